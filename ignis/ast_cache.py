@@ -0,0 +1,149 @@
+import gc
+import hashlib
+import zlib
+
+import ast_nodes
+from build_cache import compiler_hash
+from lexer import Token, TokenType
+
+# pickle і json імпортуються у функціях нижче: main.py імпортує цей модуль при кожному запуску,
+# а AST зберігається чи завантажується лише в частині збірок.
+
+# Формат файлу: магічний рядок, хеш компілятора, хеш вихідного коду (по рядку), далі стиснуте тіло.
+# dump_ast / load_ast - pickle, лише для записів, які компілятор сам кладе у свій кеш .build/cache.
+# export_ast / import_ast - JSON для --emit-ast / --from-ast: файл від користувача не може виконати код.
+AST_MAGIC = b'IGNAST1\n'
+AST_EXPORT_MAGIC = b'IGNAST-JSON1\n'
+AST_SUFFIX = '.ignast'
+
+# Класи, які import_ast може створити: вузли AST і токени, і більше нічого
+_NODE_CLASSES = {cls.__name__: cls for cls in vars(ast_nodes).values()
+                 if isinstance(cls, type) and issubclass(cls, ast_nodes.AST)}
+_NODE_CLASSES['Token'] = Token
+
+
+class AstFileError(Exception):
+    pass
+
+
+def source_hash(source_code):
+    return hashlib.sha256(source_code.encode('utf-8')).hexdigest()
+
+
+def dump_ast(tree, source_path, source_code, warden_mode, warden_stats):
+    """
+    Серіалізує перевірений AST (з анотаціями аналізу "Вахтера") разом з вихідним кодом,
+    потрібним ErrorReporter для повідомлень бекенду. Повертає bytes.
+    """
+    import pickle
+
+    payload = {'source_path': str(source_path), 'source': source_code, 'warden_mode': warden_mode,
+               'warden_stats': warden_stats, 'tree': tree}
+    # Збирач сміття лише сканує мільйони щойно створених вузлів, нічого не звільняючи:
+    # з вимкненим gc серіалізація та завантаження в кілька разів швидші.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        body = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        if gc_enabled: gc.enable()
+    return _header(AST_MAGIC, source_code) + zlib.compress(body, 1)
+
+
+def load_ast(data, expected_source=None):
+    """
+    Повертає словник, збережений dump_ast. Файл іншої версії компілятора відхиляється.
+    Лише для кешу збірки: pickle з чужого файлу може виконати довільний код.
+    """
+    import pickle
+
+    body = _split_header(data, AST_MAGIC, expected_source)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(zlib.decompress(body))
+    except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+        raise AstFileError(f"Corrupted AST file: {e}")
+    finally:
+        if gc_enabled: gc.enable()
+
+
+def export_ast(tree, source_path, source_code, warden_mode, warden_stats):
+    """Те саме, що dump_ast, але в JSON: формат файлів --emit-ast, які можна передавати іншим."""
+    import json
+
+    payload = {'source_path': str(source_path), 'source': source_code, 'warden_mode': warden_mode,
+               'warden_stats': warden_stats, 'tree': tree}
+    body = json.dumps(_encode(payload, {}), separators=(',', ':')).encode('utf-8')
+    return _header(AST_EXPORT_MAGIC, source_code) + zlib.compress(body, 1)
+
+
+def import_ast(data):
+    """Читає файл export_ast. Створюються лише вузли AST і токени, тож файл не виконує жодного коду."""
+    import json
+
+    if data.startswith(AST_MAGIC):
+        raise AstFileError("AST file is in the build cache format; write it again with --emit-ast")
+    body = _split_header(data, AST_EXPORT_MAGIC)
+    try:
+        encoded = json.loads(zlib.decompress(body))
+    except (zlib.error, ValueError) as e:
+        raise AstFileError(f"Corrupted AST file: {e}")
+    try:
+        payload = _decode(encoded, {})
+        if not isinstance(payload, dict) or not isinstance(payload.get('tree'), ast_nodes.Program):
+            raise AstFileError("Corrupted AST file: no program in it")
+        return payload
+    except (KeyError, TypeError, ValueError, AttributeError, RecursionError) as e:
+        raise AstFileError(f"Corrupted AST file: {e!r}")
+
+
+def _header(magic, source_code):
+    return magic + compiler_hash().encode() + b'\n' + source_hash(source_code).encode() + b'\n'
+
+
+def _split_header(data, magic, expected_source=None):
+    """Перевіряє заголовок файлу AST і повертає стиснуте тіло."""
+    if not data.startswith(magic): raise AstFileError("Not an Ignis AST file")
+    try:
+        version, source_digest, body = data[len(magic):].split(b'\n', 2)
+        version, source_digest = version.decode(), source_digest.decode()
+    except (ValueError, UnicodeDecodeError):
+        # Обрізаний або пошкоджений заголовок
+        raise AstFileError("Corrupted AST file: truncated header")
+    if version != compiler_hash():
+        raise AstFileError("AST file was produced by a different version of the compiler")
+    if expected_source is not None and source_digest != source_hash(expected_source):
+        raise AstFileError("AST file does not match the source code")
+    return body
+
+
+# Кодування JSON: вузол - {"node": клас, "id": номер, "attrs": {...}}, повторне посилання на той самий
+# вузол - {"ref": номер} (бекенди ключують деякі таблиці за id(вузла), тож спільні вузли мають лишитися
+# спільними), словник - {"dict": {...}}, TokenType - {"token_type": ім'я}.
+
+def _encode(value, ids):
+    if value is None or isinstance(value, (bool, int, str)): return value
+    if isinstance(value, list): return [_encode(item, ids) for item in value]
+    if isinstance(value, dict): return {'dict': {key: _encode(item, ids) for key, item in value.items()}}
+    if isinstance(value, TokenType): return {'token_type': value.name}
+    if _NODE_CLASSES.get(type(value).__name__) is not type(value):
+        raise TypeError(f"cannot export {type(value).__name__} in an AST")
+    if id(value) in ids: return {'ref': ids[id(value)]}
+    ids[id(value)] = len(ids)
+    return {'node': type(value).__name__, 'id': ids[id(value)],
+            'attrs': {name: _encode(item, ids) for name, item in vars(value).items()}}
+
+
+def _decode(value, nodes):
+    if value is None or isinstance(value, (bool, int, str)): return value
+    if isinstance(value, list): return [_decode(item, nodes) for item in value]
+    if 'dict' in value: return {key: _decode(item, nodes) for key, item in value['dict'].items()}
+    if 'token_type' in value: return TokenType[value['token_type']]
+    if 'ref' in value: return nodes[value['ref']]
+    cls = _NODE_CLASSES[value['node']]
+    # Без виклику __init__: атрибути беруться з файлу як є
+    node = nodes[value['id']] = cls.__new__(cls)
+    for name, item in value['attrs'].items():
+        setattr(node, name, _decode(item, nodes))
+    return node
@@ -19,6 +19,9 @@ class Field(AST):
 class MemberAccess(AST):
     def __init__(self, left, right): self.left, self.right = left, right
     def __repr__(self): return f"MemberAccess({self.left}, '{self.right.value}')"
+class IndexExpr(AST):
+    def __init__(self, left, index, token): self.left, self.index, self.token = left, index, token
+    def __repr__(self): return f"IndexExpr({self.left}, {self.index})"
 class VarDecl(AST):
     def __init__(self, type_node, var_node, assign_node, is_mutable): self.type_node, self.var_node, self.assign_node, self.is_mutable = type_node, var_node, assign_node, is_mutable
     def __repr__(self): mut_str = 'mut ' if self.is_mutable else ''; return f"    VarDecl({self.type_node} {self.var_node.value} = {self.assign_node})"
@@ -37,19 +40,34 @@ class LoopStmt(AST):
 class ForStmt(AST):
     def __init__(self, init, condition, increment, body): self.init, self.condition, self.increment, self.body = init, condition, increment, body
     def __repr__(self): return f"    ForStmt(init={self.init}, cond={self.condition}, inc={self.increment}, body={self.body})"
+class ForeachStmt(AST):
+    def __init__(self, var_node, iterable, body): self.var_node, self.iterable, self.body = var_node, iterable, body
+    def __repr__(self): return f"    ForeachStmt(var='{self.var_node.value}', iterable={self.iterable}, body={self.body})"
+class YieldStmt(AST):
+    def __init__(self, token, value): self.token, self.value = token, value
+    def __repr__(self): return f"    YieldStmt(value={self.value})"
 class BreakStmt(AST):
     def __repr__(self): return "    BreakStmt"
 class ContinueStmt(AST):
     def __repr__(self): return "    ContinueStmt"
 class Type(AST):
-    def __init__(self, token, pointer_level=0):
+    element, length = None, None  # для array<element, length>
+    def __init__(self, token, pointer_level=0, element=None, length=None):
         self.token, self.value, self.pointer_level = token, token.value if token else "struct", pointer_level
-    def __repr__(self): return f"{'ptr ' * self.pointer_level}{self.value}"
+        self.element, self.length = element, length
+    def __repr__(self):
+        base = f"array<{self.element}, {self.length}>" if self.length is not None else self.value
+        return f"{'ptr ' * self.pointer_level}{base}"
     def __eq__(self, other):
         if type(other) == type(self):
-            return self.value == other.value and self.pointer_level == other.pointer_level
+            return self.value == other.value and self.pointer_level == other.pointer_level and \
+                self.length == other.length and self.element == other.element
         else:
             raise NotImplementedError
+    @property
+    def is_array(self): return self.length is not None and self.pointer_level == 0
+    def pointer_to(self): return Type(self.token, self.pointer_level + 1, self.element, self.length)
+    def pointee(self): return Type(self.token, self.pointer_level - 1, self.element, self.length)
 class Assign(AST):
     def __init__(self, left, op, right): self.left, self.op, self.right = left, op, right
     def __repr__(self):
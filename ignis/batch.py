@@ -0,0 +1,236 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from warden import WARDEN_MODES
+from error import DEFAULT_MAX_ERRORS
+from build_cache import BuildCache
+from server import ThreadLocalStream
+
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+
+def frontend_job(input_file, target, warden_mode, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Лексер, парсер, перевірки та генерація коду для одного файлу (виконується в процесі пулу).
+    Повертає (згенерований код або None, вивід компілятора, час у секундах).
+    """
+    from main import compile_source, report_failure
+    from error import ErrorReporter, CompilerError, TooManyErrors
+
+    start = time.perf_counter()
+    output = io.StringIO()
+    generated_code = None
+    with contextlib.redirect_stdout(output):
+        reporter = None
+        try:
+            with open(input_file, 'r', encoding='utf-8') as f:
+                source_code = f.read()
+            reporter = ErrorReporter(input_file, source_code.split('\n'), max_errors)
+            generated_code = compile_source(source_code, input_file, reporter, target, warden_mode)
+            if reporter.had_error:
+                generated_code = None
+                report_failure(reporter)
+            else:
+                reporter.flush()
+        except (CompilerError, TooManyErrors) as e:
+            report_failure(reporter, e)
+        except Exception:
+            print("--- An unexpected internal compiler error occurred ---")
+            print(traceback.format_exc(), end='')
+    return generated_code, output.getvalue(), time.perf_counter() - start
+
+
+def collect_inputs(patterns):
+    """Розгортає директорії (усі *.ign всередині) та glob-шаблони у список файлів без повторів."""
+    files, seen = [], set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(str(p) for p in path.glob('*.ign'))
+        elif any(ch in pattern for ch in '*?['):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for match in matches:
+            if Path(match).resolve() not in seen:
+                seen.add(Path(match).resolve())
+                files.append(match)
+    return files
+
+
+class BatchJob:
+    def __init__(self, input_file, out_dir):
+        self.input_file = input_file
+        source_path = Path(input_file).resolve()
+        base_dir = Path(out_dir).resolve() if out_dir else source_path.parent
+        self.executable_path = base_dir / source_path.stem
+        self.status = 'pending'
+        self.message = ''
+        self.frontend_time = 0.0
+        self.backend_time = 0.0
+        self.cache_key = None
+
+
+def backend_job(job, generated_code, args, cache):
+    """g++, cc або nasm+ld для одного файлу (виконується в пулі потоків - робота йде у зовнішніх процесах)."""
+    from main import compile_cpp, compile_c, run_tool
+
+    start = time.perf_counter()
+    output = io.StringIO()
+    # redirect_stdout підмінює глобальний sys.stdout і не працює з кількома потоками,
+    # тому вивід кожного потоку збирається через ThreadLocalStream.
+    sys.stdout.capture(output)
+    try:
+        if args.target == 'cpp':
+            compile_cpp(generated_code, job.executable_path, args.opt_level,
+                        cache_root=cache.root if cache is not None else None, capture=True,
+                        warden_checks=args.warden_checks)
+        elif args.target == 'c':
+            compile_c(generated_code, job.executable_path, args.opt_level,
+                      cache_root=cache.root if cache is not None else None, capture=True,
+                      warden_checks=args.warden_checks)
+        else:
+            build_dir = job.executable_path.parent / '.build' / job.executable_path.stem
+            build_dir.mkdir(parents=True, exist_ok=True)
+            asm_path = build_dir / (job.executable_path.name + '.asm')
+            obj_path = build_dir / (job.executable_path.name + '.o')
+            asm_path.write_text(generated_code)
+            run_tool(['nasm', '-f', 'elf64', '-o', str(obj_path), str(asm_path)], capture=True)
+            run_tool(['ld', '-o', str(job.executable_path), str(obj_path)], capture=True)
+            if not args.keep_files:
+                asm_path.unlink(); obj_path.unlink()
+                if not any(build_dir.iterdir()): build_dir.rmdir()
+        if cache is not None: cache.store(job.cache_key, {'executable': job.executable_path})
+        job.status = 'ok'
+    except FileNotFoundError:
+        job.status = 'failed'
+        output.write("Error: A required build tool was not found (e.g., nasm, ld, g++, cc).\n")
+    except subprocess.CalledProcessError as e:
+        job.status = 'failed'
+        output.write(f"An error occurred during an external command: {e}\n")
+    finally:
+        sys.stdout.release()
+    job.message += output.getvalue()
+    job.backend_time = time.perf_counter() - start
+
+
+def build_many(argv):
+    from main import cache_flags
+
+    arg_parser = argparse.ArgumentParser(prog="ignis build",
+                                         description="Compile many Ignis source files in one invocation.")
+    arg_parser.add_argument('inputs', nargs='+', help='Source files, directories or glob patterns')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                            help='Number of parallel jobs (default: number of CPUs)')
+    arg_parser.add_argument('--out-dir', type=str, help='Directory for executables (default: next to each source)')
+    arg_parser.add_argument('--target', type=str, choices=['asm', 'cpp', 'c'], default='asm',
+                            help="Specify the compilation target: 'asm' (default), 'cpp' or 'c'")
+    arg_parser.add_argument('-O', dest='opt_level', choices=['0', '1', '2', '3', 's'], default='0',
+                            help="Optimization level passed to g++ or cc (only for 'cpp' and 'c' targets), default 0")
+    arg_parser.add_argument('-k', '--keep-files', action='store_true', help='Keep intermediate files')
+    arg_parser.add_argument('--warden-checks', choices=WARDEN_MODES, default='elided',
+                            help="Runtime key checks on dereference (only for 'cpp' and 'c' targets)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Do not use the build cache")
+    arg_parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                            help=f"Stop compiling a file after N errors (default: {DEFAULT_MAX_ERRORS}, 0 - no limit)")
+    args = arg_parser.parse_args(argv)
+
+    jobs = [BatchJob(input_file, args.out_dir) for input_file in collect_inputs(args.inputs)]
+    if not jobs:
+        print("Error: No input files found.")
+        return 1
+    print(f"--- Building {len(jobs)} files (Target: {args.target.upper()}, jobs: {args.jobs}) ---")
+    start = time.perf_counter()
+
+    # Однойменні файли з різних директорій у спільному --out-dir перезаписали б один одного
+    outputs = {}
+    for job in jobs:
+        first = outputs.setdefault(job.executable_path, job)
+        if first is not job:
+            job.status = 'failed'
+            job.message = (f"Error: '{job.input_file}' and '{first.input_file}' would both be built to "
+                           f"'{job.executable_path}'; build them into different --out-dir directories\n")
+
+    caches = {}
+    pending = []
+    for job in jobs:
+        if job.status == 'failed': continue
+        if not os.path.exists(job.input_file):
+            job.status, job.message = 'failed', f"Error: Input file not found at '{job.input_file}'\n"
+            continue
+        job.executable_path.parent.mkdir(parents=True, exist_ok=True)
+        cache = None
+        if not args.no_cache:
+            cache_root = job.executable_path.parent / '.build' / 'cache'
+            cache = caches.setdefault(cache_root, BuildCache(cache_root))
+            with open(job.input_file, 'r', encoding='utf-8') as f:
+                # compile_source генерує код так само, як main.py без прапорців IR
+                job.cache_key = cache.make_key(f.read(), args.target, cache_flags(args.warden_checks, args.opt_level))
+            cached = cache.lookup(job.cache_key) or {}
+            if 'executable' in cached:
+                shutil.copy2(cached['executable'], job.executable_path)
+                job.status = 'cached'
+                continue
+        pending.append((job, cache))
+
+    # Фронтенд (CPU-bound Python) - у пулі процесів; g++/nasm - у пулі потоків з тим самим лімітом.
+    real_stdout = sys.stdout
+    sys.stdout = ThreadLocalStream(real_stdout)
+    try:
+        run_pools(pending, args)
+    finally:
+        sys.stdout = real_stdout
+
+    wall = time.perf_counter() - start
+    print_summary(jobs, wall)
+    return 1 if any(job.status == 'failed' for job in jobs) else 0
+
+
+def run_pools(pending, args):
+    with ProcessPoolExecutor(max_workers=args.jobs) as frontend_pool, \
+            ThreadPoolExecutor(max_workers=args.jobs) as backend_pool:
+        frontend_futures = {frontend_pool.submit(frontend_job, job.input_file, args.target, args.warden_checks,
+                                                    args.max_errors):
+                                (job, cache) for job, cache in pending}
+        backend_futures = []
+        # Файл іде на g++/nasm, щойно для нього готовий код, не чекаючи на решту.
+        for future in as_completed(frontend_futures):
+            job, cache = frontend_futures[future]
+            generated_code, output, job.frontend_time = future.result()
+            job.message = output
+            if generated_code is None:
+                job.status = 'failed'
+                continue
+            if cache is not None: cache.store_text(job.cache_key, 'generated', generated_code)
+            backend_futures.append(backend_pool.submit(backend_job, job, generated_code, args, cache))
+        for future in backend_futures: future.result()
+
+
+def print_summary(jobs, wall):
+    failed = [job for job in jobs if job.status == 'failed']
+    for job in failed:
+        print(f"\n{RED}!!! {job.input_file} !!!{RESET}")
+        print(job.message.rstrip())
+
+    print("\n--- Build summary ---")
+    name_width = max(len(job.input_file) for job in jobs)
+    for job in jobs:
+        color = RED if job.status == 'failed' else GREEN
+        timing = f"front-end {job.frontend_time * 1000:7.1f} ms  back-end {job.backend_time * 1000:7.1f} ms"
+        if job.status == 'cached': timing = "up to date (cache)"
+        print(f"  {color}{job.status:<7}{RESET} {job.input_file:<{name_width}}  {timing}")
+    built = len(jobs) - len(failed)
+    print(f"\n{built}/{len(jobs)} succeeded, {len(failed)} failed in {wall:.2f} s "
+          f"({len(jobs) / wall:.1f} files/s)")
@@ -0,0 +1,132 @@
+"""
+Бенчмарк часу зовнішнього компілятора: g++ над кодом цілі cpp проти cc над кодом цілі c.
+
+Для кожної "форми" синтетичної програми (див. generator.py) та кожного розміру один раз
+проганяє фронтенд, генерує C++ та C і вимірює лише `g++ -std=c++17 -c` та `cc -std=c11 -c`
+(без лінкування та рантайму) для кожного рівня -O. Найкращий з кількох запусків
+записується в JSON поруч з відношенням g++ / cc.
+
+    python3 ignis/benchmarks/backend_compile_bench.py
+    python3 ignis/benchmarks/backend_compile_bench.py --sizes 100K 1M --shape nesting --opt-levels 0 2
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generator import SHAPES, generate_program, parse_size, format_size  # noqa: E402
+from error import ErrorReporter  # noqa: E402
+from main import run_frontend  # noqa: E402
+from codegen_cpp import CodeGeneratorCpp  # noqa: E402
+from codegen_c import CodeGeneratorC  # noqa: E402
+from build_cache import compiler_hash, runtime_dir, tool_version  # noqa: E402
+
+DEFAULT_SIZES = ('10K', '100K', '1M')
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+# (ціль, кодогенератор, розширення, команда компіляції без -O та файлів)
+BACKENDS = (
+    ('cpp', CodeGeneratorCpp, '.cpp', ['g++', '-std=c++17']),
+    ('c', CodeGeneratorC, '.c', ['cc', '-std=c11']),
+)
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def compile_time(command, repeat):
+    """Найкращий реальний час компіляції (секунди) або None, якщо компілятор завершився з помилкою."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            print(f"  {RED}[!] {' '.join(command[:2])} failed:{RESET}\n{result.stderr[:2000]}")
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_case(shape, size, opt_levels, repeat, work_dir):
+    source_code, units = generate_program(shape, size)
+    name = f"{shape}-{format_size(size)}"
+    reporter = ErrorReporter(f"<{name}>", source_code.split('\n'))
+    ast, _ = run_frontend(source_code, f"<{name}>", reporter)
+    if ast is None: raise RuntimeError(f"Front end failed on the '{shape}' program")
+
+    result = {'shape': shape, 'size': size, 'bytes': len(source_code), 'units': units, 'backends': {}}
+    for target, generator_class, suffix, command in BACKENDS:
+        code = generator_class(ErrorReporter(f"<{name}>", [])).generate(ast)
+        path = work_dir / (name + suffix)
+        path.write_text(code)
+        times = {}
+        for level in opt_levels:
+            times[level] = compile_time([*command, f'-O{level}', f'-I{runtime_dir()}', '-c', '-o',
+                                         str(path.with_suffix('.o')), str(path)], repeat)
+        result['backends'][target] = {'generated_bytes': len(code), 'lines': code.count('\n') + 1, 'times': times}
+    return result
+
+
+def print_results(results, opt_levels):
+    print(f"\n{'shape':<12} {'size':>6}  " + "  ".join(f"{'g++ -O' + level:>10} {'cc -O' + level:>10} {'ratio':>6}"
+                                                   for level in opt_levels))
+    for r in results:
+        cells = []
+        for level in opt_levels:
+            cpp_time = r['backends']['cpp']['times'][level]
+            c_time = r['backends']['c']['times'][level]
+            if cpp_time is None or c_time is None:
+                cells.append(f"{'n/a':>10} {'n/a':>10} {'':>6}")
+                continue
+            ratio = cpp_time / c_time
+            color = GREEN if ratio > 1.1 else RED if ratio < 0.9 else ""
+            cells.append(f"{cpp_time * 1000:8.0f}ms {c_time * 1000:8.0f}ms {color}{ratio:5.2f}x{RESET if color else ''}")
+        print(f"{r['shape']:<12} {format_size(r['size']):>6}  " + "  ".join(cells))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare g++ on the 'cpp' target with cc on the 'c' target.")
+    arg_parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                            help="Program sizes, e.g. 10K 100K 1M (default: 10K 100K 1M)")
+    arg_parser.add_argument('--shape', action='append', choices=SHAPES, dest='shapes',
+                            help="Program shape to benchmark (repeatable, default: all shapes)")
+    arg_parser.add_argument('--opt-levels', nargs='+', choices=['0', '1', '2', '3', 's'], default=['0'],
+                            help="Optimization levels for both compilers (default: 0)")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per case; the fastest is kept (default: 3)")
+    arg_parser.add_argument('-o', '--output', type=str,
+                            help="JSON result file (default: results/backend-compile-<time>.json)")
+    args = arg_parser.parse_args()
+
+    sizes = sorted(parse_size(size) for size in args.sizes)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='ignis-backend-bench-') as work_dir:
+        for shape in args.shapes or SHAPES:
+            for size in sizes:
+                print(f"[*] {shape} {format_size(size)}", flush=True)
+                results.append(bench_case(shape, size, args.opt_levels, args.repeat, Path(work_dir)))
+
+    print_results(results, args.opt_levels)
+
+    output_path = Path(args.output) if args.output else \
+        RESULTS_DIR / f"backend-compile-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'python': platform.python_version(),
+                            'platform': platform.platform(), 'compiler_hash': compiler_hash(),
+                            'repeat': args.repeat, 'g++': tool_version('cpp'), 'cc': tool_version('c')},
+                   'results': results}, f, indent=1)
+    print(f"\n[+] Results saved to {output_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Бенчмарк прибирання перевірок меж масивів (bounds.py) на цілі cpp.
+
+Кожна програма компілюється двічі: з перевіркою кожного індексу (bounds_mode='full') і з
+перевірками, які прибрав аналіз діапазонів ('elided'). Якщо поруч лежить `<назва>_raw.ign` -
+та сама програма на сирих вказівниках, - вона теж збирається: це межа, до якої має дотягувати
+'elided'. Перевірки "Вахтера" вимкнені, щоб вимірювалися лише перевірки меж. Для кожного
+рівня -O записується найкращий з кількох запусків, а вивід варіантів порівнюється.
+
+    python3 ignis/benchmarks/bounds_bench.py
+    python3 ignis/benchmarks/bounds_bench.py --opt-levels 0 2 --repeat 10 ignis/benchmarks/runtime/array_sum.ign
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from error import ErrorReporter  # noqa: E402
+from main import run_frontend  # noqa: E402
+from codegen_cpp import CodeGeneratorCpp  # noqa: E402
+from build_cache import compiler_hash, runtime_dir, tool_version  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / 'results'
+DEFAULT_PROGRAMS = [str(BENCH_DIR / 'runtime' / 'array_sum.ign')]
+RUN_TIMEOUT = 120
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+
+def generate(path, bounds_mode):
+    """(код C++, {функція: {'sites', 'elided'}}) програми з указаним режимом перевірок меж."""
+    source_code = path.read_text(encoding='utf-8')
+    reporter = ErrorReporter(str(path), source_code.split('\n'))
+    ast, _ = run_frontend(source_code, str(path), reporter, 'off', bounds_mode=bounds_mode)
+    if ast is None: raise RuntimeError(f"Front end failed on {path}")
+    return CodeGeneratorCpp(ErrorReporter(str(path), [])).generate(ast), getattr(ast, 'bounds_stats', {})
+
+
+def build(code, executable, level):
+    source = executable.with_suffix('.cpp')
+    source.write_text(code)
+    runtime = runtime_dir()
+    subprocess.run(['g++', '-std=c++17', f'-O{level}', f'-I{runtime}', '-o', str(executable), str(source),
+                    str(runtime / 'ignis_runtime.cpp')], check=True, capture_output=True, text=True)
+
+
+def run_time(executable, repeat):
+    """(найкращий реальний час у секундах, вивід програми)."""
+    best, output = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([str(executable)], capture_output=True, timeout=RUN_TIMEOUT)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0: raise RuntimeError(f"{executable.name} exited with {result.returncode}")
+        best, output = (elapsed if best is None else min(best, elapsed)), result.stdout
+    return best, output
+
+
+def bench_program(path, opt_levels, repeat, work_dir):
+    variants = {mode: generate(path, mode) for mode in ('full', 'elided')}
+    raw_path = path.with_name(path.stem + '_raw.ign')
+    if raw_path.exists(): variants['raw'] = generate(raw_path, 'full')
+
+    stats = variants['full'][1]
+    result = {'program': path.name, 'sites': sum(s['sites'] for s in stats.values()),
+              'elided': sum(s['elided'] for s in variants['elided'][1].values()), 'times': {}}
+    for level in opt_levels:
+        times, outputs = {}, {}
+        for name, (code, _) in variants.items():
+            executable = work_dir / f"{path.stem}-{name}-O{level}"
+            build(code, executable, level)
+            times[name], outputs[name] = run_time(executable, repeat)
+        if len(set(outputs.values())) != 1:
+            print(f"  {RED}[!] {path.name} -O{level}: variants print different output{RESET}")
+        result['times'][level] = times
+    return result
+
+
+def print_results(results, opt_levels):
+    print(f"\n{'program':<20} {'elided':>8}  {'-O':>3} {'full':>9} {'elided':>9} {'raw':>9} {'full/elided':>11}")
+    for r in results:
+        for level in opt_levels:
+            times = r['times'][level]
+            raw = f"{times['raw'] * 1000:7.1f}ms" if 'raw' in times else f"{'n/a':>9}"
+            ratio = times['full'] / times['elided']
+            color = GREEN if ratio > 1.1 else ""
+            print(f"{r['program']:<20} {r['elided']:>3}/{r['sites']:<4}  {level:>3} {times['full'] * 1000:7.1f}ms "
+                  f"{times['elided'] * 1000:7.1f}ms {raw} {color}{ratio:10.2f}x{RESET if color else ''}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Array bounds checks: all checks vs range-analysis elision.")
+    arg_parser.add_argument('programs', nargs='*', default=DEFAULT_PROGRAMS,
+                            help="Ignis programs with arrays (default: runtime/array_sum.ign)")
+    arg_parser.add_argument('--opt-levels', nargs='+', choices=['0', '1', '2', '3', 's'], default=['0', '2'],
+                            help="g++ optimization levels (default: 0 2)")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Runs per variant; the fastest is kept (default: 5)")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/bounds-<time>.json)")
+    args = arg_parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='ignis-bounds-bench-') as work_dir:
+        for program in args.programs:
+            print(f"[*] {Path(program).name}", flush=True)
+            results.append(bench_program(Path(program), args.opt_levels, args.repeat, Path(work_dir)))
+
+    print_results(results, args.opt_levels)
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"bounds-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'python': platform.python_version(),
+                            'platform': platform.platform(), 'compiler_hash': compiler_hash(),
+                            'repeat': args.repeat, 'g++': tool_version('cpp')},
+                   'results': results}, f, indent=1)
+    print(f"\n[+] Results saved to {output_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Бенчмарк пропускної здатності компілятора на синтетичних програмах (див. generator.py).
+
+Для кожної "форми" програми та кожного розміру окремо вимірює лексер, парсер, перевірки,
+аналіз "Вахтера" та генерацію коду кожним бекендом, зберігає результати в JSON і
+попереджає, якщо час фази росте швидше за розмір програми (надлінійна поведінка).
+
+    python3 ignis/benchmarks/compiler_bench.py
+    python3 ignis/benchmarks/compiler_bench.py --sizes 1K 10K 100K 1M 10M 100M --shape functions
+    python3 ignis/benchmarks/compiler_bench.py --compare ignis/benchmarks/results/compiler-<дата>.json
+"""
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generator import SHAPES, generate_program, parse_size, format_size  # noqa: E402
+from lexer import Lexer  # noqa: E402
+from parser import Parser  # noqa: E402
+from checker import Checker  # noqa: E402
+from error import ErrorReporter  # noqa: E402
+from bounds import BoundsAnalyzer  # noqa: E402
+from warden import WardenAnalyzer  # noqa: E402
+from codegen import CodeGenerator  # noqa: E402
+from codegen_cpp import CodeGeneratorCpp  # noqa: E402
+from timing import TokenList, tokenize, count_nodes  # noqa: E402
+from build_cache import compiler_hash  # noqa: E402
+
+PHASES = ('lexer', 'parser', 'checker', 'bounds', 'warden', 'codegen_asm', 'codegen_cpp')
+DEFAULT_SIZES = ('1K', '10K', '100K', '1M')
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+# Показник масштабування t ~ size^k, вище якого фаза вважається надлінійною
+SUPERLINEAR_EXPONENT = 1.25
+# Фази коротші за цей час надто шумні для оцінки масштабування (секунди)
+MIN_MEASURABLE_TIME = 0.005
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run_once(source_code, file_name):
+    """Проганяє всі фази один раз. Повертає (часи фаз, кількість токенів, кількість вузлів AST)."""
+    reporter = ErrorReporter(file_name, source_code.split('\n'))
+    times = {}
+    tokens, times['lexer'] = _timed(lambda: tokenize(Lexer(source_code, reporter)))
+    ast, times['parser'] = _timed(lambda: Parser(TokenList(tokens), reporter).parse())
+    _, times['checker'] = _timed(lambda: Checker(reporter).check(ast))
+    _, times['bounds'] = _timed(lambda: BoundsAnalyzer(reporter).analyze(ast))
+    _, times['warden'] = _timed(lambda: WardenAnalyzer('elided').analyze(ast))
+    for backend, generator_class in (('asm', CodeGenerator), ('cpp', CodeGeneratorCpp)):
+        try:
+            _, times[f'codegen_{backend}'] = _timed(lambda: generator_class(reporter).generate(ast))
+        except Exception:
+            # Бекенд може не підтримувати якусь конструкцію - це не зупиняє решту вимірів
+            times[f'codegen_{backend}'] = None
+    return times, len(tokens), count_nodes(ast)
+
+
+def bench_case(shape, size, repeat):
+    source_code, units = generate_program(shape, size)
+    best = {}
+    for _ in range(repeat):
+        gc.collect()
+        times, token_count, node_count = run_once(source_code, f"<{shape}-{format_size(size)}>")
+        for phase, value in times.items():
+            if value is None: best[phase] = None
+            elif best.get(phase, math.inf) is not None: best[phase] = min(value, best.get(phase, math.inf))
+    return {'shape': shape, 'size': size, 'bytes': len(source_code), 'units': units,
+            'tokens': token_count, 'ast_nodes': node_count, 'phases': best}
+
+
+def scaling_exponents(results):
+    """Для сусідніх розмірів однієї форми: k = log(t2 / t1) / log(bytes2 / bytes1)."""
+    exponents = []
+    for shape in SHAPES:
+        runs = sorted((r for r in results if r['shape'] == shape), key=lambda r: r['bytes'])
+        for small, large in zip(runs, runs[1:]):
+            for phase in PHASES:
+                t1, t2 = small['phases'].get(phase), large['phases'].get(phase)
+                if not t1 or not t2 or t1 < MIN_MEASURABLE_TIME: continue
+                k = math.log(t2 / t1) / math.log(large['bytes'] / small['bytes'])
+                exponents.append({'shape': shape, 'phase': phase, 'from': small['size'], 'to': large['size'],
+                                  'exponent': round(k, 3)})
+    return exponents
+
+
+def print_results(results):
+    header = "  ".join(f"{phase:>12}" for phase in PHASES)
+    print(f"\n{'shape':<12} {'size':>6} {'tokens':>10}  {header}   MB/s (lexer..codegen_cpp)")
+    for r in results:
+        cells = "  ".join(f"{r['phases'][p] * 1000:10.1f}ms" if r['phases'].get(p) is not None else f"{'n/a':>12}"
+                          for p in PHASES)
+        total = sum(t for t in r['phases'].values() if t is not None)
+        print(f"{r['shape']:<12} {format_size(r['size']):>6} {r['tokens']:>10}  {cells}   "
+              f"{r['bytes'] / (1024 * 1024) / total:6.2f}")
+
+
+def print_exponents(exponents):
+    flagged = [e for e in exponents if e['exponent'] > SUPERLINEAR_EXPONENT]
+    if not exponents: return flagged
+    print(f"\n{YELLOW}--- Scaling (t ~ size^k) ---{RESET}")
+    for e in exponents:
+        color = RED if e in flagged else GREEN
+        print(f"  {color}k={e['exponent']:5.2f}{RESET}  {e['shape']:<12} {e['phase']:<12} "
+              f"{format_size(e['from'])} -> {format_size(e['to'])}")
+    if flagged:
+        print(f"\n{RED}!!! {len(flagged)} phase(s) scale superlinearly (k > {SUPERLINEAR_EXPONENT}) !!!{RESET}")
+    return flagged
+
+
+def print_comparison(results, previous_path):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r['shape'], r['size']): r for r in json.load(f)['results']}
+    print(f"\n{YELLOW}--- Compared with {previous_path} (new / old time) ---{RESET}")
+    for r in results:
+        old = previous.get((r['shape'], r['size']))
+        if old is None: continue
+        ratios = []
+        for phase in PHASES:
+            new_time, old_time = r['phases'].get(phase), old['phases'].get(phase)
+            if not new_time or not old_time: ratios.append(f"{phase}=n/a"); continue
+            ratio = new_time / old_time
+            color = RED if ratio > 1.1 else GREEN if ratio < 0.9 else ""
+            ratios.append(f"{phase}={color}{ratio:.2f}x{RESET if color else ''}")
+        print(f"  {r['shape']:<12} {format_size(r['size']):>6}  " + "  ".join(ratios))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure Ignis compiler throughput on synthetic programs.")
+    arg_parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                            help="Program sizes, e.g. 1K 10K 100K 1M 10M 100M (default: 1K..1M)")
+    arg_parser.add_argument('--shape', action='append', choices=SHAPES, dest='shapes',
+                            help="Program shape to benchmark (repeatable, default: all shapes)")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Runs per case; the fastest is kept (default: 3)")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/compiler-<time>.json)")
+    arg_parser.add_argument('--compare', type=str, metavar='JSON', help="Previous result file to compare with")
+    arg_parser.add_argument('--check', action='store_true', help="Exit with code 1 if any phase scales superlinearly")
+    args = arg_parser.parse_args()
+
+    sizes = sorted(parse_size(size) for size in args.sizes)
+    # Рекурсивні фази компілятора на великих програмах потребують глибшого стеку
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    results = []
+    for shape in args.shapes or SHAPES:
+        for size in sizes:
+            print(f"[*] {shape} {format_size(size)}", flush=True)
+            results.append(bench_case(shape, size, args.repeat))
+
+    print_results(results)
+    exponents = scaling_exponents(results)
+    flagged = print_exponents(exponents)
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"compiler-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'python': platform.python_version(),
+                            'platform': platform.platform(), 'compiler_hash': compiler_hash(),
+                            'repeat': args.repeat},
+                   'results': results, 'scaling': exponents}, f, indent=1)
+    print(f"\n[+] Results saved to {output_path}")
+
+    if args.compare: print_comparison(results, args.compare)
+    return 1 if args.check and flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
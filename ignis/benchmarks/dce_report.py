@@ -0,0 +1,125 @@
+"""
+Звіт про видалення мертвого коду (ir_opt.py: cfg, dce, dead-functions) на прикладах.
+
+Кожна програма опускається в IR двічі: конвеєром без cfg/dce/dead-functions і повним.
+Для обох варіантів рахуються інструкції IR, інструкції та байти згенерованого асемблера,
+байти згенерованого C++, а якщо є g++ - ще й розмір секції .text об'єктного файлу (-O0),
+тобто скільки машинного коду прибрано ще до оптимізацій g++.
+
+    python3 ignis/benchmarks/dce_report.py
+    python3 ignis/benchmarks/dce_report.py examples/test_loop.ign --no-objects
+"""
+import argparse
+import glob
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from error import ErrorReporter  # noqa: E402
+from ir import lower_program, IRUnsupported  # noqa: E402
+from ir_opt import optimize, PASSES, MODULE_PASSES  # noqa: E402
+from codegen import IRCodeGenerator  # noqa: E402
+from codegen_cpp import IRCodeGeneratorCpp  # noqa: E402
+from build_cache import runtime_dir as cpp_runtime_dir  # noqa: E402
+from main import run_frontend  # noqa: E402
+from timing import PhaseTimer  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / 'results'
+EXAMPLES_DIR = BENCH_DIR.parent.parent / 'examples'
+BASELINE_PASSES = [(name, run) for name, run in PASSES if name not in ('cfg', 'dce')]
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def asm_instructions(code):
+    """Рядки з інструкціями: без міток, коментарів, директив і даних."""
+    count = 0
+    for line in code.splitlines():
+        line = line.split(';', 1)[0].strip()
+        if not line or line.endswith(':') or line.split()[0] in ('section', 'global', 'extern', 'default'): continue
+        if len(line.split()) > 1 and line.split()[1] in ('db', 'dq', 'resb', 'resq', 'equ'): continue
+        count += 1
+    return count
+
+
+def text_size(cpp_code, work_dir):
+    """Розмір .text об'єктного файлу, скомпільованого g++ -O0, у байтах."""
+    obj_path = work_dir / 'unit.o'
+    subprocess.run(['g++', '-std=c++17', '-O0', f'-I{cpp_runtime_dir()}', '-c', '-o', str(obj_path),
+                    '-x', 'c++', '-'], input=cpp_code, text=True, check=True, capture_output=True)
+    result = subprocess.run(['size', '-A', str(obj_path)], text=True, check=True, capture_output=True)
+    return sum(int(line.split()[1]) for line in result.stdout.splitlines() if line.startswith('.text'))
+
+
+def measure(tree, file_name, lines, passes, module_passes, work_dir):
+    module = optimize(lower_program(tree), passes=passes, module_passes=module_passes)
+    asm_code = IRCodeGenerator(ErrorReporter(file_name, lines)).generate(module)
+    cpp_code = IRCodeGeneratorCpp(ErrorReporter(file_name, lines)).generate(module)
+    return {'ir_instructions': sum(1 for func in module.functions for _ in func.instructions()),
+            'functions': len(module.functions),
+            'asm_instructions': asm_instructions(asm_code), 'asm_bytes': len(asm_code.encode()),
+            'cpp_bytes': len(cpp_code.encode()),
+            'text_bytes': text_size(cpp_code, work_dir) if work_dir is not None else None}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Report how much code the IR dead code elimination removes.")
+    arg_parser.add_argument('files', nargs='*', help="Programs to measure (default: examples/*.ign)")
+    arg_parser.add_argument('--no-objects', action='store_true', help="Do not compile with g++ to measure .text")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/dce-<time>.json)")
+    args = arg_parser.parse_args()
+
+    files = args.files or sorted(glob.glob(str(EXAMPLES_DIR / '*.ign')))
+    objects = not args.no_objects and shutil.which('g++') is not None
+    columns = ('ir_instructions', 'asm_instructions', 'asm_bytes', 'cpp_bytes') + (('text_bytes',) if objects else ())
+    results, totals = [], {column: [0, 0] for column in columns}
+    print(f"{YELLOW}--- Dead code elimination: before -> after (change) ---{RESET}")
+    with tempfile.TemporaryDirectory(prefix='ignis-dce-') as temp_dir:
+        work_dir = Path(temp_dir) if objects else None
+        for file_path in files:
+            name = Path(file_path).stem
+            source_code = Path(file_path).read_text(encoding='utf-8')
+            lines = source_code.split('\n')
+            reporter = ErrorReporter(file_path, lines)
+            tree, _ = run_frontend(source_code, file_path, reporter, 'elided', PhaseTimer(enabled=False))
+            if tree is None:
+                print(f"  {name:<24} skipped (does not compile)")
+                continue
+            try:
+                before = measure(tree, file_path, lines, BASELINE_PASSES, [], work_dir)
+                after = measure(tree, file_path, lines, PASSES, MODULE_PASSES, work_dir)
+            except IRUnsupported as e:
+                print(f"  {name:<24} skipped ({e})")
+                continue
+            results.append({'file': name, 'before': before, 'after': after})
+            cells = []
+            for column in columns:
+                totals[column][0] += before[column]
+                totals[column][1] += after[column]
+                cells.append(f"{column} {before[column]} -> {after[column]} ({after[column] - before[column]:+})")
+            print(f"  {name:<24} " + ', '.join(cells))
+    print(f"{YELLOW}--- Total ---{RESET}")
+    for column, (before, after) in totals.items():
+        share = (after - before) / before * 100 if before else 0.0
+        print(f"  {column:<24} {before:8} -> {after:8}  ({after - before:+}, {share:+.1f}%)")
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"dce-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'platform': platform.platform()}, 'results': results,
+                   'totals': {column: {'before': b, 'after': a} for column, (b, a) in totals.items()}}, f, indent=1)
+    print(f"\n{GREEN}[+] Results saved to {output_path}{RESET}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
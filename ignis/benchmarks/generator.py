@@ -0,0 +1,144 @@
+"""
+Генератор синтетичних програм Ignis заданого розміру для бенчмарків компілятора.
+
+Кожна "форма" навантажує окрему частину компілятора:
+  functions   - багато функцій, що викликають одна одну
+  nesting     - глибоко вкладені if/while/блоки-вирази
+  expressions - довгі арифметичні та логічні вирази
+  structs     - багато структур з полями-вказівниками та доступом через `.`
+  strings     - велика таблиця рядкових літералів
+
+Програма будується з однакових одиниць, доки не досягне потрібного розміру в байтах,
+тож розмір можна змінювати від кілобайт до сотень мегабайт, не змінюючи "форму" коду.
+"""
+import random
+
+SHAPES = ('functions', 'nesting', 'expressions', 'structs', 'strings')
+
+# Глибина вкладеності та довжина виразу обмежені: усі фази компілятора рекурсивні,
+# а тут вимірюється масштабування за розміром програми, а не ліміт рекурсії Python.
+DEFAULT_NESTING_DEPTH = 24
+DEFAULT_EXPRESSION_TERMS = 48
+STRINGS_PER_FUNCTION = 16
+
+
+def _function_unit(i, rng):
+    call = f"f{i - 1}(r, b)" if i > 0 else "a - b"
+    return (f"int f{i}(int a, int b) {{\n"
+            f"    mut int r = a * {rng.randint(1, 9)} + b;\n"
+            f"    if (r > {rng.randint(10, 99)}) {{\n"
+            f"        r = r - {call};\n"
+            f"    }} else {{\n"
+            f"        r = r + {rng.randint(1, 9)};\n"
+            f"    }};\n"
+            f"    return r;\n"
+            f"}}\n\n")
+
+
+def _nesting_unit(i, rng, depth=DEFAULT_NESTING_DEPTH):
+    lines = [f"int nest{i}(int a) {{", "    mut int r = 0;"]
+    indent = "    "
+    closers = []
+    for level in range(depth):
+        kind = level % 3
+        if kind == 0:
+            lines.append(f"{indent}if (a > {level}) {{")
+            closers.append(f"{indent}}} else {{\n{indent}    r = r - {level};\n{indent}}};")
+        elif kind == 1:
+            lines.append(f"{indent}while (r < {level + rng.randint(1, 5)}) {{")
+            lines.append(f"{indent}    r = r + 1;")
+            closers.append(f"{indent}}}")
+        else:
+            lines.append(f"{indent}int v{level} = {{")
+            lines.append(f"{indent}    r = r + {level};")
+            closers.append(f"{indent}    r\n{indent}}};")
+        indent += "    "
+    lines.append(f"{indent}r = r + a;")
+    while closers: lines.append(closers.pop())
+    lines.append("    return r;")
+    lines.append("}\n\n")
+    return "\n".join(lines)
+
+
+def _expression_unit(i, rng, terms=DEFAULT_EXPRESSION_TERMS):
+    operators = ('+', '-', '*', 'band', 'bor', 'bxor')
+    parts = ["a"]
+    for _ in range(terms):
+        operand = rng.choice(("a", "b", str(rng.randint(1, 999)), f"(a - {rng.randint(1, 99)})"))
+        parts.append(f"{rng.choice(operators)} {operand}")
+    condition = " and ".join(f"(a > {rng.randint(0, 50)} or b < {rng.randint(0, 50)})" for _ in range(terms // 8))
+    return (f"int expr{i}(int a, int b) {{\n"
+            f"    int x = {' '.join(parts)};\n"
+            f"    int c = {condition or '1'};\n"
+            f"    return x + c;\n"
+            f"}}\n\n")
+
+
+def _struct_unit(i, rng):
+    prev_field = f"    ptr S{i - 1} prev;\n" if i > 0 else ""
+    prev_use = f"    s.prev = s.prev;\n" if i > 0 else ""
+    return (f"struct S{i} {{\n"
+            f"    int x;\n"
+            f"    int y;\n"
+            f"    char tag;\n"
+            f"{prev_field}"
+            f"}}\n\n"
+            f"int use_s{i}(ptr S{i} s) {{\n"
+            f"    s.x = s.y + {rng.randint(1, 99)};\n"
+            f"    s.tag = 'a';\n"
+            f"{prev_use}"
+            f"    return s.x * 2;\n"
+            f"}}\n\n")
+
+
+def _string_unit(i, rng):
+    alphabet = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    lines = [f"int strings{i}() {{"]
+    for k in range(STRINGS_PER_FUNCTION):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(8, 48)))
+        lines.append(f'    ptr char s{k} = "{text}\\n";')
+    lines.append("    return 0;")
+    lines.append("}\n\n")
+    return "\n".join(lines)
+
+
+UNIT_GENERATORS = {
+    'functions': _function_unit,
+    'nesting': _nesting_unit,
+    'expressions': _expression_unit,
+    'structs': _struct_unit,
+    'strings': _string_unit,
+}
+
+MAIN_FUNCTION = "int main() {\n    print(0);\n    return 0;\n}\n"
+
+
+def generate_program(shape, target_bytes, seed=0):
+    """Повертає (вихідний код, кількість одиниць). Розмір - не менше target_bytes (крім main)."""
+    if shape not in UNIT_GENERATORS: raise ValueError(f"Unknown benchmark shape '{shape}'")
+    rng = random.Random(seed)
+    unit = UNIT_GENERATORS[shape]
+    chunks = [f"// Synthetic Ignis benchmark: shape={shape}, target size={target_bytes} bytes\n\n"]
+    size = len(chunks[0])
+    count = 0
+    while size < target_bytes:
+        chunk = unit(count, rng)
+        chunks.append(chunk)
+        size += len(chunk)
+        count += 1
+    chunks.append(MAIN_FUNCTION)
+    return "".join(chunks), count
+
+
+def parse_size(text):
+    """'1K', '10M', '100MB', '4096' -> кількість байтів."""
+    text = text.strip().upper().rstrip('B')
+    multipliers = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+    if text and text[-1] in multipliers: return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
+
+def format_size(size):
+    for unit, factor in (('G', 1024 ** 3), ('M', 1024 ** 2), ('K', 1024)):
+        if size >= factor: return f"{size / factor:g}{unit}"
+    return str(size)
@@ -0,0 +1,137 @@
+"""
+Бенчмарк CSE та винесення інваріантів з циклів (ir_opt.py: cse, licm) для бекенду asm.
+
+Кожна програма опускається в IR двічі: конвеєром без cse/licm і повним. Для кожного циклу
+рахується, скільки інструкцій асемблера згенеровано для блоків його тіла - стільки
+виконується за ітерацію, якщо в тілі немає розгалужень (з розгалуженнями - сума всіх гілок).
+Якщо в системі є nasm (і perf), програми ще й збираються та запускаються, а perf stat
+показує загальну кількість виконаних інструкцій.
+
+    python3 ignis/benchmarks/loop_opt_bench.py
+    python3 ignis/benchmarks/loop_opt_bench.py ignis/benchmarks/runtime/struct_copy.ign
+"""
+import argparse
+import glob
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from error import ErrorReporter  # noqa: E402
+from ir import lower_program, natural_loops, IRUnsupported  # noqa: E402
+from ir_opt import optimize, PASSES  # noqa: E402
+from codegen import IRCodeGenerator  # noqa: E402
+from main import run_frontend  # noqa: E402
+from timing import PhaseTimer  # noqa: E402
+from dce_report import asm_instructions  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / 'results'
+EXAMPLES_DIR = BENCH_DIR.parent.parent / 'examples'
+DEFAULT_PROGRAMS = [*sorted(glob.glob(str(BENCH_DIR / 'runtime' / '*.ign'))),
+                    *(str(EXAMPLES_DIR / name) for name in ('test_for.ign', 'test_ptrs.ign', 'test_structures.ign'))]
+BASELINE_PASSES = [(name, run) for name, run in PASSES if name not in ('cse', 'licm')]
+RUN_TIMEOUT = 120
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def block_sizes(asm_code):
+    """Мітка блоку (.L_<функція>_<блок>) -> кількість інструкцій під нею."""
+    sizes, current, lines = {}, None, []
+    for line in asm_code.splitlines() + ['.end:']:
+        label = line.strip()
+        if label.endswith(':') and not label.endswith('_false:'):
+            if current is not None: sizes[current] = asm_instructions('\n'.join(lines))
+            current, lines = label[:-1], []
+        else:
+            lines.append(line)
+    return sizes
+
+
+def loop_costs(module, asm_code):
+    """{'функція:заголовок циклу': інструкцій asm у тілі}."""
+    sizes = block_sizes(asm_code)
+    return {f'{func.name}:{header.name}': sum(sizes.get(f'.L_{func.name}_{block.name.replace(".", "_")}', 0)
+                                                  for block in body)
+            for func in module.functions for header, body in natural_loops(func)}
+
+
+def perf_instructions(asm_code, work_dir):
+    """Виконані інструкції (perf stat) або None, якщо немає nasm чи perf."""
+    if shutil.which('nasm') is None or shutil.which('perf') is None: return None
+    asm_path, obj_path, executable_path = work_dir / 'bench.asm', work_dir / 'bench.o', work_dir / 'bench'
+    asm_path.write_text(asm_code)
+    subprocess.run(['nasm', '-f', 'elf64', '-o', str(obj_path), str(asm_path)], check=True, capture_output=True)
+    subprocess.run(['ld', '-o', str(executable_path), str(obj_path)], check=True, capture_output=True)
+    result = subprocess.run(['perf', 'stat', '-x', ',', '-e', 'instructions', str(executable_path)],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True, timeout=RUN_TIMEOUT)
+    for line in result.stderr.splitlines():
+        fields = line.split(',')
+        if len(fields) >= 3 and fields[0].strip().isdigit(): return int(fields[0])
+    return None
+
+
+def measure(tree, file_name, lines, passes, work_dir):
+    module = optimize(lower_program(tree), passes=passes)
+    asm_code = IRCodeGenerator(ErrorReporter(file_name, lines)).generate(module)
+    return {'loops': loop_costs(module, asm_code), 'perf_instructions': perf_instructions(asm_code, work_dir)}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Per-iteration asm instructions with and without CSE/LICM.")
+    arg_parser.add_argument('files', nargs='*', help="Programs to measure (default: runtime/*.ign and loop examples)")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/loops-<time>.json)")
+    args = arg_parser.parse_args()
+
+    results = []
+    if shutil.which('nasm') is None or shutil.which('perf') is None:
+        print("[*] 'nasm' or 'perf' not found, only static per-iteration counts are reported")
+    print(f"{YELLOW}--- asm instructions per loop iteration: without cse/licm -> with ---{RESET}")
+    with tempfile.TemporaryDirectory(prefix='ignis-loops-') as temp_dir:
+        for file_path in args.files or DEFAULT_PROGRAMS:
+            name = Path(file_path).stem
+            source_code = Path(file_path).read_text(encoding='utf-8')
+            lines = source_code.split('\n')
+            tree, _ = run_frontend(source_code, file_path, ErrorReporter(file_path, lines), 'elided',
+                                   PhaseTimer(enabled=False))
+            if tree is None:
+                print(f"  {name:<24} skipped (does not compile)")
+                continue
+            try:
+                before = measure(tree, file_path, lines, BASELINE_PASSES, Path(temp_dir))
+                after = measure(tree, file_path, lines, PASSES, Path(temp_dir))
+            except IRUnsupported as e:
+                print(f"  {name:<24} skipped ({e})")
+                continue
+            results.append({'file': name, 'before': before, 'after': after})
+            if not after['loops']: print(f"  {name:<24} no loops")
+            # Блоки тіла можуть злитися, але заголовки циклів в обох варіантах ті самі
+            for loop, new in after['loops'].items():
+                old = before['loops'].get(loop)
+                if old is None: continue
+                change = (new - old) / old * 100 if old else 0.0
+                print(f"  {name:<24} {loop:<20} {old:4} -> {new:4}  ({new - old:+}, {change:+.1f}%)")
+            if before['perf_instructions'] and after['perf_instructions']:
+                old, new = before['perf_instructions'], after['perf_instructions']
+                print(f"  {name:<24} executed instructions {old:,} -> {new:,}  ({(new - old) / old * 100:+.1f}%)")
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"loops-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'platform': platform.platform()}, 'results': results},
+                  f, indent=1)
+    print(f"\n{GREEN}[+] Results saved to {output_path}{RESET}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
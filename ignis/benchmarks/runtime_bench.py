@@ -0,0 +1,214 @@
+"""
+Бенчмарк швидкості згенерованого коду: asm проти cpp (з кількома рівнями -O), а на вимогу -
+c (C11 через cc, з тими самими рівнями -O), інтерпретатор AST (`run`) і байт-код (`vm`), що виконуються через `main.py run`.
+
+Кожна програма з ignis/benchmarks/runtime/ компілюється кожним варіантом бекенду та
+запускається кілька разів. Для кожного запуску записуються реальний час, процесорний час
+(user/sys), page faults і перемикання контексту (os.wait4), а якщо в системі
+є `perf` - ще й апаратні лічильники `perf stat`. Вивід програм порівнюється між варіантами,
+щоб швидший бекенд не виявився просто неправильним.
+
+    python3 ignis/benchmarks/runtime_bench.py
+    python3 ignis/benchmarks/runtime_bench.py --opt-levels 0 2 3 --repeat 10 pointer_walk
+    python3 ignis/benchmarks/runtime_bench.py --targets cpp run vm --opt-levels 2 --repeat 3
+    python3 ignis/benchmarks/runtime_bench.py --targets cpp c --opt-levels 0 2
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROGRAMS_DIR = BENCH_DIR / 'runtime'
+RESULTS_DIR = BENCH_DIR / 'results'
+BIN_DIR = RESULTS_DIR / 'bin'
+COMPILER_PATH = BENCH_DIR.parent / 'main.py'
+PERF_EVENTS = ('cycles', 'instructions', 'branch-misses', 'cache-misses')
+RUN_TIMEOUT = 120
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+class Variant:
+    def __init__(self, target, opt_level=None):
+        self.target = target
+        self.opt_level = opt_level
+        self.name = target if opt_level is None else f"{target}-O{opt_level}"
+
+    def compile_args(self):
+        args = [f'--target={self.target}']
+        if self.opt_level is not None: args.append(f'-O{self.opt_level}')
+        return args
+
+    def command(self, path):
+        """Команда запуску скомпільованої програми (для `run` - вихідного файлу)."""
+        if self.target in ('run', 'vm'): return [sys.executable, str(COMPILER_PATH), 'run', str(path)]
+        return [str(path)]
+
+
+def compile_program(program, variant):
+    """Повертає (шлях до виконуваного файлу або None, вивід компілятора, час компіляції)."""
+    # Інтерпретатор виконує вихідний файл, компіляції немає
+    if variant.target == 'run': return program, '', 0.0
+    executable_path = BIN_DIR / variant.name / (program.stem + ('.ignc' if variant.target == 'vm' else ''))
+    executable_path.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, str(COMPILER_PATH), str(program), '-o', str(executable_path), *variant.compile_args()]
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0: return None, result.stdout + result.stderr, elapsed
+    return executable_path, '', elapsed
+
+
+def run_program(command):
+    """
+    Один запуск. Вивід іде у тимчасовий файл, а не в pipe: так os.wait4 повертає
+    використання ресурсів саме цього процесу, а читання pipe не додається до виміру.
+    """
+    with tempfile.TemporaryFile() as stdout:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=stdout,
+                                   stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        stdout.seek(0)
+        output = stdout.read()
+    # ru_maxrss тут не використовується: Linux переносить у нього пікову пам'ять процесу
+    # до exec, тобто пам'ять інтерпретатора Python, що запускає бенчмарк.
+    return {
+        'exit_code': process.returncode,
+        'wall': wall,
+        'user': usage.ru_utime,
+        'sys': usage.ru_stime,
+        'minor_faults': usage.ru_minflt,
+        'context_switches': usage.ru_nvcsw + usage.ru_nivcsw,
+        # Пробіли не враховуються: `print` в asm додає переведення рядка, а в C++ - ні
+        'output_hash': hashlib.sha256(b''.join(output.split())).hexdigest()[:16],
+    }
+
+
+def perf_counters(command):
+    """Апаратні лічильники одного запуску через `perf stat`, якщо він доступний."""
+    if shutil.which('perf') is None: return None
+    command = ['perf', 'stat', '-x', ',', '-e', ','.join(PERF_EVENTS), *command]
+    try:
+        result = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, text=True, timeout=RUN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return None
+    counters = {}
+    for line in result.stderr.splitlines():
+        fields = line.split(',')
+        # Формат CSV perf: значення,одиниця,подія,...; "<not supported>" пропускаємо
+        if len(fields) >= 3 and fields[0].strip().isdigit(): counters[fields[2]] = int(fields[0])
+    return counters or None
+
+
+def bench_variant(program, variant, repeat):
+    executable_path, message, compile_time = compile_program(program, variant)
+    result = {'program': program.stem, 'variant': variant.name, 'compile_time': compile_time}
+    if executable_path is None:
+        lines = message.strip().splitlines()
+        errors = [line.strip() for line in lines if 'error' in line.lower()]
+        result.update(status='compile failed', message=(errors or lines or [''])[-1:])
+        return result
+    command = variant.command(executable_path)
+    run_program(command)  # прогрів: кеш сторінок, завантаження бібліотек
+    runs = [run_program(command) for _ in range(repeat)]
+    if any(run['exit_code'] != 0 for run in runs):
+        result.update(status='run failed', message=[f"exit code {runs[-1]['exit_code']}"])
+        return result
+    walls = [run['wall'] for run in runs]
+    result.update(
+        status='ok',
+        wall_median=statistics.median(walls),
+        wall_min=min(walls),
+        wall_stdev=statistics.stdev(walls) if len(walls) > 1 else 0.0,
+        user=statistics.median(run['user'] for run in runs),
+        sys=statistics.median(run['sys'] for run in runs),
+        minor_faults=statistics.median(run['minor_faults'] for run in runs),
+        context_switches=statistics.median(run['context_switches'] for run in runs),
+        output_hash=runs[0]['output_hash'],
+        perf=perf_counters(command),
+    )
+    return result
+
+
+def print_report(results, variants):
+    baseline_name = variants[0].name
+    print(f"\n{YELLOW}--- Runtime comparison (median of runs; speedup relative to {baseline_name}) ---{RESET}")
+    for program in dict.fromkeys(r['program'] for r in results):
+        rows = [r for r in results if r['program'] == program]
+        baseline = next((r for r in rows if r['variant'] == baseline_name and r['status'] == 'ok'), None)
+        hashes = {r['output_hash'] for r in rows if r['status'] == 'ok'}
+        print(f"\n{program}" + (f"  {RED}(outputs differ between variants!){RESET}" if len(hashes) > 1 else ""))
+        for r in rows:
+            if r['status'] != 'ok':
+                print(f"  {r['variant']:<10} {RED}{r['status']}{RESET}: {' '.join(r['message'])}")
+                continue
+            speedup = f"{baseline['wall_median'] / r['wall_median']:5.2f}x" if baseline else "   n/a"
+            line = (f"  {r['variant']:<10} {r['wall_median'] * 1000:9.1f} ms ±{r['wall_stdev'] * 1000:6.1f}  "
+                    f"{speedup}  user {r['user'] * 1000:8.1f} ms  sys {r['sys'] * 1000:6.1f} ms  "
+                    f"faults {r['minor_faults']:7.0f}  compile {r['compile_time']:5.2f} s")
+            if r['perf']:
+                line += "  " + "  ".join(f"{name} {value:,}" for name, value in r['perf'].items())
+            print(line)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare the speed of code generated by the Ignis backends.")
+    arg_parser.add_argument('programs', nargs='*', help="Benchmark names to run (default: all in runtime/)")
+    arg_parser.add_argument('--targets', nargs='+', choices=['asm', 'cpp', 'c', 'run', 'vm'], default=['asm', 'cpp'],
+                            help="Backends to compare (default: asm cpp; 'run' and 'vm' execute in Python "
+                                 "and are orders of magnitude slower)")
+    arg_parser.add_argument('--opt-levels', nargs='+', choices=['0', '1', '2', '3', 's'], default=['0', '2'],
+                            help="g++/cc optimization levels for the 'cpp' and 'c' backends (default: 0 2)")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Timed runs per variant (default: 5)")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/runtime-<time>.json)")
+    args = arg_parser.parse_args()
+
+    programs = sorted(Path(p) for p in glob.glob(str(PROGRAMS_DIR / '*.ign')))
+    if args.programs: programs = [p for p in programs if p.stem in args.programs]
+    if not programs:
+        print(f"{RED}Error: No benchmark programs found.{RESET}")
+        return 1
+
+    variants = []
+    for target in args.targets:
+        if target in ('cpp', 'c'): variants.extend(Variant(target, level) for level in args.opt_levels)
+        else: variants.append(Variant(target))
+    # Базовий варіант для прискорення - C++ без оптимізацій, якщо він є
+    variants.sort(key=lambda v: v.name != 'cpp-O0')
+
+    if shutil.which('perf') is None: print("[*] 'perf' not found, hardware counters are not collected")
+    results = []
+    for program in programs:
+        for variant in variants:
+            print(f"[*] {program.stem} [{variant.name}]", flush=True)
+            results.append(bench_variant(program, variant, args.repeat))
+
+    print_report(results, variants)
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"runtime-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'platform': platform.platform(), 'repeat': args.repeat},
+                   'results': results}, f, indent=1)
+    print(f"\n[+] Results saved to {output_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
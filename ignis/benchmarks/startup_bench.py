@@ -0,0 +1,137 @@
+"""
+Бенчмарк старту компілятора: скільки коштує запуск `main.py` до початку справжньої роботи.
+
+Кожен сценарій запускається в окремому процесі кілька разів для кожного способу запуску:
+  script      - python3 ignis/main.py з байткодом модулів у кеші (звичайний повторний запуск);
+  script-cold - те саме, але без .pyc: усі модулі компілюються з джерел (перший запуск,
+                PYTHONDONTWRITEBYTECODE, директорія лише для читання);
+  bundle      - zipapp з готовим байткодом (bundle.py).
+Окремо друкуються найдорожчі імпорти з `python -X importtime` і час порожнього інтерпретатора -
+нижня межа, за яку старт опуститися не може.
+
+    python3 ignis/benchmarks/startup_bench.py
+    python3 ignis/benchmarks/startup_bench.py --repeat 20 --top 15
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR / 'results'
+IGNIS_DIR = BENCH_DIR.parent
+COMPILER_PATH = IGNIS_DIR / 'main.py'
+# Найменша програма, на якій відпрацьовують усі фази: час іде на старт, а не на компіляцію
+PROGRAM = "int main() {\n    print(42);\n    return 0;\n}\n"
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+
+
+def scenarios(work_dir):
+    source = work_dir / 'startup.ign'
+    return {
+        'help': ['--help'],
+        # Фронтенд без кешу збірки: старт, лексер, парсер, перевірки, запис AST
+        'frontend': [str(source), '--emit-ast', str(work_dir / 'startup.ignast'), '--no-cache'],
+        # Збірка, що повністю відновлюється з кешу
+        'cached-build': [str(source), '--target', 'cpp', '-o', str(work_dir / 'startup')],
+    }
+
+
+def launchers(work_dir):
+    bundle_path = work_dir / 'ignis.pyz'
+    subprocess.run([sys.executable, str(IGNIS_DIR / 'bundle.py'), '-o', str(bundle_path)],
+                   check=True, capture_output=True)
+    warm_cache, cold_cache = work_dir / 'pycache-warm', work_dir / 'pycache-cold'
+    return {
+        'script': ([sys.executable, str(COMPILER_PATH)], {'PYTHONPYCACHEPREFIX': str(warm_cache)}),
+        'script-cold': ([sys.executable, str(COMPILER_PATH)],
+                        {'PYTHONPYCACHEPREFIX': str(cold_cache), 'PYTHONDONTWRITEBYTECODE': '1'}),
+        'bundle': ([sys.executable, str(bundle_path)], {}),
+    }
+
+
+def run_once(command, env):
+    start = time.perf_counter()
+    result = subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0: raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr}")
+    return elapsed
+
+
+def measure(command, env, repeat):
+    run_once(command, env)  # прогрів: кеш сторінок, .pyc для 'script', кеш збірки для 'cached-build'
+    times = [run_once(command, env) for _ in range(repeat)]
+    return {'median': statistics.median(times), 'min': min(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0}
+
+
+def import_times(command, env):
+    """[(модуль, власний час, сумарний час)] з виводу `-X importtime`, у мікросекундах."""
+    result = subprocess.run([command[0], '-X', 'importtime', *command[1:]], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line: continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Лише модулі верхнього рівня: вкладені імпорти вже враховані в їхньому сумарному часі
+        if not name.startswith('  '): rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure the start-up time of the Ignis compiler.")
+    arg_parser.add_argument('--repeat', type=int, default=10, help="Timed runs per scenario (default: 10)")
+    arg_parser.add_argument('--top', type=int, default=10, help="Most expensive imports to show (default: 10)")
+    arg_parser.add_argument('-o', '--output', type=str, help="JSON result file (default: results/startup-<time>.json)")
+    args = arg_parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='ignis-startup-'))
+    try:
+        (work_dir / 'startup.ign').write_text(PROGRAM)
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('PYTHONDONTWRITEBYTECODE', 'PYTHONPYCACHEPREFIX')}
+        variants = {name: (command, {**env, **extra}) for name, (command, extra) in launchers(work_dir).items()}
+
+        baseline = measure([sys.executable, '-c', 'pass'], env, args.repeat)
+        print(f"{YELLOW}--- Start-up time (median of {args.repeat} runs) ---{RESET}")
+        print(f"  {'python -c pass':<28} {baseline['median'] * 1000:7.1f} ms  (lower bound)")
+        results = []
+        for scenario, scenario_args in scenarios(work_dir).items():
+            for name, (command, variant_env) in variants.items():
+                stats = measure(command + scenario_args, variant_env, args.repeat)
+                results.append({'scenario': scenario, 'launcher': name, **stats})
+                print(f"  {scenario + ' [' + name + ']':<28} {stats['median'] * 1000:7.1f} ms "
+                      f"±{stats['stdev'] * 1000:5.1f}  (+{(stats['median'] - baseline['median']) * 1000:5.1f} ms "
+                      f"over the interpreter)", flush=True)
+
+        command, script_env = variants['script']
+        imports = import_times(command + scenarios(work_dir)['frontend'], script_env)
+        print(f"\n{YELLOW}--- Most expensive imports (frontend [script], -X importtime) ---{RESET}")
+        for name, self_us, cumulative_us in sorted(imports, key=lambda row: -row[2])[:args.top]:
+            print(f"  {name:<28} {cumulative_us / 1000:7.2f} ms  (self {self_us / 1000:.2f} ms)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output_path = Path(args.output) if args.output else RESULTS_DIR / f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': {'timestamp': time.time(), 'platform': platform.platform(), 'repeat': args.repeat,
+                            'interpreter': baseline},
+                   'results': results,
+                   'imports': [{'module': name, 'self_us': s, 'cumulative_us': c} for name, s, c in imports]},
+                  f, indent=1)
+    print(f"\n{GREEN}[+] Results saved to {output_path}{RESET}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Масиви фіксованої довжини `array<T, N>`: перевірки, яких не роблять кодогенератори,
+та аналіз діапазонів, що прибирає перевірки меж.
+
+Кожна індексація `a[i]` - місце перевірки: бекенд перевіряє 0 <= i < N під час виконання.
+Для лічильника циклу `for` межі доводяться статично: якщо ініціалізація дає сталий початок,
+крок - `i = i + c` (або `i = i - c`) зі сталою c, умова обмежує лічильник сталою (літерал,
+глобальна константа) чи виразом від лічильників зовнішніх циклів, а в умові й тілі лічильник не змінюється і його адреса ніде не береться,
+то в тілі він лежить у [початок, межа]. Діапазон індексу (`i`, `i + 1`, `2 * i - k`, ...)
+рахується інтервальною арифметикою; якщо він увесь у [0, N), перевірка не потрібна.
+
+Результат - `node.bounds_check` на кожному IndexExpr (True - перевіряти) та статистика
+по функціях у `tree.bounds_stats`.
+"""
+from ast_nodes import *
+from checker import NodeVisitor
+from lexer import TokenType, Token
+
+BOUNDS_MODES = ('full', 'elided')
+
+_INT = Type(Token(TokenType.KW_INT, 'int'))
+_CHAR = Type(Token(TokenType.KW_CHAR, 'char'))
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Порівняння лічильника з межею: (межа зліва, оператор) -> зсув, що дає найбільше (для циклу,
+# що зростає) чи найменше (для циклу, що спадає) значення лічильника в тілі
+_UPPER = {(False, TokenType.LESS): -1, (False, TokenType.LESS_EQUAL): 0,
+          (True, TokenType.GREATER): -1, (True, TokenType.GREATER_EQUAL): 0}
+_LOWER = {(False, TokenType.GREATER): 1, (False, TokenType.GREATER_EQUAL): 0,
+          (True, TokenType.LESS): 1, (True, TokenType.LESS_EQUAL): 0}
+
+
+def _walk(node):
+    """Усі вузли піддерева (ітеративно: тіла функцій бувають глибокими)."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, AST) and not isinstance(node, Type):
+            yield node
+            stack.extend(value for value in vars(node).values() if isinstance(value, (AST, list)))
+
+
+def array_of(type_node):
+    """Тип масиву, який індексує значення цього типу (масив або ключ масиву), або None."""
+    if type_node is None or type_node.length is None: return None
+    if type_node.pointer_level == 0: return type_node
+    if type_node.pointer_level == 1: return type_node.pointee()
+    return None
+
+
+class BoundsAnalyzer(NodeVisitor):
+    def __init__(self, reporter, mode='elided'):
+        self.reporter = reporter
+        self.mode = mode
+        self.struct_fields = {}
+        self.func_types = {}
+        self.globals = {}
+        self.constants = {}  # глобальна константа -> значення (межі циклів)
+        self.symbol_table = {}
+        self.ranges = {}  # лічильник циклу -> (найменше, найбільше) значення в тілі циклу
+        self.address_taken = set()
+        self.current_function = None
+        self.stats = {}
+
+    def error(self, code, message, token):
+        self.reporter.recoverable_error(code, message, token)
+
+    def analyze(self, tree):
+        self.visit(tree)
+        tree.bounds_stats = self.stats
+        return self.stats
+
+    # --- Типи -----------------------------------------------------------------
+
+    def _type_of(self, node):
+        if isinstance(node, Var): return self.symbol_table.get(node.value)
+        if isinstance(node, Num): return _INT
+        if isinstance(node, CharLiteral): return _CHAR
+        if isinstance(node, StringLiteral): return _CHAR.pointer_to()
+        if isinstance(node, UnaryOp):
+            base = self._type_of(node.expr)
+            if base is None: return None
+            if node.op.type == TokenType.KW_ADDR: return base.pointer_to()
+            if node.op.type == TokenType.KW_DEREF and base.pointer_level > 0: return base.pointee()
+            return base
+        if isinstance(node, BinOp):
+            left, right = self._type_of(node.left), self._type_of(node.right)
+            if left is not None and left.pointer_level > 0: return left
+            if right is not None and right.pointer_level > 0: return right
+            return left
+        if isinstance(node, MemberAccess):
+            struct_type = self._type_of(node.left)
+            if struct_type is None: return None
+            return self.struct_fields.get(struct_type.value, {}).get(node.right.value)
+        if isinstance(node, IndexExpr):
+            array_type = array_of(self._type_of(node.left))
+            return array_type.element if array_type is not None else None
+        if isinstance(node, New): return node.type_node.pointer_to()
+        if isinstance(node, FunctionCall): return self.func_types.get(node.name_node.value)
+        return None
+
+    def _check_copy(self, target_type, value, token):
+        """Масив копіюється лише з масиву того самого типу."""
+        value_type = self._type_of(value)
+        if target_type is None or value_type is None: return
+        if (target_type.is_array or value_type.is_array) and target_type != value_type:
+            self.error("E009", f"Type mismatch in array assignment: expected '{target_type}', got '{value_type}'",
+                       token)
+
+    # --- Діапазони --------------------------------------------------------------
+
+    def _constant(self, node):
+        if isinstance(node, (Num, CharLiteral)): return node.value
+        if isinstance(node, UnaryOp) and node.op.type == TokenType.MINUS:
+            value = self._constant(node.expr)
+            return -value if value is not None else None
+        if isinstance(node, Var) and node.value in self.constants and \
+                self.symbol_table.get(node.value) is self.globals.get(node.value):
+            return self.constants[node.value]
+        return None
+
+    def _range(self, node):
+        """(найменше, найбільше) значення цілого виразу або None, якщо воно невідоме."""
+        value = self._constant(node)
+        if value is not None: return value, value
+        if isinstance(node, Var): return self.ranges.get(node.value)
+        if not isinstance(node, BinOp) or node.op.type not in (TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY):
+            return None
+        left, right = self._range(node.left), self._range(node.right)
+        if left is None or right is None: return None
+        if node.op.type == TokenType.PLUS:
+            low, high = left[0] + right[0], left[1] + right[1]
+        elif node.op.type == TokenType.MINUS:
+            low, high = left[0] - right[1], left[1] - right[0]
+        else:
+            products = [a * b for a in left for b in right]
+            low, high = min(products), max(products)
+        # Переповнення int64 під час виконання дало б зовсім інше значення
+        if low < _INT64_MIN or high > _INT64_MAX: return None
+        return low, high
+
+    def _step(self, increment, name):
+        """Крок `i = i + c` / `i = c + i` / `i = i - c` (c - ненульова стала) або None."""
+        if not isinstance(increment, Assign) or not isinstance(increment.left, Var) or increment.left.value != name:
+            return None
+        value = increment.right
+        if not isinstance(value, BinOp) or value.op.type not in (TokenType.PLUS, TokenType.MINUS): return None
+        if isinstance(value.left, Var) and value.left.value == name:
+            step = self._constant(value.right)
+            if step is not None and value.op.type == TokenType.MINUS: step = -step
+        elif value.op.type == TokenType.PLUS and isinstance(value.right, Var) and value.right.value == name:
+            step = self._constant(value.left)
+        else:
+            return None
+        return step or None
+
+    def _bound(self, condition, name, table):
+        """Найтісніша межа лічильника, яку гарантує умова (кон'юнкції через `and`), або None."""
+        if not isinstance(condition, BinOp): return None
+        if condition.op.type == TokenType.KW_AND:
+            bounds = [bound for bound in (self._bound(condition.left, name, table),
+                                          self._bound(condition.right, name, table)) if bound is not None]
+            if not bounds: return None
+            return min(bounds) if table is _UPPER else max(bounds)
+        for counter, limit, reversed_ in ((condition.left, condition.right, False),
+                                          (condition.right, condition.left, True)):
+            shift = table.get((reversed_, condition.op.type))
+            if shift is None or not isinstance(counter, Var) or counter.value != name: continue
+            # Межа - стала чи вираз від лічильників зовнішніх циклів (`j < i`): береться її крайнє значення
+            if any(isinstance(part, Var) and part.value == name for part in _walk(limit)): continue
+            limits = self._range(limit)
+            if limits is not None: return (limits[1] if table is _UPPER else limits[0]) + shift
+        return None
+
+    def _induction(self, node):
+        """(лічильник, (найменше, найбільше)) для тіла циклу for або None, якщо меж не довести."""
+        init = node.init
+        if isinstance(init, VarDecl) and init.type_node == _INT:
+            name, start = init.var_node.value, self._constant(init.assign_node) if init.assign_node else None
+        elif isinstance(init, Assign) and isinstance(init.left, Var):
+            name, start = init.left.value, self._constant(init.right)
+            # Глобальну змінну може змінити будь-яка викликана функція
+            var_type = self.symbol_table.get(name)
+            if var_type is None or var_type != _INT or var_type is self.globals.get(name): return None
+        else:
+            return None
+        if start is None or name in self.address_taken: return None
+        step = self._step(node.increment, name)
+        if step is None: return None
+        table = _UPPER if step > 0 else _LOWER
+        bound = self._bound(node.condition, name, table)
+        if bound is None: return None
+        for child in _walk([node.condition, node.body]):
+            if isinstance(child, Assign) and isinstance(child.left, Var) and child.left.value == name: return None
+        low, high = (start, bound) if step > 0 else (bound, start)
+        # Крок з останнього значення не повинен переповнити int64 і повернути лічильник у межі
+        if not _INT64_MIN <= (high + step if step > 0 else low + step) <= _INT64_MAX: return None
+        return name, (low, high)
+
+    def _collect_address_taken(self, node):
+        self.address_taken = set()
+        for child in _walk(node):
+            if isinstance(child, UnaryOp) and child.op.type == TokenType.KW_ADDR:
+                root = child.expr
+                while isinstance(root, (MemberAccess, IndexExpr)): root = root.left
+                if isinstance(root, Var): self.address_taken.add(root.value)
+
+    # --- Оголошення -------------------------------------------------------------
+
+    def visit_Program(self, node):
+        for decl in node.declarations:
+            if isinstance(decl, StructDef):
+                self.struct_fields[decl.name] = {field.var_node.value: field.type_node for field in decl.fields}
+            elif isinstance(decl, FunctionDecl):
+                self.func_types[decl.func_name] = decl.type_node
+            elif isinstance(decl, (VarDecl, ConstDecl)):
+                self.globals[decl.var_node.value] = decl.type_node
+                if isinstance(decl, ConstDecl) and isinstance(decl.assign_node, Num):
+                    self.constants[decl.var_node.value] = decl.assign_node.value
+        for decl in node.declarations:
+            self.symbol_table = dict(self.globals)
+            self.ranges = {}
+            self.visit(decl)
+
+    def visit_FunctionDecl(self, node):
+        self.current_function = node.func_name
+        self.stats[node.func_name] = {'sites': 0, 'elided': 0}
+        if node.type_node is not None and node.type_node.is_array:
+            self.error("E023", f"Function '{node.func_name}' cannot return an array by value; "
+                               f"return 'ptr {node.type_node}' instead", node.type_node.token)
+        for param in node.params:
+            if param.type_node.is_array:
+                self.error("E023", f"Array parameter '{param.var_node.value}' cannot be passed by value; "
+                                   f"use 'ptr {param.type_node}'", param.var_node.token)
+            self.symbol_table[param.var_node.value] = param.type_node
+        self._collect_address_taken(node.body)
+        self.visit(node.body)
+        self.current_function = None
+
+    def visit_VarDecl(self, node):
+        if node.assign_node is not None:
+            self.visit(node.assign_node)
+            self._check_copy(node.type_node, node.assign_node, node.var_node.token)
+        self.symbol_table[node.var_node.value] = node.type_node
+        self.ranges.pop(node.var_node.value, None)
+
+    def visit_ConstDecl(self, node):
+        self.visit(node.assign_node)
+
+    def visit_StructDef(self, node):
+        pass
+
+    def visit_Type(self, node):
+        pass
+
+    # --- Інструкції -------------------------------------------------------------
+
+    def visit_Block(self, node):
+        old_symbol_table, old_ranges = self.symbol_table.copy(), self.ranges.copy()
+        for child in node.children: self.visit(child)
+        self.symbol_table, self.ranges = old_symbol_table, old_ranges
+
+    def visit_ForStmt(self, node):
+        old_symbol_table, old_ranges = self.symbol_table.copy(), self.ranges.copy()
+        if node.init is not None: self.visit(node.init)
+        induction = self._induction(node)
+        if node.condition is not None: self.visit(node.condition)
+        if node.increment is not None: self.visit(node.increment)
+        if induction is not None:
+            name, bounds = induction
+            self.ranges[name] = bounds
+        self.visit(node.body)
+        self.symbol_table, self.ranges = old_symbol_table, old_ranges
+
+    def visit_Assign(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self._check_copy(self._type_of(node.left), node.right, node.op)
+
+    # --- Вирази -----------------------------------------------------------------
+
+    def visit_IndexExpr(self, node):
+        self.visit(node.left)
+        self.visit(node.index)
+        left_type = self._type_of(node.left)
+        array_type = array_of(left_type)
+        if array_type is None:
+            described = f"a value of type '{left_type}'" if left_type is not None else "this expression"
+            self.error("E024", f"Cannot index {described}: only 'array<T, N>' and 'ptr array<T, N>' can be indexed",
+                       node.token)
+            return
+        index_type = self._type_of(node.index)
+        if index_type is not None and (index_type.pointer_level > 0 or index_type.value not in ('int', 'char')):
+            self.error("E026", f"Array index must be an integer, got '{index_type}'", node.token)
+            return
+        length = array_type.length
+        constant = self._constant(node.index)
+        if constant is not None and not 0 <= constant < length:
+            self.error("E025", f"Array index {constant} is out of bounds for '{array_type}'", node.token)
+            return
+
+        bounds = self._range(node.index)
+        node.bounds_check = self.mode == 'full' or bounds is None or not (0 <= bounds[0] and bounds[1] < length)
+        if self.current_function is None: return
+        stats = self.stats[self.current_function]
+        stats['sites'] += 1
+        if not node.bounds_check: stats['elided'] += 1
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import zipimport
+from pathlib import Path
+
+
+# Ліміт розміру кешу за замовчуванням (байти). Найдавніше використані записи видаляються першими.
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Версії зовнішніх інструментів, що впливають на результат збірки.
+TOOL_VERSION_COMMANDS = {
+    'asm': [['nasm', '-v'], ['ld', '--version']],
+    'cpp': [['g++', '--version']],
+    'c': [['cc', '--version']],
+}
+
+_compiler_hash = None
+_tool_versions = {}
+_runtime_lock = threading.Lock()
+_runtime_dir = None
+
+
+def bundle_path():
+    """Шлях до архіву, якщо компілятор запущено зі zipapp (див. bundle.py), інакше None."""
+    return Path(__loader__.archive) if isinstance(__loader__, zipimport.zipimporter) else None
+
+
+def compiler_hash():
+    """Хеш усіх файлів компілятора та рантайму: будь-яка зміна в них інвалідує кеш."""
+    global _compiler_hash
+    if _compiler_hash is None:
+        digest = hashlib.sha256()
+        bundle = bundle_path()
+        if bundle is not None:
+            # В архіві вже лежать усі модулі та рантайм
+            digest.update(bundle.read_bytes())
+        else:
+            script_dir = Path(__file__).parent.resolve()
+            files = sorted(script_dir.glob('*.py')) + sorted((script_dir / 'cpp_runtime').glob('*'))
+            for path in files:
+                if not path.is_file(): continue
+                digest.update(path.name.encode())
+                digest.update(path.read_bytes())
+        _compiler_hash = digest.hexdigest()
+    return _compiler_hash
+
+
+def runtime_dir():
+    """
+    Директорія з ignis_runtime.cpp/.h на диску. З архіву рантайм один раз розпаковується
+    у тимчасову директорію: g++ не вміє читати файли всередині zip.
+    """
+    global _runtime_dir
+    if _runtime_dir is None:
+        bundle = bundle_path()
+        if bundle is None:
+            _runtime_dir = Path(__file__).parent.resolve() / 'cpp_runtime'
+        else:
+            import tempfile
+            import zipfile
+            _runtime_dir = Path(tempfile.gettempdir()) / f'ignis-runtime-{compiler_hash()[:16]}'
+            with _runtime_lock:
+                if not _runtime_dir.exists():
+                    tmp_dir = Path(tempfile.mkdtemp(prefix='ignis-runtime-'))
+                    with zipfile.ZipFile(bundle) as archive:
+                        for name in archive.namelist():
+                            if name.startswith('cpp_runtime/') and not name.endswith('/'):
+                                (tmp_dir / Path(name).name).write_bytes(archive.read(name))
+                    try:
+                        os.rename(tmp_dir, _runtime_dir)
+                    except OSError:
+                        shutil.rmtree(tmp_dir, ignore_errors=True)  # паралельний запуск розпакував першим
+    return _runtime_dir
+
+
+def tool_version(target):
+    """Перший рядок виводу `--version` кожного інструмента збірки для цілі."""
+    if target not in _tool_versions:
+        versions = []
+        for command in TOOL_VERSION_COMMANDS.get(target, []):
+            try:
+                result = subprocess.run(command, capture_output=True, text=True)
+                output = (result.stdout or result.stderr).strip()
+                versions.append(output.splitlines()[0] if output else '')
+            except FileNotFoundError:
+                versions.append(f"{command[0]}: not found")
+        _tool_versions[target] = '\n'.join(versions)
+    return _tool_versions[target]
+
+
+class BuildCache:
+    """
+    Контентно-адресований кеш збірки.
+
+    Кожен запис - це директорія `<root>/<key[:2]>/<key>/` з артефактами (згенерований код,
+    об'єктний файл, виконуваний файл) та `meta.json`. Ключ обчислюється з вмісту вихідного
+    файлу, цілі, прапорців та версії компілятора і зовнішніх інструментів.
+    Час останнього використання запису - це mtime його `meta.json`.
+    """
+
+    def __init__(self, root, max_size=DEFAULT_CACHE_SIZE):
+        self.root = Path(root)
+        self.max_size = max_size
+
+    def make_key(self, source_code, target, flags):
+        digest = hashlib.sha256()
+        digest.update(source_code.encode('utf-8'))
+        digest.update(b'\0' + target.encode())
+        digest.update(b'\0' + json.dumps(flags, sort_keys=True).encode())
+        digest.update(b'\0' + compiler_hash().encode())
+        digest.update(b'\0' + tool_version(target).encode())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key):
+        return self.root / key[:2] / key
+
+    def lookup(self, key):
+        """Повертає словник {назва артефакту: шлях} для запису або None."""
+        meta_path = self._entry_dir(key) / 'meta.json'
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        artifacts = {name: self._entry_dir(key) / file_name for name, file_name in meta['artifacts'].items()}
+        if not all(path.exists() for path in artifacts.values()):
+            return None
+        os.utime(meta_path)
+        return artifacts
+
+    def store(self, key, artifacts):
+        """Додає артефакти ({назва: шлях до файлу}) до запису `key`, зберігаючи вже наявні."""
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        for name, path in artifacts.items():
+            path = Path(path)
+            if path.exists() and path.resolve() != (entry_dir / name).resolve():
+                shutil.copy2(path, entry_dir / name)
+        self._update_meta(key, artifacts.keys())
+
+    def store_text(self, key, name, text):
+        """Зберігає текстовий артефакт (напр., згенерований код) без проміжного файлу."""
+        self.store_bytes(key, name, text.encode('utf-8'))
+
+    def store_bytes(self, key, name, data):
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        with open(entry_dir / name, 'wb') as f:
+            f.write(data)
+        self._update_meta(key, [name])
+
+    def _update_meta(self, key, names):
+        entry_dir = self._entry_dir(key)
+        meta_path = entry_dir / 'meta.json'
+        meta = {'artifacts': {}, 'created': time.time()}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+        for name in names:
+            if (entry_dir / name).exists(): meta['artifacts'][name] = name
+        meta['size'] = sum((entry_dir / file_name).stat().st_size for file_name in meta['artifacts'].values())
+        # Записуємо через тимчасовий файл, щоб паралельні збірки не бачили напівзаписаний meta.json
+        tmp_path = entry_dir / f'meta.json.{os.getpid()}.{threading.get_ident()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        if not self.root.exists(): return entries
+        for meta_path in self.root.glob('*/*/meta.json'):
+            try:
+                stat = meta_path.stat()
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    size = json.load(f).get('size', 0)
+            except (OSError, ValueError):
+                continue
+            entries.append((stat.st_mtime, size, meta_path.parent))
+        return entries
+
+    def evict(self):
+        """LRU-витіснення: видаляє найдавніше використані записи, доки кеш не вміститься в ліміт."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size: return
+        for _, size, entry_dir in sorted(entries):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            if total <= self.max_size: break
+
+
+def runtime_defines(warden_checks):
+    """Макроси компіляції рантайму: з --warden-checks=off журнал "Вахтера" в ньому не ведеться."""
+    return ['-DIGNIS_WARDEN_OFF'] if warden_checks == 'off' else []
+
+
+def prepare_cpp_runtime(cache_root, runtime_dir, opt_level, warden_checks='elided'):
+    """
+    Збирає рантайм C++ один раз для кожного рівня оптимізації (і окремо для --warden-checks=off).
+
+    Повертає (шлях до ignis_runtime.o, директорія з ignis_runtime.h.gch). Директорію з
+    передкомпільованим заголовком треба передати через -I перед директорією рантайму:
+    тоді `#include "ignis_runtime.h"` підхопить .gch замість розбору заголовка.
+    """
+    runtime_dir = Path(runtime_dir)
+    defines = runtime_defines(warden_checks)
+    out_dir = _runtime_out_dir(cache_root, runtime_dir, opt_level, 'cpp', defines)
+    obj_path = out_dir / 'ignis_runtime.o'
+    pch_path = out_dir / 'ignis_runtime.h.gch'
+    with _runtime_lock:
+        # Потоки одного процесу (сервер, пакетна збірка) не збирають рантайм двічі.
+        if not (obj_path.exists() and pch_path.exists()):
+            _build_cpp_runtime(runtime_dir, opt_level, out_dir, obj_path, pch_path, defines)
+    return obj_path, out_dir
+
+
+def prepare_c_runtime(cache_root, runtime_dir, opt_level, warden_checks='elided'):
+    """Збирає рантайм цілі c (ignis_runtime.c) один раз для кожного рівня оптимізації. Повертає шлях до .o."""
+    runtime_dir = Path(runtime_dir)
+    defines = runtime_defines(warden_checks)
+    out_dir = _runtime_out_dir(cache_root, runtime_dir, opt_level, 'c', defines)
+    obj_path = out_dir / 'ignis_runtime_c.o'
+    with _runtime_lock:
+        if not obj_path.exists():
+            out_dir.mkdir(parents=True, exist_ok=True)
+            suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+            subprocess.run(['cc', '-std=c11', f'-O{opt_level}', f'-I{runtime_dir}', *defines, '-c',
+                            '-o', str(obj_path) + suffix, str(runtime_dir / 'ignis_runtime.c')], check=True)
+            os.replace(str(obj_path) + suffix, obj_path)
+    return obj_path
+
+
+def _runtime_out_dir(cache_root, runtime_dir, opt_level, target, defines=()):
+    """Директорія кешу для рантайму: залежить від його файлів, рівня -O, макросів та версії компілятора цілі."""
+    digest = hashlib.sha256()
+    for path in sorted(runtime_dir.glob('*')):
+        if path.is_file(): digest.update(path.name.encode()); digest.update(path.read_bytes())
+    digest.update(opt_level.encode())
+    digest.update(' '.join(defines).encode())
+    digest.update(tool_version(target).encode())
+    return Path(cache_root) / 'runtime' / digest.hexdigest()[:16]
+
+
+def _build_cpp_runtime(runtime_dir, opt_level, out_dir, obj_path, pch_path, defines=()):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+    common_flags = ['g++', '-std=c++17', f'-O{opt_level}', f'-I{runtime_dir}']
+    subprocess.run(common_flags + [*defines, '-c', '-o', str(obj_path) + suffix,
+                                   str(runtime_dir / 'ignis_runtime.cpp')], check=True)
+    subprocess.run(common_flags + ['-x', 'c++-header', '-o', str(pch_path) + suffix,
+                                   str(runtime_dir / 'ignis_runtime.h')], check=True)
+    # Атомарна заміна: паралельні збірки або побачать готові файли, або зберуть свої.
+    os.replace(str(obj_path) + suffix, obj_path)
+    os.replace(str(pch_path) + suffix, pch_path)
@@ -0,0 +1,72 @@
+"""
+Збирає компілятор в один виконуваний zipapp з уже скомпільованим байткодом.
+
+Звичайний запуск `python3 ignis/main.py` щоразу компілює main.py (скрипт не кешується в
+__pycache__), а модулі - якщо __pycache__ немає або він недоступний для запису
+(PYTHONDONTWRITEBYTECODE, директорія лише для читання). В архіві кожен модуль лежить
+як .pyc (хеш-варіант без перевірки джерела), тому на старті лише розпаковується байткод.
+Поряд лежать і джерела - для трасування внутрішніх помилок - та рантайм C++, який
+build_cache.runtime_dir() розпаковує на диск при першій збірці з --target cpp.
+
+    python3 ignis/bundle.py -o ignis.pyz
+    ./ignis.pyz program.ign --target cpp
+"""
+import argparse
+import importlib.util
+import marshal
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+# Точка входу архіву: main.py імпортується як звичайний модуль, тож і він береться з .pyc
+ENTRY_POINT = "import main\nmain.main()\n"
+DEFAULT_INTERPRETER = '/usr/bin/env python3'
+
+
+def compile_module(name, source):
+    """Вміст .pyc: заголовок хеш-варіанта (PEP 552) без перевірки джерела та байткод."""
+    code = compile(source, name, 'exec', dont_inherit=True)
+    flags = (0b01).to_bytes(4, 'little')  # хеш-варіант, check_source = 0
+    return importlib.util.MAGIC_NUMBER + flags + importlib.util.source_hash(source) + marshal.dumps(code)
+
+
+def write_bundle(output_path, interpreter=DEFAULT_INTERPRETER):
+    """Повертає кількість модулів у архіві."""
+    modules = {path.name: path.read_bytes() for path in sorted(SCRIPT_DIR.glob('*.py'))
+               if path.name != Path(__file__).name}
+    modules['__main__.py'] = ENTRY_POINT.encode()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(f"#!{interpreter}\n".encode())
+        # Без стиснення: розпакування на старті коштувало б більше, ніж читання більшого файлу
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for name, source in modules.items():
+                archive.writestr(name, source)
+                archive.writestr(name + 'c', compile_module(name, source))
+            for path in sorted((SCRIPT_DIR / 'cpp_runtime').glob('*')):
+                if path.is_file(): archive.writestr(f'cpp_runtime/{path.name}', path.read_bytes())
+    output_path.chmod(output_path.stat().st_mode | 0o111)
+    return len(modules)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Bundle the Ignis compiler into a single executable zipapp.")
+    arg_parser.add_argument('-o', '--output', type=str, default='ignis.pyz',
+                            help="Archive to write (default: ignis.pyz)")
+    arg_parser.add_argument('--python', type=str, default=DEFAULT_INTERPRETER,
+                            help=f"Interpreter for the #! line (default: {DEFAULT_INTERPRETER})")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    output_path = Path(args.output).resolve()
+    count = write_bundle(output_path, args.python)
+    print(f"[+] {count} modules bundled into {output_path} ({output_path.stat().st_size / 1024:.0f} KB, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms)")
+    print(f"    Run it as '{output_path} program.ign' or 'python3 {output_path} program.ign'")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
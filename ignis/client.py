@@ -0,0 +1,98 @@
+"""
+Тонкий клієнт сервера компіляції (`ignis serve`).
+
+Імпортує лише стандартні модулі, тож не платить за імпорт лексера, парсера та кодогенераторів:
+усю роботу виконує вже "теплий" сервер.
+
+    python3 ignis/client.py leet.ign --target cpp -o leet
+    python3 ignis/client.py --bench 200 --concurrency 8 leet.ign --target cpp -o leet
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+
+def default_socket_path():
+    if os.environ.get('IGNIS_SOCKET'): return os.environ['IGNIS_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f'ignis-{os.getuid()}.sock')
+
+
+def send_request(socket_path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        with sock.makefile('rb') as stream:
+            return json.loads(stream.readline())
+
+
+def compile_remote(argv, socket_path=None):
+    return send_request(socket_path or default_socket_path(), {'command': 'compile', 'argv': argv, 'cwd': os.getcwd()})
+
+
+def benchmark(socket_path, argv, total, concurrency):
+    """Надсилає `total` однакових запитів з `concurrency` потоків і друкує пропускну здатність."""
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                if next(counter, None) is None: return
+            start = time.perf_counter()
+            response = send_request(socket_path, {'command': 'compile', 'argv': argv, 'cwd': os.getcwd()})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response['exit_code'] != 0: failures[0] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"--- Benchmark: {total} requests, concurrency {concurrency} ---")
+    print(f"  Wall time:    {wall:.3f} s")
+    print(f"  Throughput:   {total / wall:.1f} requests/s")
+    print(f"  Latency p50:  {latencies[len(latencies) // 2] * 1000:.1f} ms")
+    print(f"  Latency p95:  {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.1f} ms")
+    print(f"  Failures:     {failures[0]}")
+    return 1 if failures[0] else 0
+
+
+def main(argv):
+    socket_path = default_socket_path()
+    bench, concurrency = 0, 1
+    # Власні прапорці клієнта розбираємо вручну: решта аргументів без змін іде на сервер.
+    while argv and argv[0] in ('--socket', '--bench', '--concurrency', '--ping', '--shutdown'):
+        flag = argv.pop(0)
+        if flag == '--ping':
+            print(json.dumps(send_request(socket_path, {'command': 'ping'})['stats']))
+            return 0
+        if flag == '--shutdown':
+            print(send_request(socket_path, {'command': 'shutdown'})['output'], end='')
+            return 0
+        value = argv.pop(0)
+        if flag == '--socket': socket_path = value
+        elif flag == '--bench': bench = int(value)
+        elif flag == '--concurrency': concurrency = int(value)
+
+    try:
+        if bench: return benchmark(socket_path, argv, bench, concurrency)
+        response = send_request(socket_path, {'command': 'compile', 'argv': argv, 'cwd': os.getcwd()})
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"Error: No Ignis compile server at '{socket_path}'. Start one with 'python3 ignis/main.py serve'.")
+        return 1
+    sys.stdout.write(response['output'])
+    return response['exit_code']
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,5 +1,6 @@
 from ast_nodes import *
 from lexer import TokenType, Token
+from error import CompilerError
 
 
 class NodeVisitor:
@@ -21,9 +22,11 @@ class CodeGenerator(NodeVisitor):
         self.struct_table = {}
         self.current_function = None
         self.stack_index = 0
+        self.max_stack = 0  # the deepest local of the current function (its frame size)
         self.label_counter = 0
         self.loop_labels_stack = []
         self.string_literal_counter = 0
+        self.uses_heap = False
 
     def error(self, code, message, node):
         self.reporter.error(code, message, self._get_token_from_node(node))
@@ -32,6 +35,7 @@ class CodeGenerator(NodeVisitor):
         self.reporter.warning(code, message, self._get_token_from_node(node))
 
     def _get_token_from_node(self, node):
+        if isinstance(node, Token): return node
         if hasattr(node, 'token'): return node.token
         if hasattr(node, 'op'): return node.op
         if hasattr(node, 'name_node'): return node.name_node.token
@@ -40,11 +44,14 @@ class CodeGenerator(NodeVisitor):
         return None
 
     def _new_label(self):
+        # Labels are numbered per function, so a function's code does not depend on the
+        # rest of the file and can be cached on its own (see incremental.py).
         self.label_counter += 1
-        return self.label_counter
+        return f"{self.current_function}_{self.label_counter}"
 
     def _get_type_size(self, type_node):
         if type_node.pointer_level > 0: return 8
+        if type_node.length is not None: return type_node.length * self._get_type_size(type_node.element)
         if type_node.value == 'int': return 8
         if type_node.value == 'char': return 1
         if type_node.value in self.struct_table:
@@ -60,10 +67,10 @@ class CodeGenerator(NodeVisitor):
             self.error("E004", f"Undeclared variable '{var_name}'", node)
         if isinstance(node, UnaryOp):
             base_type = self._get_node_type(node.expr)
-            if node.op.type == TokenType.KW_ADDR: return Type(base_type.token, base_type.pointer_level + 1)
+            if node.op.type == TokenType.KW_ADDR: return base_type.pointer_to()
             if node.op.type == TokenType.KW_DEREF:
                 if base_type.pointer_level == 0: self.error("E005", "Cannot dereference a non-pointer type", node)
-                return Type(base_type.token, base_type.pointer_level - 1)
+                return base_type.pointee()
         if isinstance(node, BinOp):
             left_type = self._get_node_type(node.left)
             right_type = self._get_node_type(node.right)
@@ -81,19 +88,38 @@ class CodeGenerator(NodeVisitor):
                                                                                       f"Struct '{struct_name}' has no field '{field_name}'",
                                                                                       node)
             return self.struct_table[struct_name]['fields'][field_name]['type']
+        if isinstance(node, IndexExpr): return self._get_node_type(node.left).element
         return Type(Token(TokenType.KW_INT, 'int'))
 
     def generate(self, tree):
         self.visit(tree)
+        return self.link_units([(self.assembly_code, self.data_section)])
+
+    def generate_unit(self, tree, decl):
+        """Assembly of a single function: (code lines, data section lines)."""
+        for struct in tree.declarations:
+            if isinstance(struct, StructDef): self.visit(struct)
+        self.visit(decl)
+        return self.assembly_code, self.data_section
+
+    def link_units(self, units):
+        """Builds the full file from per-function units (see generate_unit) and the built-in functions."""
+        self.assembly_code = [line for code, _ in units for line in code]
+        self.data_section = [line for _, data in units for line in data]
+        uses_bounds = any('ignis_bounds_fail' in line for line in self.assembly_code)
+        if uses_bounds: self.data_section.append('  L_bounds_message db "Runtime error: Array index out of bounds", 10')
         full_asm = []
         if self.data_section: full_asm.append('section .data'); full_asm.extend(self.data_section)
         full_asm.append('section .bss')
+        if self.uses_heap: full_asm.append('  heap_top resb 8')
         full_asm.append('  print_buf resb 32\n')
         full_asm.append('section .text')
         full_asm.append('global _start')
         self._add_print_function()
         self._add_putchar_function()
         self._add_getchar_function()
+        if self.uses_heap: self._add_heap_functions()
+        if uses_bounds: self._add_bounds_function()
         full_asm.extend(self.assembly_code)
         return '\n'.join(full_asm)
 
@@ -101,7 +127,13 @@ class CodeGenerator(NodeVisitor):
         for decl in node.declarations:
             if isinstance(decl, StructDef): self.visit(decl)
         for decl in node.declarations:
-            if not isinstance(decl, StructDef): self.visit(decl)
+            if isinstance(decl, StructDef): continue
+            # An error in one declaration is recorded and generation moves on to the next one;
+            # the output is discarded anyway once the reporter has an error.
+            try:
+                self.visit(decl)
+            except CompilerError:
+                pass
 
     def visit_StructDef(self, node):
         offset = 0
@@ -116,14 +148,18 @@ class CodeGenerator(NodeVisitor):
 
     def visit_FunctionDecl(self, node):
         self.current_function = node.func_name
+        self.label_counter = 0
+        self.string_literal_counter = 0
         func_label = '_start' if node.func_name == 'main' else node.func_name
         self.assembly_code.append(f'{func_label}:')
         self.assembly_code.append('  push rbp')
         self.assembly_code.append('  mov rbp, rsp')
         local_vars_space = 256
+        frame_line = len(self.assembly_code)
         self.assembly_code.append(f'  sub rsp, {local_vars_space}')
         self.symbol_table = {}
         self.stack_index = 0
+        self.max_stack = 0
         arg_registers = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
         for i, param in enumerate(node.params):
             param_name = param.var_node.value
@@ -131,6 +167,9 @@ class CodeGenerator(NodeVisitor):
             self.symbol_table[param_name] = {'type': param.type_node, 'offset': self.stack_index}
             self.assembly_code.append(f'  mov [rbp{self.stack_index}], {arg_registers[i]}')
         self.visit(node.body)
+        # Arrays can outgrow the fixed frame: it is widened to what the locals really take
+        if self.max_stack > local_vars_space:
+            self.assembly_code[frame_line] = f'  sub rsp, {(self.max_stack + 15) // 16 * 16}'
         if not node.body.children or not isinstance(node.body.children[-1], Return):
             self.assembly_code.append('  pop rax')
         self.assembly_code.append(f'.L_ret_{node.func_name}:')
@@ -147,7 +186,10 @@ class CodeGenerator(NodeVisitor):
         old_symbol_table = self.symbol_table.copy()
         old_stack_index = self.stack_index
         for child in node.children:
-            self.visit(child)
+            try:
+                self.visit(child)
+            except CompilerError:
+                continue
             if isinstance(child, FunctionCall):
                 self.assembly_code.append('  add rsp, 8 ; Discard unused function call return value')
         self.symbol_table = old_symbol_table
@@ -159,8 +201,10 @@ class CodeGenerator(NodeVisitor):
         var_type = node.type_node
         type_size = self._get_type_size(var_type)
 
-        alloc_size = 8
+        # A struct or an array takes all its bytes, everything else a full 8-byte slot
+        alloc_size = max(8, (type_size + 7) // 8 * 8)
         self.stack_index -= alloc_size
+        self.max_stack = max(self.max_stack, -self.stack_index)
         self.symbol_table[var_name] = {'type': var_type, 'offset': self.stack_index}
 
         if node.assign_node:
@@ -187,11 +231,11 @@ class CodeGenerator(NodeVisitor):
             self.visit(node.left, is_lvalue=True)
             self.assembly_code.append('  pop rdi')
             self.assembly_code.append('  pop rsi')
-            self.assembly_code.append(f'  mov rcx, {self.struct_table[left_type.value]["size"]}')
+            self.assembly_code.append(f'  mov rcx, {self._get_type_size(left_type)}')
             self.assembly_code.append('  rep movsb')
         else:
             self.visit(node.right)
-            if isinstance(node.left, MemberAccess):
+            if isinstance(node.left, (MemberAccess, IndexExpr)):
                 self.visit(node.left, is_lvalue=True)
                 self.assembly_code.append('  pop rbx')
                 self.assembly_code.append('  pop rax')
@@ -239,6 +283,34 @@ class CodeGenerator(NodeVisitor):
                 self.assembly_code.append('  mov rax, [rax]')
             self.assembly_code.append('  push rax')
 
+    def visit_IndexExpr(self, node, is_lvalue=False):
+        array_type = self._get_node_type(node.left)
+        is_ptr = array_type.pointer_level > 0
+        element_type = array_type.element
+        size = self._get_type_size(element_type)
+        if is_ptr:
+            self.visit(node.left)
+        elif isinstance(node.left, UnaryOp) and node.left.op.type == TokenType.KW_DEREF:
+            self.visit(node.left.expr)  # the key itself is the address of the array
+        else:
+            self.visit(node.left, is_lvalue=True)
+        self.visit(node.index)
+        self.assembly_code.append('  pop rax')
+        self.assembly_code.append('  pop rbx')
+        if getattr(node, 'bounds_check', True):
+            # The unsigned comparison also rejects negative indices
+            self.assembly_code.append(f'  cmp rax, {array_type.length}')
+            self.assembly_code.append('  jae ignis_bounds_fail')
+        if size != 1: self.assembly_code.append(f'  imul rax, rax, {size}')
+        self.assembly_code.append('  add rax, rbx')
+        is_struct_like = element_type.value not in ('int', 'char') and element_type.pointer_level == 0
+        if not is_lvalue and not is_struct_like:
+            if size == 1:
+                self.assembly_code.append('  movzx rax, byte [rax]')
+            else:
+                self.assembly_code.append('  mov rax, [rax]')
+        self.assembly_code.append('  push rax')
+
     def visit_Var(self, node, is_lvalue=False):
         var_name = node.value
         if var_name not in self.symbol_table: self.error("E004", f"Undeclared variable '{var_name}'", node)
@@ -274,13 +346,17 @@ class CodeGenerator(NodeVisitor):
         self.assembly_code.append(f'  push {node.value}')
 
     def visit_StringLiteral(self, node):
-        label = f'L_str_{self.string_literal_counter}'
+        label = f'L_str_{self.current_function}_{self.string_literal_counter}'
         self.string_literal_counter += 1
+        self.data_section.append(f'  {label} db ' + self._string_bytes(node.value))
+        self.assembly_code.append(f'  push {label}')
 
+    def _string_bytes(self, value):
+        """Operands of the `db` directive for a null-terminated string."""
         asm_bytes = []
         current_string = ""
         # Iterate through the Python string which now has real escape characters
-        for char in node.value:
+        for char in value:
             # Check for printable ASCII characters that don't need special escaping in NASM
             if 32 <= ord(char) <= 126 and char not in ('"', "'", '`'):
                 current_string += char
@@ -298,9 +374,7 @@ class CodeGenerator(NodeVisitor):
 
         # Add the null terminator
         asm_bytes.append('0')
-
-        self.data_section.append(f'  {label} db ' + ', '.join(asm_bytes))
-        self.assembly_code.append(f'  push {label}')
+        return ', '.join(asm_bytes)
 
     def _add_putchar_function(self):
         self.assembly_code.extend([
@@ -336,6 +410,46 @@ class CodeGenerator(NodeVisitor):
             '  ret', ''
         ])
 
+    def _add_bounds_function(self):
+        # Index out of bounds: the message (L_bounds_message) goes to stderr, the exit status is 1
+        self.assembly_code.extend([
+            'ignis_bounds_fail:',
+            '  mov rax, 1',
+            '  mov rdi, 2',
+            '  mov rsi, L_bounds_message',
+            '  mov rdx, 41',
+            '  syscall',
+            '  mov rax, 60',
+            '  mov rdi, 1',
+            '  syscall', ''
+        ])
+
+    def _add_heap_functions(self):
+        # A bump allocator on top of brk: ignis_free does not return memory to the system.
+        self.assembly_code.extend([
+            'ignis_alloc:',
+            '  push rdi',
+            '  mov rax, [rel heap_top]',
+            '  test rax, rax',
+            '  jnz ignis_alloc_grow',
+            '  mov rax, 12',
+            '  xor rdi, rdi',
+            '  syscall',
+            'ignis_alloc_grow:',
+            '  pop rdi',
+            '  add rdi, 15',
+            '  and rdi, -16',
+            '  push rax',
+            '  add rdi, rax',
+            '  mov [rel heap_top], rdi',
+            '  mov rax, 12',
+            '  syscall',
+            '  pop rax',
+            '  ret',
+            'ignis_free:',
+            '  ret', ''
+        ])
+
     def visit_Return(self, node):
         self.visit(node.value)
         self.assembly_code.append('  pop rax')
@@ -344,8 +458,8 @@ class CodeGenerator(NodeVisitor):
     def visit_UnaryOp(self, node):
         op_type = node.op.type
         if op_type == TokenType.KW_ADDR:
-            if not isinstance(node.expr, (Var, MemberAccess)):
-                self.error("E011", "'addr' can only be used on variables or struct members", node)
+            if not isinstance(node.expr, (Var, MemberAccess, IndexExpr)):
+                self.error("E011", "'addr' can only be used on variables, struct members or array elements", node)
             self.visit(node.expr, is_lvalue=True)
             return
         if op_type == TokenType.KW_DEREF:
@@ -445,10 +559,10 @@ class CodeGenerator(NodeVisitor):
         self.assembly_code.append('  pop rax')
 
         if left_type.pointer_level > 0 and right_type.pointer_level == 0:  # ptr + int
-            size = self._get_type_size(Type(left_type.token, left_type.pointer_level - 1))
+            size = self._get_type_size(left_type.pointee())
             if size > 1: self.assembly_code.append(f'  imul rbx, {size}')
         elif right_type.pointer_level > 0 and left_type.pointer_level == 0:  # int + ptr
-            size = self._get_type_size(Type(right_type.token, right_type.pointer_level - 1))
+            size = self._get_type_size(right_type.pointee())
             if size > 1: self.assembly_code.append(f'  imul rax, {size}')
 
         if op_type == TokenType.PLUS:
@@ -574,3 +688,243 @@ class CodeGenerator(NodeVisitor):
             'print_int_write:', '  mov rax, 1', '  mov rsi, rdi', '  mov rdx, r9', '  mov rdi, 1', '  syscall', '  ret',
             ''])
 
+
+
+class IRCodeGenerator(CodeGenerator):
+    """
+    Emits NASM from the SSA IR (ir.py) instead of walking the AST. Every SSA value gets
+    its own 8-byte stack slot and every `alloca` a stack area of its type's size, so the
+    frame is sized exactly instead of the fixed 256 bytes. Instructions load their
+    operands into rax/rcx and store the result; phi nodes become parallel copies on the
+    incoming edges. Struct layout matches the AST generator (no padding, char = 1 byte).
+    """
+
+    _ARITHMETIC = {'add': 'add', 'sub': 'sub', 'mul': 'imul', 'and': 'and', 'or': 'or', 'xor': 'xor'}
+    _SETCC = {'eq': 'sete', 'ne': 'setne', 'lt': 'setl', 'le': 'setle', 'gt': 'setg', 'ge': 'setge'}
+    _BUILTINS = {'print': 'print_int', 'putchar': 'putchar', 'getchar': 'getchar'}
+    _ARG_REGISTERS = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
+
+    def __init__(self, reporter):
+        super().__init__(reporter)
+        self.layouts = {}
+        self.slots = {}
+        self.strings = {}
+
+    def generate(self, module):
+        for name, fields in module.structs.items():
+            offset, offsets = 0, {}
+            for field, field_type in fields:
+                offsets[field] = offset
+                offset += self._size(field_type)
+            self.layouts[name] = (offsets, offset)
+        for func in module.functions:
+            try:
+                self._function(func)
+            except CompilerError:
+                pass
+        return self.link_units([(self.assembly_code, self.data_section)])
+
+    def _size(self, ir_type):
+        if ir_type.pointer_level > 0 or ir_type.base == 'int': return 8
+        if ir_type.is_array: return ir_type.length * self._size(ir_type.element)
+        if ir_type.base == 'char': return 1
+        return self.layouts[ir_type.base][1]
+
+    def _label(self, block):
+        return f'.L_{self.current_function}_{block.name.replace(".", "_")}'
+
+    # --- Operands ---
+
+    def _load(self, value, register):
+        from ir import Const, Undef
+        if isinstance(value, Const):
+            if isinstance(value.value, str):
+                if value.value not in self.strings:
+                    label = f'L_str_{self.current_function}_{len(self.strings)}'
+                    self.strings[value.value] = label
+                    self.data_section.append(f'  {label} db ' + self._string_bytes(value.value))
+                self.assembly_code.append(f'  mov {register}, {self.strings[value.value]}')
+            else:
+                self.assembly_code.append(f'  mov {register}, {value.value}')
+        elif isinstance(value, Undef):
+            self.assembly_code.append(f'  mov {register}, 0')
+        elif getattr(value, 'op', None) == 'alloca':
+            self.assembly_code.append(f'  lea {register}, [rbp-{self.slots[value]}]')
+        else:
+            self.assembly_code.append(f'  mov {register}, [rbp-{self.slots[value]}]')
+
+    def _operand(self, value, register):
+        """A 32-bit immediate for small integer constants, otherwise the value loaded into register."""
+        from ir import Const
+        if isinstance(value, Const) and isinstance(value.value, int) and -(1 << 31) <= value.value < (1 << 31):
+            return str(value.value)
+        self._load(value, register)
+        return register
+
+    def _store_result(self, instr, register='rax'):
+        self.assembly_code.append(f'  mov [rbp-{self.slots[instr]}], {register}')
+
+    # --- Functions ---
+
+    def _function(self, func):
+        self.current_function = func.name
+        self.strings = {}
+        self.slots = {}
+        offset = 0
+        for value in func.params:
+            offset += 8
+            self.slots[value] = offset
+        for instr in func.instructions():
+            if instr.op == 'alloca':
+                offset += (self._size(instr.attr) + 7) // 8 * 8
+            elif instr.has_value:
+                offset += 8
+            else:
+                continue
+            self.slots[instr] = offset
+        if len(func.params) > len(self._ARG_REGISTERS):
+            self.error("E012", f"Too many parameters in function '{func.name}'", None)
+
+        self.assembly_code.append(f"{'_start' if func.name == 'main' else func.name}:")
+        self.assembly_code.append('  push rbp')
+        self.assembly_code.append('  mov rbp, rsp')
+        frame = (offset + 15) // 16 * 16
+        if frame: self.assembly_code.append(f'  sub rsp, {frame}')
+        for register, param in zip(self._ARG_REGISTERS, func.params):
+            self.assembly_code.append(f'  mov [rbp-{self.slots[param]}], {register}')
+        for index, block in enumerate(func.blocks):
+            following = func.blocks[index + 1] if index + 1 < len(func.blocks) else None
+            self.assembly_code.append(f'{self._label(block)}:')
+            for instr in block.instrs:
+                self._instr(instr, block, following)
+        self.assembly_code.append(f'.L_ret_{func.name}:')
+        self.assembly_code.append('  mov rsp, rbp')
+        self.assembly_code.append('  pop rbp')
+        if func.name == 'main':
+            self.assembly_code.append('  mov rdi, rax')
+            self.assembly_code.append('  mov rax, 60')
+            self.assembly_code.append('  syscall')
+        else:
+            self.assembly_code.append('  ret')
+
+    def _edge(self, source, target, following):
+        """Phi copies for the source -> target edge (through the stack, so they happen in parallel), then the jump."""
+        if target.phis:
+            index = target.preds.index(source)
+            moves = [(phi, phi.args[index]) for phi in target.phis if phi.args[index] is not phi]
+            if len(moves) == 1:
+                self._load(moves[0][1], 'rax')
+                self._store_result(moves[0][0])
+            else:
+                for _, arg in moves:
+                    self._load(arg, 'rax')
+                    self.assembly_code.append('  push rax')
+                for phi, _ in reversed(moves):
+                    self.assembly_code.append('  pop rax')
+                    self._store_result(phi)
+        if target is not following: self.assembly_code.append(f'  jmp {self._label(target)}')
+
+    def _instr(self, instr, block, following):
+        op, args, code = instr.op, instr.args, self.assembly_code
+        if op == 'br':
+            self._edge(block, instr.attr[0], following)
+        elif op == 'cbr':
+            if_true, if_false = instr.attr
+            self._load(args[0], 'rax')
+            code.append('  test rax, rax')
+            if if_false.phis:
+                edge = f'{self._label(block)}_false'
+                code.append(f'  jz {edge}')
+                self._edge(block, if_true, None)
+                code.append(f'{edge}:')
+                self._edge(block, if_false, following)
+            else:
+                code.append(f'  jz {self._label(if_false)}')
+                self._edge(block, if_true, following)
+        elif op == 'ret':
+            if block.instrs[-2:-1] and block.instrs[-2].op == 'tailcall': return  # the callee returns for us
+            if args: self._load(args[0], 'rax')
+            if following is not None: code.append(f'  jmp .L_ret_{self.current_function}')
+        elif op in ('alloca', 'phi'):
+            pass
+        elif op == 'div':
+            self._load(args[0], 'rax')
+            self._load(args[1], 'rcx')
+            code.append('  cqo')
+            code.append('  idiv rcx')
+            self._store_result(instr)
+        elif op in self._ARITHMETIC or op in self._SETCC:
+            self._load(args[0], 'rax')
+            right = self._operand(args[1], 'rcx')
+            if op in self._SETCC:
+                code.append(f'  cmp rax, {right}')
+                code.append(f'  {self._SETCC[op]} al')
+                code.append('  movzx rax, al')
+            elif op == 'mul' and right != 'rcx':
+                code.append(f'  imul rax, rax, {right}')
+            else:
+                code.append(f'  {self._ARITHMETIC[op]} rax, {right}')
+            self._store_result(instr)
+        elif op in ('neg', 'bnot', 'not', 'bool', 'trunc', 'cast', 'check'):
+            # Warden checks are only implemented by the C++ runtime (as in the AST generator)
+            self._load(args[0], 'rax')
+            if op == 'neg': code.append('  neg rax')
+            elif op == 'bnot': code.append('  not rax')
+            elif op in ('not', 'bool'):
+                code.append('  cmp rax, 0')
+                code.append(f"  {'sete' if op == 'not' else 'setne'} al")
+                code.append('  movzx rax, al')
+            elif op == 'trunc': code.append('  movzx rax, al')
+            self._store_result(instr)
+        elif op == 'load':
+            self._load(args[0], 'rax')
+            code.append('  movzx rax, byte [rax]' if self._size(instr.type) == 1 else '  mov rax, [rax]')
+            self._store_result(instr)
+        elif op == 'store':
+            self._load(args[0], 'rcx')
+            self._load(args[1], 'rax')
+            code.append('  mov [rcx], al' if self._size(args[0].type.pointee()) == 1 else '  mov [rcx], rax')
+        elif op in ('elemptr', 'indexptr'):
+            self._load(args[0], 'rax')
+            self._load(args[1], 'rcx')
+            size = self._size(instr.type.pointee())
+            if size != 1: code.append(f'  imul rcx, rcx, {size}')
+            code.append('  add rax, rcx')
+            self._store_result(instr)
+        elif op == 'bounds':
+            # Unsigned compare: a negative index is caught as a huge one
+            self._load(args[0], 'rax')
+            code.append(f'  cmp rax, {instr.attr}')
+            code.append('  jae ignis_bounds_fail')
+            self._store_result(instr)
+        elif op == 'fieldptr':
+            self._load(args[0], 'rax')
+            offset = self.layouts[args[0].type.base][0][instr.attr]
+            if offset: code.append(f'  add rax, {offset}')
+            self._store_result(instr)
+        elif op == 'copy':
+            self._load(args[0], 'rdi')
+            self._load(args[1], 'rsi')
+            code.append(f'  mov rcx, {self._size(instr.attr)}')
+            code.append('  rep movsb')
+        elif op in ('call', 'tailcall'):
+            if len(args) > len(self._ARG_REGISTERS): self.error("E012", "Too many arguments in function call", instr)
+            for register, arg in zip(self._ARG_REGISTERS, args): self._load(arg, register)
+            if op == 'tailcall':
+                # The frame is released first: the callee returns straight to our caller
+                code.append('  mov rsp, rbp')
+                code.append('  pop rbp')
+                code.append(f'  jmp {instr.attr}')
+                return
+            code.append(f'  call {self._BUILTINS.get(instr.attr, instr.attr)}')
+            if instr.has_value: self._store_result(instr)
+        elif op in ('alloc', 'new', 'free'):
+            self.uses_heap = True
+            if op == 'new':
+                code.append(f'  mov rdi, {self._size(instr.attr)}')
+            else:
+                self._load(args[0], 'rdi')
+            code.append(f"  call {'ignis_free' if op == 'free' else 'ignis_alloc'}")
+            if instr.has_value: self._store_result(instr)
+        else:
+            self.error("E003", f"Unsupported IR instruction '{op}'", instr)
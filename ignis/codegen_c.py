@@ -0,0 +1,408 @@
+"""
+Кодогенератор C11 (--target c): той самий код, що й у цілі cpp, але без конструкцій C++,
+тож його компілює gcc/cc, чий фронтенд розбирає C значно швидше, ніж g++ - C++.
+
+Блоки та if у позиції значення (у C++ - лямбди) опускаються в інструкції: значення
+обчислюється в тимчасову змінну перед інструкцією, що його використовує. Операнди, які
+обчислюються раніше за такий блок, спершу теж зберігаються в тимчасові змінні, тож порядок
+лишається зліва направо, а `and`/`or` не обчислюють правий операнд без потреби.
+return/break/continue у блоці-виразі діють на функцію та цикл, як в інтерпретаторі та IR.
+reinterpret_cast стає приведенням C, результат ignis_check (void *) теж приводиться,
+constexpr - const, а глобальні змінні з неконстантним ініціалізатором отримують значення
+на початку main: у C ініціалізатор глобальної змінної має бути константним виразом.
+"""
+from ast_nodes import *
+from lexer import TokenType, Token
+from error import CompilerError
+from codegen_cpp import CodeGeneratorCpp, IRCodeGeneratorCpp, array_types
+
+_INT = Type(Token(TokenType.KW_INT, 'int'))
+_CHAR = Type(Token(TokenType.KW_CHAR, 'char'))
+_VOID = Type(Token(TokenType.KW_VOID, 'void'))
+_VOID_PTR = Type(Token(TokenType.KW_VOID, 'void'), pointer_level=1)
+_BUILTIN_TYPES = {'print': _VOID, 'putchar': _VOID, 'getchar': _CHAR}
+
+# Вузли, що не мають значення навіть в останній позиції блоку
+_STATEMENTS = (VarDecl, ConstDecl, Return, WhileStmt, LoopStmt, ForStmt, BreakStmt, ContinueStmt, Free)
+# Логічні операції, що обчислюють правий операнд лише за потреби:
+# (обчислювати правий, якщо лівий істинний; заперечити результат)
+_SHORT_CIRCUIT = {TokenType.KW_AND: (True, False), TokenType.KW_OR: (False, False),
+                  TokenType.KW_NAND: (True, True), TokenType.KW_NOR: (False, True)}
+# Бінарні операції з результатом 0/1 незалежно від типу операндів
+_INT_RESULT = {TokenType.KW_AND, TokenType.KW_OR, TokenType.KW_NAND, TokenType.KW_NOR, TokenType.KW_XOR,
+               TokenType.KW_XNOR, TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL,
+               TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.TYPE_EQUAL}
+_CONSTANT_UNARY = {TokenType.MINUS, TokenType.PLUS, TokenType.KW_NOT, TokenType.KW_BNOT, TokenType.KW_NNOT,
+                   TokenType.KW_NBNOT}
+# Куди йде значення останнього вузла блоку в хвості функції
+_RETURN = 'return'
+
+
+def _needs_statements(node):
+    """Чи є у виразі блок або if у позиції значення - те, що не записати одним виразом C."""
+    if isinstance(node, (IfExpr, Block)): return True
+    if isinstance(node, BinOp):
+        return node.op.type != TokenType.TYPE_EQUAL and (_needs_statements(node.left) or _needs_statements(node.right))
+    if isinstance(node, Assign): return _needs_statements(node.left) or _needs_statements(node.right)
+    if isinstance(node, UnaryOp): return _needs_statements(node.expr)
+    if isinstance(node, MemberAccess): return _needs_statements(node.left)
+    if isinstance(node, IndexExpr): return _needs_statements(node.left) or _needs_statements(node.index)
+    if isinstance(node, FunctionCall): return any(_needs_statements(arg) for arg in node.args)
+    if isinstance(node, Alloc): return _needs_statements(node.size_expr)
+    if isinstance(node, Free): return _needs_statements(node.expr)
+    if isinstance(node, VarDecl): return node.assign_node is not None and _needs_statements(node.assign_node)
+    return False
+
+
+def _is_constant(node):
+    """Чи є вираз константним виразом C (лише такий може ініціалізувати глобальну змінну)."""
+    if isinstance(node, (Num, CharLiteral, StringLiteral)): return True
+    if isinstance(node, UnaryOp): return node.op.type in _CONSTANT_UNARY and _is_constant(node.expr)
+    if isinstance(node, BinOp):
+        return node.op.type != TokenType.TYPE_EQUAL and _is_constant(node.left) and _is_constant(node.right)
+    return False
+
+
+def _identifiers(tree):
+    """Усі імена програми: тимчасові змінні не повинні з ними збігатися."""
+    names, stack = set(), [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, AST): continue
+        if isinstance(node, Var): names.add(node.value)
+        elif isinstance(node, FunctionDecl): names.add(node.func_name)
+        elif isinstance(node, StructDef): names.add(node.name)
+        stack.extend(vars(node).values())
+    return names
+
+
+class CodeGeneratorC(CodeGeneratorCpp):
+    def __init__(self, reporter):
+        super().__init__(reporter)
+        self.writer = None
+        self.prefix = '_t'
+        self.temp_count = 0
+        self.global_symbols = {}
+        self.function_types = {}
+        self.value_types = {}  # id(блоку чи if у позиції значення) -> тип значення
+        self.result_types = {}  # тимчасова змінна -> тип записаного в неї значення
+        self.spilled = {}  # id(операнда) -> тимчасова змінна, в якій вже лежить його значення
+        self.loops = []  # для кожного циклу, що генерується: мітка для continue (None - звичайний continue)
+        self.in_function = False
+        self.deferred = []  # глобальні змінні, що отримують значення на початку main
+        self.prologue = []
+
+    def _cast(self, type_str, expr):
+        return f"(({type_str})({expr}))"
+
+    def _checked(self, pointer_node, expr):
+        pointer_type = self._map_type(self._get_node_type(pointer_node)).strip()
+        return f"(({pointer_type})ignis_check({expr}))"
+
+    def _struct_declaration(self, name):
+        return f"typedef struct {name} {name};"
+
+    def _function_signature(self, node: FunctionDecl):
+        signature = super()._function_signature(node)
+        return signature[:-2] + "(void)" if signature.endswith("()") else signature
+
+    def _get_node_type(self, node):
+        if isinstance(node, (IfExpr, Block)): return self.value_types.get(id(node), _INT)
+        if isinstance(node, Var) and node.value not in self.symbol_table and node.value in self.global_symbols:
+            return self.global_symbols[node.value]
+        if isinstance(node, FunctionCall):
+            name = node.name_node.value
+            if name in _BUILTIN_TYPES: return _BUILTIN_TYPES[name]
+            if name in self.function_types: return self.function_types[name]
+        if isinstance(node, BinOp) and node.op.type in _INT_RESULT: return _INT
+        if isinstance(node, UnaryOp) and node.op.type in (TokenType.KW_NOT, TokenType.KW_NNOT): return _INT
+        if isinstance(node, New): return node.type_node.pointer_to()
+        if isinstance(node, Alloc): return _VOID_PTR
+        if isinstance(node, Assign): return self._get_node_type(node.left)
+        return super()._get_node_type(node)
+
+    def _temp(self):
+        self.temp_count += 1
+        return f"{self.prefix}{self.temp_count}"
+
+    def _loop(self, label, visit, *args):
+        self.loops.append(label)
+        try:
+            visit(*args)
+        finally:
+            self.loops.pop()
+
+    # --- Програма та оголошення ---
+
+    def visit_Program(self, node: Program, writer):
+        self.writer = writer
+        names = _identifiers(node)
+        while any(name.startswith(self.prefix) for name in names): self.prefix = '_' + self.prefix
+        init_name = f"{self.prefix}init_globals"
+
+        writer.add_line('#include "ignis_runtime.h"')
+        writer.add_line('')
+        for decl in node.declarations:
+            if isinstance(decl, StructDef):
+                self.struct_info[decl.name] = {field.var_node.value: field.type_node for field in decl.fields}
+                writer.add_line(self._struct_declaration(decl.name))
+            elif isinstance(decl, FunctionDecl):
+                self.function_types[decl.func_name] = decl.type_node
+        for name in array_types(node): writer.add_line(self._struct_declaration(name))
+        writer.add_line('')
+        # У C функцію не можна викликати до її оголошення, тож прототипи всіх функцій - наперед
+        for decl in node.declarations:
+            if isinstance(decl, FunctionDecl): writer.add_line(f"{self._function_signature(decl)};")
+        if any(isinstance(decl, (VarDecl, ConstDecl)) and decl.assign_node is not None
+               and not _is_constant(decl.assign_node) for decl in node.declarations):
+            writer.add_line(f"static void {init_name}(void);")
+            self.prologue = [f"{init_name}();"]
+        main_prologue = self.prologue
+        writer.add_line('')
+        self.arrays = set()
+        for decl in node.declarations:
+            self.symbol_table = self.global_symbols
+            self.prologue = main_prologue if isinstance(decl, FunctionDecl) and decl.func_name == 'main' else []
+            try:
+                self._define_arrays(decl, writer)
+                self.visit(decl, writer)
+            except CompilerError:
+                pass
+            writer.add_line('')
+
+        if main_prologue:
+            writer.add_line(f"static void {init_name}(void)")
+            writer.enter_block()
+            self.symbol_table = self.global_symbols
+            for decl in self.deferred:
+                try:
+                    value = self.visit_expr(decl.assign_node)
+                    if isinstance(decl.assign_node, Alloc): value = self._cast(self._map_type(decl.type_node), value)
+                    writer.add_line(f"{decl.var_node.value} = {value};")
+                except CompilerError:
+                    pass
+            writer.exit_block()
+
+    def _defer_global(self, node):
+        """Глобальна змінна без константного ініціалізатора: значення записує функція, яку викликає main."""
+        var_name = node.var_node.value
+        if var_name in self.symbol_table:
+            self.error("E008", f"Variable '{var_name}' is already declared in this scope.", node)
+        self.symbol_table[var_name] = node.type_node
+        self.writer.add_line(f"{self._map_type(node.type_node)} {var_name};")
+        self.deferred.append(node)
+
+    def visit_VarDecl(self, node: VarDecl, writer):
+        if not self.in_function and node.assign_node is not None and not _is_constant(node.assign_node):
+            self._defer_global(node)
+            return
+        super().visit_VarDecl(node, writer)
+
+    def visit_ConstDecl(self, node: ConstDecl, writer):
+        if not self.in_function and not _is_constant(node.assign_node):
+            self._defer_global(node)
+            return
+        self.symbol_table[node.var_node.value] = node.type_node
+        var_type = self._map_type(node.type_node, is_const=isinstance(node.assign_node, StringLiteral))
+        value_expr = self.visit_expr(node.assign_node)
+        writer.add_line(f"{var_type} const {node.var_node.value} = {value_expr};")
+
+    def visit_FunctionDecl(self, node: FunctionDecl, writer):
+        self.in_function = True
+        try:
+            super().visit_FunctionDecl(node, writer)
+        finally:
+            self.in_function = False
+
+    # --- Блоки та значення ---
+
+    def visit_Block(self, node: Block, writer, is_function_body=False, is_void=False, is_expr_context=False,
+                    result=None):
+        """result - куди йде значення останнього вузла: ім'я тимчасової змінної або _RETURN."""
+        if is_function_body and not is_void: result = _RETURN
+        old_symbol_table = self.symbol_table.copy()
+        writer.enter_block()
+        if is_function_body:
+            for line in self.prologue: writer.add_line(line)
+            self.prologue = []
+        for child in node.children[:-1]:
+            try:
+                self.visit_statement(child, writer)
+            except CompilerError:
+                pass
+        if node.children:
+            try:
+                self._result(node.children[-1], writer, result)
+            except CompilerError:
+                pass
+        writer.exit_block()
+        self.symbol_table = old_symbol_table
+
+    def _result(self, node, writer, result):
+        if result is None or isinstance(node, _STATEMENTS):
+            self.visit_statement(node, writer)
+        elif isinstance(node, IfExpr):
+            self._if(node, writer, result)
+        elif isinstance(node, Block):
+            self.visit_Block(node, writer, result=result)
+        else:
+            value_expr = self.visit_expr(node)
+            value_type = self._get_node_type(node)
+            if value_type == _VOID:
+                # void-вираз там, де чекають значення: як і в інтерпретаторі, результат - 0
+                writer.add_line(f"{value_expr};")
+                if result == _RETURN: writer.add_line("return 0;")
+            elif result == _RETURN:
+                writer.add_line(f"return {value_expr};")
+            else:
+                writer.add_line(f"{result} = {value_expr};")
+                known = self.result_types.get(result)
+                # Гілки int і char дають int
+                if known is None or (known == _CHAR and value_type == _INT): self.result_types[result] = value_type
+
+    def _if(self, node: IfExpr, writer, result):
+        condition = self.visit_expr(node.condition)
+        writer.add_line(f"if ({condition})")
+        self.visit_Block(node.if_block, writer, result=result)
+        if node.else_block is None: return
+        writer.add_line("else")
+        if isinstance(node.else_block, IfExpr) and _needs_statements(node.else_block.condition):
+            # Інструкції, що обчислюють умову elif, не можуть стояти між else та if
+            writer.enter_block()
+            self._if(node.else_block, writer, result)
+            writer.exit_block()
+        elif isinstance(node.else_block, IfExpr):
+            self._if(node.else_block, writer, result)
+        else:
+            self.visit_Block(node.else_block, writer, result=result)
+
+    def visit_IfExpr(self, node: IfExpr, writer, is_expr_context=False):
+        self._if(node, writer, None)
+
+    def visit_expr(self, node):
+        name = self.spilled.pop(id(node), None)
+        if name is not None: return name
+        if isinstance(node, (IfExpr, Block)): return self._hoist(node)
+        return self.visit(node)
+
+    def _hoist(self, node):
+        """Блок або if у позиції значення: інструкції - перед поточною, значення - у тимчасовій змінній."""
+        writer = self.writer
+        name = self._temp()
+        indent = '    ' * writer.indent_level
+        declaration = len(writer.code)
+        writer.add_line('')  # оголошення дописується, коли відомий тип значення
+        self._result(node, writer, name)
+        value_type = self.result_types.pop(name, _INT)
+        self.value_types[id(node)] = value_type
+        writer.code[declaration] = f"{indent}{self._map_type(value_type)} {name};"
+        return name
+
+    def _spill(self, operands):
+        """Операнди, що обчислюються раніше за блок-вираз у пізнішому операнді, - у тимчасові змінні."""
+        last = max((index for index, operand in enumerate(operands) if _needs_statements(operand)), default=0)
+        for operand in operands[:last]:
+            if isinstance(operand, (Num, CharLiteral, StringLiteral)): continue
+            value_type = self._get_node_type(operand)
+            value_expr = self.visit_expr(operand)
+            if value_type == _VOID:
+                self.writer.add_line(f"{value_expr};")
+                self.spilled[id(operand)] = '0'
+                continue
+            name = self._temp()
+            self.writer.add_line(f"{self._map_type(value_type)} {name} = {value_expr};")
+            self.spilled[id(operand)] = name
+
+    # --- Вирази ---
+
+    def visit_BinOp(self, node: BinOp, *args, **kwargs):
+        op_type = node.op.type
+        if op_type in _SHORT_CIRCUIT and _needs_statements(node.right):
+            when_true, negate = _SHORT_CIRCUIT[op_type]
+            writer = self.writer
+            name = self._temp()
+            writer.add_line(f"int64_t {name} = ({self.visit_expr(node.left)}) != 0;")
+            writer.add_line(f"if ({name})" if when_true else f"if (!{name})")
+            writer.enter_block()
+            writer.add_line(f"{name} = ({self.visit_expr(node.right)}) != 0;")
+            writer.exit_block()
+            return f"(!{name})" if negate else name
+        if op_type != TokenType.TYPE_EQUAL: self._spill([node.left, node.right])
+        return super().visit_BinOp(node, *args, **kwargs)
+
+    def visit_FunctionCall(self, node: FunctionCall):
+        self._spill(node.args)
+        return super().visit_FunctionCall(node)
+
+    # --- Цикли ---
+
+    def visit_WhileStmt(self, node: WhileStmt, writer):
+        if not _needs_statements(node.condition):
+            self._loop(None, super().visit_WhileStmt, node, writer)
+            return
+        # Умова з блоком-виразом обчислюється на початку кожної ітерації
+        writer.add_line("for (;;)")
+        writer.enter_block()
+        writer.add_line(f"if (!({self.visit_expr(node.condition)})) break;")
+        self._loop(None, self.visit, node.body, writer)
+        writer.exit_block()
+
+    def visit_LoopStmt(self, node: LoopStmt, writer):
+        self._loop(None, super().visit_LoopStmt, node, writer)
+
+    def visit_ForStmt(self, node: ForStmt, writer):
+        old_symbol_table = self.symbol_table.copy()
+        parts = [part for part in (node.init, node.condition, node.increment) if part is not None]
+        if not any(_needs_statements(part) for part in parts):
+            if isinstance(node.init, VarDecl): self.symbol_table[node.init.var_node.value] = node.init.type_node
+            self._loop(None, super().visit_ForStmt, node, writer)
+        else:
+            # continue має виконати крок циклу, тож стає переходом на мітку перед ним
+            label = f"{self._temp()}_next"
+            writer.enter_block()
+            if node.init is not None: self.visit_statement(node.init, writer)
+            writer.add_line("for (;;)")
+            writer.enter_block()
+            if node.condition is not None:
+                writer.add_line(f"if (!({self.visit_expr(node.condition)})) break;")
+            self._loop(label, self.visit, node.body, writer)
+            writer.add_line(f"{label}:;")
+            if node.increment is not None: self.visit_statement(node.increment, writer)
+            writer.exit_block()
+            writer.exit_block()
+        self.symbol_table = old_symbol_table
+
+    def visit_ContinueStmt(self, node: ContinueStmt, writer):
+        label = self.loops[-1] if self.loops else None
+        writer.add_line(f"goto {label};" if label else "continue;")
+
+
+class IRCodeGeneratorC(IRCodeGeneratorCpp):
+    """IRCodeGeneratorCpp, що пише C11: приведення C, (void *)0 замість nullptr, typedef для структур."""
+
+    _UNARY = {**IRCodeGeneratorCpp._UNARY, 'trunc': '(char)({})'}
+    _INCLUDES = ['#include "ignis_runtime.h"']
+    _NULL = '((void *)0)'
+    _MUSTTAIL = [
+        '#if defined(__has_attribute) && __has_attribute(musttail)',
+        '#define IGNIS_MUSTTAIL __attribute__((musttail))',
+        '#else',
+        '#define IGNIS_MUSTTAIL',
+        '#endif',
+    ]
+
+    def _cast(self, type_str, expr):
+        return f"(({type_str})({expr}))"
+
+    def _checked(self, ir_type, expr):
+        return f"(({self._type(ir_type)})ignis_check({expr}))"
+
+    def _struct_declaration(self, name):
+        return f"typedef struct {name} {name};"
+
+    def _signature(self, func):
+        signature = super()._signature(func)
+        return signature[:-2] + "(void)" if signature.endswith("()") else signature
@@ -1,5 +1,38 @@
 from ast_nodes import *
 from lexer import TokenType, Token
+from error import CompilerError
+
+
+def _mangle(type_node):
+    if type_node.length is not None: name = f"array_{_mangle(type_node.element)}_{type_node.length}"
+    else: name = type_node.value if isinstance(type_node, Type) else type_node.base
+    return 'ptr_' * type_node.pointer_level + name
+
+
+def array_name(array_type):
+    """Структура-обгортка масиву (AST Type чи IRType): array<int, 10> -> ignis_array_int_10."""
+    return f"ignis_array_{_mangle(array_type.element)}_{array_type.length}"
+
+
+def array_types(node):
+    """
+    Масиви, що згадуються в піддереві AST: {ім'я обгортки: тип масиву}, кожен після масивів,
+    які є його елементами (у C/C++ масив `T data[N]` потребує повного типу T).
+    """
+    found, stack = {}, [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, Type):
+            pending = []
+            while node is not None and node.length is not None:
+                pending.append(Type(node.token, 0, node.element, node.length))
+                node = node.element
+            for array_type in reversed(pending): found.setdefault(array_name(array_type), array_type)
+        elif isinstance(node, AST):
+            stack.extend(reversed([value for value in vars(node).values() if isinstance(value, (AST, list))]))
+    return found
 
 
 class CppWriter:
@@ -39,6 +72,7 @@ class CodeGeneratorCpp(NodeVisitor):
         self.reporter = reporter
         self.symbol_table = {}
         self.struct_info = {}
+        self.arrays = set()  # обгортки масивів, уже визначені у файлі
 
     def _get_token_from_node(self, node):
         if hasattr(node, 'token'): return node.token
@@ -52,6 +86,7 @@ class CodeGeneratorCpp(NodeVisitor):
     def _map_type(self, type_node, is_const=False):
         if type_node is None: return "void"
         base_type = type_node.value
+        if type_node.length is not None: base_type = array_name(type_node)
         cpp_type = {'int': 'int64_t', 'char': 'char'}.get(base_type, base_type)
         const_prefix = "const " if is_const else ""
         type_str = f"{const_prefix}{cpp_type}"
@@ -75,10 +110,10 @@ class CodeGeneratorCpp(NodeVisitor):
         if isinstance(node, UnaryOp):
             base_type = self._get_node_type(node.expr)
             if node.op.type == TokenType.KW_ADDR:
-                return Type(base_type.token, base_type.pointer_level + 1)
+                return base_type.pointer_to()
             if node.op.type == TokenType.KW_DEREF:
                 if base_type.pointer_level == 0: self.error("E005", "Cannot dereference a non-pointer type.", node)
-                return Type(base_type.token, base_type.pointer_level - 1)
+                return base_type.pointee()
         if isinstance(node, MemberAccess):
             struct_type = self._get_node_type(node.left)
             struct_name = struct_type.value
@@ -88,8 +123,28 @@ class CodeGeneratorCpp(NodeVisitor):
                                                                            f"Struct '{struct_name}' has no field '{field_name}'",
                                                                            node)
             return self.struct_info[struct_name][field_name]
+        if isinstance(node, IndexExpr):
+            # Індексація масиву або ключа масиву (bounds.py вже перевірив, що це одне з двох)
+            return self._get_node_type(node.left).element
         return Type(Token(TokenType.KW_INT, 'int'))
 
+    def _cast(self, type_str, expr):
+        return f"reinterpret_cast<{type_str}>({expr})"
+
+    def _checked(self, pointer_node, expr):
+        """Ключ, розіменування якого статичний аналіз не зміг довести безпечним, - через перевірку Вахтера."""
+        return f"ignis_check({expr})"
+
+    def _struct_declaration(self, name):
+        return f"struct {name};"
+
+    def _define_arrays(self, node, writer):
+        """Обгортки масивів, потрібні оголошенню node, - перед ним (кожна один раз на файл)."""
+        for name, array_type in array_types(node).items():
+            if name in self.arrays: continue
+            self.arrays.add(name)
+            writer.add_line(f"struct {name} {{ {self._map_type(array_type.element)} data[{array_type.length}]; }};")
+
     def generate(self, tree):
         writer = CppWriter()
         self.visit(tree, writer)
@@ -103,17 +158,67 @@ class CodeGeneratorCpp(NodeVisitor):
         for decl in node.declarations:
             if isinstance(decl, StructDef):
                 self.struct_info[decl.name] = {field.var_node.value: field.type_node for field in decl.fields}
-                writer.add_line(f"struct {decl.name};")
+                writer.add_line(self._struct_declaration(decl.name))
+        for name in array_types(node): writer.add_line(self._struct_declaration(name))
         writer.add_line('')
+        self.arrays = set()
         for decl in node.declarations:
-            self.visit(decl, writer)
+            # Помилка в одному оголошенні записується, і генерація переходить до наступного
+            try:
+                self._define_arrays(decl, writer)
+                self.visit(decl, writer)
+            except CompilerError:
+                pass
             writer.add_line('')
 
-    def visit_FunctionDecl(self, node: FunctionDecl, writer: CppWriter):
-        self.symbol_table = {}
-        for param in node.params:
-            self.symbol_table[param.var_node.value] = param.type_node
+    def generate_unit(self, tree, decl, dependencies):
+        """
+        Окрема одиниця трансляції для однієї функції: лише структури, константи та прототипи
+        функцій з dependencies (множина вузлів оголошень), від яких залежить decl.
+        """
+        return self._generate_unit(tree, [decl], dependencies)
+
+    def generate_globals_unit(self, tree, global_decls, dependencies):
+        """
+        Одиниця трансляції з єдиними визначеннями глобальних змінних global_decls; одиниці
+        функцій бачать їх через extern-оголошення.
+        """
+        return self._generate_unit(tree, global_decls, dependencies)
+
+    def _generate_unit(self, tree, own, dependencies):
+        writer = CppWriter()
+        writer.add_line('#include "ignis_runtime.h"')
+        writer.add_line('#include <cstdint>')
+        writer.add_line('#include <typeinfo>')
+        writer.add_line('')
+        for other in tree.declarations:
+            if isinstance(other, StructDef):
+                self.struct_info[other.name] = {field.var_node.value: field.type_node for field in other.fields}
+                if other in dependencies: writer.add_line(self._struct_declaration(other.name))
+        used = [other for other in tree.declarations if other in own or other in dependencies]
+        for name in array_types(used): writer.add_line(self._struct_declaration(name))
+        writer.add_line('')
+        self.arrays = set()
+        for other in tree.declarations:
+            if other in own:
+                self._define_arrays(other, writer)
+                self.visit(other, writer)
+            elif other not in dependencies:
+                continue
+            elif isinstance(other, FunctionDecl):
+                # Прототипу досить оголошених вище обгорток масивів
+                writer.add_line(f"{self._function_signature(other)};")
+            elif isinstance(other, VarDecl):
+                # Глобальна змінна визначена один раз в одиниці глобальних (generate_globals_unit)
+                self._define_arrays(other, writer)
+                writer.add_line(f"extern {self._var_type(other)} {other.var_node.value};")
+            else:
+                self._define_arrays(other, writer)
+                self.visit(other, writer)
+            writer.add_line('')
+        return writer.get_code()
 
+    def _function_signature(self, node: FunctionDecl):
         is_void_func = node.type_node == Type(TokenType.KW_VOID)
 
         if is_void_func:
@@ -129,7 +234,15 @@ class CodeGeneratorCpp(NodeVisitor):
             param_name = param.var_node.value
             params_list.append(f"{param_type} {param_name}")
         params = ", ".join(params_list)
-        writer.add_line(f"{return_type} {func_name}({params})")
+        return f"{return_type} {func_name}({params})"
+
+    def visit_FunctionDecl(self, node: FunctionDecl, writer: CppWriter):
+        self.symbol_table = {}
+        for param in node.params:
+            self.symbol_table[param.var_node.value] = param.type_node
+
+        is_void_func = node.type_node == Type(TokenType.KW_VOID)
+        writer.add_line(self._function_signature(node))
 
         self.visit(node.body, writer, is_function_body=True, is_void=is_void_func)
 
@@ -137,14 +250,20 @@ class CodeGeneratorCpp(NodeVisitor):
         old_symbol_table = self.symbol_table.copy()
         writer.enter_block()
         for child in node.children[:-1]:
-            self.visit_statement(child, writer)
+            try:
+                self.visit_statement(child, writer)
+            except CompilerError:
+                pass
         if node.children:
             last_child = node.children[-1]
-            if (is_function_body or is_expr_context) and not is_void and not isinstance(last_child, Return):
-                expr_code = self.visit_expr(last_child)
-                writer.add_line(f"return {expr_code};")
-            else:
-                self.visit_statement(last_child, writer)
+            try:
+                if (is_function_body or is_expr_context) and not is_void and not isinstance(last_child, Return):
+                    expr_code = self.visit_expr(last_child)
+                    writer.add_line(f"return {expr_code};")
+                else:
+                    self.visit_statement(last_child, writer)
+            except CompilerError:
+                pass
         writer.exit_block()
         self.symbol_table = old_symbol_table
 
@@ -155,21 +274,23 @@ class CodeGeneratorCpp(NodeVisitor):
         else:
             self.visit(node, writer)
 
+    def _var_type(self, node: VarDecl):
+        is_const_string = isinstance(node.assign_node, StringLiteral)
+        return self._map_type(node.type_node, is_const=is_const_string and not node.is_mutable)
+
     def visit_VarDecl(self, node: VarDecl, writer: CppWriter):
         var_name = node.var_node.value
         if var_name in self.symbol_table:
             self.error("E008", f"Variable '{var_name}' is already declared in this scope.", node)
         self.symbol_table[var_name] = node.type_node
-        is_const_string = isinstance(node.assign_node, StringLiteral)
-        is_mut = node.is_mutable
-        var_type = self._map_type(node.type_node, is_const=is_const_string and not is_mut)
+        var_type = self._var_type(node)
         if node.assign_node:
             value_expr = self.visit_expr(node.assign_node)
 
             if isinstance(node.assign_node, (Alloc, New)):
                 pointer_type_str = self._map_type(node.type_node).strip()
                 if isinstance(node.assign_node, Alloc):
-                    value_expr = f"reinterpret_cast<{pointer_type_str}>({value_expr})"
+                    value_expr = self._cast(pointer_type_str, value_expr)
 
             writer.add_line(f"{var_type} {var_name} = {value_expr};")
         else:
@@ -179,7 +300,7 @@ class CodeGeneratorCpp(NodeVisitor):
         if node.op.type == TokenType.TYPE_EQUAL:
             left_type = self._get_node_type(node.left)
             right_type = self._get_node_type(node.right)
-            if left_type.value == right_type.value and left_type.pointer_level == right_type.pointer_level:
+            if left_type == right_type:
                 return "true"
             else:
                 return "false"
@@ -221,8 +342,24 @@ class CodeGeneratorCpp(NodeVisitor):
         left_expr_str = self.visit_expr(node.left)
         left_type = self._get_node_type(node.left)
         op = "->" if left_type.pointer_level > 0 else "."
+        if op == "->" and getattr(node, 'warden_check', False):
+            left_expr_str = self._checked(node.left, left_expr_str)
         return f"{left_expr_str}{op}{node.right.value}"
 
+    def visit_IndexExpr(self, node: IndexExpr):
+        left_expr_str = self.visit_expr(node.left)
+        left_type = self._get_node_type(node.left)
+        index_str = self.visit_expr(node.index)
+        if left_type.pointer_level > 0:
+            if getattr(node, 'warden_check', False): left_expr_str = self._checked(node.left, left_expr_str)
+            left_expr_str += "->data"
+        else:
+            left_expr_str += ".data"
+        # Індекс, який аналіз діапазонів (bounds.py) не довів, перевіряється під час виконання
+        if getattr(node, 'bounds_check', True):
+            index_str = f"ignis_index({index_str}, {left_type.length})"
+        return f"{left_expr_str}[{index_str}]"
+
     def visit_ConstDecl(self, node: ConstDecl, writer: CppWriter):
         var_type = self._map_type(node.type_node, is_const=True)
         var_name = node.var_node.value
@@ -287,7 +424,7 @@ class CodeGeneratorCpp(NodeVisitor):
 
         # Генеруємо фінальний рядок згідно з планом
         # f"reinterpret_cast<{cpp_type}*> (ignis_alloc(sizeof({cpp_type})))"
-        return f"reinterpret_cast<{cpp_type}*>(ignis_alloc(sizeof({cpp_type})))"
+        return self._cast(f"{cpp_type}*", f"ignis_alloc(sizeof({cpp_type}))")
 
     def visit_Free(self, node: Free):
         """Генерує виклик ignis_free(pointer)."""
@@ -367,7 +504,7 @@ class CodeGeneratorCpp(NodeVisitor):
             left_type = self._get_node_type(node.left)
             pointer_type_str = self._map_type(left_type).strip()
 
-            right_expr = f"reinterpret_cast<{pointer_type_str}>({right_expr})"
+            right_expr = self._cast(pointer_type_str, right_expr)
 
         return f"{left_expr} = {right_expr}"
 
@@ -411,6 +548,10 @@ class CodeGeneratorCpp(NodeVisitor):
             TokenType.MINUS: '(-{expr})', TokenType.PLUS: '(+{expr})'
         }
 
+        # Розіменування через ключ, яке статичний аналіз не зміг довести безпечним.
+        if op_type == TokenType.KW_DEREF and getattr(node, 'warden_check', False):
+            expr = self._checked(node.expr, expr)
+
         if op_type in op_map:
             return op_map[node.op.type].format(expr=expr)
 
@@ -424,4 +565,261 @@ class CodeGeneratorCpp(NodeVisitor):
         func_map = {'print': 'print_int', 'putchar': 'ignis_putchar', 'getchar': 'ignis_getchar'}
         func_name = func_map.get(node.name_node.value, node.name_node.value)
         args_str = ", ".join([self.visit_expr(arg) for arg in node.args])
-        return f"{func_name}({args_str})"
\ No newline at end of file
+        return f"{func_name}({args_str})"
+
+class IRCodeGeneratorCpp:
+    """
+    Emits C++ from the SSA IR (ir.py) instead of walking the AST: every function becomes
+    a flat sequence of labelled blocks joined by `goto`, every SSA value a local variable
+    declared at the top (so no jump crosses an initialization), and phi nodes become
+    assignments on the incoming edges. g++ rebuilds the structured control flow itself.
+    """
+
+    _TYPES = {'int': 'int64_t', 'char': 'char', 'void': 'void'}
+    _BINARY = {'add': '+', 'sub': '-', 'mul': '*', 'div': '/', 'and': '&', 'or': '|', 'xor': '^',
+               'eq': '==', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+    _UNARY = {'neg': '-{}', 'not': '!{}', 'bnot': '~{}', 'bool': '({} != 0)', 'trunc': 'static_cast<char>({})'}
+    _BUILTINS = {'print': 'print_int', 'putchar': 'ignis_putchar', 'getchar': 'ignis_getchar'}
+    _INCLUDES = ['#include "ignis_runtime.h"', '#include <cstdint>']
+    _NULL = 'nullptr'
+
+    # Guaranteed tail calls where the compiler has them; otherwise g++ -O2 still emits a jump
+    _MUSTTAIL = [
+        '#if defined(__has_cpp_attribute) && __has_cpp_attribute(clang::musttail)',
+        '#define IGNIS_MUSTTAIL [[clang::musttail]]',
+        '#elif defined(__has_cpp_attribute) && __has_cpp_attribute(gnu::musttail)',
+        '#define IGNIS_MUSTTAIL [[gnu::musttail]]',
+        '#else',
+        '#define IGNIS_MUSTTAIL',
+        '#endif',
+    ]
+
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.names = {}
+        self.prefix = '_v'
+        self.signatures = {}
+        self.current = None
+
+    def _type(self, ir_type):
+        base = array_name(ir_type) if ir_type.length is not None else self._TYPES.get(ir_type.base, ir_type.base)
+        return base + ' ' + '*' * ir_type.pointer_level if ir_type.pointer_level else base
+
+    def _cast(self, type_str, expr):
+        return f"reinterpret_cast<{type_str}>({expr})"
+
+    def _checked(self, ir_type, expr):
+        return f"ignis_check({expr})"
+
+    def _struct_declaration(self, name):
+        return f"struct {name};"
+
+    def _signature(self, func):
+        return_type = 'int' if func.name == 'main' else self._type(func.return_type)
+        params = ', '.join(f"{self._type(param.type)} {param.name}" for param in func.params)
+        return f"{return_type} {func.name}({params})"
+
+    def generate(self, module):
+        # Generated names must not collide with the program's own identifiers
+        user_names = {func.name for func in module.functions}
+        user_names.update(value.name for func in module.functions for value in func.params)
+        while any(name.startswith(self.prefix) for name in user_names): self.prefix = '_' + self.prefix
+
+        self.signatures = {func.name: (func.return_type, [param.type for param in func.params])
+                           for func in module.functions}
+
+        writer = CppWriter()
+        for line in self._INCLUDES: writer.add_line(line)
+        if any(instr.op == 'tailcall' for func in module.functions for instr in func.instructions()):
+            for line in self._MUSTTAIL: writer.add_line(line)
+        writer.add_line('')
+        arrays = self._array_types(module)
+        for name in [*module.structs, *arrays]: writer.add_line(self._struct_declaration(name))
+        defined = set()
+        for name in module.structs: self._define(name, module.structs, arrays, defined, writer)
+        for name in arrays: self._define(name, module.structs, arrays, defined, writer)
+        writer.add_line('')
+        for func in module.functions: writer.add_line(f"{self._signature(func)};")
+        for func in module.functions:
+            writer.add_line('')
+            self._function(func, writer)
+        return writer.get_code() + '\n'
+
+    @staticmethod
+    def _array_types(module):
+        """{wrapper name: array IRType} for every array the module mentions, also behind pointers."""
+        from ir import IRType
+        types = [field_type for fields in module.structs.values() for _, field_type in fields]
+        for func in module.functions:
+            types.append(func.return_type)
+            types.extend(param.type for param in func.params)
+            for instr in func.instructions():
+                types.append(instr.type)
+                if isinstance(instr.attr, IRType): types.append(instr.attr)
+        arrays = {}
+        for ir_type in types:
+            while ir_type.length is not None:
+                arrays.setdefault(array_name(ir_type), IRType(ir_type.base, 0, ir_type.length))
+                ir_type = ir_type.element
+        return arrays
+
+    def _define(self, name, structs, arrays, defined, writer):
+        """Defines a struct or an array wrapper after the aggregates it holds by value."""
+        if name in defined: return
+        defined.add(name)
+        if name in arrays:
+            element = arrays[name].element
+            if element.is_struct: self._define(array_name(element) if element.is_array else element.base,
+                                               structs, arrays, defined, writer)
+            writer.add_line(f"struct {name} {{ {self._type(element)} data[{arrays[name].length}]; }};")
+            return
+        for _, field_type in structs[name]:
+            if field_type.is_struct: self._define(array_name(field_type) if field_type.is_array else field_type.base,
+                                                  structs, arrays, defined, writer)
+        writer.add_line(f"struct {name}")
+        writer.enter_block()
+        for field, field_type in structs[name]: writer.add_line(f"{self._type(field_type)} {field};")
+        writer.exit_block()
+        writer.add_line(";")
+
+    # --- Values ---
+
+    def _const(self, const):
+        value = const.value
+        if isinstance(value, str):
+            escaped = value.encode("unicode_escape").decode("utf-8").replace('"', '\\"')
+            return f'(char *)"{escaped}"'
+        if const.type.is_pointer: return self._NULL if value == 0 else self._cast(self._type(const.type), value)
+        if value == -(1 << 63): return '(-9223372036854775807 - 1)'
+        return f"({value})" if value < 0 else str(value)
+
+    def _value(self, value):
+        from ir import Const, Undef
+        if isinstance(value, Const): return self._const(value)
+        if isinstance(value, Undef): return self._NULL if value.type.is_pointer else '0'
+        if getattr(value, 'op', None) == 'alloca': return f"(&{self.names[value]})"
+        return self.names[value]
+
+    def _deref(self, pointer):
+        """`*p`, or the variable itself when p is an alloca."""
+        if getattr(pointer, 'op', None) == 'alloca': return self.names[pointer]
+        return f"(*{self._value(pointer)})"
+
+    # --- Functions ---
+
+    def _function(self, func, writer):
+        self.current = func.name
+        self.names = {param: param.name for param in func.params}
+        counter = 0
+        declarations = []
+        for instr in func.instructions():
+            if not instr.has_value: continue
+            name = f"{self.prefix}{counter}"
+            counter += 1
+            self.names[instr] = name
+            declared = instr.attr if instr.op == 'alloca' else instr.type
+            declarations.append(f"{self._type(declared)} {name};")
+        targets = {succ for block in func.blocks for succ in block.succs}
+
+        writer.add_line(self._signature(func))
+        writer.enter_block()
+        for line in declarations: writer.add_line(line)
+        for index, block in enumerate(func.blocks):
+            following = func.blocks[index + 1] if index + 1 < len(func.blocks) else None
+            if block in targets:
+                writer.indent_level -= 1
+                writer.add_line(f"{self._label(block)}:;")
+                writer.indent_level += 1
+            for instr in block.instrs: self._instr(instr, block, following, writer)
+        writer.exit_block()
+
+    def _label(self, block):
+        return 'L_' + block.name.replace('.', '_')
+
+    def _edge(self, source, target, following):
+        """Phi assignments for the source -> target edge, then the jump."""
+        lines = []
+        if target.phis:
+            index = target.preds.index(source)
+            moves = [(phi, phi.args[index]) for phi in target.phis if phi.args[index] is not phi]
+            # Phis of the same block read each other's old values: copy through temporaries,
+            # in a scope of their own so that no goto jumps over their initialization
+            if len(moves) > 1 and any(arg in target.phis for _, arg in moves):
+                lines.append(' '.join(['{', *(f"{self._type(phi.type)} {self.names[phi]}_in = {self._value(arg)};"
+                                         for phi, arg in moves),
+                                       *(f"{self.names[phi]} = {self.names[phi]}_in;" for phi, _ in moves), '}']))
+            else:
+                lines.extend(f"{self.names[phi]} = {self._value(arg)};" for phi, arg in moves)
+        if target is not following: lines.append(f"goto {self._label(target)};")
+        return lines
+
+    @staticmethod
+    def _conditional(writer, head, lines):
+        if len(lines) == 1:
+            writer.add_line(f"{head} {lines[0]}")
+            return
+        writer.add_line(head)
+        writer.enter_block()
+        for line in lines: writer.add_line(line)
+        writer.exit_block()
+
+    def _instr(self, instr, block, following, writer):
+        op, args = instr.op, instr.args
+        value = self._value
+        if op == 'br':
+            for line in self._edge(block, instr.attr[0], following): writer.add_line(line)
+            return
+        if op == 'cbr':
+            cond = value(args[0])
+            if_true = self._edge(block, instr.attr[0], following)
+            if_false = self._edge(block, instr.attr[1], following)
+            if not if_true and not if_false: return
+            if not if_true: cond, if_true, if_false = f"!({cond})", if_false, if_true
+            self._conditional(writer, f"if ({cond})", if_true)
+            if if_false: self._conditional(writer, "else", if_false)
+            return
+        if op == 'ret':
+            if block.instrs[-2:-1] and block.instrs[-2].op == 'tailcall': return
+            writer.add_line(f"return {value(args[0])};" if args else "return;")
+            return
+        if op == 'tailcall':
+            # musttail requires the caller and the callee to have the same signature
+            musttail = 'IGNIS_MUSTTAIL ' if self.signatures[instr.attr] == self.signatures[self.current] else ''
+            writer.add_line(f"{musttail}return {instr.attr}({', '.join(value(arg) for arg in args)});")
+            return
+        if op in ('alloca', 'phi'): return
+        if op == 'store':
+            writer.add_line(f"{self._deref(args[0])} = {value(args[1])};")
+            return
+        if op == 'copy':
+            writer.add_line(f"{self._deref(args[0])} = {self._deref(args[1])};")
+            return
+        if op == 'free':
+            writer.add_line(f"ignis_free({value(args[0])});")
+            return
+
+        if op in self._BINARY: expr = f"{value(args[0])} {self._BINARY[op]} {value(args[1])}"
+        elif op in self._UNARY: expr = self._UNARY[op].format(value(args[0]))
+        elif op == 'load': expr = self._deref(args[0])
+        elif op == 'elemptr': expr = f"{value(args[0])} + {value(args[1])}"
+        elif op == 'fieldptr':
+            base = args[0]
+            expr = (f"&{self.names[base]}.{instr.attr}" if getattr(base, 'op', None) == 'alloca'
+                    else f"&{value(base)}->{instr.attr}")
+        elif op == 'indexptr':
+            base = args[0]
+            expr = (f"&{self.names[base]}.data[{value(args[1])}]" if getattr(base, 'op', None) == 'alloca'
+                    else f"&{value(base)}->data[{value(args[1])}]")
+        elif op == 'bounds': expr = f"ignis_index({value(args[0])}, {instr.attr})"
+        elif op == 'cast': expr = self._cast(self._type(instr.type), value(args[0]))
+        elif op == 'check': expr = self._checked(instr.type, value(args[0]))
+        elif op == 'alloc': expr = f"ignis_alloc({value(args[0])})"
+        elif op == 'new':
+            allocated = self._type(instr.attr)
+            expr = self._cast(f"{allocated} *", f"ignis_alloc(sizeof({allocated}))")
+        elif op == 'call':
+            callee = self._BUILTINS.get(instr.attr, instr.attr)
+            expr = f"{callee}({', '.join(value(arg) for arg in args)})"
+        else:
+            raise NotImplementedError(f"C++ emission of IR instruction '{op}'")
+        writer.add_line(f"{self.names[instr]} = {expr};" if instr.has_value else f"{expr};")
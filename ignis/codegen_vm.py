@@ -0,0 +1,256 @@
+"""
+Кодогенератор байт-коду (--target vm): оптимізований модуль IR (ir.py) -> файл .ignc (vm.py).
+
+Кожне значення SSA отримує власний регістр, константи - регістри з шаблону кадру, phi -
+копіювання на ребрах (паралельне, через тимчасові регістри, якщо phi читають одна одну).
+Порівняння, яке читає лише наступний за ним cbr, зливається з ним в один умовний перехід
+(jlt, jge, ...). Розміщення структур те саме, що в C++ на x86-64 (як в інтерпретаторі).
+"""
+from collections import Counter
+
+from ir import Const, Undef, CHAR
+from vm import (MOV, ADD, ADDI, SUB, MUL, MULI, DIV, AND, OR, XOR, EQ, NE, LT, LE, GT, GE,
+                NEG, NOT, BNOT, BOOL, TRUNC, LOADQ, LOADB, STOREQ, STOREB, CHECK, BOUNDS, COPY, NEW, ALLOC, FREE,
+                JUMP, JT, JF, JEQ, JNE, JLT, JLE, JGT, JGE, CALL, TAILCALL, RET, RETV, PRINT, PUTCHAR, GETCHAR,
+                CodeObject, Program, dump_program)
+
+_INT64_MIN = -(1 << 63)
+
+_BINARY = {'add': ADD, 'sub': SUB, 'mul': MUL, 'div': DIV, 'and': AND, 'or': OR, 'xor': XOR,
+           'eq': EQ, 'ne': NE, 'lt': LT, 'le': LE, 'gt': GT, 'ge': GE}
+_UNARY = {'neg': NEG, 'not': NOT, 'bnot': BNOT, 'bool': BOOL, 'trunc': TRUNC}
+# Порівняння, злите з cbr: (перехід, якщо істинне; перехід, якщо хибне)
+_BRANCHES = {'eq': (JEQ, JNE), 'ne': (JNE, JEQ), 'lt': (JLT, JGE), 'le': (JLE, JGT), 'gt': (JGT, JLE),
+             'ge': (JGE, JLT)}
+_BUILTINS = {'print': PRINT, 'putchar': PUTCHAR, 'getchar': GETCHAR}
+
+
+class IRCodeGeneratorVM:
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.pool = []
+        self.pool_index = {}  # (вид, значення) -> номер у пулі констант
+        self.structs = {}
+        self.layouts = {}  # назва структури -> (розмір, вирівнювання, {поле: зсув})
+        self.function_index = {}
+        # Стан функції, що генерується
+        self.words = []
+        self.count = 0  # інструкцій у words
+        self.registers = {}
+        self.register_count = 0
+        self.constants = []
+        self.temps = []
+        self.sink = None
+        self.labels = {}
+        self.fixups = []  # (позиція слова, блок), куди записати номер першої інструкції блоку
+
+    def generate(self, module):
+        self.structs = module.structs
+        self.function_index = {func.name: index for index, func in enumerate(module.functions)}
+        if 'main' not in self.function_index: self.reporter.error("E015", "Undeclared function 'main'", None)
+        functions = [self._function(func) for func in module.functions]
+        return dump_program(Program(self.pool, functions, self.function_index['main']))
+
+    # --- Розміщення в пам'яті ---
+
+    def layout(self, type):
+        """(розмір, вирівнювання) значення типу."""
+        if type.is_pointer or type.base == 'int': return 8, 8
+        if type.is_array:
+            size, align = self.layout(type.element)
+            return size * type.length, align
+        if type.base in ('char', 'void'): return 1, 1
+        size, align, _ = self.struct_layout(type.base)
+        return size, align
+
+    def struct_layout(self, name):
+        if name not in self.layouts:
+            offset, max_align, fields = 0, 1, {}
+            for field, field_type in self.structs[name]:
+                size, align = self.layout(field_type)
+                offset = (offset + align - 1) // align * align
+                fields[field] = offset
+                offset += size
+                max_align = max(max_align, align)
+            self.layouts[name] = ((offset + max_align - 1) // max_align * max_align or 1, max_align, fields)
+        return self.layouts[name]
+
+    # --- Регістри ---
+
+    def _new_register(self):
+        self.register_count += 1
+        return self.register_count - 1
+
+    def _constant(self, key, value):
+        if key not in self.pool_index:
+            self.pool_index[key] = len(self.pool)
+            self.pool.append(value)
+        register = self._new_register()
+        self.constants.append((register, self.pool_index[key]))
+        return register
+
+    def reg(self, value):
+        """Регістр значення IR; константа отримує регістр з шаблону кадру при першому використанні."""
+        register = self.registers.get(value)
+        if register is not None: return register
+        if isinstance(value, Const) and isinstance(value.value, str):
+            register = self._constant(('str', value.value), value.value.encode('utf-8') + b'\0')
+        elif isinstance(value, (Const, Undef)):
+            number = value.value if isinstance(value, Const) else 0
+            # Знаковий char, як у C++; цілі - з переповненням у 64 біти
+            number = ((number + 128) & 0xFF) - 128 if value.type == CHAR else \
+                ((number - _INT64_MIN) & 0xFFFFFFFFFFFFFFFF) + _INT64_MIN
+            register = self._constant(('int', number), number)
+        else:
+            register = self._new_register()
+        # Const порівнюються за значенням, тож однакові константи ділять регістр
+        self.registers[value] = register
+        return register
+
+    def _temp(self, index):
+        while len(self.temps) <= index: self.temps.append(self._new_register())
+        return self.temps[index]
+
+    # --- Функції ---
+
+    def emit(self, op, *operands):
+        self.words.append(op)
+        self.words.extend(operands)
+        self.count += 1
+
+    def _function(self, func):
+        self.words, self.count = [], 0
+        self.registers, self.constants, self.temps, self.sink = {}, [], [], None
+        self.labels, self.fixups = {}, []
+        self.register_count = 1 + len(func.params)  # r0 - адреса пам'яті кадру
+        for index, param in enumerate(func.params): self.registers[param] = 1 + index
+
+        # Пам'ять кадру: alloca лежать за зсувами від r0
+        stack_size, offsets = 0, {}
+        for instr in func.entry.instrs:
+            if instr.op != 'alloca': continue
+            size, align = self.layout(instr.attr)
+            offsets[instr] = (stack_size + align - 1) // align * align
+            stack_size = offsets[instr] + size
+
+        uses = Counter(id(arg) for instr in func.instructions() for arg in instr.args)
+        for index, block in enumerate(func.blocks):
+            following = func.blocks[index + 1] if index + 1 < len(func.blocks) else None
+            self.labels[block] = self.count
+            term = block.terminator
+            fused = None
+            if (term is not None and term.op == 'cbr' and len(block.instrs) > 1 and block.instrs[-2] is term.args[0]
+                    and term.args[0].op in _BRANCHES and uses[id(term.args[0])] == 1):
+                fused = term.args[0]
+            for position, instr in enumerate(block.instrs):
+                if instr is fused: continue
+                if instr.op == 'ret' and position > 0 and block.instrs[position - 1].op == 'tailcall': continue
+                if instr.op == 'alloca':
+                    self.emit(ADDI, self.reg(instr), 0, offsets[instr])
+                elif instr.op == 'br':
+                    self._edge(block, instr.attr[0], fallthrough=instr.attr[0] is following)
+                elif instr.op == 'cbr':
+                    self._cbr(block, instr, fused, following)
+                else:
+                    self._instr(instr)
+        for position, block in self.fixups: self.words[position] = self.labels[block]
+        return CodeObject(func.name, len(func.params), self.register_count, stack_size, self.constants, self.words)
+
+    def _edge(self, source, target, fallthrough):
+        """Копіювання для phi на ребрі source -> target, потім перехід (якщо target не йде одразу далі)."""
+        if target.phis:
+            index = target.preds.index(source)
+            moves = [(phi, phi.args[index]) for phi in target.phis if phi.args[index] is not phi]
+            if len(moves) > 1 and any(arg in target.phis for _, arg in moves):
+                # phi одного блоку читають старі значення одна одної: спершу всі в тимчасові регістри
+                for position, (_, arg) in enumerate(moves): self.emit(MOV, self._temp(position), self.reg(arg))
+                for position, (phi, _) in enumerate(moves): self.emit(MOV, self.reg(phi), self._temp(position))
+            else:
+                for phi, arg in moves: self.emit(MOV, self.reg(phi), self.reg(arg))
+        if not fallthrough:
+            self.emit(JUMP, -1)
+            self.fixups.append((len(self.words) - 1, target))
+
+    def _has_moves(self, source, target):
+        index = target.preds.index(source) if target.phis else None
+        return any(phi.args[index] is not phi for phi in target.phis)
+
+    def _cbr(self, block, instr, fused, following):
+        if_true, if_false = instr.attr
+        # Умовний перехід іде на гілку, що не наступна за блоком; копіювання phi для неї -
+        # у "заглушці" після іншої гілки
+        jump_if = if_false is following and not self._has_moves(block, if_false)
+        taken, fall = (if_true, if_false) if jump_if else (if_false, if_true)
+        stub = self._has_moves(block, taken)
+        cond = instr.args[0]
+        if fused is not None:
+            op = _BRANCHES[fused.op][0 if jump_if else 1]
+            self.emit(op, self.reg(fused.args[0]), self.reg(fused.args[1]), -1)
+        else:
+            self.emit(JT if jump_if else JF, self.reg(cond), -1)
+        target_position = len(self.words) - 1
+        if stub:
+            self._edge(block, fall, fallthrough=False)
+            self.words[target_position] = self.count
+            self._edge(block, taken, fallthrough=taken is following)
+        else:
+            self.fixups.append((target_position, taken))
+            self._edge(block, fall, fallthrough=fall is following)
+
+    def _instr(self, instr):
+        op, args = instr.op, instr.args
+        reg = self.reg
+        if op in _BINARY:
+            self.emit(_BINARY[op], reg(instr), reg(args[0]), reg(args[1]))
+        elif op in _UNARY:
+            self.emit(_UNARY[op], reg(instr), reg(args[0]))
+        elif op == 'cast':
+            self.emit(MOV, reg(instr), reg(args[0]))
+        elif op == 'check':
+            self.emit(CHECK, reg(instr), reg(args[0]))
+        elif op == 'bounds':
+            self.emit(BOUNDS, reg(instr), reg(args[0]), instr.attr)
+        elif op == 'load':
+            self.emit(LOADB if instr.type == CHAR else LOADQ, reg(instr), reg(args[0]))
+        elif op == 'store':
+            self.emit(STOREB if args[0].type.pointee() == CHAR else STOREQ, reg(args[0]), reg(args[1]))
+        elif op == 'copy':
+            self.emit(COPY, reg(args[0]), reg(args[1]), self.layout(instr.attr)[0])
+        elif op == 'fieldptr':
+            offset = self.struct_layout(args[0].type.pointee().base)[2][instr.attr]
+            self.emit(ADDI, reg(instr), reg(args[0]), offset)
+        elif op in ('elemptr', 'indexptr'):
+            size = self.layout(instr.type.pointee())[0]
+            index = args[1]
+            if isinstance(index, Const):
+                self.emit(ADDI, reg(instr), reg(args[0]), index.value * size)
+            elif size == 1:
+                self.emit(ADD, reg(instr), reg(args[0]), reg(index))
+            else:
+                scaled = self._new_register()
+                self.emit(MULI, scaled, reg(index), size)
+                self.emit(ADD, reg(instr), reg(args[0]), scaled)
+        elif op == 'new':
+            self.emit(NEW, reg(instr), self.layout(instr.attr)[0])
+        elif op == 'alloc':
+            self.emit(ALLOC, reg(instr), reg(args[0]))
+        elif op == 'free':
+            self.emit(FREE, reg(args[0]))
+        elif op == 'call' and instr.attr in _BUILTINS:
+            self.emit(_BUILTINS[instr.attr], reg(instr) if instr.has_value else reg(args[0]))
+        elif op == 'call':
+            if instr.has_value:
+                result = reg(instr)
+            else:
+                if self.sink is None: self.sink = self._new_register()
+                result = self.sink
+            self.emit(CALL, result, self.function_index[instr.attr], len(args), *(reg(arg) for arg in args))
+        elif op == 'tailcall':
+            self.emit(TAILCALL, self.function_index[instr.attr], len(args), *(reg(arg) for arg in args))
+        elif op == 'ret':
+            if args:
+                self.emit(RET, reg(args[0]))
+            else:
+                self.emit(RETV)
+        else:
+            raise NotImplementedError(f"Bytecode emission of IR instruction '{op}'")
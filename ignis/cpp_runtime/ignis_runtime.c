@@ -0,0 +1,149 @@
+/*
+ * Рантайм цілі c: те саме, що ignis_runtime.cpp, але на C11 (для gcc/cc без C++).
+ * Журнал "Вахтера" зберігається у двійкових деревах tsearch (POSIX, search.h) замість std::map;
+ * з IGNIS_WARDEN_OFF (--warden-checks=off) він не ведеться.
+ */
+#define _XOPEN_SOURCE 700
+#include "ignis_runtime.h"
+#include <inttypes.h>
+#include <search.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+/*
+ * Ділянка пам'яті в журналі. Ділянки одного дерева не перетинаються (живі об'єкти не
+ * перетинаються, а звільнена ділянка забувається, щойно її пам'ять знову видано), тож
+ * порівняння "перетинаються - отже рівні" задає в дереві звичайний порядок. Так tfind
+ * знаходить і ділянку з даною адресою всередині, і будь-яку ділянку, що перетинає нову.
+ */
+typedef struct {
+    uintptr_t start;
+    size_t size;
+} WardenRegion;
+
+/*
+ * live  - живі об'єкти,
+ * freed - звільнені ділянки, доступ до яких через старі ключі є помилкою.
+ */
+static void* warden_live = NULL;
+static void* warden_freed = NULL;
+static size_t warden_freed_count = 0;
+
+static uintptr_t region_end(const WardenRegion* region) {
+    return region->start + (region->size ? region->size : 1);
+}
+
+static int region_compare(const void* a, const void* b) {
+    const WardenRegion* left = (const WardenRegion*)a;
+    const WardenRegion* right = (const WardenRegion*)b;
+    if (region_end(left) <= right->start) return -1;
+    if (left->start >= region_end(right)) return 1;
+    return 0;
+}
+
+static void warden_fail(const char* message, const void* ptr) {
+    fflush(stdout);
+    fprintf(stderr, "Runtime error: %s (%p)\n", message, ptr);
+    exit(1);
+}
+
+// Повертає ділянку з дерева, що перетинає key, або NULL.
+static WardenRegion* warden_find(void* const* tree, const WardenRegion* key) {
+    void* node = tfind(key, tree, region_compare);
+    return node ? *(WardenRegion**)node : NULL;
+}
+
+/**
+ * Реалізація функції для виведення цілого числа.
+ * @param value Число, яке потрібно вивести.
+ */
+void print_int(int64_t value) {
+    printf("%" PRId64, value);
+}
+
+/**
+ * Реалізація функції для виведення символу.
+ * @param value Символ, який потрібно вивести.
+ */
+void ignis_putchar(char value) {
+    putchar((unsigned char)value);
+}
+
+/**
+ * Реалізація функції для читання символу.
+ * @return Прочитаний символ.
+ */
+char ignis_getchar(void) {
+    return (char)getchar();
+}
+
+/**
+ * Виділяє пам'ять заданого розміру.
+ * @param size Розмір в байтах.
+ * @return Вказівник на виділену пам'ять.
+ */
+void* ignis_alloc(size_t size) {
+    void* ptr = malloc(size ? size : 1);
+#ifdef IGNIS_WARDEN_OFF
+    if (ptr == NULL) warden_fail("Out of memory", NULL);
+#else
+    WardenRegion* region = (WardenRegion*)malloc(sizeof(WardenRegion));
+    if (ptr == NULL || region == NULL) warden_fail("Out of memory", NULL);
+    region->start = (uintptr_t)ptr;
+    region->size = size;
+    // Пам'ять перевикористано: старі записи про звільнені ділянки в ній більше не дійсні.
+    WardenRegion* stale;
+    while (warden_freed_count && (stale = warden_find(&warden_freed, region)) != NULL) {
+        tdelete(stale, &warden_freed, region_compare);
+        warden_freed_count--;
+        free(stale);
+    }
+    if (tsearch(region, &warden_live, region_compare) == NULL) warden_fail("Out of memory", ptr);
+#endif
+    return ptr;
+}
+
+/**
+ * Звільняє раніше виділену пам'ять.
+ * @param ptr Вказівник на пам'ять, яку потрібно звільнити.
+ */
+void ignis_free(void* ptr) {
+    // free(null) нічого не робить, як і free(NULL) у C
+    if (ptr == NULL) return;
+#ifndef IGNIS_WARDEN_OFF
+    WardenRegion key = {(uintptr_t)ptr, 0};
+    WardenRegion* region = warden_find(&warden_live, &key);
+    if (region == NULL || region->start != key.start) warden_fail("Attempt to free an invalid reference", ptr);
+    tdelete(region, &warden_live, region_compare);
+    if (tsearch(region, &warden_freed, region_compare) == NULL) warden_fail("Out of memory", ptr);
+    warden_freed_count++;
+#endif
+    free(ptr);
+}
+
+/**
+ * Перевірка ключа "Вахтером".
+ * Якщо вказівник веде у звільнений об'єкт, програма завершується з контрольованою помилкою
+ * замість невизначеної поведінки.
+ * @param ptr Адреса, до якої виконується доступ.
+ */
+void ignis_warden_check(const void* ptr) {
+#ifdef IGNIS_WARDEN_OFF
+    (void)ptr;
+#else
+    if (!warden_freed_count) return;
+    WardenRegion key = {(uintptr_t)ptr, 0};
+    if (warden_find(&warden_freed, &key) != NULL) warden_fail("Attempt to access by invalid reference", ptr);
+#endif
+}
+
+/**
+ * Вихід індексу за межі масиву (див. ignis_index у ignis_runtime.h).
+ * @param index Індекс, яким звертались до масиву.
+ * @param length Довжина масиву.
+ */
+void ignis_bounds_fail(int64_t index, int64_t length) {
+    fflush(stdout);
+    fprintf(stderr, "Runtime error: Array index out of bounds (index %" PRId64 ", length %" PRId64 ")\n", index, length);
+    exit(1);
+}
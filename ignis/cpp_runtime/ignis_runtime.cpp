@@ -1,6 +1,40 @@
 #include "ignis_runtime.h" // Підключаємо наше "меню", щоб компілятор знав, що ми реалізуємо
 #include <iostream>      // Підключаємо стандартну бібліотеку для введення/виведення
 #include <new>
+#include <map>
+#include <cstdlib>
+#include <cstdint>
+
+/*
+ * Журнал "Вахтера" (з IGNIS_WARDEN_OFF, тобто --warden-checks=off, не ведеться).
+ * live  - живі об'єкти (адреса початку -> розмір),
+ * freed - звільнені ділянки, доступ до яких через старі ключі є помилкою.
+ * Звільнена ділянка забувається, щойно її пам'ять знову видано через ignis_alloc.
+ */
+static std::map<uintptr_t, size_t>& warden_live() {
+    static std::map<uintptr_t, size_t> live;
+    return live;
+}
+
+static std::map<uintptr_t, size_t>& warden_freed() {
+    static std::map<uintptr_t, size_t> freed;
+    return freed;
+}
+
+static void warden_fail(const char* message, const void* ptr) {
+    std::cout.flush();
+    std::cerr << "Runtime error: " << message << " (" << ptr << ")" << std::endl;
+    std::exit(1);
+}
+
+// Повертає ділянку з журналу, що містить адресу, або end().
+static std::map<uintptr_t, size_t>::iterator warden_find(std::map<uintptr_t, size_t>& log, uintptr_t addr) {
+    auto it = log.upper_bound(addr);
+    if (it == log.begin()) return log.end();
+    --it;
+    if (addr < it->first + (it->second ? it->second : 1)) return it;
+    return log.end();
+}
 
 /**
  * Реалізація функції для виведення цілого числа.
@@ -33,7 +67,17 @@ char ignis_getchar() {
  * @return Вказівник на виділену пам'ять.
  */
 void* ignis_alloc(size_t size) {
-    return ::operator new(size);
+    void* ptr = ::operator new(size);
+#ifndef IGNIS_WARDEN_OFF
+    uintptr_t start = reinterpret_cast<uintptr_t>(ptr);
+    auto& freed = warden_freed();
+    // Пам'ять перевикористано: старі записи про звільнені ділянки в ній більше не дійсні.
+    auto it = warden_find(freed, start);
+    if (it == freed.end()) it = freed.lower_bound(start);
+    while (it != freed.end() && it->first < start + (size ? size : 1)) it = freed.erase(it);
+    warden_live()[start] = size;
+#endif
+    return ptr;
 }
 
 /**
@@ -42,5 +86,43 @@ void* ignis_alloc(size_t size) {
  * @param ptr Вказівник на пам'ять, яку потрібно звільнити.
  */
 void ignis_free(void* ptr) {
+    // free(null) нічого не робить, як і delete nullptr
+    if (ptr == nullptr) return;
+#ifndef IGNIS_WARDEN_OFF
+    uintptr_t start = reinterpret_cast<uintptr_t>(ptr);
+    auto& live = warden_live();
+    auto it = live.find(start);
+    if (it == live.end()) warden_fail("Attempt to free an invalid reference", ptr);
+    warden_freed()[start] = it->second;
+    live.erase(it);
+#endif
     ::operator delete(ptr);
-}
\ No newline at end of file
+}
+
+/**
+ * Перевірка ключа "Вахтером".
+ * Якщо вказівник веде у звільнений об'єкт, програма завершується з контрольованою помилкою
+ * замість невизначеної поведінки.
+ * @param ptr Адреса, до якої виконується доступ.
+ */
+void ignis_warden_check(const void* ptr) {
+#ifdef IGNIS_WARDEN_OFF
+    (void)ptr;
+#else
+    auto& freed = warden_freed();
+    if (freed.empty()) return;
+    if (warden_find(freed, reinterpret_cast<uintptr_t>(ptr)) != freed.end())
+        warden_fail("Attempt to access by invalid reference", ptr);
+#endif
+}
+/**
+ * Вихід індексу за межі масиву (див. ignis_index у ignis_runtime.h).
+ * @param index Індекс, яким звертались до масиву.
+ * @param length Довжина масиву.
+ */
+void ignis_bounds_fail(int64_t index, int64_t length) {
+    std::cout.flush();
+    std::cerr << "Runtime error: Array index out of bounds (index " << index << ", length " << length << ")"
+              << std::endl;
+    std::exit(1);
+}
@@ -1,12 +1,21 @@
 #ifndef IGNIS_RUNTIME_H
 #define IGNIS_RUNTIME_H
 
+/*
+ * Заголовок спільний для цілей cpp (ignis_runtime.cpp) та c (ignis_runtime.c).
+ */
+#ifdef __cplusplus
 #include <cstdint> // Підключаємо, щоб мати доступ до типу int64_t
 #include <cstddef>
+#else
+#include <stdint.h>
+#include <stddef.h>
+#include <stdbool.h>
+#endif
 
 /*
  * Оголошення вбудованих функцій мови Ignis,
- * які будуть викликатися зі згенерованого C++ коду.
+ * які будуть викликатися зі згенерованого C++ або C коду.
  */
 
 // Функція для виведення 64-бітного цілого числа на екран.
@@ -16,10 +25,38 @@ void print_int(int64_t value);
 void ignis_putchar(char value);
 
 // Функція для читання одного символу з вводу.
-char ignis_getchar();
+char ignis_getchar(void);
 
 // Функції для керування пам'яттю
 void* ignis_alloc(size_t size);
 void ignis_free(void* ptr);
 
-#endif //IGNIS_RUNTIME_H
\ No newline at end of file
+// "Вахтер": перевіряє, що ключ не веде у вже звільнену пам'ять.
+void ignis_warden_check(const void* ptr);
+
+// Масиви: завершує програму з помилкою, коли індекс виходить за межі.
+void ignis_bounds_fail(int64_t index, int64_t length);
+
+// Перевірка індексу масиву; повертає той самий індекс. Одне беззнакове порівняння
+// відкидає й від'ємні індекси.
+static inline int64_t ignis_index(int64_t index, int64_t length) {
+    if ((uint64_t)index >= (uint64_t)length) ignis_bounds_fail(index, length);
+    return index;
+}
+
+#ifdef __cplusplus
+// Обгортка для розіменування через ключ: перевіряє та повертає той самий вказівник.
+template <typename T>
+inline T* ignis_check(T* ptr) {
+    ignis_warden_check(ptr);
+    return ptr;
+}
+#else
+// У C немає шаблонів: результат - void *, кодогенератор C приводить його до типу ключа.
+static inline void* ignis_check(const void* ptr) {
+    ignis_warden_check(ptr);
+    return (void*)ptr;
+}
+#endif
+
+#endif //IGNIS_RUNTIME_H
@@ -1,46 +1,115 @@
-class ErrorReporter:
-    def __init__(self, file_path, source_lines):
-        self.file_path = file_path
-        self.source_lines = source_lines
-        self.had_error = False
-        self.had_warning = False
+# Скільки помилок збирається, перш ніж компіляція зупиняється (--max-errors; 0 - без обмеження)
+DEFAULT_MAX_ERRORS = 20
+
+
+class CompilerError(Exception):
+    """
+    Розкручує стек від місця помилки до найближчої точки відновлення (інструкція, оголошення,
+    функція), звідки фаза продовжує роботу. Сама помилка вже записана в ErrorReporter.
+    """
+
+    def __init__(self, diagnostic):
+        super().__init__(diagnostic)
+        self.diagnostic = diagnostic
+
+    def __str__(self):
+        return f"Compiler error:\n{self.diagnostic.format()}"
 
-    def _report(self, level, code, message, token):
-        if level == "Error":
-            self.had_error = True
-        elif level == "Warning":
-            self.had_warning = True
 
-        line_num, col_num = (token.line, token.col) if token else (1, 1)
+class TooManyErrors(Exception):
+    """Досягнуто ліміт --max-errors: точки відновлення її не перехоплюють, компіляція зупиняється."""
 
-        header = f"{code}: {message}"
-        if token.type is not None:
-            token_text = f"{token}"
-        else:
-            token_text = "NoneToken"
-        location = f"--> {self.file_path}:{line_num}:{col_num}"
+    def __init__(self, limit):
+        super().__init__(f"Too many errors ({limit}), stopping compilation (use --max-errors to change the limit)")
+        self.limit = limit
+
+
+class Diagnostic:
+    """Одна помилка чи попередження. Текст з фрагментом коду форматується лише під час друку."""
+
+    def __init__(self, level, code, message, token, file_path, source_lines):
+        self.level = level
+        self.code = code
+        self.message = message
+        # Рядок і стовпець копіюються: токени закешованого AST можуть згодом зсунутись (watch.py)
+        self.token_text = f"{token}" if token is not None and token.type is not None else "NoneToken"
+        self.line, self.col = (token.line or 1, token.col or 1) if token is not None else (1, 1)
+        self.file_path = file_path
+        self.source_lines = source_lines
+
+    def format(self):
+        header = f"{self.code}: {self.message}"
+        location = f"--> {self.file_path}:{self.line}:{self.col}"
 
         snippet = ""
-        start_line = max(0, line_num - 3)
-        end_line = min(len(self.source_lines), line_num + 2)
+        start_line = max(0, self.line - 3)
+        end_line = min(len(self.source_lines), self.line + 2)
 
         for i in range(start_line, end_line):
             line = self.source_lines[i]
             line_number_str = f"{i + 1:4} | "
             snippet += f"{line_number_str}{line}\n"
-            if i + 1 == line_num:
-                pointer_padding = ' ' * (len(line_number_str) + col_num - 1)
+            if i + 1 == self.line:
+                pointer_padding = ' ' * (len(line_number_str) + self.col - 1)
                 snippet += f"{pointer_padding}^\n"
 
-        full_message = f"{level} {header}\n{token_text}\n{location}\n\n{snippet}"
+        return f"{self.level} {header}\n{self.token_text}\n{location}\n\n{snippet}"
+
+    def to_dict(self):
+        return {'level': self.level, 'code': self.code, 'message': self.message, 'file': str(self.file_path),
+                'line': self.line, 'col': self.col}
 
+
+class ErrorReporter:
+    def __init__(self, file_path, source_lines, max_errors=DEFAULT_MAX_ERRORS):
+        self.file_path = file_path
+        self.source_lines = source_lines
+        self.max_errors = max_errors
+        self.diagnostics = []
+        self.error_count = 0
+        self.warning_count = 0
+        self.had_error = False
+        self.had_warning = False
+        self._printed = 0
+        self._seen = set()
+
+    def _report(self, level, code, message, token):
+        diagnostic = Diagnostic(level, code, message, token, self.file_path, self.source_lines)
+        # Після відновлення та сама помилка може повторитися (напр., '}' на кінці файлу для кожного
+        # вкладеного блоку) - друга така ж не записується. Діагностика без токена не має місця
+        # (усі вони на 1:1), тож дві такі - це різні помилки, навіть з тим самим текстом
+        if token is not None:
+            key = (level, code, message, diagnostic.line, diagnostic.col)
+            if key in self._seen: return diagnostic
+            self._seen.add(key)
+        self.diagnostics.append(diagnostic)
         if level == "Error":
-            raise Exception(f'Compiler error:\n{full_message}')
-        else:
-            print(f"{full_message}\n")
+            self.had_error = True
+            self.error_count += 1
+            if self.max_errors and self.error_count >= self.max_errors: raise TooManyErrors(self.max_errors)
+        elif level == "Warning":
+            self.had_warning = True
+            self.warning_count += 1
+        return diagnostic
 
     def error(self, code, message, token):
+        """Записує помилку й переходить до найближчої точки відновлення (CompilerError)."""
+        raise CompilerError(self._report("Error", code, message, token))
+
+    def recoverable_error(self, code, message, token):
+        """Записує помилку, після якої фаза може працювати далі з того ж місця (напр., лексер)."""
         self._report("Error", code, message, token)
 
     def warning(self, code, message, token):
         self._report("Warning", code, message, token)
+
+    def flush(self):
+        """Друкує діагностику, записану після попереднього виклику."""
+        for diagnostic in self.diagnostics[self._printed:]:
+            print(f"{diagnostic.format()}\n")
+        self._printed = len(self.diagnostics)
+
+    def summary(self):
+        parts = [f"{self.error_count} error{'s' if self.error_count != 1 else ''}"]
+        if self.warning_count: parts.append(f"{self.warning_count} warning{'s' if self.warning_count != 1 else ''}")
+        return ", ".join(parts)
@@ -0,0 +1,298 @@
+"""
+Генератори (`yield`) та цикл `foreach`: опускаються у звичайний AST одразу після перевірок,
+тож кожен бекенд (asm, cpp, c, run, IR/vm) отримує лише цикли, блоки та змінні.
+
+Генератор - функція `ptr Generator`, у тілі якої є `yield`. Значення генератора може бути
+лише послідовністю `foreach`, тобто він ніколи не "втікає" з функції, що його перебирає.
+Тому замість об'єкта зі станом та функції відновлення тіло генератора вбудовується на
+місце циклу: параметри та локальні змінні стають локальними змінними (з новими іменами)
+функції, що викликає, а кожен `yield v` - блоком `{ int x = v; <тіло foreach> }`.
+Ні виділення пам'яті, ні непрямих викликів, а стан генератора - звичайні змінні в
+регістрах чи на стеку.
+
+break у тілі foreach зупиняє весь генератор: він записує 1 у прапорець, а після кожної
+інструкції генератора, що містить yield, прапорець перевіряється (break із циклів генератора,
+решта інструкцій поза циклами - під `if (not прапорець)`). continue завершує лише поточне
+значення: якщо тіло має break чи continue, воно загортається в `loop { ...; break; }`,
+де continue стає break. return у тілі foreach, як і в будь-якому циклі, виходить з функції.
+"""
+import copy
+
+from ast_nodes import *
+from lexer import TokenType, Token
+from error import CompilerError
+
+_LOOPS = (WhileStmt, LoopStmt, ForStmt, ForeachStmt)
+
+
+def _walk(node):
+    """Усі вузли піддерева (ітеративно: тіла функцій бувають глибокими)."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, AST):
+            yield node
+            stack.extend(value for value in vars(node).values() if isinstance(value, (AST, list)))
+
+
+def _bodies(statement):
+    """Блоки інструкцій, вкладені в інструкцію (блоки-вирази всередині виразів сюди не входять)."""
+    if isinstance(statement, Block): return [statement]
+    if isinstance(statement, IfExpr):
+        if isinstance(statement.else_block, IfExpr): return [statement.if_block, *_bodies(statement.else_block)]
+        return [statement.if_block] + ([statement.else_block] if statement.else_block is not None else [])
+    if isinstance(statement, _LOOPS): return [statement.body]
+    return []
+
+
+def _loop_control(block):
+    """(чи є break, чи є continue), що стосуються саме цього тіла циклу, а не вкладених циклів."""
+    has_break = has_continue = False
+    for child in block.children:
+        if isinstance(child, BreakStmt): has_break = True
+        elif isinstance(child, ContinueStmt): has_continue = True
+        elif not isinstance(child, _LOOPS):
+            for body in _bodies(child):
+                inner_break, inner_continue = _loop_control(body)
+                has_break, has_continue = has_break or inner_break, has_continue or inner_continue
+    return has_break, has_continue
+
+
+class GeneratorLowering:
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.generators = {}  # назва -> FunctionDecl
+        self.expanding = []  # генератори, що зараз вбудовуються (для виявлення рекурсії)
+        self.prefix = '_g'
+        self.count = 0
+
+    def error(self, code, message, token):
+        self.reporter.error(code, message, token)
+
+    def lower(self, tree):
+        names = {node.value for node in _walk(tree) if isinstance(node, Var)}
+        while any(name.startswith(self.prefix) for name in names): self.prefix = '_' + self.prefix
+
+        generator_decls = []
+        for decl in tree.declarations:
+            if not isinstance(decl, FunctionDecl): continue
+            yields = [node for node in _walk(decl.body) if isinstance(node, YieldStmt)]
+            if not yields: continue
+            generator_decls.append(decl)
+            try:
+                self._register(decl, yields)
+            except CompilerError:
+                pass
+        # Генератори не існують як функції: їхні тіла живуть лише всередині foreach
+        tree.declarations = [decl for decl in tree.declarations if decl not in generator_decls]
+        for decl in tree.declarations:
+            try:
+                self._expand(decl)
+            except CompilerError:
+                pass
+
+        # Генератор поза foreach означав би об'єкт, що живе довше за цикл, - такого немає
+        for node in _walk(tree):
+            try:
+                if isinstance(node, FunctionCall) and node.name_node.value in self.generators:
+                    self.error("E017", f"Generator '{node.name_node.value}' can only be iterated with 'foreach'",
+                               node.name_node.token)
+                elif isinstance(node, YieldStmt):
+                    self.error("E018", "'yield' outside of a generator function", node.token)
+            except CompilerError:
+                pass
+        return tree
+
+    def _register(self, decl, yields):
+        type_node = decl.type_node
+        if type_node is None or type_node.value != 'Generator' or type_node.pointer_level != 1:
+            self.error("E022", f"Generator '{decl.func_name}' must be declared as 'ptr Generator'", yields[0].token)
+        if decl.func_name == 'main': self.error("E022", "'main' cannot be a generator", yields[0].token)
+        for node in _walk(decl.body):
+            if isinstance(node, Return):
+                self.error("E021", f"'return' in generator '{decl.func_name}': the sequence ends with the body",
+                           yields[0].token)
+        # yield - інструкція: у блоці-виразі він мав би ще й значення
+        statements = set()
+        pending = [decl.body]
+        while pending:
+            block = pending.pop()
+            for child in block.children:
+                if isinstance(child, YieldStmt): statements.add(id(child))
+                pending.extend(_bodies(child))
+        for node in yields:
+            if id(node) not in statements: self.error("E018", "'yield' can only be used as a statement", node.token)
+        self.generators[decl.func_name] = decl
+
+    # --- Вбудовування ---
+
+    def _expand(self, node):
+        """Замінює всі foreach у піддереві на вбудовані генератори."""
+        if isinstance(node, list):
+            for item in node: self._expand(item)
+            return
+        if not isinstance(node, AST): return
+        if isinstance(node, Block):
+            children = []
+            for child in node.children:
+                if not isinstance(child, ForeachStmt):
+                    self._expand(child)
+                    children.append(child)
+                    continue
+                # foreach з помилкою просто зникає: решта функції перевіряється далі
+                try:
+                    children.append(self._foreach(child))
+                except CompilerError:
+                    pass
+            node.children = children
+            return
+        for value in vars(node).values():
+            if isinstance(value, (AST, list)): self._expand(value)
+
+    def _foreach(self, node):
+        call = node.iterable
+        token = node.var_node.token
+        if not isinstance(call, FunctionCall) or call.name_node.value not in self.generators:
+            self.error("E020", "'foreach' can only iterate over a generator call", token)
+        name = call.name_node.value
+        generator = self.generators[name]
+        if name in self.expanding: self.error("E019", f"Generator '{name}' iterates over itself", token)
+        if len(call.args) != len(generator.params):
+            self.error("E016", f"Generator '{name}' takes {len(generator.params)} arguments, got {len(call.args)}",
+                       call.name_node.token)
+
+        self.count += 1
+        tag = f"{self.prefix}{self.count}_"
+        done = Var(Token(TokenType.IDENTIFIER, f"{tag}done", token.line, token.col))
+        result = Block()
+
+        # Параметри - змінні, ініціалізовані аргументами (у порядку зліва направо, як у виклику)
+        assigned = {target.left.value for target in _walk(generator.body)
+                    if isinstance(target, Assign) and isinstance(target.left, Var)}
+        for param, arg in zip(generator.params, call.args):
+            self._expand(arg)
+            param_name = param.var_node.value
+            result.children.append(VarDecl(param.type_node, self._var(tag + param_name, token), arg,
+                                           is_mutable=param_name in assigned))
+
+        body = copy.deepcopy(generator.body)
+        self._rename(body, {param.var_node.value for param in generator.params}, tag)
+        self.expanding.append(name)
+        try:
+            self._expand(body)
+        finally:
+            self.expanding.pop()
+
+        has_break, has_continue = _loop_control(node.body)
+        if has_break:
+            result.children.append(VarDecl(Type(Token(TokenType.KW_INT, 'int')), self._var(done.value, token),
+                                           Num(Token(TokenType.INTEGER, 0)), is_mutable=True))
+        site = _Site(self, node, done if has_break else None, has_break or has_continue)
+        self._substitute(body, site, in_loop=False)
+        result.children.extend(body.children)
+        return result
+
+    def _substitute(self, block, site, in_loop):
+        """Замінює yield у блоці генератора тілом foreach. Повертає, чи був у блоці yield."""
+        children, found = [], False
+        for index, child in enumerate(block.children):
+            if isinstance(child, YieldStmt):
+                children.append(site.expand(child))
+                contains = True
+            else:
+                contains = False
+                for body in _bodies(child):
+                    contains = self._substitute(body, site, in_loop or isinstance(child, _LOOPS)) or contains
+                children.append(child)
+            found = found or contains
+            if not contains or site.done is None: continue
+            # Після break у тілі foreach решта генератора не виконується
+            if in_loop:
+                children.append(IfExpr(site.var(site.done), self._block([BreakStmt()]), None))
+            elif index + 1 < len(block.children):
+                rest = self._block(block.children[index + 1:])
+                self._substitute(rest, site, in_loop)
+                negated = UnaryOp(Token(TokenType.KW_NOT, 'not'), site.var(site.done))
+                children.append(IfExpr(negated, rest, None))
+                break
+        block.children = children
+        return found
+
+    def _rename(self, node, visible, tag):
+        """Нові імена для параметрів та локальних змінних генератора (глобальні лишаються)."""
+        if isinstance(node, list):
+            for item in node: self._rename(item, visible, tag)
+        elif isinstance(node, Block):
+            inner = set(visible)
+            for child in node.children: self._rename(child, inner, tag)
+        elif isinstance(node, ForStmt):
+            inner = set(visible)
+            for part in (node.init, node.condition, node.increment, node.body): self._rename(part, inner, tag)
+        elif isinstance(node, ForeachStmt):
+            self._rename(node.iterable, visible, tag)
+            inner = visible | {node.var_node.value}
+            node.var_node.value = tag + node.var_node.value
+            self._rename(node.body, inner, tag)
+        elif isinstance(node, (VarDecl, ConstDecl)):
+            self._rename(node.assign_node, visible, tag)
+            visible.add(node.var_node.value)
+            node.var_node.value = tag + node.var_node.value
+        elif isinstance(node, Var):
+            if node.value in visible: node.value = tag + node.value
+        elif isinstance(node, MemberAccess):
+            self._rename(node.left, visible, tag)  # node.right - назва поля
+        elif isinstance(node, FunctionCall):
+            self._rename(node.args, visible, tag)
+        elif isinstance(node, AST) and not isinstance(node, Type):
+            for value in vars(node).values():
+                if isinstance(value, (AST, list)): self._rename(value, visible, tag)
+
+    @staticmethod
+    def _var(name, token):
+        return Var(Token(TokenType.IDENTIFIER, name, token.line, token.col))
+
+    @staticmethod
+    def _block(children):
+        block = Block()
+        block.children = list(children)
+        return block
+
+
+class _Site:
+    """Тіло одного foreach, яке підставляється на місце кожного yield генератора."""
+
+    def __init__(self, lowering, node, done, wrap):
+        self.lowering = lowering
+        self.node = node
+        self.done = done  # змінна-прапорець break або None, якщо тіло не має break
+        self.wrap = wrap  # тіло має break чи continue: воно загортається в одноразовий loop
+
+    def var(self, var):
+        return GeneratorLowering._var(var.value, var.token)
+
+    def expand(self, yield_node):
+        body = copy.deepcopy(self.node.body)
+        if self.wrap: self._rewrite(body)
+        self.lowering._expand(body)
+        children = [LoopStmt(GeneratorLowering._block([*body.children, BreakStmt()]))] if self.wrap else body.children
+        binding = VarDecl(Type(Token(TokenType.KW_INT, 'int')), self.var(self.node.var_node), yield_node.value,
+                          is_mutable=False)
+        return GeneratorLowering._block([binding, *children])
+
+    def _rewrite(self, block):
+        """break тіла foreach -> прапорець + break з одноразового loop; continue -> break."""
+        children = []
+        for child in block.children:
+            if isinstance(child, BreakStmt):
+                one = Num(Token(TokenType.INTEGER, 1))
+                children.extend([Assign(self.var(self.done), Token(TokenType.ASSIGN, '='), one), child])
+                continue
+            if isinstance(child, ContinueStmt):
+                children.append(BreakStmt())
+                continue
+            if not isinstance(child, _LOOPS):
+                for body in _bodies(child): self._rewrite(body)
+            children.append(child)
+        block.children = children
@@ -0,0 +1,224 @@
+"""
+Інкрементальна перекомпіляція на рівні оголошень верхнього рівня.
+
+Для кожної функції обчислюється ключ з її власного AST та AST усього, від чого вона
+залежить (структури, константи, глобальні змінні - повністю; інші функції - лише сигнатура).
+Позиції токенів у ключ не входять, тож рядок, доданий вище у файлі, нічого не інвалідує.
+
+C++: кожна функція - окрема одиниця трансляції з власним об'єктним файлом у кеші збірки;
+після зміни перекомпілюються лише змінені функції, а далі все лінкується.
+ASM: кешуються фрагменти асемблера кожної функції; nasm і ld запускаються для всього файлу.
+"""
+import hashlib
+import json
+import os
+import subprocess
+
+from ast_nodes import *
+from lexer import Token
+from build_cache import prepare_cpp_runtime, runtime_dir as cpp_runtime_dir
+
+
+def decl_name(decl):
+    if isinstance(decl, FunctionDecl): return decl.func_name
+    if isinstance(decl, StructDef): return decl.name
+    return decl.var_node.value  # ConstDecl, глобальна VarDecl
+
+
+def _feed(value, digest):
+    if isinstance(value, AST):
+        digest.update(b'(' + type(value).__name__.encode())
+        for name, field in sorted(vars(value).items()):
+            digest.update(b' ' + name.encode() + b'=')
+            _feed(field, digest)
+        digest.update(b')')
+    elif isinstance(value, Token):
+        # Рядок і стовпець не враховуються: переміщення коду не змінює згенерований код
+        digest.update(f"T({value.type.name},{value.value!r})".encode())
+    elif isinstance(value, list):
+        digest.update(b'[')
+        for item in value: _feed(item, digest)
+        digest.update(b']')
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(*nodes):
+    digest = hashlib.sha256()
+    for node in nodes: _feed(node, digest)
+    return digest.hexdigest()
+
+
+def references(node, names=None):
+    """Усі імена, що згадуються у вузлі: виклики функцій, типи, змінні."""
+    names = set() if names is None else names
+    if isinstance(node, Type):
+        names.add(node.value)
+    elif isinstance(node, Var):
+        names.add(node.value)
+    elif isinstance(node, FunctionCall):
+        names.add(node.name_node.value)
+    if isinstance(node, AST):
+        for value in vars(node).values():
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, AST): references(item, names)
+            elif isinstance(value, AST):
+                references(value, names)
+    return names
+
+
+class DeclarationGraph:
+    def __init__(self, program):
+        self.decls = {decl_name(decl): decl for decl in program.declarations}
+        self.direct = {}
+        self.signature_deps = {}
+        for name, decl in self.decls.items():
+            if isinstance(decl, FunctionDecl):
+                # Від функції-залежності потрібна лише сигнатура
+                interface = references(decl.type_node) if decl.type_node else set()
+                for param in decl.params: references(param.type_node, interface)
+                self.signature_deps[name] = (interface & self.decls.keys()) - {name}
+            self.direct[name] = (references(decl) & self.decls.keys()) - {name}
+
+    def closure(self, name):
+        """Оголошення, потрібні одиниці трансляції функції name (транзитивно)."""
+        result, pending = set(), list(self.direct[name])
+        while pending:
+            dep = pending.pop()
+            if dep in result or dep == name: continue
+            result.add(dep)
+            decl = self.decls[dep]
+            pending.extend(self.signature_deps[dep] if isinstance(decl, FunctionDecl) else self.direct[dep])
+        return result
+
+    def key(self, name):
+        decl = self.decls[name]
+        parts = [fingerprint(decl)]
+        for dep in sorted(self.closure(name)):
+            dep_decl = self.decls[dep]
+            if isinstance(dep_decl, FunctionDecl):
+                parts.append(f"{dep}:sig:{fingerprint(dep_decl.type_node, dep_decl.params)}")
+            else:
+                parts.append(f"{dep}:{fingerprint(dep_decl)}")
+        return '\n'.join(parts)
+
+
+# Одиниця з визначеннями глобальних змінних; дефіс не дає їй збігтися з іменем функції
+GLOBALS_UNIT = 'globals-unit'
+
+
+def _unit_key(cache, graph, names, target, flags):
+    # Справжня ціль - щоб у ключ потрапила версія g++/nasm; одиницю від цілої програми відрізняє прапорець
+    return cache.make_key('\n'.join(graph.key(name) for name in names), target, {**flags, 'unit': True})
+
+
+def generate_asm_incremental(ast, reporter, cache, memory=None):
+    """
+    Повертає (повний асемблер, кількість перегенерованих функцій, кількість функцій).
+    memory - необов'язковий словник у пам'яті (ключ одиниці -> код), що перевіряється перед кешем
+    на диску; після виклику в ньому лишаються лише одиниці поточної програми (див. watch.py).
+    """
+    from codegen import CodeGenerator
+
+    graph = DeclarationGraph(ast)
+    functions = [decl for decl in ast.declarations if isinstance(decl, FunctionDecl)]
+    units, rebuilt, used = [], 0, {}
+    for func in functions:
+        key = _unit_key(cache, graph, [func.func_name], 'asm', {})
+        unit = memory.get(key) if memory is not None else None
+        if unit is None:
+            cached = cache.lookup(key) or {}
+            if 'generated' in cached:
+                with open(cached['generated'], 'r', encoding='utf-8') as f:
+                    unit = json.load(f)
+            else:
+                code, data = CodeGenerator(reporter).generate_unit(ast, func)
+                unit = {'code': code, 'data': data}
+                rebuilt += 1
+                # Функція з помилками не кешується: після виправлення вона має згенеруватися знову
+                if reporter.had_error: continue
+                cache.store_text(key, 'generated', json.dumps(unit))
+        used[key] = unit
+        units.append((unit['code'], unit['data']))
+    if memory is not None:
+        memory.clear()
+        memory.update(used)
+    return CodeGenerator(reporter).link_units(units), rebuilt, len(functions)
+
+
+def _compile_unit(unit_code, obj_path, opt_level, pch_dir, runtime_dir):
+    command = ['g++', '-std=c++17', f'-O{opt_level}', f'-I{pch_dir}', f'-I{runtime_dir}',
+               '-c', '-o', str(obj_path), '-x', 'c++', '-']
+    return subprocess.run(command, text=True, input=unit_code, capture_output=True)
+
+
+def build_cpp_incremental(ast, reporter, cache, executable_path, opt_level, units_dir, keep_files=False,
+                          capture=False, memory=None, warden_checks='elided'):
+    """
+    Компілює кожну функцію в окремий об'єктний файл (з кешу, якщо функція не змінилась)
+    і лінкує виконуваний файл. Повертає (кількість перекомпільованих функцій, кількість функцій).
+    memory - як у generate_asm_incremental, але значення - шляхи до об'єктних файлів у кеші.
+    """
+    from codegen_cpp import CodeGeneratorCpp
+    from main import run_tool
+
+    runtime_dir = cpp_runtime_dir()
+    runtime_obj_path, pch_dir = prepare_cpp_runtime(cache.root, runtime_dir, opt_level, warden_checks)
+    graph = DeclarationGraph(ast)
+    functions = [decl for decl in ast.declarations if isinstance(decl, FunctionDecl)]
+
+    # Глобальні змінні визначаються в окремій одиниці, щоб у програмі була одна їх копія
+    global_decls = [decl for decl in ast.declarations if isinstance(decl, VarDecl)]
+    units = [(func.func_name, [func]) for func in functions]
+    if global_decls: units.append((GLOBALS_UNIT, global_decls))
+
+    objects, misses, used = [], [], {}
+    for unit_name, own in units:
+        names = [decl_name(decl) for decl in own]
+        key = _unit_key(cache, graph, names, 'cpp', {'opt_level': opt_level})
+        obj_path = memory.get(key) if memory is not None else None
+        # Файл міг зникнути з кешу (витіснення LRU) - тоді звертаємось до самого кешу
+        if obj_path is None or not obj_path.exists(): obj_path = (cache.lookup(key) or {}).get('object')
+        if obj_path is not None:
+            used[key] = obj_path
+            objects.append(obj_path)
+            continue
+        dependencies = {graph.decls[dep] for name in names for dep in graph.closure(name)} - set(own)
+        if unit_name == GLOBALS_UNIT:
+            unit_code = CodeGeneratorCpp(reporter).generate_globals_unit(ast, own, dependencies)
+        else:
+            unit_code = CodeGeneratorCpp(reporter).generate_unit(ast, own[0], dependencies)
+        objects.append(None)
+        misses.append((len(objects) - 1, unit_name, key, unit_code))
+    rebuilt = sum(1 for miss in misses if miss[1] != GLOBALS_UNIT)
+    # Помилки кодогенерації вже записані в reporter; компілювати такий код немає сенсу
+    if reporter.had_error: return rebuilt, len(functions)
+
+    if misses:
+        from concurrent.futures import ThreadPoolExecutor  # ~5 мс імпорту, потрібен лише для перекомпіляції
+
+        units_dir.mkdir(parents=True, exist_ok=True)
+        # Змінені функції компілюються паралельно; вивід друкується з головного потоку
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            results = list(pool.map(lambda miss: _compile_unit(miss[3], units_dir / f"{miss[1]}.o", opt_level,
+                                                               pch_dir, runtime_dir), misses))
+        for (index, unit_name, key, unit_code), result in zip(misses, results):
+            if result.stdout or result.stderr: print(result.stdout + result.stderr, end='')
+            if result.returncode != 0: raise subprocess.CalledProcessError(result.returncode, ['g++', unit_name])
+            obj_path = units_dir / f"{unit_name}.o"
+            if keep_files: (units_dir / f"{unit_name}.cpp").write_text(unit_code)
+            cache.store(key, {'object': obj_path})
+            objects[index] = obj_path
+            if memory is not None:
+                stored = (cache.lookup(key) or {}).get('object')
+                if stored is not None: used[key] = stored
+
+    run_tool(['g++', '-o', str(executable_path), *map(str, objects), str(runtime_obj_path)], capture)
+    if not keep_files:
+        for _, unit_name, _, _ in misses: (units_dir / f"{unit_name}.o").unlink(missing_ok=True)
+        if units_dir.exists() and not any(units_dir.iterdir()): units_dir.rmdir()
+    if memory is not None:
+        memory.clear()
+        memory.update(used)
+    return rebuilt, len(functions)
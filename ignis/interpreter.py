@@ -0,0 +1,1143 @@
+"""
+`ignis run file.ign` - виконує перевірений AST прямо в процесі компілятора, без g++, nasm і ld.
+
+Перед запуском кожна функція один раз перетворюється на дерево замикань Python: типи, зсуви полів,
+слоти змінних і крок вказівникової арифметики обчислюються заздалегідь, тож під час виконання
+немає ні обходу AST, ні пошуку імен. Семантика та сама, що в цілі cpp (еталонної для прикладів):
+64-бітні цілі з переповненням, знаковий char, `print` без переведення рядка, код завершення -
+результат main.
+
+Пам'ять імітується одним bytearray з побайтовою адресацією: у ньому лежать рядкові літерали,
+об'єкти `new`/`alloc`, структури та змінні, чию адресу беруть через `addr`. Решта локальних
+змінних - звичайні значення Python у кадрі функції. "Вахтер" перевіряє ключі там само, де й
+у цілі cpp (--warden-checks), і так само зупиняє програму повідомленням `Runtime error: ...`.
+
+Виклик у хвостовій позиції (return f(...), останній вираз тіла, гілки if у ньому) не вкладає
+виклик Python, а повертає _TailCall, який виконує цикл в Interpreter.invoke - хвостова рекурсія
+будь-якої глибини працює, як і в цілях з --ir (див. ir_opt.mark_tail_calls).
+
+    python3 ignis/main.py run program.ign
+    python3 ignis/main.py run program.ign --warden-checks full < input.txt
+"""
+import argparse
+import struct
+import sys
+import threading
+from bisect import bisect_right, insort
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from ast_nodes import *
+from lexer import TokenType
+from error import ErrorReporter, CompilerError, TooManyErrors, DEFAULT_MAX_ERRORS
+from warden import WARDEN_MODES
+from ir import ir_type, INT, CHAR, VOID, STRING, VOID_PTR
+from timing import PhaseTimer, TIME_REPORT_FORMATS
+
+# Перші байти пам'яті не видаються: доступ через нульовий вказівник - помилка, а не читання даних
+NULL_GUARD = 64
+# Глибша рекурсія програми - помилка "Stack overflow" (cpp і c з типовим стеком 8 МБ падають ще раніше)
+CALL_DEPTH_LIMIT = 200_000
+# Виклик функції Ignis - це кілька вкладених замикань (виклик, тіло, інструкція, вираз...): для простої
+# функції близько 6 кадрів Python. Ліміт рекурсії Python - запас на глибину CALL_DEPTH_LIMIT
+PYTHON_FRAMES_PER_CALL = 10
+RECURSION_LIMIT = CALL_DEPTH_LIMIT * PYTHON_FRAMES_PER_CALL
+# Python до 3.11 тримає кожен кадр ще й на стеку C: стек потоку - з розрахунку на кожен кадр
+THREAD_STACK_SIZE = RECURSION_LIMIT * 256
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+_INT64, _CHAR = struct.Struct('<q'), struct.Struct('<b')
+_BYTES = [bytes((value,)) for value in range(256)]
+# Що повертає інструкція: None - виконання йде далі
+_BREAK, _CONTINUE, _RETURN = 1, 2, 3
+# Інструкції, які ніколи не дають значення, навіть останніми в блоці (як в ir.py)
+_STATEMENTS = (VarDecl, ConstDecl, Return, WhileStmt, LoopStmt, ForStmt, BreakStmt, ContinueStmt, Free)
+_BUILTINS = {'print': (INT,), 'putchar': (CHAR,), 'getchar': ()}
+_BITWISE = {TokenType.KW_BAND: lambda a, b: a & b, TokenType.KW_BOR: lambda a, b: a | b,
+            TokenType.KW_BXOR: lambda a, b: a ^ b, TokenType.KW_NBAND: lambda a, b: ~(a & b),
+            TokenType.KW_NBOR: lambda a, b: ~(a | b), TokenType.KW_NBXOR: lambda a, b: ~(a ^ b)}
+
+
+def _wrap(value):
+    return ((value - _INT64_MIN) & 0xFFFFFFFFFFFFFFFF) + _INT64_MIN
+
+
+def _to_char(value):
+    return ((value + 128) & 0xFF) - 128
+
+
+class IgnisRuntimeError(Exception):
+    """Помилка під час виконання програми; друкується так само, як warden_fail у рантаймі C++."""
+
+    def __init__(self, message, address=None):
+        super().__init__(message)
+        self.message, self.address = message, address
+
+    def __str__(self):
+        return self.message if self.address is None else f"{self.message} ({self.address:#x})"
+
+
+# Помилки, якими закінчується виконання програми (тут і у vm.py), та їхні повідомлення
+RUNTIME_ERRORS = (IgnisRuntimeError, struct.error, RecursionError, MemoryError)
+_RUNTIME_MESSAGES = {struct.error: "Invalid memory access", RecursionError: "Stack overflow",
+                     MemoryError: "Out of memory"}
+
+
+def report_runtime_error(error, stdout):
+    """Друкує `Runtime error: ...` після вже виведеного програмою і повертає код завершення 1."""
+    stdout.flush()
+    print(f"Runtime error: {_RUNTIME_MESSAGES.get(type(error), error)}", file=sys.stderr)
+    return 1
+
+
+class _Escape(Exception):
+    """return, break чи continue всередині блоку, що є виразом: летить до функції чи циклу."""
+
+    def __init__(self, signal):
+        self.signal = signal
+
+
+class _TailCall:
+    """Виклик у хвостовій позиції: його виконує invoke функції, з якої він повернувся."""
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, args):
+        self.function, self.args = function, args
+
+
+class Memory:
+    """
+    Імітована пам'ять: адреса - зсув у bytearray. Ділянки вирівняні на 8 байтів і повторно
+    видаються лише ділянці того ж розміру. Кадри функцій мають власні списки вільних ділянок:
+    "Вахтер" стежить лише за купою, як і рантайм C++ (live - живі об'єкти, freed - звільнені).
+    """
+
+    def __init__(self):
+        self.data = bytearray(NULL_GUARD)
+        self.heap_free, self.frame_free = {}, {}  # розмір -> вільні адреси
+        self.live = {}  # адреса -> розмір
+        self.freed = {}
+        self.freed_starts = []  # адреси з freed за зростанням: пошук ділянки за внутрішньою адресою
+
+    def _take(self, size, pool):
+        size = (max(size, 1) + 7) & ~7
+        free = pool.get(size)
+        if free:
+            address = free.pop()
+            self.data[address:address + size] = bytes(size)
+        else:
+            address = len(self.data)
+            self.data.extend(bytes(size))
+        return address
+
+    def static(self, content):
+        """Ділянка, що живе до кінця програми (рядкові літерали, глобальні змінні в пам'яті)."""
+        address = self._take(len(content), {})
+        self.data[address:address + len(content)] = content
+        return address
+
+    def alloc(self, size):
+        if size < 0: raise IgnisRuntimeError("Allocation of a negative size")
+        address = self._take(size, self.heap_free)
+        # Пам'ять перевикористано: запис про звільнену ділянку в ній більше не дійсний
+        if self.freed.pop(address, None) is not None: self.freed_starts.remove(address)
+        self.live[address] = size
+        return address
+
+    def free(self, address):
+        if address == 0: return  # free(null) нічого не робить, як у рантаймах cpp і c
+        size = self.live.pop(address, None)
+        if size is None: raise IgnisRuntimeError("Attempt to free an invalid reference", address)
+        self.freed[address] = size
+        insort(self.freed_starts, address)
+        self.heap_free.setdefault((max(size, 1) + 7) & ~7, []).append(address)
+
+    def check(self, address):
+        if not self.freed: return
+        index = bisect_right(self.freed_starts, address) - 1
+        if index < 0: return
+        start = self.freed_starts[index]
+        if address < start + (self.freed[start] or 1):
+            raise IgnisRuntimeError("Attempt to access by invalid reference", address)
+
+    def push_frame(self, size):
+        return self._take(size, self.frame_free)
+
+    def pop_frame(self, address, size):
+        self.frame_free.setdefault((max(size, 1) + 7) & ~7, []).append(address)
+
+    def copy(self, target, source, size):
+        for address in (target, source):
+            if address < NULL_GUARD or address + size > len(self.data):
+                raise IgnisRuntimeError("Invalid memory access", address)
+        self.data[target:target + size] = self.data[source:source + size]
+
+    def loader(self, type):
+        """Читання значення типу type за адресою."""
+        data = self.data
+        unpack = (_CHAR if type == CHAR else _INT64).unpack_from
+
+        def load(address):
+            if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+            return unpack(data, address)[0]
+        return load
+
+    def storer(self, type):
+        """Запис значення типу type за адресою."""
+        data = self.data
+        pack = (_CHAR if type == CHAR else _INT64).pack_into
+
+        def store(address, value):
+            if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+            pack(data, address, value)
+        return store
+
+
+class _Binding:
+    """
+    Де живе змінна: 'frame' - значення в кадрі функції (index - слот), 'stack' - у пам'яті
+    за адресою кадр[0] + index, 'global' - значення в Interpreter.globals, 'static' - у пам'яті
+    за адресою index.
+    """
+    __slots__ = ('kind', 'type', 'index')
+
+    def __init__(self, kind, type, index):
+        self.kind, self.type, self.index = kind, type, index
+
+
+class _Function:
+    """
+    Підготовлена функція. Кадр - список: [0] - адреса її ділянки пам'яті (stack_size байтів),
+    [1] - значення return, далі слоти параметрів і локальних змінних.
+    """
+    __slots__ = ('name', 'return_type', 'param_types', 'params', 'body', 'frame_size', 'stack_size')
+
+    def __init__(self, name, return_type, param_types):
+        self.name, self.return_type, self.param_types = name, return_type, param_types
+        self.params, self.body = [], None
+        self.frame_size, self.stack_size = 2, 0
+
+
+def _has_value(node):
+    """Чи дає вузол значення в кінці блоку: if без жодної гілки-виразу - це інструкція."""
+    if isinstance(node, IfExpr):
+        return _has_value(node.if_block) or (node.else_block is not None and _has_value(node.else_block))
+    if isinstance(node, Block): return bool(node.children) and _has_value(node.children[-1])
+    return not isinstance(node, _STATEMENTS)
+
+
+def _addressed_names(node, names):
+    """Імена змінних під `addr` (корінь `addr x`, `addr x.field`, `addr x[i]`): вони мусять жити в пам'яті."""
+    if isinstance(node, UnaryOp) and node.op.type == TokenType.KW_ADDR:
+        root = node.expr
+        while isinstance(root, (MemberAccess, IndexExpr)): root = root.left
+        if isinstance(root, Var): names.add(root.value)
+    for value in vars(node).values():
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, AST): _addressed_names(item, names)
+        elif isinstance(value, AST):
+            _addressed_names(value, names)
+    return names
+
+
+class Interpreter:
+    """
+    prepare(tree) перетворює програму на замикання й записує помилки в reporter (ті самі коди,
+    що й кодогенератори), execute() запускає main і повертає код завершення.
+    Вираз - функція від кадру, що повертає значення (для структур - їхню адресу), інструкція -
+    функція від кадру, що повертає None або _BREAK/_CONTINUE/_RETURN.
+    """
+
+    def __init__(self, reporter, stdin=None, stdout=None):
+        self.reporter = reporter
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self.memory = Memory()
+        self.struct_defs = {}
+        self.layouts = {}  # назва структури -> (розмір, вирівнювання, {поле: (зсув, тип)})
+        self.functions = {}
+        self.globals = []
+        self.global_scope = {}
+        # Глобальні ініціалізатори - інструкції в кадрі окремої псевдофункції, що виконуються перед main
+        self.startup = _Function('<globals>', VOID, [])
+        self.initializers = []
+        self.strings = {}
+        self.scope = {}
+        self.function = None
+        self.loop_depth = 0
+        self.address_taken = set()
+        self.depth = 0  # глибина викликів під час виконання (CALL_DEPTH_LIMIT)
+
+    def _get_token_from_node(self, node):
+        if hasattr(node, 'token'): return node.token
+        if hasattr(node, 'op'): return node.op
+        if hasattr(node, 'name_node'): return node.name_node.token
+        if hasattr(node, 'var_node'): return node.var_node.token
+        if isinstance(node, MemberAccess): return self._get_token_from_node(node.left)
+        return None
+
+    def error(self, code, message, node):
+        self.reporter.error(code, message, self._get_token_from_node(node) if node is not None else None)
+
+    # --- Типи та розміщення в пам'яті ---
+
+    def resolve_type(self, type_node, node):
+        type = element = ir_type(type_node)
+        while element.length is not None: element = element.element
+        if element.base not in ('int', 'char', 'void') and element.base not in self.struct_defs:
+            self.error("E006", f"Unknown type '{element.base}'", node)
+        return type
+
+    def layout(self, type):
+        """(розмір, вирівнювання) значення типу, як у C++ на x86-64."""
+        if type.is_pointer or type.base == 'int': return 8, 8
+        if type.is_array:
+            size, align = self.layout(type.element)
+            return size * type.length, align
+        if type.base in ('char', 'void'): return 1, 1
+        size, align, _ = self.struct_layout(type.base)
+        return size, align
+
+    def struct_layout(self, name):
+        if name in self.layouts: return self.layouts[name]
+        decl = self.struct_defs[name]
+        self.layouts[name] = None  # поле з типом самої структури: помилка, а не нескінченна рекурсія
+        offset, max_align, fields = 0, 1, {}
+        try:
+            for field in decl.fields:
+                type = element = self.resolve_type(field.type_node, field)
+                while element.is_array: element = element.element
+                if element.is_struct and self.layouts.get(element.base, ()) is None:
+                    self.error("E006", f"Struct '{element.base}' contains itself", field)
+                size, align = self.layout(type)
+                offset = (offset + align - 1) // align * align
+                fields[field.var_node.value] = (offset, type)
+                offset += size
+                max_align = max(max_align, align)
+        except CompilerError:
+            del self.layouts[name]
+            raise
+        self.layouts[name] = ((offset + max_align - 1) // max_align * max_align or 1, max_align, fields)
+        return self.layouts[name]
+
+    def field(self, struct_type, node):
+        if struct_type.pointer_level != 0 or struct_type.base not in self.struct_defs:
+            self.error("E006", f"Unknown struct type '{struct_type.base}'", node)
+        fields = self.struct_layout(struct_type.base)[2]
+        name = node.right.value
+        if name not in fields: self.error("E007", f"Struct '{struct_type.base}' has no field '{name}'", node)
+        return fields[name]
+
+    def coerce(self, fn, source, target):
+        """Перетворення значення для запису, виклику чи return: int -> char обрізається."""
+        if target == CHAR and source != CHAR: return lambda f: _to_char(fn(f))
+        return fn
+
+    # --- Програма ---
+
+    def prepare(self, tree):
+        for decl in tree.declarations:
+            if isinstance(decl, StructDef): self.struct_defs[decl.name] = decl
+        for decl in tree.declarations:
+            try:
+                if isinstance(decl, StructDef):
+                    self.struct_layout(decl.name)
+                elif isinstance(decl, FunctionDecl):
+                    return_type = self.resolve_type(decl.type_node, decl) if decl.type_node else INT
+                    params = [self.resolve_type(param.type_node, param) for param in decl.params]
+                    self.functions[decl.func_name] = _Function(decl.func_name, return_type, params)
+            except CompilerError:
+                pass
+        addressed = _addressed_names(tree, set())
+        self.function = self.startup
+        for decl in tree.declarations:
+            if isinstance(decl, (VarDecl, ConstDecl)):
+                try:
+                    self.prepare_global(decl, addressed)
+                except CompilerError:
+                    pass
+        for decl in tree.declarations:
+            if isinstance(decl, FunctionDecl) and decl.func_name in self.functions:
+                try:
+                    self.prepare_function(decl)
+                except CompilerError:
+                    pass
+        if 'main' not in self.functions: self.error("E015", "Undeclared function 'main'", None)
+
+    def prepare_global(self, decl, addressed):
+        self.scope = self.global_scope
+        type = self.resolve_type(decl.type_node, decl)
+        init = self.expr(decl.assign_node) if decl.assign_node is not None else None
+        name = decl.var_node.value
+        if type.is_struct or name in addressed:
+            size = self.layout(type)[0]
+            binding = _Binding('static', type, self.memory.static(bytes(size)))
+        else:
+            binding = _Binding('global', type, len(self.globals))
+            self.globals.append(0)
+        self.global_scope[name] = binding
+        if init is not None: self.initializers.append(self.store_binding(binding, init, decl))
+
+    def prepare_function(self, decl):
+        function = self.functions[decl.func_name]
+        self.function = function
+        self.scope = dict(self.global_scope)
+        self.address_taken = _addressed_names(decl.body, set())
+        # Аргументи кладуться в кадр підряд, з слоту 2, навіть для параметрів, що живуть у пам'яті
+        function.frame_size = 2 + len(decl.params)
+        for position, (param, type) in enumerate(zip(decl.params, function.param_types)):
+            function.params.append(self.declare(param.var_node.value, type, param, slot=2 + position))
+        want_value = not function.return_type.is_void
+        statements, last = self.block_parts(decl.body, want_value, tail=function.return_type)
+        if last is not None: last = last[0]
+        default = 0 if want_value else None
+
+        def body(frame):
+            for statement in statements:
+                if statement(frame) is not None: return frame[1]  # з тіла функції виходить лише return
+            return last(frame) if last is not None else default
+        function.body = body
+
+    def declare(self, name, type, node, slot=None):
+        binding = self.scope.get(name)
+        if binding is not None and binding.kind not in ('global', 'static'):
+            self.error("E008", f"Variable '{name}' is already declared in this scope.", node)
+        function = self.function
+        if type.is_struct or name in self.address_taken:
+            size, align = self.layout(type)
+            offset = (function.stack_size + align - 1) // align * align
+            function.stack_size = offset + size
+            binding = _Binding('stack', type, offset)
+        elif slot is not None:
+            binding = _Binding('frame', type, slot)
+        else:
+            binding = _Binding('frame', type, function.frame_size)
+            function.frame_size += 1
+        self.scope[name] = binding
+        return binding
+
+    def lookup(self, node):
+        binding = self.scope.get(node.value)
+        if binding is None: self.error("E004", f"Undeclared variable '{node.value}'", node)
+        return binding
+
+    def binding_address(self, binding):
+        offset = binding.index
+        if binding.kind == 'stack': return lambda f: f[0] + offset
+        return lambda f: offset
+
+    def store_binding(self, binding, value, node):
+        """Інструкція `змінна = значення` (value - (замикання, тип)); повертає None."""
+        fn, type = value
+        if binding.type.is_struct:
+            if type != binding.type: self.error("E009", "Type mismatch in struct assignment", node)
+            address, size, copy = self.binding_address(binding), self.layout(type)[0], self.memory.copy
+
+            def store_struct(f):
+                copy(address(f), fn(f), size)
+            return store_struct
+        fn = self.coerce(fn, type, binding.type)
+        index = binding.index
+        if binding.kind == 'frame':
+            def store_frame(f):
+                f[index] = fn(f)
+            return store_frame
+        if binding.kind == 'global':
+            values = self.globals
+
+            def store_global(f):
+                values[index] = fn(f)
+            return store_global
+        address, store = self.binding_address(binding), self.memory.storer(binding.type)
+
+        def store_memory(f):
+            store(address(f), fn(f))
+        return store_memory
+
+    # --- Виконання ---
+
+    def execute(self):
+        """Обчислює глобальні змінні, викликає main і повертає код завершення процесу."""
+        try:
+            frame = [None] * self.startup.frame_size
+            if self.startup.stack_size: frame[0] = self.memory.push_frame(self.startup.stack_size)
+            for initializer in self.initializers:
+                initializer(frame)
+            status = self.invoke(self.functions['main'], [])
+            return (status or 0) & 0xFF
+        except RUNTIME_ERRORS as e:
+            return report_runtime_error(e, self.stdout)
+        finally:
+            self.stdout.flush()
+
+    def invoke(self, function, args, result=None):
+        """
+        Виклик функції; result - куди скопіювати структуру, яку вона повертає. _TailCall від тіла
+        виконується тут же замість вкладеного виклику, якщо кадр не має пам'яті: інакше аргументи
+        можуть вказувати в неї (як і в ir_opt, де хвостовий виклик не робиться при addr локальних).
+        """
+        memory = self.memory
+        self.depth += 1
+        if self.depth > CALL_DEPTH_LIMIT: raise RecursionError
+        while True:
+            frame = [None, None, *args]
+            frame.extend([None] * (function.frame_size - len(frame)))
+            stack_size = function.stack_size
+            if stack_size:
+                frame[0] = base = memory.push_frame(stack_size)
+                for position, binding in enumerate(function.params):
+                    if binding.kind == 'frame': continue
+                    value = frame[2 + position]
+                    if binding.type.is_struct:
+                        memory.copy(base + binding.index, value, self.layout(binding.type)[0])
+                    else:
+                        memory.storer(binding.type)(base + binding.index, value)
+            try:
+                value = function.body(frame)
+            except _Escape:
+                value = frame[1]  # return всередині блоку-виразу
+            if value.__class__ is _TailCall:
+                if not stack_size:
+                    function, args = value.function, value.args
+                    continue
+                value = self.invoke(value.function, value.args)
+            if result is not None: memory.copy(result, value, self.layout(function.return_type)[0])
+            if stack_size: memory.pop_frame(frame[0], stack_size)
+            self.depth -= 1
+            return value
+
+    # --- Інструкції ---
+
+    def block_parts(self, node, want_value, tail=None):
+        """
+        Інструкції блоку та (замикання, тип) його значення - останнього дочірнього вузла,
+        якщо це вираз і значення потрібне. Помилка в одній інструкції не зупиняє решту.
+        tail - тип результату функції, якщо кінець блоку - її хвостова позиція.
+        """
+        saved = self.scope.copy()
+        statements, last = [], None
+        for index, child in enumerate(node.children):
+            is_last = index == len(node.children) - 1
+            try:
+                if want_value and is_last and _has_value(child):
+                    if tail is not None:
+                        last = self.tail_value(child, tail), tail
+                        continue
+                    value = self.expr(child)
+                    if value[1].is_void:
+                        statements.append(self.expression_statement(value[0]))
+                    else:
+                        last = value
+                elif is_last and tail is not None and tail.is_void:
+                    statements.append(self.tail_statement(child))
+                else:
+                    statements.append(self.statement(child))
+            except CompilerError:
+                pass
+        self.scope = saved
+        return statements, last
+
+    def block(self, node, tail=False):
+        statements = self.block_parts(node, want_value=False, tail=VOID if tail else None)[0]
+        if len(statements) == 1: return statements[0]
+
+        def run(f):
+            for statement in statements:
+                signal = statement(f)
+                if signal is not None: return signal
+        return run
+
+    def statement(self, node):
+        if isinstance(node, (VarDecl, ConstDecl)): return self.var_decl(node)
+        if isinstance(node, IfExpr): return self.if_statement(node)
+        if isinstance(node, WhileStmt): return self.while_statement(node)
+        if isinstance(node, LoopStmt): return self.loop_statement(node)
+        if isinstance(node, ForStmt): return self.for_statement(node)
+        if isinstance(node, Block): return self.block(node)
+        if isinstance(node, Return): return self.return_statement(node)
+        if isinstance(node, BreakStmt):
+            if not self.loop_depth: self.error("E013", "'break' outside of a loop", node)
+            return lambda f: _BREAK
+        if isinstance(node, ContinueStmt):
+            if not self.loop_depth: self.error("E014", "'continue' outside of a loop", node)
+            return lambda f: _CONTINUE
+        if isinstance(node, Free):
+            fn, free = self.expr(node.expr)[0], self.memory.free
+
+            def run_free(f):
+                free(fn(f))
+            return run_free
+        return self.expression_statement(self.expr(node)[0])
+
+    @staticmethod
+    def expression_statement(fn):
+        def run(f):
+            fn(f)
+        return run
+
+    def var_decl(self, node):
+        type = self.resolve_type(node.type_node, node)
+        # Ініціалізатор обчислюється до того, як ім'я з'являється в області видимості
+        init = self.expr(node.assign_node) if node.assign_node is not None else None
+        binding = self.declare(node.var_node.value, type, node)
+        if init is not None: return self.store_binding(binding, init, node)
+        if binding.kind == 'frame':
+            index = binding.index
+
+            def clear(f):
+                f[index] = 0
+            return clear
+        return lambda f: None
+
+    def if_statement(self, node, tail=False):
+        cond = self.expr(node.condition)[0]
+        then = self.block(node.if_block, tail)
+        if node.else_block is None:
+            def run_if(f):
+                if cond(f): return then(f)
+            return run_if
+        other = self.tail_statement(node.else_block) if tail else self.statement(node.else_block)
+
+        def run_if_else(f):
+            if cond(f): return then(f)
+            return other(f)
+        return run_if_else
+
+    def loop_body(self, node):
+        self.loop_depth += 1
+        try:
+            return self.block(node)
+        finally:
+            self.loop_depth -= 1
+
+    def while_statement(self, node):
+        cond, body = self.expr(node.condition)[0], self.loop_body(node.body)
+
+        def run(f):
+            while cond(f):
+                try:
+                    signal = body(f)
+                except _Escape as escape:
+                    signal = escape.signal
+                if signal is not None:
+                    if signal == _BREAK: break
+                    if signal == _RETURN: return signal
+        return run
+
+    def loop_statement(self, node):
+        body = self.loop_body(node.body)
+
+        def run(f):
+            while True:
+                try:
+                    signal = body(f)
+                except _Escape as escape:
+                    signal = escape.signal
+                if signal is not None:
+                    if signal == _BREAK: break
+                    if signal == _RETURN: return signal
+        return run
+
+    def for_statement(self, node):
+        saved = self.scope.copy()
+        init = self.statement(node.init) if node.init is not None else None
+        cond = self.expr(node.condition)[0] if node.condition is not None else (lambda f: True)
+        step = self.expr(node.increment)[0] if node.increment is not None else None
+        body = self.loop_body(node.body)
+        self.scope = saved
+
+        def run(f):
+            if init is not None: init(f)
+            while cond(f):
+                try:
+                    signal = body(f)
+                except _Escape as escape:
+                    signal = escape.signal
+                if signal is not None:
+                    if signal == _BREAK: break
+                    if signal == _RETURN: return signal
+                if step is not None: step(f)
+        return run
+
+    def return_statement(self, node):
+        return_type = self.function.return_type
+        if node.value is None or return_type.is_void:
+            fn = self.expr(node.value)[0] if node.value is not None else None
+
+            def run_void(f):
+                if fn is not None: fn(f)
+                return _RETURN
+            return run_void
+        fn = self.tail_value(node.value, return_type)
+
+        def run(f):
+            f[1] = fn(f)
+            return _RETURN
+        return run
+
+    # --- Хвостові виклики ---
+
+    def tail_callee(self, node, target):
+        """Функція, виклик якої в хвостовій позиції повертає _TailCall: та, що дає саме target (не структуру)."""
+        if not isinstance(node, FunctionCall) or node.name_node.value in _BUILTINS: return None
+        function = self.functions.get(node.name_node.value)
+        if function is None or function.return_type != target or target.is_struct: return None
+        return function
+
+    def tail_value(self, node, target):
+        """Замикання для виразу в хвостовій позиції, що вже дає значення типу target."""
+        if self.tail_callee(node, target) is not None: return self.expr_FunctionCall(node, tail=True)[0]
+        if isinstance(node, IfExpr) and node.else_block is not None:
+            cond = self.expr(node.condition)[0]
+            then = self.value_block(node.if_block, tail=target)[0]
+            if isinstance(node.else_block, IfExpr):
+                other = self.tail_value(node.else_block, target)
+            else:
+                other = self.value_block(node.else_block, tail=target)[0]
+            return lambda f: then(f) if cond(f) else other(f)
+        if isinstance(node, Block): return self.value_block(node, tail=target)[0]
+        fn, type = self.expr(node)
+        if type.is_void:
+            # void-вираз у кінці функції зі значенням: результат - 0, як коли значення немає зовсім
+            def run_void(f):
+                fn(f)
+                return 0
+            return run_void
+        return self.coerce(fn, type, target)
+
+    def tail_statement(self, node):
+        """Остання інструкція void-функції: виклик void-функції в ній стає _TailCall у кадрі[1]."""
+        if self.tail_callee(node, VOID) is not None:
+            fn = self.expr_FunctionCall(node, tail=True)[0]
+
+            def run(f):
+                f[1] = fn(f)
+                return _RETURN
+            return run
+        if isinstance(node, IfExpr): return self.if_statement(node, tail=True)
+        if isinstance(node, Block): return self.block(node, tail=True)
+        return self.statement(node)
+
+    # --- Вирази ---
+
+    def expr(self, node):
+        """(замикання, тип) виразу."""
+        method = getattr(self, 'expr_' + type(node).__name__, None)
+        if method is None: self.error("E003", f"Unsupported AST node '{type(node).__name__}'", node)
+        return method(node)
+
+    def expr_Num(self, node):
+        value = _wrap(node.value)
+        return (lambda f: value), INT
+
+    def expr_CharLiteral(self, node):
+        value = _to_char(node.value)
+        return (lambda f: value), CHAR
+
+    def expr_StringLiteral(self, node):
+        if node.value not in self.strings:
+            self.strings[node.value] = self.memory.static(node.value.encode('utf-8') + b'\0')
+        address = self.strings[node.value]
+        return (lambda f: address), STRING
+
+    def expr_Var(self, node):
+        binding = self.lookup(node)
+        index, type = binding.index, binding.type
+        if binding.kind == 'frame': return (lambda f: f[index]), type
+        if binding.kind == 'global':
+            values = self.globals
+            return (lambda f: values[index]), type
+        address = self.binding_address(binding)
+        if type.is_struct: return address, type
+        load = self.memory.loader(type)
+        if binding.kind == 'static': return (lambda f: load(index)), type
+        return (lambda f: load(f[0] + index)), type
+
+    def checked(self, fn, node):
+        """Перевірка ключа "Вахтером", якщо аналіз залишив її для цього доступу."""
+        if not getattr(node, 'warden_check', False): return fn
+        check = self.memory.check
+
+        def run(f):
+            address = fn(f)
+            check(address)
+            return address
+        return run
+
+    def address(self, node):
+        """(замикання, що дає адресу, тип значення за нею) для змінної в пам'яті, поля чи deref."""
+        if isinstance(node, Var):
+            binding = self.lookup(node)
+            if binding.kind in ('frame', 'global'):
+                self.error("E011", "'addr' can only be used on variables or struct members", node)
+            return self.binding_address(binding), binding.type
+        if isinstance(node, MemberAccess):
+            base, left_type = self.expr(node.left)
+            if left_type.is_pointer:
+                base, left_type = self.checked(base, node), left_type.pointee()
+            offset, type = self.field(left_type, node)
+            if offset == 0: return base, type
+            return (lambda f: base(f) + offset), type
+        if isinstance(node, IndexExpr): return self.element(node)
+        if isinstance(node, UnaryOp) and node.op.type == TokenType.KW_DEREF:
+            pointer, type = self.expr(node.expr)
+            if not type.is_pointer: self.error("E005", "Cannot dereference a non-pointer type", node)
+            return self.checked(pointer, node), type.pointee()
+        self.error("E011", "'addr' can only be used on variables or struct members", node)
+
+    def element(self, node):
+        """Адреса елемента масиву; індекс перевіряється, якщо аналіз меж (bounds.py) не довів, що він у межах."""
+        base, array_type = self.expr(node.left)
+        if array_type.is_pointer:
+            base, array_type = self.checked(base, node), array_type.pointee()
+        if not array_type.is_array: self.error("E024", f"Cannot index a value of type '{array_type}'", node)
+        index = self.expr(node.index)[0]
+        length, size = array_type.length, self.layout(array_type.element)[0]
+        if not getattr(node, 'bounds_check', True): return (lambda f: base(f) + index(f) * size), array_type.element
+
+        def element(f):
+            address, position = base(f), index(f)
+            if not 0 <= position < length:
+                raise IgnisRuntimeError(f"Array index out of bounds (index {position}, length {length})")
+            return address + position * size
+        return element, array_type.element
+
+    def load(self, address, type):
+        if type.is_struct: return address, type
+        load = self.memory.loader(type)
+        return (lambda f: load(address(f))), type
+
+    def expr_MemberAccess(self, node):
+        return self.load(*self.address(node))
+
+    def expr_IndexExpr(self, node):
+        return self.load(*self.address(node))
+
+    def expr_UnaryOp(self, node):
+        op = node.op.type
+        if op == TokenType.KW_ADDR:
+            address, type = self.address(node.expr)
+            return address, type.pointer_to()
+        if op == TokenType.KW_DEREF: return self.load(*self.address(node))
+        fn, type = self.expr(node.expr)
+        if op in (TokenType.PLUS, TokenType.KW_NBNOT): return fn, type
+        if op == TokenType.MINUS:
+            def neg(f):
+                value = -fn(f)
+                return value if value <= _INT64_MAX else _INT64_MIN
+            return neg, INT
+        if op == TokenType.KW_NOT: return (lambda f: 0 if fn(f) else 1), INT
+        if op == TokenType.KW_NNOT: return (lambda f: 1 if fn(f) else 0), INT
+        if op == TokenType.KW_BNOT: return (lambda f: ~fn(f)), INT
+        self.error("E003", f"Unsupported unary operator '{node.op.value}'", node)
+
+    def cpp_type(self, node):
+        """Тип, який порівнює `===`, як його обчислює бекенд C++ (вказівник перемагає, інакше лівий)."""
+        if isinstance(node, BinOp):
+            left, right = self.cpp_type(node.left), self.cpp_type(node.right)
+            return left if left.is_pointer or not right.is_pointer else right
+        if isinstance(node, UnaryOp):
+            operand = self.cpp_type(node.expr)
+            if node.op.type == TokenType.KW_ADDR: return operand.pointer_to()
+            if node.op.type == TokenType.KW_DEREF: return operand.pointee()
+            return INT
+        if isinstance(node, (Num, CharLiteral, StringLiteral, Var, MemberAccess, IndexExpr)): return self.expr(node)[1]
+        return INT
+
+    def expr_BinOp(self, node):
+        op = node.op.type
+        if op == TokenType.TYPE_EQUAL:
+            # Порівняння типів на етапі компіляції: операнди не обчислюються
+            result = int(self.cpp_type(node.left) == self.cpp_type(node.right))
+            return (lambda f: result), INT
+        a, left = self.expr(node.left)
+        b, right = self.expr(node.right)
+        if op == TokenType.KW_AND: return (lambda f: 1 if a(f) and b(f) else 0), INT
+        if op == TokenType.KW_OR: return (lambda f: 1 if a(f) or b(f) else 0), INT
+        if op == TokenType.KW_NAND: return (lambda f: 0 if a(f) and b(f) else 1), INT
+        if op == TokenType.KW_NOR: return (lambda f: 0 if a(f) or b(f) else 1), INT
+        if op == TokenType.KW_XOR: return (lambda f: int((not a(f)) != (not b(f)))), INT
+        if op == TokenType.KW_XNOR: return (lambda f: int((not a(f)) == (not b(f)))), INT
+        if op == TokenType.EQUAL: return (lambda f: 1 if a(f) == b(f) else 0), INT
+        if op == TokenType.NOT_EQUAL: return (lambda f: 1 if a(f) != b(f) else 0), INT
+        if op == TokenType.LESS: return (lambda f: 1 if a(f) < b(f) else 0), INT
+        if op == TokenType.LESS_EQUAL: return (lambda f: 1 if a(f) <= b(f) else 0), INT
+        if op == TokenType.GREATER: return (lambda f: 1 if a(f) > b(f) else 0), INT
+        if op == TokenType.GREATER_EQUAL: return (lambda f: 1 if a(f) >= b(f) else 0), INT
+        if op in _BITWISE:
+            bitwise = _BITWISE[op]
+            return (lambda f: bitwise(a(f), b(f))), INT
+        if op in (TokenType.PLUS, TokenType.MINUS) and (left.is_pointer or right.is_pointer):
+            return self.pointer_arithmetic(node, a, left, b, right)
+        if op == TokenType.PLUS:
+            def add(f):
+                value = a(f) + b(f)
+                return value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+            return add, INT
+        if op == TokenType.MINUS:
+            def sub(f):
+                value = a(f) - b(f)
+                return value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+            return sub, INT
+        if op == TokenType.MULTIPLY:
+            def mul(f):
+                value = a(f) * b(f)
+                return value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+            return mul, INT
+        if op == TokenType.DIVIDE:
+            def div(f):
+                dividend, divisor = a(f), b(f)
+                if divisor == 0: raise IgnisRuntimeError("Division by zero")
+                if dividend == _INT64_MIN and divisor == -1: raise IgnisRuntimeError("Integer overflow in division")
+                quotient = abs(dividend) // abs(divisor)
+                return quotient if (dividend < 0) == (divisor < 0) else -quotient
+            return div, INT
+        self.error("E003", f"Unsupported binary operator '{node.op.value}'", node)
+
+    def pointer_arithmetic(self, node, a, left, b, right):
+        """Як у C++: зсув вказівника на n елементів, різниця вказівників - у елементах."""
+        if left.is_pointer and right.is_pointer:
+            if node.op.type == TokenType.PLUS: self.error("E003", "Cannot add two pointers", node)
+            step = self.layout(left.pointee())[0]
+
+            def difference(f):
+                delta = a(f) - b(f)
+                return delta // step if delta >= 0 else -(-delta // step)
+            return difference, INT
+        if right.is_pointer:
+            if node.op.type == TokenType.MINUS: self.error("E003", "Cannot subtract a pointer from an integer", node)
+            a, left, b, right = b, right, a, left
+        step = self.layout(left.pointee())[0]
+        if node.op.type == TokenType.MINUS: step = -step
+        return (lambda f: a(f) + b(f) * step), left
+
+    def expr_Assign(self, node):
+        left = node.left
+        value = self.expr(node.right)
+        if isinstance(left, Var):
+            binding = self.lookup(left)
+            if binding.kind in ('frame', 'global'):
+                store, index = self.store_binding(binding, value, node), binding.index
+                if binding.kind == 'frame': return self.assigned(store, lambda f: f[index]), binding.type
+                values = self.globals
+                return self.assigned(store, lambda f: values[index]), binding.type
+            return self.store_at(self.binding_address(binding), binding.type, value, node)
+        if isinstance(left, (MemberAccess, IndexExpr)) or \
+                (isinstance(left, UnaryOp) and left.op.type == TokenType.KW_DEREF):
+            return self.store_at(*self.address(left), value, node)
+        self.error("E010", "Invalid left-hand side in assignment", node)
+
+    @staticmethod
+    def assigned(store, read):
+        """Присвоєння як вираз: записує значення й повертає записане."""
+        def run(f):
+            store(f)
+            return read(f)
+        return run
+
+    def store_at(self, address, target, value, node):
+        fn, type = value
+        if target.is_struct:
+            if type != target: self.error("E009", "Type mismatch in struct assignment", node)
+            size, copy = self.layout(target)[0], self.memory.copy
+
+            def assign_struct(f):
+                destination = address(f)
+                copy(destination, fn(f), size)
+                return destination
+            return assign_struct, target
+        fn, store = self.coerce(fn, type, target), self.memory.storer(target)
+
+        def assign(f):
+            destination, result = address(f), fn(f)
+            store(destination, result)
+            return result
+        return assign, target
+
+    def expr_IfExpr(self, node):
+        cond = self.expr(node.condition)[0]
+        then, then_type = self.value_block(node.if_block)
+        if node.else_block is None: return (lambda f: then(f) if cond(f) else None), then_type
+        if isinstance(node.else_block, IfExpr):
+            other, other_type = self.expr_IfExpr(node.else_block)
+        else:
+            other, other_type = self.value_block(node.else_block)
+        types = {then_type, other_type} - {VOID}
+        type = INT if types == {INT, CHAR} else (then_type if not then_type.is_void else other_type)
+        return (lambda f: then(f) if cond(f) else other(f)), type
+
+    def value_block(self, node, tail=None):
+        """
+        Блок як вираз: return/break/continue всередині вилітають з нього як _Escape.
+        tail - тип результату функції, якщо блок у її хвостовій позиції.
+        """
+        statements, last = self.block_parts(node, want_value=True, tail=tail)
+        if tail is not None:
+            fn, type = last if last is not None else ((lambda f: 0), tail)
+        else:
+            fn, type = last if last is not None else (None, VOID)
+
+        def run(f):
+            for statement in statements:
+                signal = statement(f)
+                if signal is not None: raise _Escape(signal)
+            return fn(f) if fn is not None else None
+        return run, type
+
+    def expr_Block(self, node):
+        return self.value_block(node)
+
+    def expr_New(self, node):
+        type = self.resolve_type(node.type_node, node)
+        size, alloc = self.layout(type)[0], self.memory.alloc
+        return (lambda f: alloc(size)), type.pointer_to()
+
+    def expr_Alloc(self, node):
+        size, alloc = self.expr(node.size_expr)[0], self.memory.alloc
+        return (lambda f: alloc(size(f))), VOID_PTR
+
+    def expr_FunctionCall(self, node, tail=False):
+        name = node.name_node.value
+        # Вбудовані функції мають пріоритет, як і в бекенді C++
+        function = None if name in _BUILTINS else self.functions.get(name)
+        if function is None and name not in _BUILTINS: self.error("E015", f"Undeclared function '{name}'", node)
+        param_types = function.param_types if function is not None else _BUILTINS[name]
+        if len(node.args) != len(param_types):
+            self.error("E016", f"Function '{name}' takes {len(param_types)} arguments, got {len(node.args)}", node)
+        args = []
+        for arg, param_type in zip(node.args, param_types):
+            fn, type = self.expr(arg)
+            args.append(self.coerce(fn, type, param_type))
+        if function is None: return getattr(self, 'builtin_' + name)(*args)
+
+        if tail:
+            # Викликає не замикання, а invoke функції, що зараз виконується (див. tail_value)
+            if len(args) == 1:
+                arg = args[0]
+                return (lambda f: _TailCall(function, [arg(f)])), function.return_type
+            return (lambda f: _TailCall(function, [arg(f) for arg in args])), function.return_type
+        invoke = self.invoke
+        if function.return_type.is_struct:
+            # Структура-результат копіюється в тимчасову ділянку кадру того, хто викликає
+            size, align = self.layout(function.return_type)
+            caller = self.function
+            offset = (caller.stack_size + align - 1) // align * align
+            caller.stack_size = offset + size
+
+            def call_struct(f):
+                return invoke(function, [arg(f) for arg in args], f[0] + offset)
+            return call_struct, function.return_type
+        if not args: return (lambda f: invoke(function, [])), function.return_type
+        if len(args) == 1:
+            arg = args[0]
+            return (lambda f: invoke(function, [arg(f)])), function.return_type
+        return (lambda f: invoke(function, [arg(f) for arg in args])), function.return_type
+
+    # --- Вбудовані функції (типи параметрів - у _BUILTINS) ---
+
+    def builtin_print(self, value):
+        write = self.stdout.write
+
+        def run(f):
+            write(b'%d' % value(f))
+        return run, VOID
+
+    def builtin_putchar(self, value):
+        write = self.stdout.write
+
+        def run(f):
+            write(_BYTES[value(f) & 0xFF])
+        return run, VOID
+
+    def builtin_getchar(self):
+        stdin, stdout = self.stdin, self.stdout
+
+        def run(f):
+            stdout.flush()  # як std::cin, прив'язаний до std::cout
+            data = stdin.read(1)
+            return _to_char(data[0]) if data else -1
+        return run, CHAR
+
+
+def make_arg_parser():
+    arg_parser = argparse.ArgumentParser(prog="ignis run",
+                                         description="Run an Ignis program in-process, without g++ or nasm.")
+    arg_parser.add_argument('input_file', type=str, help="The Ignis source file or '--target vm' bytecode to run")
+    arg_parser.add_argument('--warden-checks', choices=WARDEN_MODES, default='elided',
+                            help="Runtime key checks on dereference, as for the 'cpp' target (default: 'elided')")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Do not reuse the checked AST from '.build/cache'")
+    arg_parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                            help=f"Stop after N errors (default: {DEFAULT_MAX_ERRORS}, 0 - no limit)")
+    arg_parser.add_argument('--time-report', nargs='?', const='table', choices=TIME_REPORT_FORMATS,
+                            help="Report the time of every phase, including the run itself, to stderr")
+    return arg_parser
+
+
+def run_in_thread(target):
+    """Виконує target у потоці з великим стеком: глибока рекурсія програми не валить інтерпретатор."""
+    result = []
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+    old_size = threading.stack_size(THREAD_STACK_SIZE)
+    try:
+        thread = threading.Thread(target=lambda: result.append(target()), daemon=True)
+        thread.start()
+    finally:
+        threading.stack_size(old_size)
+    thread.join()
+    return result[0] if result else 1
+
+
+def run(argv):
+    """`ignis run`: виконання вихідного файлу чи байт-коду .ignc (vm.py). Повертає код завершення."""
+    args = make_arg_parser().parse_args(argv)
+    input_path = Path(args.input_file)
+    if not input_path.exists():
+        print(f"Error: Input file not found at '{input_path}'", file=sys.stderr)
+        return 1
+    timer = PhaseTimer(enabled=bool(args.time_report))
+    from vm import is_bytecode
+    if is_bytecode(input_path):
+        # Байт-код з --target vm: фронтенд і підготовка вже пройдені під час збірки
+        from vm import run_file
+        status = run_file(input_path, timer)
+    else:
+        status = run_source(input_path, args, timer)
+    if timer.enabled:
+        timer.stop()
+        with redirect_stdout(sys.stderr):
+            if args.time_report == 'json':
+                import json
+                print(json.dumps(timer.to_dict(input_path, 'run'), indent=2))
+            else:
+                timer.print_table(input_path)
+    return status
+
+
+def run_source(input_path, args, timer):
+    """Фронтенд (з кешем перевіреного AST), підготовка та виконання вихідного файлу."""
+    from main import cached_frontend, report_failure
+    from build_cache import BuildCache
+
+    # Вивід програми - це stdout; діагностика компілятора йде в stderr
+    stdout = sys.stdout.buffer
+    with redirect_stdout(sys.stderr):
+        reporter = None
+        try:
+            with timer.phase('read'):
+                source_code = input_path.read_text(encoding='utf-8')
+            reporter = ErrorReporter(str(input_path), source_code.split('\n'), args.max_errors)
+            cache = None if args.no_cache else BuildCache(input_path.resolve().parent / '.build' / 'cache')
+            ast, _ = cached_frontend(source_code, str(input_path), reporter, args.warden_checks, cache, timer)
+            if reporter.had_error: report_failure(reporter); return 1
+            interpreter = Interpreter(reporter, stdout=stdout)
+            with timer.phase('prepare'):
+                interpreter.prepare(ast)
+            if reporter.had_error: report_failure(reporter); return 1
+            reporter.flush()
+        except (CompilerError, TooManyErrors) as e:
+            report_failure(reporter, e)
+            return 1
+
+    with timer.phase('run'):
+        return run_in_thread(interpreter.execute)
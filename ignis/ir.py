@@ -0,0 +1,1117 @@
+"""
+Mid-level intermediate representation shared by the asm and C++ backends.
+
+The checked AST is lowered once into three-address SSA form: every function is a list
+of basic blocks, every block a list of instructions ending in exactly one terminator
+(`br`, `cbr`, `ret`), and values that merge at control-flow joins go through phi nodes
+at the top of the join block. Every value carries an IRType, so the backends no longer
+re-derive types from the AST and optimization passes (ir_opt.py) are written once.
+
+SSA is built on the fly with the algorithm of Braun et al., "Simple and Efficient
+Construction of Static Single Assignment Form" (CC 2013): scalar locals live in the
+variable map of the lowering and only become phis where their definitions actually
+merge. Locals whose address is taken and all struct locals stay in memory (`alloca`)
+and are accessed with `load`/`store`. Struct values are always handled by address.
+
+Programs the IR cannot express yet (struct parameters and return values, assignments
+to globals, ...) raise IRUnsupported, and the driver falls back to the AST generators.
+The lowering does not report diagnostics: the same programs go through the AST
+generators, which keep the existing error codes and messages.
+
+    python3 ignis/main.py program.ign --ir --dump-ir -
+"""
+from ast_nodes import *
+from lexer import TokenType
+
+
+class IRUnsupported(Exception):
+    """The program uses a construct the IR cannot express yet."""
+
+
+class IRVerifyError(Exception):
+    """A pass produced malformed IR (an internal compiler error)."""
+
+
+# --- Types -------------------------------------------------------------------
+
+class IRType:
+    """
+    A scalar, struct or pointer type. Fixed-size arrays keep their element IRType in
+    `base` and the element count in `length`; like structs they are handled by address.
+    """
+    __slots__ = ('base', 'pointer_level', 'length')
+
+    def __init__(self, base, pointer_level=0, length=None):
+        self.base, self.pointer_level, self.length = base, pointer_level, length
+
+    def __eq__(self, other):
+        return isinstance(other, IRType) and self.base == other.base and \
+            self.pointer_level == other.pointer_level and self.length == other.length
+
+    def __hash__(self):
+        return hash((self.base, self.pointer_level, self.length))
+
+    @property
+    def is_pointer(self): return self.pointer_level > 0
+
+    @property
+    def is_struct(self): return self.pointer_level == 0 and self.base not in ('int', 'char', 'void')
+
+    @property
+    def is_array(self): return self.pointer_level == 0 and self.length is not None
+
+    @property
+    def is_void(self): return self.pointer_level == 0 and self.base == 'void'
+
+    @property
+    def element(self): return self.base if self.length is not None else None
+
+    def pointee(self): return IRType(self.base, self.pointer_level - 1, self.length)
+
+    def pointer_to(self): return IRType(self.base, self.pointer_level + 1, self.length)
+
+    def __str__(self):
+        if self.length is not None: return f"[{self.length} x {self.base}]" + '*' * self.pointer_level
+        return {'int': 'i64', 'char': 'i8', 'void': 'void'}.get(self.base, '%' + self.base) + '*' * self.pointer_level
+
+    __repr__ = __str__
+
+
+INT = IRType('int')
+CHAR = IRType('char')
+VOID = IRType('void')
+STRING = IRType('char', 1)
+VOID_PTR = IRType('void', 1)
+
+
+def ir_type(type_node):
+    # Functions declared without a return type (`main() { ... }`) return int
+    if type_node is None: return INT
+    if type_node.length is not None:
+        return IRType(ir_type(type_node.element), type_node.pointer_level, type_node.length)
+    return IRType(type_node.value, type_node.pointer_level)
+
+
+# --- Values ------------------------------------------------------------------
+
+class Value:
+    __slots__ = ('type',)
+
+
+class Const(Value):
+    """An integer (int, char, null pointer) or a string literal (str value, type i8*)."""
+    __slots__ = ('value',)
+
+    def __init__(self, type, value):
+        self.type, self.value = type, value
+
+    def __eq__(self, other):
+        return isinstance(other, Const) and self.type == other.type and self.value == other.value
+
+    def __hash__(self):
+        return hash((self.type, self.value))
+
+    def __str__(self):
+        if isinstance(self.value, str):
+            return 'c"' + self.value.encode('unicode_escape').decode('ascii').replace('"', '\\"') + '"'
+        return str(self.value)
+
+
+class Undef(Value):
+    """The value of a variable read before any definition reaches it."""
+    __slots__ = ()
+
+    def __init__(self, type):
+        self.type = type
+
+    def __str__(self):
+        return 'undef'
+
+
+class Param(Value):
+    __slots__ = ('name',)
+
+    def __init__(self, type, name):
+        self.type, self.name = type, name
+
+
+class Instr(Value):
+    """
+    One instruction. `args` are its Value operands; `attr` holds the non-value operand:
+    the callee name (call), field name (fieldptr), allocated type (alloca, new, copy),
+    array length (bounds) or the target blocks (br, cbr). Phi operands are parallel to `block.preds`.
+    """
+    __slots__ = ('op', 'args', 'attr', 'block', 'hint', 'token')
+
+    def __init__(self, op, args, type, attr=None, hint=None, token=None):
+        self.op, self.args, self.type, self.attr, self.hint, self.token = op, args, type, attr, hint, token
+        self.block = None
+
+    @property
+    def has_value(self):
+        return not self.type.is_void
+
+
+BINARY_OPS = ('add', 'sub', 'mul', 'div', 'and', 'or', 'xor', 'eq', 'ne', 'lt', 'le', 'gt', 'ge')
+UNARY_OPS = ('neg', 'not', 'bnot', 'bool', 'trunc')
+TERMINATORS = ('br', 'cbr', 'ret')
+# Instructions whose only effect is their result (safe to fold, drop or move)
+PURE_OPS = BINARY_OPS + UNARY_OPS + ('elemptr', 'fieldptr', 'indexptr', 'cast')
+
+
+class BasicBlock:
+    __slots__ = ('name', 'phis', 'instrs', 'preds')
+
+    def __init__(self, name):
+        self.name = name
+        self.phis = []
+        self.instrs = []
+        self.preds = []
+
+    @property
+    def terminator(self):
+        return self.instrs[-1] if self.instrs and self.instrs[-1].op in TERMINATORS else None
+
+    @property
+    def succs(self):
+        term = self.terminator
+        return term.attr if term is not None and term.op != 'ret' else ()
+
+    def __repr__(self):
+        return f"BasicBlock({self.name})"
+
+
+class Function:
+    __slots__ = ('name', 'return_type', 'params', 'blocks')
+
+    def __init__(self, name, return_type, params):
+        self.name, self.return_type, self.params = name, return_type, params
+        self.blocks = []
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def instructions(self):
+        for block in self.blocks:
+            yield from block.phis
+            yield from block.instrs
+
+
+class Module:
+    def __init__(self):
+        self.structs = {}  # name -> [(field name, IRType)], in source order
+        self.functions = []
+
+
+# --- Constant evaluation (shared by the lowering and ir_opt.py) ---------------
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _wrap(value):
+    return ((value - _INT64_MIN) & 0xFFFFFFFFFFFFFFFF) + _INT64_MIN
+
+
+def _portable(const):
+    # Chars outside ASCII are signed in the C++ runtime and unsigned in asm: leave them alone
+    return (isinstance(const, Const) and isinstance(const.value, int) and not const.type.is_pointer
+            and (const.type != CHAR or 0 <= const.value <= 127))
+
+
+def evaluate(op, args):
+    """Folds an instruction over constant operands; None if it cannot be folded for every backend."""
+    if not all(_portable(arg) for arg in args): return None
+    if len(args) == 1:
+        a = args[0].value
+        if op == 'neg': return Const(INT, _wrap(-a))
+        if op == 'not': return Const(INT, int(a == 0))
+        if op == 'bool': return Const(INT, int(a != 0))
+        if op == 'bnot': return Const(INT, ~a)
+        if op == 'trunc' and 0 <= a <= 127: return Const(CHAR, a)
+        return None
+    a, b = args[0].value, args[1].value
+    if op == 'add': return Const(INT, _wrap(a + b))
+    if op == 'sub': return Const(INT, _wrap(a - b))
+    if op == 'mul': return Const(INT, _wrap(a * b))
+    if op == 'div':
+        if b == 0 or (a == _INT64_MIN and b == -1): return None
+        quotient = abs(a) // abs(b)
+        return Const(INT, quotient if (a < 0) == (b < 0) else -quotient)
+    if op == 'and': return Const(INT, a & b)
+    if op == 'or': return Const(INT, a | b)
+    if op == 'xor': return Const(INT, a ^ b)
+    if op == 'eq': return Const(INT, int(a == b))
+    if op == 'ne': return Const(INT, int(a != b))
+    if op == 'lt': return Const(INT, int(a < b))
+    if op == 'le': return Const(INT, int(a <= b))
+    if op == 'gt': return Const(INT, int(a > b))
+    if op == 'ge': return Const(INT, int(a >= b))
+    return None
+
+
+# --- CFG helpers --------------------------------------------------------------
+
+def add_edge(source, target):
+    target.preds.append(source)
+    for phi in target.phis: phi.args.append(Undef(phi.type))
+
+
+def remove_edge(source, target):
+    """Removes one source -> target edge together with the matching phi operands."""
+    index = target.preds.index(source)
+    del target.preds[index]
+    for phi in target.phis: del phi.args[index]
+
+
+def reverse_postorder(func):
+    """Blocks reachable from the entry, every block before its successors (back edges aside)."""
+    order, visited, stack = [], {func.entry}, [(func.entry, iter(func.entry.succs))]
+    while stack:
+        block, succs = stack[-1]
+        for succ in succs:
+            if succ not in visited:
+                visited.add(succ)
+                stack.append((succ, iter(succ.succs)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def dominators(func):
+    """block -> immediate dominator (the entry maps to itself); Cooper, Harvey and Kennedy."""
+    order = reverse_postorder(func)
+    index = {block: i for i, block in enumerate(order)}
+    idom = {func.entry: func.entry}
+
+    def intersect(a, b):
+        while a is not b:
+            while index[a] > index[b]: a = idom[a]
+            while index[b] > index[a]: b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new = None
+            for pred in block.preds:
+                if pred in idom: new = pred if new is None else intersect(pred, new)
+            if idom.get(block) is not new:
+                idom[block] = new
+                changed = True
+    return idom
+
+
+def dominates(idom, a, b):
+    while b is not a:
+        if idom[b] is b: return False
+        b = idom[b]
+    return True
+
+
+def natural_loops(func):
+    """[(header, set of blocks)] for every loop (back edges to one header merged), innermost first."""
+    idom = dominators(func)
+    bodies = {}
+    for block in func.blocks:
+        for succ in block.succs:
+            if block in idom and dominates(idom, succ, block):
+                body = bodies.setdefault(succ, {succ})
+                pending = [block]
+                while pending:
+                    current = pending.pop()
+                    if current in body: continue
+                    body.add(current)
+                    pending.extend(current.preds)
+    return sorted(bodies.items(), key=lambda item: len(item[1]))
+
+
+def replace_uses(func, mapping):
+    """Rewrites every operand through mapping (chains are followed) and drops mapped phis."""
+    if not mapping: return
+
+    def resolve(value):
+        while value in mapping: value = mapping[value]
+        return value
+
+    for block in func.blocks:
+        block.phis = [phi for phi in block.phis if phi not in mapping]
+        for instr in block.phis:
+            instr.args = [resolve(arg) for arg in instr.args]
+        for instr in block.instrs:
+            if instr.args: instr.args = [resolve(arg) for arg in instr.args]
+
+
+def simplify_phis(func):
+    """Replaces phis whose operands are all the same value (or the phi itself) by that value."""
+    mapping = {}
+
+    def resolve(value):
+        while value in mapping: value = mapping[value]
+        return value
+
+    changed = True
+    while changed:
+        changed = False
+        for block in func.blocks:
+            for phi in block.phis:
+                if phi in mapping: continue
+                same, trivial = None, True
+                for arg in phi.args:
+                    arg = resolve(arg)
+                    if arg is phi or (same is not None and (arg is same or arg == same)): continue
+                    if same is not None:
+                        trivial = False
+                        break
+                    same = arg
+                if trivial:
+                    mapping[phi] = same if same is not None else Undef(phi.type)
+                    changed = True
+    replace_uses(func, mapping)
+    return len(mapping)
+
+
+# --- Lowering ---------------------------------------------------------------
+
+BUILTINS = {'print': (VOID, [INT]), 'putchar': (VOID, [CHAR]), 'getchar': (CHAR, [])}
+
+_BINARY = {
+    TokenType.PLUS: 'add', TokenType.MINUS: 'sub', TokenType.MULTIPLY: 'mul', TokenType.DIVIDE: 'div',
+    TokenType.KW_BAND: 'and', TokenType.KW_BOR: 'or', TokenType.KW_BXOR: 'xor',
+    TokenType.KW_NBAND: 'and', TokenType.KW_NBOR: 'or', TokenType.KW_NBXOR: 'xor',
+    TokenType.EQUAL: 'eq', TokenType.NOT_EQUAL: 'ne', TokenType.LESS: 'lt', TokenType.LESS_EQUAL: 'le',
+    TokenType.GREATER: 'gt', TokenType.GREATER_EQUAL: 'ge',
+}
+_INVERTED_BITWISE = (TokenType.KW_NBAND, TokenType.KW_NBOR, TokenType.KW_NBXOR)
+_COMPARISONS = ('eq', 'ne', 'lt', 'le', 'gt', 'ge')
+_UNARY = {TokenType.MINUS: 'neg', TokenType.KW_NOT: 'not', TokenType.KW_BNOT: 'bnot', TokenType.KW_NNOT: 'bool'}
+# Statements that never produce a value, even as the last child of a block
+_STATEMENTS = (VarDecl, ConstDecl, Return, WhileStmt, LoopStmt, ForStmt, BreakStmt, ContinueStmt, Free)
+
+
+class _Variable:
+    __slots__ = ('name', 'type', 'slot')
+
+    def __init__(self, name, type, slot=None):
+        self.name, self.type, self.slot = name, type, slot
+
+
+def _address_taken(node, names):
+    """Names of variables used under `addr` (the root of `addr x`, `addr x.field`, `addr x[i]`)."""
+    if isinstance(node, UnaryOp) and node.op.type == TokenType.KW_ADDR:
+        root = node.expr
+        while isinstance(root, (MemberAccess, IndexExpr)): root = root.left
+        if isinstance(root, Var): names.add(root.value)
+    for value in vars(node).values():
+        if isinstance(value, list):
+            for item in value:
+                if isinstance(item, AST): _address_taken(item, names)
+        elif isinstance(value, AST):
+            _address_taken(value, names)
+    return names
+
+
+class Lowering:
+    """Lowers a checked Program into a Module. Raises IRUnsupported for what the IR cannot express."""
+
+    def __init__(self):
+        self.module = Module()
+        self.signatures = dict(BUILTINS)
+        self.globals = {}  # name -> Const (constants and immutable globals)
+
+    def lower(self, tree):
+        for decl in tree.declarations:
+            if isinstance(decl, StructDef):
+                self.module.structs[decl.name] = [(field.var_node.value, ir_type(field.type_node))
+                                                  for field in decl.fields]
+        for decl in tree.declarations:
+            if isinstance(decl, FunctionDecl):
+                params = [ir_type(param.type_node) for param in decl.params]
+                return_type = ir_type(decl.type_node)
+                if return_type.is_struct or any(param.is_struct for param in params):
+                    raise IRUnsupported(f"'{decl.func_name}' passes a struct by value")
+                self.signatures[decl.func_name] = (return_type, params)
+            elif isinstance(decl, (ConstDecl, VarDecl)):
+                name = decl.var_node.value
+                value = self._constant(decl.assign_node) if decl.assign_node is not None else None
+                if value is None: raise IRUnsupported(f"global '{name}' is not a compile-time constant")
+                declared = ir_type(decl.type_node)
+                if declared == CHAR and value.type == INT:
+                    value = evaluate('trunc', [value])
+                    if value is None: raise IRUnsupported(f"constant '{name}' does not fit into a char")
+                elif value.type != declared and not isinstance(value.value, str):
+                    value = Const(declared, value.value)
+                self.globals[name] = value
+        for decl in tree.declarations:
+            if isinstance(decl, FunctionDecl):
+                self.module.functions.append(FunctionLowering(self, decl).lower())
+        return self.module
+
+    def _constant(self, node):
+        if isinstance(node, Num): return Const(INT, node.value)
+        if isinstance(node, CharLiteral): return Const(CHAR, node.value)
+        if isinstance(node, StringLiteral): return Const(STRING, node.value)
+        if isinstance(node, Var): return self.globals.get(node.value)
+        if isinstance(node, UnaryOp):
+            operand = self._constant(node.expr)
+            if operand is None: return None
+            if node.op.type in (TokenType.PLUS, TokenType.KW_NBNOT): return operand
+            return evaluate(_UNARY[node.op.type], [operand]) if node.op.type in _UNARY else None
+        if isinstance(node, BinOp) and node.op.type in _BINARY:
+            left, right = self._constant(node.left), self._constant(node.right)
+            if left is None or right is None: return None
+            value = evaluate(_BINARY[node.op.type], [left, right])
+            if value is not None and node.op.type in _INVERTED_BITWISE: value = evaluate('bnot', [value])
+            return value
+        return None
+
+
+class FunctionLowering:
+    def __init__(self, program, decl):
+        self.program = program
+        self.decl = decl
+        self.structs = program.module.structs
+        params = [Param(ir_type(param.type_node), param.var_node.value) for param in decl.params]
+        self.func = Function(decl.func_name, ir_type(decl.type_node), params)
+        self.block = None
+        self.block_counter = 0
+        self.scope = dict(program.globals)  # name -> _Variable or Const
+        self.defs = {}  # _Variable -> {block: value}
+        self.sealed = set()
+        self.incomplete = {}  # block -> {_Variable: phi}
+        self.loops = []  # (continue target, break target)
+        self.allocas = 0
+        self.address_taken = _address_taken(decl.body, set())
+
+    # --- Blocks and instructions ---
+
+    def new_block(self, kind):
+        self.block_counter += 1
+        return BasicBlock(f"{kind}.{self.block_counter}")
+
+    def start(self, block):
+        self.func.blocks.append(block)
+        self.block = block
+
+    def current(self):
+        """The block being filled; code after return/break/continue goes into a block without predecessors."""
+        if self.block is None:
+            block = self.new_block('dead')
+            self.sealed.add(block)
+            self.start(block)
+        return self.block
+
+    def emit(self, op, args, type, attr=None, hint=None, token=None):
+        instr = Instr(op, args, type, attr, hint, token)
+        instr.block = self.current()
+        instr.block.instrs.append(instr)
+        return instr
+
+    def jump(self, target):
+        source = self.current()
+        self.emit('br', [], VOID, [target])
+        add_edge(source, target)
+        self.block = None
+
+    def branch(self, cond, if_true, if_false):
+        source = self.current()
+        self.emit('cbr', [cond], VOID, [if_true, if_false])
+        add_edge(source, if_true)
+        add_edge(source, if_false)
+        self.block = None
+
+    def ret(self, value=None):
+        self.emit('ret', [] if value is None else [value], VOID)
+        self.block = None
+
+    def alloca(self, type, name):
+        instr = Instr('alloca', [], type.pointer_to(), type, name)
+        instr.block = self.func.entry
+        self.func.entry.instrs.insert(self.allocas, instr)
+        self.allocas += 1
+        return instr
+
+    # --- SSA construction (Braun et al.) ---
+
+    def write(self, var, block, value):
+        self.defs.setdefault(var, {})[block] = value
+
+    def read(self, var):
+        pending = []
+        value = self._lookup(var, self.current(), pending)
+        # Operands of new phis are read iteratively: deep chains of joins must not hit the recursion limit
+        while pending:
+            phi = pending.pop()
+            phi.args = [self._lookup(var, pred, pending) for pred in phi.block.preds]
+        return value
+
+    def _lookup(self, var, block, pending):
+        defs = self.defs.setdefault(var, {})
+        chain = []
+        while True:
+            value = defs.get(block)
+            if value is not None: break
+            if block not in self.sealed:
+                value = self._phi(var, block)
+                self.incomplete.setdefault(block, {})[var] = value
+                break
+            if len(block.preds) == 1:
+                chain.append(block)
+                block = block.preds[0]
+                continue
+            if not block.preds:
+                value = Undef(var.type)
+            else:
+                value = self._phi(var, block)
+                pending.append(value)
+            break
+        defs[block] = value
+        for visited in chain: defs[visited] = value
+        return value
+
+    def _phi(self, var, block):
+        phi = Instr('phi', [], var.type, hint=var.name)
+        phi.block = block
+        block.phis.append(phi)
+        return phi
+
+    def seal(self, block):
+        pending = []
+        for var, phi in self.incomplete.pop(block, {}).items():
+            phi.args = [self._lookup(var, pred, pending) for pred in block.preds]
+            while pending:
+                inner = pending.pop()
+                inner.args = [self._lookup(var, pred, pending) for pred in inner.block.preds]
+        self.sealed.add(block)
+
+    # --- Functions ---
+
+    def lower(self):
+        decl = self.decl
+        entry = self.new_block('entry')
+        entry.name = 'entry'
+        self.start(entry)
+        self.sealed.add(entry)
+        for param_node, param in zip(decl.params, self.func.params):
+            var = self.declare(param_node.var_node.value, param.type)
+            if var.slot is not None:
+                self.emit('store', [var.slot, param], VOID)
+            else:
+                self.write(var, entry, param)
+
+        return_type = self.func.return_type
+        value = self.block_value(decl.body, want_value=not return_type.is_void)
+        if self.block is not None:
+            if return_type.is_void:
+                self.ret()
+            elif value is not None:
+                self.ret(self.coerce(value, return_type))
+            else:
+                # Falling off the end: main returns 0, anything else is undefined (as in C++)
+                self.ret(Const(INT, 0) if decl.func_name == 'main' else Undef(return_type))
+        for block in self.func.blocks:
+            if block not in self.sealed: self.seal(block)
+        simplify_phis(self.func)
+        return self.func
+
+    def declare(self, name, type):
+        if isinstance(self.scope.get(name), _Variable):
+            raise IRUnsupported(f"variable '{name}' is declared twice")
+        slot = self.alloca(type, name) if type.is_struct or name in self.address_taken else None
+        var = _Variable(name, type, slot)
+        self.scope[name] = var
+        return var
+
+    def lookup(self, node):
+        binding = self.scope.get(node.value)
+        if binding is None: raise IRUnsupported(f"undeclared variable '{node.value}'")
+        return binding
+
+    # --- Types ---
+
+    def struct_fields(self, type):
+        if type.pointer_level != 0 or type.base not in self.structs:
+            raise IRUnsupported(f"'{type}' is not a struct")
+        return dict(self.structs[type.base])
+
+    def type_of(self, node):
+        """Static type of an expression, without generating code."""
+        if isinstance(node, Num): return INT
+        if isinstance(node, CharLiteral): return CHAR
+        if isinstance(node, StringLiteral): return STRING
+        if isinstance(node, Var): return self.lookup(node).type
+        if isinstance(node, MemberAccess):
+            left = self.type_of(node.left)
+            fields = self.struct_fields(left.pointee() if left.is_pointer else left)
+            if node.right.value not in fields: raise IRUnsupported(f"no field '{node.right.value}'")
+            return fields[node.right.value]
+        if isinstance(node, IndexExpr):
+            left = self.type_of(node.left)
+            array = left.pointee() if left.is_pointer else left
+            if not array.is_array: raise IRUnsupported("indexing a non-array")
+            return array.element
+        if isinstance(node, UnaryOp):
+            operand = self.type_of(node.expr)
+            if node.op.type == TokenType.KW_ADDR: return operand.pointer_to()
+            if node.op.type == TokenType.KW_DEREF:
+                if not operand.is_pointer: raise IRUnsupported("dereference of a non-pointer")
+                return operand.pointee()
+            if node.op.type in (TokenType.PLUS, TokenType.KW_NBNOT): return operand
+            return INT
+        if isinstance(node, BinOp):
+            if node.op.type in (TokenType.PLUS, TokenType.MINUS):
+                left, right = self.type_of(node.left), self.type_of(node.right)
+                if left.is_pointer: return left
+                if right.is_pointer: return right
+            return INT
+        if isinstance(node, FunctionCall): return self.signature(node)[0]
+        if isinstance(node, New): return ir_type(node.type_node).pointer_to()
+        if isinstance(node, Alloc): return VOID_PTR
+        raise IRUnsupported(f"cannot type {type(node).__name__}")
+
+    def _cpp_type(self, node):
+        """The type `===` compares, as the C++ backend computes it (pointer wins, otherwise the left side)."""
+        if isinstance(node, BinOp):
+            left, right = self._cpp_type(node.left), self._cpp_type(node.right)
+            if left.is_pointer: return left
+            if right.is_pointer: return right
+            return left
+        if isinstance(node, UnaryOp):
+            operand = self._cpp_type(node.expr)
+            if node.op.type == TokenType.KW_ADDR: return operand.pointer_to()
+            if node.op.type == TokenType.KW_DEREF: return operand.pointee()
+            return INT
+        if isinstance(node, (Num, CharLiteral, StringLiteral, Var, MemberAccess, IndexExpr)): return self.type_of(node)
+        return INT
+
+    def signature(self, node):
+        name = node.name_node.value
+        if name not in self.program.signatures: raise IRUnsupported(f"call to unknown function '{name}'")
+        return self.program.signatures[name]
+
+    def coerce(self, value, type):
+        """Converts a value for a store, call or return of the given type."""
+        if value.type == type or type.is_void: return value
+        if type == CHAR and value.type == INT:
+            return evaluate('trunc', [value]) or self.emit('trunc', [value], CHAR)
+        if type.is_pointer:
+            if isinstance(value, Const) and value.value == 0: return Const(type, 0)
+            if value.type.is_pointer: return self.emit('cast', [value], type)
+        # int <-> char widening and everything else: both backends work with 64-bit words
+        return value
+
+    def checked(self, pointer, node):
+        """A Warden key check on the pointer if the analysis kept one for this access site."""
+        if getattr(node, 'warden_check', False): return self.emit('check', [pointer], pointer.type)
+        return pointer
+
+    # --- Statements ---
+
+    def block_value(self, node, want_value):
+        """Lowers a block; returns the value of its last child if it is an expression (else None)."""
+        saved = self.scope.copy()
+        value = None
+        children = node.children
+        for index, child in enumerate(children):
+            if want_value and index == len(children) - 1 and not isinstance(child, _STATEMENTS):
+                value = self.value(child, required=False)
+            else:
+                self.statement(child)
+        self.scope = saved
+        return value
+
+    def statement(self, node):
+        if isinstance(node, VarDecl): self.var_decl(node)
+        elif isinstance(node, Assign): self.assign(node)
+        elif isinstance(node, IfExpr): self.if_expr(node, want_value=False)
+        elif isinstance(node, WhileStmt): self.while_stmt(node)
+        elif isinstance(node, LoopStmt): self.loop_stmt(node)
+        elif isinstance(node, ForStmt): self.for_stmt(node)
+        elif isinstance(node, Block): self.block_value(node, want_value=False)
+        elif isinstance(node, Return): self.return_stmt(node)
+        elif isinstance(node, (BreakStmt, ContinueStmt)):
+            if not self.loops: raise IRUnsupported("'break' or 'continue' outside of a loop")
+            continue_target, break_target = self.loops[-1]
+            self.jump(break_target if isinstance(node, BreakStmt) else continue_target)
+        elif isinstance(node, Free):
+            self.emit('free', [self.value(node.expr)], VOID)
+        else:
+            self.value(node, required=False)
+
+    def var_decl(self, node):
+        type = ir_type(node.type_node)
+        # The initializer is evaluated before the name comes into scope
+        init = self.value(node.assign_node) if node.assign_node is not None else None
+        var = self.declare(node.var_node.value, type)
+        if type.is_struct:
+            if init is not None: self.emit('copy', [var.slot, init], VOID, type)
+        elif var.slot is not None:
+            if init is not None: self.emit('store', [var.slot, self.coerce(init, type)], VOID)
+        else:
+            self.write(var, self.current(), Undef(type) if init is None else self.coerce(init, type))
+
+    def assign(self, node):
+        left = node.left
+        if isinstance(left, Var):
+            var = self.lookup(left)
+            if not isinstance(var, _Variable): raise IRUnsupported(f"assignment to global '{left.value}'")
+            if var.slot is None:
+                value = self.coerce(self.value(node.right), var.type)
+                self.write(var, self.current(), value)
+                return value
+            address = var.slot
+        elif isinstance(left, (MemberAccess, IndexExpr)) or \
+                (isinstance(left, UnaryOp) and left.op.type == TokenType.KW_DEREF):
+            address = self.address(left)
+        else:
+            raise IRUnsupported("invalid left-hand side in assignment")
+        type = address.type.pointee()
+        value = self.value(node.right)
+        if type.is_struct:
+            if value.type != address.type: raise IRUnsupported("type mismatch in struct assignment")
+            self.emit('copy', [address, value], VOID, type)
+            return value
+        value = self.coerce(value, type)
+        self.emit('store', [address, value], VOID)
+        return value
+
+    def return_stmt(self, node):
+        value = self.value(node.value, required=not self.func.return_type.is_void)
+        if self.func.return_type.is_void:
+            self.ret()
+        else:
+            self.ret(self.coerce(value, self.func.return_type))
+
+    def condition(self, node):
+        value = self.value(node)
+        if value.type.is_struct: raise IRUnsupported("struct used as a condition")
+        return value
+
+    def if_expr(self, node, want_value):
+        cond = self.condition(node.condition)
+        then_block, merge = self.new_block('if.then'), self.new_block('if.end')
+        else_block = self.new_block('if.else') if node.else_block is not None else merge
+        self.branch(cond, then_block, else_block)
+        incoming = []  # (block, value) for the phi of an if-expression
+
+        for block, child in ((then_block, node.if_block), (else_block, node.else_block)):
+            if child is None: continue
+            self.seal(block)
+            self.start(block)
+            if isinstance(child, IfExpr):  # elif
+                value = self.if_expr(child, want_value)
+            else:
+                value = self.block_value(child, want_value)
+            if self.block is not None:
+                incoming.append((self.block, value))
+                self.jump(merge)
+
+        self.seal(merge)
+        if not merge.preds: return None  # every branch returned, broke or continued
+        self.start(merge)
+        if not want_value or len(incoming) != len(merge.preds) or any(v is None for _, v in incoming):
+            return None
+        values = dict(incoming)
+        types = {value.type for _, value in incoming}
+        type = incoming[0][1].type if len(types) == 1 else (INT if types <= {INT, CHAR} else None)
+        if type is None or type.is_struct: raise IRUnsupported("if-expression branches have different types")
+        phi = Instr('phi', [values[pred] for pred in merge.preds], type)
+        phi.block = merge
+        merge.phis.append(phi)
+        return phi
+
+    def while_stmt(self, node):
+        header, body, exit = self.new_block('while.cond'), self.new_block('while.body'), self.new_block('while.end')
+        self.jump(header)
+        self.start(header)
+        self.branch(self.condition(node.condition), body, exit)
+        self.loop_body(node.body, body, continue_target=header, break_target=exit)
+        if self.block is not None: self.jump(header)
+        self.seal(header)
+        self.finish_loop(exit)
+
+    def loop_stmt(self, node):
+        body, exit = self.new_block('loop.body'), self.new_block('loop.end')
+        self.jump(body)
+        self.loops.append((body, exit))
+        self.start(body)
+        self.block_value(node.body, want_value=False)
+        self.loops.pop()
+        if self.block is not None: self.jump(body)
+        self.seal(body)
+        self.finish_loop(exit)
+
+    def for_stmt(self, node):
+        saved = self.scope.copy()
+        if node.init is not None: self.statement(node.init)
+        header, body = self.new_block('for.cond'), self.new_block('for.body')
+        step, exit = self.new_block('for.step'), self.new_block('for.end')
+        self.jump(header)
+        self.start(header)
+        if node.condition is not None:
+            self.branch(self.condition(node.condition), body, exit)
+        else:
+            self.jump(body)
+        self.loop_body(node.body, body, continue_target=step, break_target=exit)
+        if self.block is not None: self.jump(step)
+        self.seal(step)
+        if step.preds:
+            self.start(step)
+            if node.increment is not None: self.statement(node.increment)
+            self.jump(header)
+        self.seal(header)
+        self.finish_loop(exit)
+        self.scope = saved
+
+    def loop_body(self, node, body, continue_target, break_target):
+        self.seal(body)
+        self.start(body)
+        self.loops.append((continue_target, break_target))
+        self.block_value(node, want_value=False)
+        self.loops.pop()
+
+    def finish_loop(self, exit):
+        self.seal(exit)
+        if exit.preds: self.start(exit)
+
+    # --- Expressions ---
+
+    def value(self, node, required=True):
+        value = self._value(node)
+        if value is not None and value.type.is_void: value = None  # a call of a void function
+        if value is None and required: raise IRUnsupported(f"{type(node).__name__} has no value here")
+        return value
+
+    def _value(self, node):
+        if isinstance(node, Num): return Const(INT, node.value)
+        if isinstance(node, CharLiteral): return Const(CHAR, node.value)
+        if isinstance(node, StringLiteral): return Const(STRING, node.value)
+        if isinstance(node, Var):
+            var = self.lookup(node)
+            if isinstance(var, Const): return var
+            if var.slot is None: return self.read(var)
+            if var.type.is_struct: return var.slot
+            return self.emit('load', [var.slot], var.type, hint=var.name)
+        if isinstance(node, BinOp): return self.binary(node)
+        if isinstance(node, UnaryOp): return self.unary(node)
+        if isinstance(node, MemberAccess):
+            address = self.address(node)
+            type = address.type.pointee()
+            return address if type.is_struct else self.emit('load', [address], type, hint=node.right.value)
+        if isinstance(node, IndexExpr):
+            address = self.address(node)
+            type = address.type.pointee()
+            return address if type.is_struct else self.emit('load', [address], type)
+        if isinstance(node, FunctionCall): return self.call(node)
+        if isinstance(node, Assign): return self.assign(node)
+        if isinstance(node, IfExpr): return self.if_expr(node, want_value=True)
+        if isinstance(node, Block): return self.block_value(node, want_value=True)
+        if isinstance(node, New): return self.emit('new', [], ir_type(node.type_node).pointer_to(), ir_type(node.type_node))
+        if isinstance(node, Alloc): return self.emit('alloc', [self.value(node.size_expr)], VOID_PTR)
+        if isinstance(node, _STATEMENTS):
+            self.statement(node)
+            return None
+        raise IRUnsupported(f"{type(node).__name__} is not supported by the IR")
+
+    def address(self, node):
+        """Address of an lvalue (a variable in memory, a struct field, an array element or a dereference)."""
+        if isinstance(node, Var):
+            var = self.lookup(node)
+            if not isinstance(var, _Variable) or var.slot is None:
+                raise IRUnsupported(f"'{node.value}' has no address")
+            return var.slot
+        if isinstance(node, MemberAccess):
+            left_type = self.type_of(node.left)
+            if left_type.is_pointer:
+                base = self.checked(self.value(node.left), node)
+                struct = left_type.pointee()
+            else:
+                base = self.address(node.left)
+                struct = left_type
+            fields = self.struct_fields(struct)
+            field = node.right.value
+            if field not in fields: raise IRUnsupported(f"struct '{struct.base}' has no field '{field}'")
+            return self.emit('fieldptr', [base], fields[field].pointer_to(), field, hint=field)
+        if isinstance(node, IndexExpr):
+            left_type = self.type_of(node.left)
+            if left_type.is_pointer:
+                base = self.checked(self.value(node.left), node)
+                array = left_type.pointee()
+            else:
+                base = self.address(node.left)
+                array = left_type
+            if not array.is_array: raise IRUnsupported("indexing a non-array")
+            index = self.value(node.index)
+            # The bounds analysis (bounds.py) clears the flag where the index is provably in range
+            if getattr(node, 'bounds_check', True):
+                index = self.emit('bounds', [index], index.type, array.length, token=node.token)
+            return self.emit('indexptr', [base, index], array.element.pointer_to())
+        if isinstance(node, UnaryOp) and node.op.type == TokenType.KW_DEREF:
+            pointer = self.value(node.expr)
+            if not pointer.type.is_pointer: raise IRUnsupported("dereference of a non-pointer")
+            return self.checked(pointer, node)
+        raise IRUnsupported(f"{type(node).__name__} has no address")
+
+    def unary(self, node):
+        op = node.op.type
+        if op == TokenType.KW_ADDR: return self.address(node.expr)
+        if op == TokenType.KW_DEREF:
+            pointer = self.address(node)
+            type = pointer.type.pointee()
+            if type.is_void: raise IRUnsupported("dereference of a void pointer")
+            return pointer if type.is_struct else self.emit('load', [pointer], type)
+        operand = self.value(node.expr)
+        if op in (TokenType.PLUS, TokenType.KW_NBNOT): return operand  # both backends leave the value as is
+        return self.emit(_UNARY[op], [operand], INT, token=node.op)
+
+    def binary(self, node):
+        op = node.op.type
+        if op == TokenType.TYPE_EQUAL:
+            # Compile-time type comparison: the operands are not evaluated
+            return Const(INT, int(self._cpp_type(node.left) == self._cpp_type(node.right)))
+        if op in (TokenType.KW_AND, TokenType.KW_NAND, TokenType.KW_OR, TokenType.KW_NOR):
+            return self.short_circuit(node)
+        left = self.value(node.left)
+        right = self.value(node.right)
+        if op in (TokenType.KW_XOR, TokenType.KW_XNOR):
+            left = self.emit('bool', [left], INT)
+            right = self.emit('bool', [right], INT)
+            return self.emit('ne' if op == TokenType.KW_XOR else 'eq', [left, right], INT, token=node.op)
+        if op not in _BINARY: raise IRUnsupported(f"operator '{node.op.value}'")
+        ir_op = _BINARY[op]
+        if ir_op in ('add', 'sub') and (left.type.is_pointer or right.type.is_pointer):
+            if left.type.is_pointer and right.type.is_pointer: raise IRUnsupported("pointer difference")
+            if right.type.is_pointer:
+                if ir_op == 'sub': raise IRUnsupported("integer minus pointer")
+                left, right = right, left
+            if left.type.pointee().is_void: raise IRUnsupported("arithmetic on a void pointer")
+            if ir_op == 'sub': right = self.emit('neg', [right], INT)
+            return self.emit('elemptr', [left, right], left.type)
+        if left.type.is_struct or right.type.is_struct: raise IRUnsupported("operator on a struct")
+        result = self.emit(ir_op, [left, right], INT, token=node.op)
+        return self.emit('bnot', [result], INT) if op in _INVERTED_BITWISE else result
+
+    def short_circuit(self, node):
+        """and/or (and their inversions) evaluate the right side only when it decides the result."""
+        op = node.op.type
+        is_and = op in (TokenType.KW_AND, TokenType.KW_NAND)
+        inverted = op in (TokenType.KW_NAND, TokenType.KW_NOR)
+        left = self.value(node.left)
+        rhs, merge = self.new_block('logic.rhs'), self.new_block('logic.end')
+        source = self.current()
+        if is_and:
+            self.branch(left, rhs, merge)
+        else:
+            self.branch(left, merge, rhs)
+        self.seal(rhs)
+        self.start(rhs)
+        right = self.emit('not' if inverted else 'bool', [self.value(node.right)], INT)
+        rhs_end = self.current()
+        self.jump(merge)
+        self.seal(merge)
+        self.start(merge)
+        # Short-circuited: and -> 0, or -> 1 (inverted for nand/nor)
+        short = Const(INT, int(is_and == inverted))
+        phi = Instr('phi', [short if pred is source else right for pred in merge.preds], INT)
+        phi.block = merge
+        merge.phis.append(phi)
+        return phi
+
+    def call(self, node):
+        return_type, param_types = self.signature(node)
+        if len(node.args) != len(param_types):
+            raise IRUnsupported(f"'{node.name_node.value}' called with a wrong number of arguments")
+        args = []
+        for arg, param_type in zip(node.args, param_types):
+            value = self.value(arg)
+            if value.type.is_struct: raise IRUnsupported("struct passed by value")
+            args.append(self.coerce(value, param_type))
+        return self.emit('call', args, return_type, node.name_node.value, token=node.name_node.token)
+
+
+def lower_program(tree):
+    """Checked AST -> Module (raises IRUnsupported)."""
+    return Lowering().lower(tree)
+
+
+# --- Verification -----------------------------------------------------------
+
+def verify(func):
+    """Structural checks after every pass: terminators, CFG edges, phi arity."""
+    blocks = set(func.blocks)
+    edges = {block: [] for block in func.blocks}
+    for block in func.blocks:
+        term = block.terminator
+        if term is None: raise IRVerifyError(f"{func.name}: block '{block.name}' has no terminator")
+        if any(instr.op in TERMINATORS for instr in block.instrs[:-1]):
+            raise IRVerifyError(f"{func.name}: terminator in the middle of '{block.name}'")
+        for succ in block.succs:
+            if succ not in blocks: raise IRVerifyError(f"{func.name}: '{block.name}' jumps to a removed block")
+            edges[succ].append(block)
+    for block in func.blocks:
+        if sorted(map(id, block.preds)) != sorted(map(id, edges[block])):
+            raise IRVerifyError(f"{func.name}: predecessors of '{block.name}' do not match the CFG")
+        for phi in block.phis:
+            if len(phi.args) != len(block.preds):
+                raise IRVerifyError(f"{func.name}: phi in '{block.name}' has {len(phi.args)} operands "
+                                    f"for {len(block.preds)} predecessors")
+
+
+# --- Textual dump -----------------------------------------------------------
+
+class _Names:
+    def __init__(self, func):
+        self.names = {param: f"%{param.name}" for param in func.params}
+        counter = 0
+        for instr in func.instructions():
+            if instr.has_value:
+                self.names[instr] = f"%{instr.hint}.{counter}" if instr.hint else f"%{counter}"
+                counter += 1
+
+    def __call__(self, value):
+        if isinstance(value, (Const, Undef)): return str(value)
+        return self.names[value]
+
+
+def _dump_instr(instr, name):
+    op, args = instr.op, instr.args
+    if op == 'phi':
+        pairs = ', '.join(f"[{name(arg)}, %{pred.name}]" for arg, pred in zip(args, instr.block.preds))
+        return f"{name(instr)} = phi {instr.type} {pairs}"
+    if op == 'br': return f"br %{instr.attr[0].name}"
+    if op == 'cbr': return f"cbr {name(args[0])}, %{instr.attr[0].name}, %{instr.attr[1].name}"
+    if op == 'ret': return f"ret {args[0].type} {name(args[0])}" if args else "ret void"
+    if op == 'store': return f"store {args[1].type} {name(args[1])}, {name(args[0])}"
+    if op == 'copy': return f"copy {instr.attr} {name(args[0])}, {name(args[1])}"
+    if op == 'free': return f"free {name(args[0])}"
+    if op == 'alloca': text = f"alloca {instr.attr}"
+    elif op == 'new': text = f"new {instr.attr}"
+    elif op == 'fieldptr': text = f"fieldptr {args[0].type} {name(args[0])}, {instr.attr}"
+    elif op == 'bounds': text = f"bounds {instr.type} {name(args[0])}, {instr.attr}"
+    elif op in ('call', 'tailcall'): text = f"{op} {instr.type} @{instr.attr}({', '.join(name(arg) for arg in args)})"
+    else: text = f"{op} {instr.type} {', '.join(name(arg) for arg in args)}"
+    return f"{name(instr)} = {text}" if instr.has_value else text
+
+
+def dump_function(func):
+    name = _Names(func)
+    params = ', '.join(f"{param.type} {name(param)}" for param in func.params)
+    lines = [f"func {func.return_type} @{func.name}({params}) {{"]
+    for block in func.blocks:
+        preds = f"  ; preds: {', '.join('%' + pred.name for pred in block.preds)}" if block.preds else ""
+        lines.append(f"{block.name}:{preds}")
+        for instr in block.phis + block.instrs:
+            lines.append(f"    {_dump_instr(instr, name)}")
+    lines.append("}")
+    return '\n'.join(lines)
+
+
+def dump_module(module):
+    parts = [f"struct %{struct} {{ {', '.join(f'{type} {field}' for field, type in fields)} }}"
+             for struct, fields in module.structs.items()]
+    parts.extend(dump_function(func) for func in module.functions)
+    return '\n\n'.join(parts) + '\n'
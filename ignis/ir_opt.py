@@ -0,0 +1,632 @@
+"""
+Optimization passes over the SSA IR (ir.py). Each pass works on one ir.Function in place
+and returns how many instructions or edges it changed, so --dump-ir and the
+benchmarks can show what every pass did. Both backends consume the result.
+"""
+import copy
+
+from ir import (Const, Undef, Instr, Param, BasicBlock, VOID, evaluate, remove_edge, replace_uses, simplify_phis, verify,
+                natural_loops, PURE_OPS)
+
+# Instructions that can be dropped when nothing uses their result
+_REMOVABLE = PURE_OPS + ('phi', 'load', 'alloca')
+# Operations whose operands can be swapped without changing the result
+_COMMUTATIVE = ('add', 'mul', 'and', 'or', 'xor', 'eq', 'ne')
+# Instructions that write memory other than through a known pointer
+_CLOBBERS = ('call', 'tailcall', 'free')
+# Inliner: largest callee (IR instructions, see _inline_cost) inlined at a call site outside loops
+INLINE_THRESHOLD = 25
+# Inlining stops growing a caller past this many times the threshold
+_CALLER_GROWTH_LIMIT = 40
+# Largest function (IR instructions) that mutual tail recursion is turned into a loop in
+_TAIL_CYCLE_LIMIT = 200
+
+
+def fold_constants(func):
+    """
+    Constant folding and propagation: instructions whose operands are all constants become
+    constants, and so do their users, until nothing changes. A `cbr` on a constant becomes
+    a `br`, and the untaken edge (with its phi operands) disappears; so does a `bounds`
+    check of a constant index that is in range.
+    """
+    changed = 0
+    while True:
+        mapping = {}
+        for block in func.blocks:
+            kept = []
+            for instr in block.instrs:
+                if mapping and instr.args:
+                    instr.args = [mapping.get(arg, arg) for arg in instr.args]
+                if instr.op in PURE_OPS:
+                    folded = evaluate(instr.op, instr.args)
+                    if folded is not None:
+                        mapping[instr] = folded
+                        continue
+                elif instr.op == 'bounds' and isinstance(instr.args[0], Const) and 0 <= instr.args[0].value < instr.attr:
+                    mapping[instr] = instr.args[0]
+                    continue
+                elif instr.op == 'cbr' and isinstance(instr.args[0], Const) and isinstance(instr.args[0].value, int):
+                    taken, untaken = instr.attr if instr.args[0].value else reversed(instr.attr)
+                    instr.op, instr.args, instr.attr = 'br', [], [taken]
+                    remove_edge(block, untaken)
+                    changed += 1
+                kept.append(instr)
+            block.instrs = kept
+        folded_phis = simplify_phis(func)
+        replace_uses(func, mapping)
+        if not mapping and not folded_phis: return changed
+        changed += len(mapping) + folded_phis
+
+
+def simplify_cfg(func):
+    """
+    Removes blocks unreachable from the entry (code after `return`, `break`, `continue`
+    and branches folded away) and merges a block into its only predecessor when that
+    predecessor jumps straight to it. Returns the number of instructions removed.
+    """
+    reached, pending = {func.entry}, [func.entry]
+    while pending:
+        for succ in pending.pop().succs:
+            if succ not in reached:
+                reached.add(succ)
+                pending.append(succ)
+    removed = 0
+    for block in func.blocks:
+        if block in reached: continue
+        removed += len(block.phis) + len(block.instrs)
+        for succ in block.succs:
+            if succ in reached: remove_edge(block, succ)
+    func.blocks = [block for block in func.blocks if block in reached]
+    simplify_phis(func)
+
+    merged = set()
+    for block in func.blocks:
+        if block in merged: continue
+        while True:
+            term = block.terminator
+            if term.op != 'br': break
+            target = term.attr[0]
+            if target is block or target is func.entry or len(target.preds) != 1: break
+            # A single predecessor leaves no phis behind (simplify_phis), only straight-line code
+            block.instrs.pop()
+            for instr in target.instrs: instr.block = block
+            block.instrs.extend(target.instrs)
+            for succ in target.succs:
+                succ.preds = [block if pred is target else pred for pred in succ.preds]
+            merged.add(target)
+            removed += 1
+    func.blocks = [block for block in func.blocks if block not in merged]
+    return removed
+
+
+def _write_only(slot, users):
+    """True if the memory at slot (an alloca or a field/element of it) is stored to but never read."""
+    for user in users.get(slot, ()):
+        if user.op in ('store', 'copy') and user.args[0] is slot and user.args[1] is not slot: continue
+        if user.op in ('fieldptr', 'elemptr', 'indexptr') and user.args[0] is slot and _write_only(user, users): continue
+        return False
+    return True
+
+
+def eliminate_dead_code(func):
+    """
+    Drops locals that are only ever written (their stores included) and every pure
+    instruction, load and phi whose result is not used by anything with an effect: calls,
+    stores, checks and terminators are the roots. Returns the number of instructions removed.
+    """
+    users = {}
+    for instr in func.instructions():
+        for arg in instr.args:
+            if isinstance(arg, Instr): users.setdefault(arg, []).append(instr)
+    dead_stores = set()
+    for instr in func.entry.instrs:
+        if instr.op == 'alloca' and _write_only(instr, users):
+            pending = [instr]
+            while pending:
+                for user in users.get(pending.pop(), ()):
+                    if user.op in ('store', 'copy'): dead_stores.add(user)
+                    else: pending.append(user)
+
+    live, pending = set(), []
+    for instr in func.instructions():
+        if instr.op not in _REMOVABLE and instr not in dead_stores:
+            live.add(instr)
+            pending.append(instr)
+    while pending:
+        for arg in pending.pop().args:
+            if isinstance(arg, Instr) and arg not in live:
+                live.add(arg)
+                pending.append(arg)
+    removed = 0
+    for block in func.blocks:
+        count = len(block.phis) + len(block.instrs)
+        block.phis = [phi for phi in block.phis if phi in live]
+        block.instrs = [instr for instr in block.instrs if instr in live]
+        removed += count - len(block.phis) - len(block.instrs)
+    return removed
+
+
+def remove_uncalled_functions(module):
+    """
+    Whole-program pass: keeps only the functions reachable from `main` through calls.
+    A module without `main` is left alone. Returns the number of instructions removed.
+    """
+    functions = {func.name: func for func in module.functions}
+    if 'main' not in functions: return 0
+    called, pending = {'main'}, ['main']
+    while pending:
+        for instr in functions[pending.pop()].instructions():
+            if instr.op in ('call', 'tailcall') and instr.attr in functions and instr.attr not in called:
+                called.add(instr.attr)
+                pending.append(instr.attr)
+    removed = sum(1 for func in module.functions if func.name not in called for _ in func.instructions())
+    module.functions = [func for func in module.functions if func.name in called]
+    return removed
+
+
+class _Memory:
+    """
+    Alias oracle for one function. A pointer is described by its base (the alloca or the
+    value it was derived from with fieldptr/elemptr/indexptr) and the path of fields below
+    it; an elemptr or indexptr ends the path, so everything below it may alias, and warden checks are looked
+    through. Distinct allocas never
+    alias, an alloca whose address never escapes only aliases pointers derived from it,
+    and two paths from the same base alias unless they name different fields.
+    """
+
+    def __init__(self, func):
+        self.escaped = set()
+        for instr in func.instructions():
+            for position, arg in enumerate(instr.args):
+                base = self.base(arg)[0]
+                if not (isinstance(base, Instr) and base.op == 'alloca'): continue
+                if instr.op in ('load', 'fieldptr', 'elemptr', 'indexptr', 'check') and position == 0: continue
+                if instr.op == 'store' and position == 0: continue
+                if instr.op == 'copy': continue
+                self.escaped.add(base)
+
+    @staticmethod
+    def base(pointer):
+        path = []
+        while isinstance(pointer, Instr) and pointer.op in ('fieldptr', 'elemptr', 'indexptr', 'check'):
+            if pointer.op == 'fieldptr': path = [pointer.attr] + path
+            elif pointer.op in ('elemptr', 'indexptr'): path = []
+            pointer = pointer.args[0]
+        return pointer, path
+
+    def is_local(self, pointer):
+        """Points into an alloca whose address never escapes: safe to read speculatively, untouched by calls."""
+        base = self.base(pointer)[0]
+        return isinstance(base, Instr) and base.op == 'alloca' and base not in self.escaped
+
+    def may_alias(self, first, second):
+        (base_a, path_a), (base_b, path_b) = self.base(first), self.base(second)
+        if base_a is not base_b:
+            allocas = [base for base in (base_a, base_b) if isinstance(base, Instr) and base.op == 'alloca']
+            if len(allocas) == 2: return False
+            return not (allocas and allocas[0] not in self.escaped)
+        return all(a == b for a, b in zip(path_a, path_b))
+
+    def clobbers(self, instr, pointer):
+        """True if instr may write memory that `load pointer` reads."""
+        if instr.op in ('store', 'copy'): return self.may_alias(instr.args[0], pointer)
+        return instr.op in _CLOBBERS and not self.is_local(pointer)
+
+
+def _value_key(value):
+    return ('const', value.type, value.value) if isinstance(value, Const) else id(value)
+
+
+def eliminate_common_subexpressions(func):
+    """
+    Local value numbering: inside each block, a pure instruction with the same operation and
+    operands as an earlier one reuses its result, and a load reuses the value last loaded from
+    or stored to the same pointer unless a store, copy or call in between may have changed it.
+    Returns the number of instructions removed.
+    """
+    memory = _Memory(func)
+    mapping = {}
+    for block in func.blocks:
+        expressions, available = {}, {}  # key -> value; pointer -> value in memory
+        kept = []
+        for instr in block.instrs:
+            if mapping and instr.args: instr.args = [mapping.get(arg, arg) for arg in instr.args]
+            if instr.op in PURE_OPS:
+                operands = [_value_key(arg) for arg in instr.args]
+                if instr.op in _COMMUTATIVE: operands.sort(key=repr)
+                key = (instr.op, instr.type, str(instr.attr), *operands)
+                if key in expressions:
+                    mapping[instr] = expressions[key]
+                    continue
+                expressions[key] = instr
+            elif instr.op == 'load':
+                known = available.get(instr.args[0])
+                if known is not None and known.type == instr.type:
+                    mapping[instr] = known
+                    continue
+                available[instr.args[0]] = instr
+            elif instr.op in ('store', 'copy') or instr.op in _CLOBBERS:
+                available = {pointer: value for pointer, value in available.items()
+                             if not memory.clobbers(instr, pointer)}
+                if instr.op == 'store': available[instr.args[0]] = instr.args[1]
+            kept.append(instr)
+        block.instrs = kept
+    replace_uses(func, mapping)
+    return len(mapping)
+
+
+def _preheader(func, header, body):
+    """The block every entry into the loop goes through, created when the header has none."""
+    outside = [index for index, pred in enumerate(header.preds) if pred not in body]
+    if len(outside) == 1:
+        pred = header.preds[outside[0]]
+        if list(pred.succs) == [header]: return pred
+    preheader = BasicBlock(f"{header.name}.pre")
+    preheader.preds = [header.preds[index] for index in outside]
+    for phi in header.phis:
+        incoming = [phi.args[index] for index in outside]
+        if len(incoming) == 1:
+            value = incoming[0]
+        else:
+            value = Instr('phi', incoming, phi.type, hint=phi.hint)
+            value.block = preheader
+            preheader.phis.append(value)
+        phi.args = [arg for index, arg in enumerate(phi.args) if index not in outside] + [value]
+    for pred in set(preheader.preds):
+        term = pred.terminator
+        term.attr = [preheader if target is header else target for target in term.attr]
+    header.preds = [pred for pred in header.preds if pred in body] + [preheader]
+    jump = Instr('br', [], VOID, [header])
+    jump.block = preheader
+    preheader.instrs.append(jump)
+    func.blocks.insert(func.blocks.index(header), preheader)
+    return preheader
+
+
+def hoist_loop_invariants(func):
+    """
+    Loop-invariant code motion: pure instructions whose operands are all defined outside
+    the loop move to its preheader, innermost loops first. `div` stays (it may trap), and a
+    load moves only if nothing in the loop may write its memory and reading it early is
+    safe: the pointer is into a local that never escapes, or the load is in the header,
+    which runs whenever the loop is entered. Returns the number of instructions hoisted.
+    """
+    hoisted = 0
+    memory = _Memory(func)
+    loops = natural_loops(func)
+    for header, body in loops:
+        writes = [instr for block in body for instr in block.instrs
+                  if instr.op in ('store', 'copy', 'check') or instr.op in _CLOBBERS]
+        preheader = None
+        changed = True
+        while changed:
+            changed = False
+            for block in [block for block in func.blocks if block in body]:
+                kept = []
+                for instr in block.instrs:
+                    movable = instr.op in PURE_OPS and instr.op != 'div'
+                    if instr.op == 'load':
+                        pointer = instr.args[0]
+                        movable = ((block is header or memory.is_local(pointer))
+                                   and not any(memory.clobbers(write, pointer) or
+                                               (write.op == 'check' and memory.may_alias(write.args[0], pointer))
+                                               for write in writes))
+                    if movable and all(not isinstance(arg, Instr) or arg.block not in body for arg in instr.args):
+                        if preheader is None:
+                            preheader = _preheader(func, header, body)
+                            # The new preheader belongs to every loop that encloses this one
+                            for _, outer in loops:
+                                if header in outer and outer is not body: outer.add(preheader)
+                        instr.block = preheader
+                        preheader.instrs.insert(-1, instr)
+                        hoisted += 1
+                        changed = True
+                        continue
+                    kept.append(instr)
+                block.instrs = kept
+    return hoisted
+
+
+def _inline_cost(func):
+    """Instructions that survive as code: no phis (edge copies), allocas or plain jumps."""
+    return sum(1 for block in func.blocks for instr in block.instrs if instr.op not in ('alloca', 'br'))
+
+
+def _call_graph_sccs(module):
+    """Tarjan: strongly connected components of the call graph, callees before callers."""
+    functions = {func.name: func for func in module.functions}
+    callees = {func.name: [instr.attr for instr in func.instructions()
+                           if instr.op == 'call' and instr.attr in functions] for func in module.functions}
+    index, low, on_stack, stack, sccs = {}, {}, set(), [], []
+    for root in functions:
+        if root in index: continue
+        work = [(root, iter(callees[root]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            name, pending = work[-1]
+            for callee in pending:
+                if callee not in index:
+                    index[callee] = low[callee] = len(index)
+                    stack.append(callee)
+                    on_stack.add(callee)
+                    work.append((callee, iter(callees[callee])))
+                    break
+                if callee in on_stack: low[name] = min(low[name], index[callee])
+            else:
+                work.pop()
+                if work: low[work[-1][0]] = min(low[work[-1][0]], low[name])
+                if low[name] == index[name]:
+                    scc = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.add(member)
+                        if member == name: break
+                    sccs.append(scc)
+    return [[functions[name] for name in scc] for scc in sccs]
+
+
+def _inline_call(caller, call, callee, tag):
+    """
+    Replaces `call` with a copy of callee's body. The copied blocks are named
+    <callee>.<tag>.<block>, so labels in the generated code still show where they came from.
+    """
+    block = call.block
+    position = block.instrs.index(call)
+    after = BasicBlock(f"{callee.name}.{tag}.ret")
+    after.instrs, block.instrs = block.instrs[position + 1:], block.instrs[:position]
+    for instr in after.instrs: instr.block = after
+    for succ in after.succs:
+        succ.preds = [after if pred is block else pred for pred in succ.preds]
+
+    blocks = {source: BasicBlock(f"{callee.name}.{tag}.{source.name}") for source in callee.blocks}
+    values = dict(zip(callee.params, call.args))
+    clones, returns = [], []
+    for source in callee.blocks:
+        copy = blocks[source]
+        copy.preds = [blocks[pred] for pred in source.preds]
+        for instr in source.phis + source.instrs:
+            if instr.op == 'ret':
+                returns.append((copy, instr.args[0] if instr.args else None))
+                clone = Instr('br', [], VOID, [after], token=instr.token)
+            else:
+                attr = [blocks[target] for target in instr.attr] if instr.op in ('br', 'cbr') else instr.attr
+                clone = Instr(instr.op, instr.args, instr.type, attr, instr.hint, instr.token)
+                values[instr] = clone
+            clones.append(clone)
+            if instr.op == 'alloca':
+                clone.block = caller.entry
+                caller.entry.instrs.insert(0, clone)
+            else:
+                clone.block = copy
+                (copy.phis if instr.op == 'phi' else copy.instrs).append(clone)
+
+    def mapped(value):
+        return values.get(value, value) if isinstance(value, (Instr, Param)) else value
+
+    # Operands are mapped once every instruction has its copy (phis may refer forward)
+    for clone in clones: clone.args = [mapped(arg) for arg in clone.args]
+    entry = blocks[callee.entry]
+    entry.preds.insert(0, block)
+    for phi in entry.phis: phi.args.insert(0, Undef(phi.type))
+    jump = Instr('br', [], VOID, [entry])
+    jump.block = block
+    block.instrs.append(jump)
+    after.preds = [copy for copy, _ in returns]
+    index = caller.blocks.index(block) + 1
+    caller.blocks[index:index] = [blocks[source] for source in callee.blocks] + [after]
+    if call.has_value:
+        incoming = [mapped(value) for _, value in returns]
+        if not incoming:
+            result = Undef(call.type)  # the callee never returns
+        elif len(incoming) == 1:
+            result = incoming[0]
+        else:
+            result = Instr('phi', incoming, call.type, hint=callee.name)
+            result.block = after
+            after.phis.append(result)
+        replace_uses(caller, {call: result})
+
+
+def inline_functions(module, threshold=INLINE_THRESHOLD, passes=None):
+    """
+    Whole-program pass: replaces calls to small functions by their bodies. Functions are
+    visited callees first, so a callee is already inlined into and re-optimized when its own
+    callers are considered. A call site is inlined when the callee's cost (_inline_cost) minus
+    the call it saves stays within the threshold, scaled by the loop depth of the call site;
+    leaf functions and functions with a single call site get a larger budget. Recursive
+    functions (a strongly connected component of the call graph with a cycle) and `main`
+    are never inlined. threshold 0 disables the pass. Returns the number of call sites inlined.
+    """
+    if threshold <= 0: return 0
+    passes = PASSES if passes is None else passes
+    sites = {}
+    for func in module.functions:
+        for instr in func.instructions():
+            if instr.op == 'call': sites[instr.attr] = sites.get(instr.attr, 0) + 1
+    functions = {func.name: func for func in module.functions}
+    sccs = _call_graph_sccs(module)
+    recursive = {func.name for scc in sccs for func in scc
+                 if len(scc) > 1 or any(instr.op == 'call' and instr.attr == func.name for instr in func.instructions())}
+    inlined, tag = 0, 0
+    for scc in sccs:
+        for caller in scc:
+            budget = _inline_cost(caller) + _CALLER_GROWTH_LIMIT * threshold
+            depth = {}
+            for _, body in natural_loops(caller):
+                for block in body: depth[block] = depth.get(block, 0) + 1
+            # Loop depth is taken up front: inlining moves the code after a call into a new block
+            calls = [(instr, depth.get(block, 0)) for block in caller.blocks for instr in block.instrs
+                     if instr.op == 'call' and instr.attr in functions and instr.attr not in recursive
+                     and instr.attr != 'main']
+            changed = False
+            for call, call_depth in calls:
+                callee = functions[call.attr]
+                cost = _inline_cost(callee)
+                limit = threshold * (1 + min(call_depth, 2))
+                if not any(instr.op == 'call' for instr in callee.instructions()): limit += threshold // 2
+                if sites[callee.name] == 1: limit *= 2
+                if cost - (2 + len(call.args)) > limit or _inline_cost(caller) + cost > budget: continue
+                tag += 1
+                _inline_call(caller, call, callee, tag)
+                inlined += 1
+                changed = True
+            if changed:
+                for _, run in passes: run(caller)
+                verify(caller)
+    return inlined
+
+
+def _split_returns(func):
+    """
+    Gives a `ret` of its own to every predecessor that jumps to a block holding nothing but
+    phis and a `ret`, when the predecessor ends with a call or is empty itself. A call in the
+    last expression of each branch of a trailing `if` then sits right before a `ret`.
+    """
+    pending = [block for block in func.blocks if len(block.instrs) == 1 and block.instrs[0].op == 'ret']
+    while pending:
+        block = pending.pop()
+        ret = block.instrs[0]
+        for pred in list(block.preds):
+            if pred.terminator.op != 'br' or (len(pred.instrs) > 1 and pred.instrs[-2].op != 'call'): continue
+            index = block.preds.index(pred)
+            args = [phi.args[index] if phi in block.phis else phi for phi in ret.args]
+            remove_edge(pred, block)
+            pred.instrs[-1] = Instr('ret', args, VOID, token=ret.token)
+            pred.instrs[-1].block = pred
+            if len(pred.instrs) == 1: pending.append(pred)
+        if not block.preds and block is not func.entry: func.blocks.remove(block)
+
+
+def _tail_calls(func):
+    """
+    Calls directly followed by a `ret` of their result (or a void call by `ret void`). None in
+    `main`, whose return ends the process, or in functions whose locals' addresses escape:
+    the callee might still use the frame that a tail call gives up.
+    """
+    if func.name == 'main' or _Memory(func).escaped: return []
+    _split_returns(func)
+    calls = []
+    for block in func.blocks:
+        if len(block.instrs) < 2: continue
+        call, ret = block.instrs[-2:]
+        if call.op == 'call' and (ret.args == [call] or (not ret.args and call.type == func.return_type)):
+            calls.append(call)
+    return calls
+
+
+def eliminate_tail_recursion(func):
+    """
+    Turns self-recursive tail calls into a loop: the body moves into a `tailrec` header whose
+    phis take the parameters on entry and the call arguments from every tail call, and the
+    calls become jumps back to it. Returns the number of calls replaced.
+    """
+    sites = [call for call in _tail_calls(func) if call.attr == func.name]
+    if not sites: return 0
+    header = func.entry
+    names = {block.name for block in func.blocks}
+    header.name, counter = 'tailrec', 1
+    while header.name in names:
+        counter += 1
+        header.name = f'tailrec.{counter}'
+    entry = BasicBlock('entry')
+    entry.instrs = [instr for instr in header.instrs if instr.op == 'alloca']
+    header.instrs = [instr for instr in header.instrs if instr.op != 'alloca']
+    for instr in entry.instrs: instr.block = entry
+    jump = Instr('br', [], VOID, [header])
+    jump.block = entry
+    entry.instrs.append(jump)
+    func.blocks.insert(0, entry)
+
+    phis = [Instr('phi', [], param.type, hint=param.name) for param in func.params]
+    replace_uses(func, dict(zip(func.params, phis)))
+    # The entry block never has predecessors, so the header is entered from `entry` and the calls only
+    for phi, param in zip(phis, func.params):
+        phi.block = header
+        phi.args = [param]
+    header.phis = phis
+    header.preds = [entry]
+    for call in sites:
+        block = call.block
+        back = Instr('br', [], VOID, [header])
+        back.block = block
+        block.instrs[-2:] = [back]
+        header.preds.append(block)
+        for phi, arg in zip(phis, call.args): phi.args.append(arg)
+    simplify_phis(func)  # parameters passed on unchanged need no phi
+    return len(sites)
+
+
+def _close_tail_cycles(module, passes):
+    """
+    Mutual tail recursion (f -> g -> f) becomes self-recursion: each tail call from f to a
+    function of its own recursive cycle is replaced by a copy of that function's original
+    body, until the tail calls lead back to f and eliminate_tail_recursion turns them into a
+    loop. f stops growing at _TAIL_CYCLE_LIMIT instructions.
+    """
+    originals = {func.name: copy.deepcopy(func) for func in module.functions}
+    cycles = {func.name: scc for scc in _call_graph_sccs(module) if len(scc) > 1 for func in scc}
+    for func in module.functions:
+        members = {member.name for member in cycles.get(func.name, ())}
+        changed = True
+        while changed:
+            changed = False
+            for call in _tail_calls(func):
+                if call.attr not in members or call.attr == func.name: continue
+                callee = originals[call.attr]
+                if _inline_cost(func) + _inline_cost(callee) > _TAIL_CYCLE_LIMIT: continue
+                _inline_call(func, call, copy.deepcopy(callee), 'tail')
+                changed = True
+            if changed:
+                for _, run in passes: run(func)
+                verify(func)
+
+
+def mark_tail_calls(module, passes=None):
+    """
+    Whole-program pass, last in the pipeline. Mutually recursive tail calls are first turned
+    into loops where possible (_close_tail_cycles); the remaining tail calls to other
+    functions become `tailcall`, which the backends emit as a jump (asm) or a guaranteed
+    tail call where the C++ compiler offers one. Returns the number of calls marked.
+    """
+    _close_tail_cycles(module, PASSES if passes is None else passes)
+    functions = {func.name for func in module.functions}
+    marked = 0
+    for func in module.functions:
+        for call in _tail_calls(func):
+            if call.attr in functions:
+                call.op = 'tailcall'
+                marked += 1
+    return marked
+
+
+def module_pipeline(inline_threshold=INLINE_THRESHOLD):
+    return [('inline', lambda module: inline_functions(module, inline_threshold)),
+            ('tail-calls', mark_tail_calls), ('dead-functions', remove_uncalled_functions)]
+
+
+PASSES = [('fold', fold_constants), ('cfg', simplify_cfg), ('tail-recursion', eliminate_tail_recursion),
+          ('cse', eliminate_common_subexpressions),
+          ('licm', hoist_loop_invariants), ('cfg', simplify_cfg), ('cse', eliminate_common_subexpressions),
+          ('fold', fold_constants), ('dce', eliminate_dead_code)]
+MODULE_PASSES = module_pipeline()
+
+
+def optimize(module, passes=PASSES, module_passes=None, stats=None, inline_threshold=INLINE_THRESHOLD):
+    """
+    Runs the function pipeline over every function, then the whole-program passes
+    (by default module_pipeline(inline_threshold)). stats (dict) receives the per-pass totals.
+    """
+    if module_passes is None: module_passes = module_pipeline(inline_threshold)
+    for func in module.functions:
+        for name, run in passes:
+            count = run(func)
+            if stats is not None: stats[name] = stats.get(name, 0) + count
+        verify(func)
+    for name, run in module_passes:
+        count = run(module)
+        if stats is not None: stats[name] = stats.get(name, 0) + count
+    for func in module.functions: verify(func)
+    return module
@@ -11,6 +11,8 @@ class TokenType(Enum):
     RPAREN = ')'
     LBRACE = '{'
     RBRACE = '}'
+    LBRACKET = '['
+    RBRACKET = ']'
     SEMICOLON = ';'
     ASSIGN = '='
     LESS = '<'
@@ -40,6 +42,8 @@ class TokenType(Enum):
     KW_FOR = 'for'
     KW_BREAK = 'break'
     KW_CONTINUE = 'continue'
+    KW_FOREACH = 'foreach'
+    KW_YIELD = 'yield'
     KW_PTR = 'ptr'
     KW_ADDR = 'addr'
     KW_DEREF = 'deref'
@@ -47,6 +51,7 @@ class TokenType(Enum):
     KW_NEW = 'new'
     KW_FREE = 'free'
     KW_STRUCT = 'struct'
+    KW_ARRAY = 'array'
 
     # Logical and bitwise keywords
     ## Logical
@@ -92,6 +97,10 @@ class Token:
         return self.__str__()
 
 
+# ### NEW ###: Односимвольні токени за символом. Виклик TokenType(char) проходить через механізм Enum
+# і в лексері був найдорожчою операцією на кожен оператор.
+SINGLE_CHAR_TOKENS = {token_type.value: token_type for token_type in TokenType if len(token_type.value) == 1}
+
 RESERVED_KEYWORDS = {
     'int': TokenType.KW_INT,
     'void': TokenType.KW_VOID,
@@ -100,6 +109,7 @@ RESERVED_KEYWORDS = {
     'const': TokenType.KW_CONST,
     'return': TokenType.KW_RETURN,
     'struct': TokenType.KW_STRUCT,
+    'array': TokenType.KW_ARRAY,
 
     # Ifs
     'if': TokenType.KW_IF,
@@ -112,6 +122,10 @@ RESERVED_KEYWORDS = {
     'for': TokenType.KW_FOR,
     'break': TokenType.KW_BREAK,
     'continue': TokenType.KW_CONTINUE,
+    'foreach': TokenType.KW_FOREACH,
+
+    # Generators
+    'yield': TokenType.KW_YIELD,
 
     # Pointers
     'ptr': TokenType.KW_PTR,
@@ -179,7 +193,8 @@ class Lexer:
             nesting_level = 1
             while nesting_level > 0:
                 if self.current_char is None:
-                    self.reporter.error("LE015", "Unterminated multi-line comment", start_token)
+                    self.reporter.recoverable_error("LE015", "Unterminated multi-line comment", start_token)
+                    return
                 elif self.current_char == '/' and self.peek() == '*': self.advance(); self.advance(); nesting_level += 1
                 elif self.current_char == '*' and self.peek() == '/': self.advance(); self.advance(); nesting_level -= 1
                 else: self.advance()
@@ -198,8 +213,7 @@ class Lexer:
         while self.current_char is not None and self.current_char != '"':
             if self.current_char == '\\':
                 self.advance()
-                if self.current_char is None:
-                    self.reporter.error("LE022", "Unterminated string literal.", start_token)
+                if self.current_char is None: break  # помилка LE022 нижче
 
                 if self.current_char == 'n':
                     result += '\n'
@@ -217,7 +231,8 @@ class Lexer:
             self.advance()
 
         if self.current_char is None:
-            self.reporter.error("LE022", "Unterminated string literal.", start_token)
+            self.reporter.recoverable_error("LE022", "Unterminated string literal.", start_token)
+            return result
 
         self.advance()  # Consume closing "
         return result
@@ -236,16 +251,19 @@ class Lexer:
                 char_val = 92  # ASCII for backslash
             elif self.current_char == "'":
                 char_val = 39  # ASCII for single quote
-            else:
+            elif self.current_char is not None:
                 # For now, any other escaped char is just the char itself
                 char_val = ord(self.current_char)
-        else:
+        elif self.current_char is not None:
             char_val = ord(self.current_char)
 
         self.advance()
         if self.current_char != "'":
-            self.reporter.error("LE021", "Unterminated or multi-character character literal",
-                                Token(None, "'", self.line, self.col - 1))
+            self.reporter.recoverable_error("LE021", "Unterminated or multi-character character literal",
+                                            Token(None, "'", self.line, self.col - 1))
+            # Пропускаємо решту літерала, щоб продовжити з наступного токена
+            while self.current_char not in (None, "'", '\n'): self.advance()
+            if self.current_char != "'": return char_val
 
         self.advance()  # Consume closing '
         return char_val
@@ -288,10 +306,11 @@ class Lexer:
                 self.advance(); self.advance(); return Token(TokenType.LESS_EQUAL, '<=', line, col)
             if self.current_char == '>' and self.peek() == '=':
                 self.advance(); self.advance(); return Token(TokenType.GREATER_EQUAL, '>=', line, col)
-            try:
-                token_type = TokenType(self.current_char)
+            token_type = SINGLE_CHAR_TOKENS.get(self.current_char)
+            if token_type is not None:
                 token = Token(token_type, token_type.value, line, col); self.advance()
                 return token
-            except ValueError:
-                self.reporter.error("LE016", f"Invalid character '{self.current_char}'", Token(None, self.current_char, line, col))
+            self.reporter.recoverable_error("LE016", f"Invalid character '{self.current_char}'",
+                                            Token(None, self.current_char, line, col))
+            self.advance()
         return Token(TokenType.EOF, None, self.line, self.col)
\ No newline at end of file
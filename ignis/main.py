@@ -1,82 +1,384 @@
 import subprocess
 import argparse
+import json
+import shutil
 import sys
-import traceback
 from pathlib import Path
 
 from lexer import Lexer
 from parser import Parser
 from checker import Checker
-from error import ErrorReporter
+from error import ErrorReporter, CompilerError, TooManyErrors, DEFAULT_MAX_ERRORS
+from warden import WardenAnalyzer, WARDEN_MODES
+from bounds import BoundsAnalyzer
+from build_cache import BuildCache, prepare_cpp_runtime, prepare_c_runtime, runtime_defines, \
+    runtime_dir as cpp_runtime_dir
+from ast_cache import dump_ast, load_ast, export_ast, import_ast, AstFileError, AST_SUFFIX
+from timing import PhaseTimer, TokenList, tokenize, count_nodes, TIME_REPORT_FORMATS
+
+# ### NEW ###: traceback та incremental (з concurrent.futures) імпортуються лише там, де вони
+# потрібні: звичайна збірка за них не платить (див. `-X importtime`, benchmarks/startup_bench.py).
 
 
 # ### MODIFIED ###: Умовний імпорт кодогенераторів
 # Ми будемо імпортувати потрібний клас залежно від аргументів
 
-def compile_source(source_code, file_path, reporter, target):
+def report_warden_stats(stats, mode):
+    for func_name, counters in stats.items():
+        if not counters['sites']: continue
+        print(f"  [+] Warden ({mode}): {func_name}: {counters['elided']}/{counters['sites']} checks elided")
+
+
+def report_bounds_stats(stats):
+    """### NEW ###: Скільки перевірок меж масивів прибрав аналіз діапазонів (bounds.py)."""
+    for func_name, counters in (stats or {}).items():
+        if not counters['sites']: continue
+        print(f"  [+] Bounds: {func_name}: {counters['elided']}/{counters['sites']} checks elided")
+
+
+def run_frontend(source_code, file_path, reporter, warden_mode='elided', timer=None, bounds_mode='elided'):
+    """
+    Лексер, парсер, перевірки та аналіз "Вахтера". Повертає (AST, статистика Вахтера) або (None, None).
+    Помилки не друкуються, а збираються в reporter (див. ErrorReporter.flush).
+    bounds_mode - 'elided' (типово) чи 'full': чи прибирати перевірки меж, доведені аналізом діапазонів.
+    """
+    # ### NEW ###: timer (timing.PhaseTimer) вимірює кожну фазу для --time-report
+    timer = timer or PhaseTimer(enabled=False)
     # 1. Lexer
     lexer = Lexer(source_code, reporter)
+    if timer.enabled:
+        # Парсер тягне токени по одному, тому для окремого виміру лексер проганяється наперед
+        with timer.phase('lexer'):
+            tokens = tokenize(lexer)
+        timer.count('tokens', len(tokens))
+        lexer = TokenList(tokens)
     # 2. Parser
-    parser = Parser(lexer, reporter)
-    ast = parser.parse()
-    if reporter.had_error: return None
+    try:
+        with timer.phase('parser'):
+            parser = Parser(lexer, reporter)
+            ast = parser.parse()
+    except CompilerError:
+        return None, None  # парсер відновлюється сам; сюди доходить лише помилка на рівні файлу
+    if reporter.had_error: return None, None
+    if timer.enabled: timer.count('ast_nodes', count_nodes(ast))
     # 2.5. Checker
-    checker = Checker(reporter)
-    checker.check(ast)
-    if reporter.had_error: return None
+    with timer.phase('checker'):
+        checker = Checker(reporter)
+        checker.check(ast)
+    if reporter.had_error: return None, None
+    # ### NEW ###: 2.55. Генератори вбудовуються на місце foreach (generators.py), далі - звичайний AST
+    if parser.uses_generators:
+        from generators import GeneratorLowering
+        with timer.phase('generators'):
+            ast = GeneratorLowering(reporter).lower(ast)
+        if reporter.had_error: return None, None
+    # ### NEW ###: 2.58. Масиви: перевірки індексації та аналіз діапазонів для перевірок меж (bounds.py)
+    if parser.uses_arrays:
+        with timer.phase('bounds'):
+            BoundsAnalyzer(reporter, bounds_mode).analyze(ast)
+        if reporter.had_error: return None, None
+    # 2.6. Аналіз ключів "Вахтера": які перевірки можна прибрати
+    with timer.phase('warden'):
+        warden = WardenAnalyzer(warden_mode)
+        warden_stats = warden.analyze(ast)
+    return ast, warden_stats
+
+
+def lower_to_ir(ast, timer, dump_ir=None, inline_threshold=None, fallback=True):
+    """
+    ### NEW ###: AST -> SSA IR (ir.py) та оптимізації над ним (ir_opt.py), спільні для всіх цілей.
+    Повертає модуль IR або None, якщо програма використовує те, чого IR ще не вміє виразити, -
+    тоді код, як і раніше, генерується напряму з AST (fallback=False - для цілі vm цього шляху немає).
+    dump_ir - файл для текстового дампу ('-' - stdout).
+    inline_threshold - поріг інлайнера (None - типовий ir_opt.INLINE_THRESHOLD, 0 - вимкнено).
+    """
+    from ir import lower_program, dump_module, IRUnsupported
+    from ir_opt import optimize, INLINE_THRESHOLD
 
+    try:
+        with timer.phase('ir-lower'):
+            module = lower_program(ast)
+    except IRUnsupported as e:
+        # Без IR не виконуються жодні його оптимізації, тож про відкат варто знати
+        print(f"  [!] IR: {e}; generating code from the AST without the IR optimizations "
+              f"(inlining, CSE, LICM, DCE, tail calls)" if fallback else f"  [!] IR: {e}")
+        return None
+    stats = {}
+    with timer.phase('ir-opt'):
+        optimize(module, stats=stats,
+                 inline_threshold=INLINE_THRESHOLD if inline_threshold is None else inline_threshold)
+    if timer.enabled:
+        timer.count('ir_instructions', sum(len(block.phis) + len(block.instrs)
+                                           for func in module.functions for block in func.blocks))
+        # Скільки змінив кожен прохід (для dce - скільки інструкцій видалено)
+        for name, count in stats.items(): timer.count(f'ir_{name}', count)
+    if dump_ir is not None:
+        text = dump_module(module)
+        if dump_ir == '-':
+            print(text, end='')
+        else:
+            with open(dump_ir, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"  [+] IR written to {dump_ir}")
+    return module
+
+
+def generate_code(ast, reporter, target, timer=None, use_ir=True, dump_ir=None, inline_threshold=None):
+    timer = timer or PhaseTimer(enabled=False)
+    use_ir = use_ir or target == 'vm'
+    module = lower_to_ir(ast, timer, dump_ir, inline_threshold, fallback=target != 'vm') if use_ir else None
     # ### MODIFIED ###: Вибір кодогенератора
     # 3. Code Generation
     if target == 'asm':
-        from codegen import CodeGenerator
-        generator = CodeGenerator(reporter)
+        from codegen import CodeGenerator, IRCodeGenerator
+        generator = CodeGenerator(reporter) if module is None else IRCodeGenerator(reporter)
     elif target == 'cpp':
-        from codegen_cpp import CodeGeneratorCpp
-        generator = CodeGeneratorCpp(reporter)
+        from codegen_cpp import CodeGeneratorCpp, IRCodeGeneratorCpp
+        generator = CodeGeneratorCpp(reporter) if module is None else IRCodeGeneratorCpp(reporter)
+    elif target == 'c':
+        # ### NEW ###: C11 для gcc/cc (codegen_c.py)
+        from codegen_c import CodeGeneratorC, IRCodeGeneratorC
+        generator = CodeGeneratorC(reporter) if module is None else IRCodeGeneratorC(reporter)
+    elif target == 'vm':
+        # ### NEW ###: Байт-код (vm.py) генерується лише з IR
+        from codegen_vm import IRCodeGeneratorVM
+        generator = IRCodeGeneratorVM(reporter)
     else:
         # Ця помилка не повинна ніколи виникнути, якщо argparse налаштовано правильно
         print(f"Error: Unknown compilation target '{target}'")
         sys.exit(1)
 
-    generated_code = generator.generate(ast)
-    return generated_code
+    try:
+        if module is None and target == 'vm':
+            reporter.error("E003", "The 'vm' target needs the IR, which cannot express this program yet", None)
+        with timer.phase('codegen'):
+            generated_code = generator.generate(ast if module is None else module)
+    except CompilerError:
+        return None  # помилка вже записана в reporter
+    return None if reporter.had_error else generated_code
 
 
-def main():
+def compile_source(source_code, file_path, reporter, target, warden_mode='elided', timer=None):
+    ast, warden_stats = run_frontend(source_code, file_path, reporter, warden_mode, timer)
+    if ast is None: return None
+    if target in ('cpp', 'c'):
+        report_warden_stats(warden_stats, warden_mode)
+    report_bounds_stats(getattr(ast, 'bounds_stats', None))
+    return generate_code(ast, reporter, target, timer)
+
+
+def cached_frontend(source_code, file_path, reporter, warden_mode, cache, timer):
+    """
+    Перевірений AST з кешу збірки або з фронтенду. Ключ не залежить від цілі,
+    тож зміна --target чи -O не запускає лексер, парсер і перевірки заново.
+    """
+    ast_key = None
+    if cache is not None:
+        ast_key = cache.make_key(source_code, 'ast', {'warden_checks': warden_mode})
+        artifacts = cache.lookup(ast_key) or {}
+        if 'ast' in artifacts:
+            try:
+                with timer.phase('ast-load'):
+                    payload = load_ast(artifacts['ast'].read_bytes(), source_code)
+                print("  [+] Checked AST restored from cache")
+                return payload['tree'], payload['warden_stats']
+            except AstFileError:
+                pass  # пошкоджений запис - просто проганяємо фронтенд
+
+    ast, warden_stats = run_frontend(source_code, file_path, reporter, warden_mode, timer)
+    if ast is not None and cache is not None:
+        with timer.phase('ast-store'):
+            cache.store_bytes(ast_key, 'ast', dump_ast(ast, file_path, source_code, warden_mode, warden_stats))
+    return ast, warden_stats
+
+
+def report_failure(reporter, error=None):
+    """Друкує зібрану діагностику та підсумок невдалої компіляції."""
+    reporter.flush()
+    if isinstance(error, TooManyErrors): print(f"Error: {error}")
+    print(f"\n--- Compilation failed: {reporter.summary()} ---")
+
+
+def report_timings(timer, args, input_path):
+    if args.time_report == 'json':
+        print(json.dumps(timer.to_dict(input_path, args.target), indent=2))
+    elif args.time_report == 'table':
+        timer.print_table(input_path)
+    if args.time_trace:
+        timer.write_chrome_trace(args.time_trace, input_path)
+        print(f"  [+] Trace written to {args.time_trace}")
+
+
+def make_arg_parser():
     arg_parser = argparse.ArgumentParser(prog="ignis", description="The Ignis language compiler.",
                                          epilog="Have fun building the future!")
     arg_parser.add_argument('input_file', type=str, help='The Ignis source file to compile')
     arg_parser.add_argument('-o', '--output', type=str, help='Specify the output file name')
-    arg_parser.add_argument('--target', type=str, choices=['asm', 'cpp'], default='asm',
-                            help="Specify the compilation target: 'asm' (default) or 'cpp'")
+    arg_parser.add_argument('--target', type=str, choices=['asm', 'cpp', 'c', 'vm'], default='asm',
+                            help="Specify the compilation target: 'asm' (default), 'cpp', 'c' (C11 for gcc/cc, "
+                                 "compiles faster than 'cpp') or 'vm' (bytecode for 'ignis run', see vm.py)")
     arg_parser.add_argument('-S', action='store_true', help="Stop after assembly generation (only for 'asm' target)")
     arg_parser.add_argument('-c', action='store_true', help="Stop after object file generation (only for 'asm' target)")
     arg_parser.add_argument('-k', '--keep-files', action='store_true', help='Keep intermediate files')
-    args = arg_parser.parse_args()
+    arg_parser.add_argument('-O', dest='opt_level', choices=['0', '1', '2', '3', 's'], default='0',
+                            help="Optimization level passed to g++ or cc (only for 'cpp' and 'c' targets), default 0")
+    arg_parser.add_argument('--warden-checks', choices=WARDEN_MODES, default='elided',
+                            help="Runtime key checks on dereference (only for 'cpp', 'c' and 'vm' targets): 'full', "
+                                 "'elided' (default, skip checks proven redundant) or 'off'")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="Do not use the build cache in '.build/cache' (always rebuild from scratch)")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="Regenerate only changed functions; for 'cpp' compile each function into its own "
+                                 "cached object file")
+    arg_parser.add_argument('--emit-ast', nargs='?', const='', metavar='FILE',
+                            help=f"Stop after the front end and write the checked AST (default: <output>{AST_SUFFIX})")
+    arg_parser.add_argument('--from-ast', action='store_true',
+                            help="The input file is an AST written by --emit-ast: run only the backend")
+    ir_group = arg_parser.add_mutually_exclusive_group()
+    ir_group.add_argument('--ir', action='store_true',
+                          help="Generate code from the optimized SSA intermediate representation (ir.py); the "
+                               "default except with --incremental. Programs it cannot express yet fall back to "
+                               "the AST")
+    ir_group.add_argument('--no-ir', action='store_true',
+                          help="Generate code directly from the AST, without the IR optimizations")
+    arg_parser.add_argument('--dump-ir', nargs='?', const='-', metavar='FILE',
+                            help="Write the optimized IR as text to FILE (default: stdout); implies --ir")
+    arg_parser.add_argument('--inline-threshold', type=int, metavar='N',
+                            help="Inline calls to functions of up to about N IR instructions (default: 25, "
+                                 "more inside loops; 0 - no inlining); implies --ir")
+    arg_parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                            help=f"Stop after N errors (default: {DEFAULT_MAX_ERRORS}, 0 - no limit)")
+    arg_parser.add_argument('--time-report', nargs='?', const='table', choices=TIME_REPORT_FORMATS,
+                            help="Report wall time, CPU time and peak memory of every compilation phase "
+                                 "as a 'table' (default) or 'json'")
+    arg_parser.add_argument('--time-trace', type=str, metavar='FILE',
+                            help="Write the phase timings as a Chrome trace-event file (chrome://tracing, Perfetto)")
+    return arg_parser
+
+
+def run_hint(args, executable_path):
+    """Команда, якою запускається результат збірки."""
+    if args.target == 'vm': return f"ignis run {executable_path.name}"
+    return f"./{executable_path.name}"
+
+
+def run_tool(command, capture=False, input=None):
+    # ### NEW ###: capture=True - вивід інструмента повертається через print (напр., клієнту демона),
+    # а не йде напряму в успадковані дескриптори процесу.
+    result = subprocess.run(command, text=True, input=input, capture_output=capture)
+    if capture and (result.stdout or result.stderr): print(result.stdout + result.stderr, end='')
+    if result.returncode != 0: raise subprocess.CalledProcessError(result.returncode, command)
+    return result
 
-    input_path = Path(args.input_file)
-    if not input_path.exists(): print(f"Error: Input file not found at '{input_path}'"); sys.exit(1)
 
-    if args.output:
-        output_base_path = Path(args.output).resolve()
+def compile_cpp(generated_code, executable_path, opt_level, cache_root=None, source_path=None, capture=False,
+                warden_checks='elided'):
+    """
+    Компілює згенерований C++ код у виконуваний файл. source_path=None - код іде через stdin.
+    warden_checks='off' лінкує рантайм без журналу "Вахтера".
+    """
+    runtime_dir = cpp_runtime_dir()
+    runtime_cpp_path = runtime_dir / 'ignis_runtime.cpp'
+    include_path_arg = f"-I{runtime_dir}"
+
+    # Без -k код не записується на диск: g++ читає його зі stdin (`-x c++ -`),
+    # а `-x none` повертає автовизначення мови для наступних файлів.
+    source_args = [str(source_path)] if source_path else ['-x', 'c++', '-', '-x', 'none']
+
+    if cache_root is not None:
+        # ### NEW ###: Рантайм компілюється один раз (для кожного -O) в об'єктний файл,
+        # а ignis_runtime.h - у передкомпільований заголовок. Тут компілюємо лише згенерований код.
+        runtime_obj_path, pch_dir = prepare_cpp_runtime(cache_root, runtime_dir, opt_level, warden_checks)
+        compile_command = [
+            'g++',
+            '-std=c++17',
+            f'-O{opt_level}',
+            f'-I{pch_dir}',
+            include_path_arg,
+            '-o', str(executable_path),
+            *source_args,
+            str(runtime_obj_path)
+        ]
     else:
-        output_base_path = input_path.resolve().with_suffix('')
+        compile_command = [
+            'g++',
+            '-std=c++17',
+            f'-O{opt_level}',
+            include_path_arg,  # Тепер це правильний аргумент, наприклад: "-I/path/to/ignis/cpp_runtime"
+            *runtime_defines(warden_checks),
+            '-o', str(executable_path),
+            *source_args,
+            str(runtime_cpp_path)
+        ]
+    run_tool(compile_command, capture, input=None if source_path else generated_code)
+
+
+def compile_c(generated_code, executable_path, opt_level, cache_root=None, source_path=None, capture=False,
+              warden_checks='elided'):
+    """Компілює згенерований C код у виконуваний файл (як compile_cpp, але cc і рантайм на C)."""
+    runtime_dir = cpp_runtime_dir()
+    source_args = [str(source_path)] if source_path else ['-x', 'c', '-', '-x', 'none']
+    # Рантайм на C компілюється один раз (для кожного -O); передкомпільований заголовок не потрібен:
+    # C-версія ignis_runtime.h підключає лише stdint.h, stddef.h і stdbool.h
+    runtime_path = prepare_c_runtime(cache_root, runtime_dir, opt_level, warden_checks) if cache_root is not None \
+        else runtime_dir / 'ignis_runtime.c'
+    compile_command = [
+        'cc',
+        '-std=c11',
+        f'-O{opt_level}',
+        f'-I{runtime_dir}',
+        *([] if cache_root is not None else runtime_defines(warden_checks)),
+        '-o', str(executable_path),
+        *source_args,
+        str(runtime_path)
+    ]
+    run_tool(compile_command, capture, input=None if source_path else generated_code)
+
+
+def cache_flags(warden_checks, opt_level, use_ir=True, inline_threshold=None):
+    """Прапорці, що впливають на результат збірки, - для ключа кешу (спільні для main.py та batch.py)."""
+    return {'warden_checks': warden_checks, 'opt_level': opt_level, 'ir': use_ir, 'inline_threshold': inline_threshold}
+
+
+def output_path(args):
+    """Шлях результату збірки: -o, а без нього - вхідний файл без розширення (для vm - з .ignc)."""
+    if args.output: return Path(args.output).resolve()
+    if args.target == 'vm':
+        from vm import BYTECODE_SUFFIX
+        return Path(args.input_file).resolve().with_suffix(BYTECODE_SUFFIX)
+    return Path(args.input_file).resolve().with_suffix('')
+
+
+def build(args, capture_tools=False, diagnostics=None):
+    """
+    Повний цикл збірки одного файлу. Повертає код завершення замість виклику sys.exit.
+    Якщо передано список diagnostics, у нього додаються помилки й попередження (error.Diagnostic).
+    """
+    input_path = Path(args.input_file)
+    if not input_path.exists(): print(f"Error: Input file not found at '{input_path}'"); return 1
+
+    output_base_path = output_path(args)
 
     build_dir = output_base_path.parent / '.build' / output_base_path.stem
-    build_dir.mkdir(exist_ok=True, parents=True)
+    # ### NEW ###: Для C++ без -k згенерований код передається в g++ через stdin, файли не потрібні.
+    # Для vm проміжного коду немає: результат генерації - сам файл байт-коду.
+    write_intermediate = (args.keep_files and args.target in ('cpp', 'c')) or args.target == 'asm'
+    if write_intermediate: build_dir.mkdir(exist_ok=True, parents=True)
 
     # ### NEW ###: Визначаємо шляхи до файлів рантайму
-    # Припускаємо, що рантайм-файли лежать в тій же директорії, що і компілятор
-    script_dir = Path(__file__).parent.resolve()
-    runtime_cpp_path = script_dir / 'cpp_runtime' / 'ignis_runtime.cpp'
-    if args.target == 'cpp' and not runtime_cpp_path.exists():
-        print(f"Error: Runtime file not found at '{runtime_cpp_path}'")
-        sys.exit(1)
+    # Рантайм-файли лежать в тій же директорії, що і компілятор (або розпаковуються з архіву, див. bundle.py)
+    runtime_name = {'cpp': 'ignis_runtime.cpp', 'c': 'ignis_runtime.c'}.get(args.target)
+    if runtime_name and not (cpp_runtime_dir() / runtime_name).exists():
+        print(f"Error: Runtime file not found at '{cpp_runtime_dir() / runtime_name}'")
+        return 1
 
     # ### MODIFIED ###: Назви проміжних файлів тепер залежать від цілі
     if args.target == 'asm':
         intermediate_ext = '.asm'
         object_ext = '.o'
+    elif args.target == 'c':
+        intermediate_ext = '.c'
+        object_ext = '.o'
     else:  # cpp
         intermediate_ext = '.cpp'
         object_ext = '.o'  # g++ також створює .o файли
@@ -85,76 +387,198 @@ def main():
     obj_file_path = build_dir / (output_base_path.name + object_ext)
     executable_path = output_base_path
 
+    # ### NEW ###: Кеш збірки. Ключ - вміст файлу, ціль, прапорці, що впливають на результат,
+    # та версії компілятора й зовнішніх інструментів.
+    cache = None if args.no_cache else BuildCache(output_base_path.parent / '.build' / 'cache')
+    # ### NEW ###: Вимір фаз компіляції (--time-report / --time-trace)
+    timer = PhaseTimer(enabled=bool(args.time_report or args.time_trace))
+
     print(f"--- Compiling {input_path} (Target: {args.target.upper()}) ---")
+    reporter = None
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            source_code = f.read()
+        with timer.phase('read'):
+            if args.from_ast:
+                # ### NEW ###: Вхід - збережений AST: вихідний код і режим Вахтера беруться з нього
+                with open(input_path, 'rb') as f:
+                    ast_payload = import_ast(f.read())
+                source_code = ast_payload['source']
+                args.warden_checks = ast_payload['warden_mode']
+            else:
+                with open(input_path, 'r', encoding='utf-8') as f:
+                    source_code = f.read()
 
-        reporter = ErrorReporter(str(input_path), source_code.split('\n'))
-        generated_code = compile_source(source_code, str(input_path), reporter, args.target)
-        if reporter.had_error: sys.exit(1)
+        # ### NEW ###: --incremental працює з AST, тож без явного --ir код для нього генерується без IR
+        wants_incremental = (args.incremental and cache is not None and args.emit_ast is None
+                             and args.target in ('asm', 'cpp'))
+        # ### NEW ###: --ir - код генерується з SSA IR (--dump-ir також друкує сам IR, тож кеш не підходить)
+        use_ir = (not (args.no_ir or wants_incremental) or args.ir or args.dump_ir is not None
+                  or args.inline_threshold is not None or args.target == 'vm')
+        if wants_incremental and not use_ir:
+            # Програма, якій потрібне усунення хвостових викликів, тут може переповнити стек
+            print("  [!] --incremental generates code from the AST: tail calls are not eliminated "
+                  "and the IR optimizations are skipped")
+        cache_key, cached = None, {}
+        if cache is not None:
+            with timer.phase('cache'):
+                cache_key = cache.make_key(source_code, args.target, cache_flags(args.warden_checks, args.opt_level,
+                                                                                 use_ir, args.inline_threshold))
+                cached = cache.lookup(cache_key) or {}
+        if args.dump_ir is not None: cached = {}
 
-        with open(intermediate_file_path, 'w') as f:
-            f.write(generated_code)
-        print(f"  [+] Intermediate code saved to {intermediate_file_path}")
+        if 'executable' in cached and not (args.S or args.c or args.emit_ast is not None):
+            shutil.copy2(cached['executable'], executable_path)
+            if write_intermediate:
+                # Інкрементна збірка C++ кешує лише об'єктні файли одиниць, цілого проміжного коду в кеші немає
+                if 'generated' in cached: shutil.copy2(cached['generated'], intermediate_file_path)
+                else: print("  [!] Intermediate code is not cached for this build, nothing to keep (-k)")
+            print(f"  [+] Up to date, executable restored from cache to {executable_path}")
+            print(f"\n--- Compilation successful! ---\nRun '{run_hint(args, executable_path)}' to see the result.")
+            return 0
+
+        # ### NEW ###: --incremental - код генерується (і для C++ компілюється) окремо для кожної функції
+        incremental = wants_incremental and not use_ir
+        if args.incremental and cache is None: print("  [!] --incremental needs the build cache, doing a full build")
+        if wants_incremental and use_ir: print("  [!] --incremental works on the AST, --ir does a full build")
+        if args.incremental and args.target in ('c', 'vm'):
+            print(f"  [!] --incremental is not supported for the '{args.target}' target, doing a full build")
+        if incremental: from incremental import generate_asm_incremental, build_cpp_incremental
+        if 'generated' in cached and args.emit_ast is None and not (incremental and args.target == 'cpp'):
+            with open(cached['generated'], 'r', encoding='utf-8') as f:
+                generated_code = f.read()
+            print("  [+] Intermediate code restored from cache")
+        else:
+            source_path = ast_payload['source_path'] if args.from_ast else str(input_path)
+            reporter = ErrorReporter(source_path, source_code.split('\n'), args.max_errors)
+            if args.from_ast:
+                ast, warden_stats = ast_payload['tree'], ast_payload['warden_stats']
+            else:
+                ast, warden_stats = cached_frontend(source_code, source_path, reporter, args.warden_checks, cache, timer)
+                if reporter.had_error: report_failure(reporter); return 1
+                reporter.flush()
+
+            if args.emit_ast is not None:
+                ast_path = Path(args.emit_ast) if args.emit_ast else output_base_path.with_suffix(AST_SUFFIX)
+                with open(ast_path, 'wb') as f:
+                    f.write(export_ast(ast, source_path, source_code, args.warden_checks, warden_stats))
+                print(f"  [+] Checked AST saved to {ast_path}")
+                print("\n--- Compilation stopped after the front end (--emit-ast) ---")
+                return 0
+
+            if args.target in ('cpp', 'c', 'vm'):
+                report_warden_stats(warden_stats, args.warden_checks)
+            report_bounds_stats(getattr(ast, 'bounds_stats', None))
+            if incremental and args.target == 'cpp':
+                generated_code = None  # одиниці трансляції генеруються під час компіляції нижче
+            elif incremental:
+                with timer.phase('codegen'):
+                    generated_code, rebuilt, total = generate_asm_incremental(ast, reporter, cache)
+                print(f"  [+] Incremental: {rebuilt}/{total} functions regenerated")
+            else:
+                generated_code = generate_code(ast, reporter, args.target, timer, use_ir, args.dump_ir,
+                                               args.inline_threshold)
+            if reporter.had_error: report_failure(reporter); return 1
+            reporter.flush()
+            if cache is not None and generated_code is not None and args.target != 'vm':
+                cache.store_text(cache_key, 'generated', generated_code)
+
+        if write_intermediate and generated_code is not None:
+            with open(intermediate_file_path, 'w') as f:
+                f.write(generated_code)
+            print(f"  [+] Intermediate code saved to {intermediate_file_path}")
 
         # ### MODIFIED ###: Розділяємо логіку збірки для ASM та CPP
         if args.target == 'asm':
             # Старий процес збірки через nasm та ld
-            if args.S: print("\n--- Compilation stopped after assembly generation (-S) ---"); sys.exit(0)
+            if args.S: print("\n--- Compilation stopped after assembly generation (-S) ---"); return 0
 
-            print("--- Assembling with NASM ---")
-            subprocess.run(['nasm', '-f', 'elf64', '-o', obj_file_path, intermediate_file_path], check=True)
-            print(f"  [+] Object file saved to {obj_file_path}")
-            if args.c: print("\n--- Compilation stopped after assembling (-c) ---"); sys.exit(0)
+            if 'object' in cached:
+                shutil.copy2(cached['object'], obj_file_path)
+                print(f"  [+] Object file restored from cache to {obj_file_path}")
+            else:
+                print("--- Assembling with NASM ---")
+                with timer.phase('nasm'):
+                    run_tool(['nasm', '-f', 'elf64', '-o', obj_file_path, intermediate_file_path], capture_tools)
+                print(f"  [+] Object file saved to {obj_file_path}")
+                if cache is not None: cache.store(cache_key, {'object': obj_file_path})
+            if args.c: print("\n--- Compilation stopped after assembling (-c) ---"); return 0
 
             print("--- Linking with LD ---")
-            subprocess.run(['ld', '-o', executable_path, obj_file_path], check=True)
+            with timer.phase('ld'):
+                run_tool(['ld', '-o', executable_path, obj_file_path], capture_tools)
             print(f"  [+] Executable file saved to {executable_path}")
+            if cache is not None: cache.store(cache_key, {'executable': executable_path})
 
 
         elif args.target == 'cpp':
             print("--- Compiling with g++ ---")
 
-            runtime_dir = script_dir / 'cpp_runtime'
-            runtime_cpp_path = runtime_dir / 'ignis_runtime.cpp'
+            runtime_cpp_path = cpp_runtime_dir() / 'ignis_runtime.cpp'
 
             if not runtime_cpp_path.exists():
                 print(f"Error: Runtime file not found at '{runtime_cpp_path}'")
-                sys.exit(1)
+                return 1
 
-            include_path_arg = f"-I{runtime_dir}"
+            if generated_code is None:
+                with timer.phase('g++'):
+                    rebuilt, total = build_cpp_incremental(ast, reporter, cache, executable_path, args.opt_level,
+                                                           build_dir / 'units', args.keep_files, capture_tools,
+                                                           warden_checks=args.warden_checks)
+                if reporter.had_error: report_failure(reporter); return 1
+                reporter.flush()
+                print(f"  [+] Incremental: {rebuilt}/{total} functions recompiled")
+            else:
+                with timer.phase('g++'):
+                    compile_cpp(generated_code, executable_path, args.opt_level,
+                                cache_root=cache.root if cache is not None else None,
+                                source_path=intermediate_file_path if write_intermediate else None,
+                                capture=capture_tools, warden_checks=args.warden_checks)
 
-            compile_command = [
-                'g++',
-                '-std=c++17',
-                include_path_arg,  # Тепер це правильний аргумент, наприклад: "-I/path/to/ignis/cpp_runtime"
-                '-o', str(executable_path),
-                str(intermediate_file_path),
-                str(runtime_cpp_path)
-            ]
-            subprocess.run(compile_command, check=True)
+            print(f"  [+] Executable file saved to {executable_path}")
+            if cache is not None: cache.store(cache_key, {'executable': executable_path})
 
+        elif args.target == 'c':
+            # ### NEW ###: Згенерований C11 компілює cc (gcc або clang) разом з рантаймом ignis_runtime.c
+            print("--- Compiling with cc ---")
+            with timer.phase('cc'):
+                compile_c(generated_code, executable_path, args.opt_level,
+                          cache_root=cache.root if cache is not None else None,
+                          source_path=intermediate_file_path if write_intermediate else None,
+                          capture=capture_tools, warden_checks=args.warden_checks)
             print(f"  [+] Executable file saved to {executable_path}")
+            if cache is not None: cache.store(cache_key, {'executable': executable_path})
+
+        elif args.target == 'vm':
+            # ### NEW ###: Байт-код і є результатом збірки: його виконує `ignis run`
+            with open(executable_path, 'wb') as f:
+                f.write(generated_code)
+            print(f"  [+] Bytecode saved to {executable_path}")
+            if cache is not None: cache.store(cache_key, {'executable': executable_path})
 
-        print(f"\n--- Compilation successful! ---\nRun './{executable_path.name}' to see the result.")
+        print(f"\n--- Compilation successful! ---\nRun '{run_hint(args, executable_path)}' to see the result.")
+        return 0
 
     except FileNotFoundError:
         # ### MODIFIED ###: Повідомлення про помилку тепер більш загальне
-        print(f"\nError: A required build tool was not found (e.g., nasm, ld, g++).");
-        sys.exit(1)
+        print(f"\nError: A required build tool was not found (e.g., nasm, ld, g++, cc).");
+        return 1
     except subprocess.CalledProcessError as e:
         print(f"\nAn error occurred during an external command: {e}");
-        sys.exit(1)
-    except Exception as e:
-        if "Compiler error:" in str(e):
-            print(f"\n{e}")
-        else:
-            print("\n--- An unexpected internal compiler error occurred ---")
-            traceback.print_exc()
-            print("------------------------------------------------------")
-        sys.exit(1)
+        return 1
+    except AstFileError as e:
+        print(f"Error: {input_path}: {e}")
+        return 1
+    except (CompilerError, TooManyErrors) as e:
+        # ### MODIFIED ###: Помилки збираються в reporter, тут лише друкуємо все зібране
+        report_failure(reporter, e)
+        return 1
+    except Exception:
+        import traceback
+        print("\n--- An unexpected internal compiler error occurred ---")
+        traceback.print_exc()
+        print("------------------------------------------------------")
+        return 1
     finally:
+        if diagnostics is not None and reporter is not None: diagnostics.extend(reporter.diagnostics)
         if not args.keep_files:
             print("--- Cleaning up intermediate files ---")
             try:
@@ -166,6 +590,30 @@ def main():
                 print("  [+] Cleanup successful.")
             except OSError as e:
                 print(f"  [!] Warning: Could not clean up all intermediate files: {e}")
+        if timer.enabled:
+            timer.stop()
+            report_timings(timer, args, input_path)
+
+
+def main():
+    # ### NEW ###: Підкоманди. `ignis serve` запускає сервер компіляції (див. server.py).
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from server import serve
+        sys.exit(serve(sys.argv[2:]))
+    # `ignis build a.ign b.ign ... -j N` - пакетна збірка багатьох файлів (див. batch.py).
+    if len(sys.argv) > 1 and sys.argv[1] == 'build':
+        from batch import build_many
+        sys.exit(build_many(sys.argv[2:]))
+    # `ignis watch file.ign` - перезбирання після кожної зміни файлу (див. watch.py).
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        from watch import watch
+        sys.exit(watch(sys.argv[2:]))
+    # `ignis run file.ign` - виконання перевіреного AST без g++ і nasm (див. interpreter.py).
+    if len(sys.argv) > 1 and sys.argv[1] == 'run':
+        from interpreter import run
+        sys.exit(run(sys.argv[2:]))
+    args = make_arg_parser().parse_args()
+    sys.exit(build(args))
 
 
 if __name__ == '__main__':
@@ -1,5 +1,21 @@
 from lexer import TokenType, Token
 from ast_nodes import *
+from error import CompilerError
+
+# ### NEW ###: Кортежі операторів будуються один раз, а не в кожному виклику: доступ до члена Enum
+# (TokenType.X) у кілька разів повільніший за звичайний атрибут. Кортеж, а не frozenset:
+# `in` порівнює члени Enum за ідентичністю, без виклику Enum.__hash__, написаного на Python.
+_UNARY_OPS = (TokenType.PLUS, TokenType.MINUS, TokenType.KW_NOT, TokenType.KW_BNOT, TokenType.KW_NNOT,
+              TokenType.KW_NBNOT, TokenType.KW_ADDR, TokenType.KW_DEREF)
+_MULTIPLICATIVE_OPS = (TokenType.MULTIPLY, TokenType.DIVIDE)
+_ADDITIVE_OPS = (TokenType.PLUS, TokenType.MINUS)
+_COMPARISON_OPS = (TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL,
+                   TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.TYPE_EQUAL)
+_BITWISE_AND_OPS = (TokenType.KW_BAND, TokenType.KW_NBAND)
+_BITWISE_XOR_OPS = (TokenType.KW_BXOR, TokenType.KW_NBXOR)
+_BITWISE_OR_OPS = (TokenType.KW_BOR, TokenType.KW_NBOR)
+_LOGICAL_AND_OPS = (TokenType.KW_AND, TokenType.KW_NAND)
+_LOGICAL_OR_OPS = (TokenType.KW_OR, TokenType.KW_NOR, TokenType.KW_XOR, TokenType.KW_XNOR)
 
 
 class Parser:
@@ -8,6 +24,10 @@ class Parser:
         self.reporter = reporter
         self.current_token = self.lexer.get_next_token()
         self.peek_token = self.lexer.get_next_token()
+        # ### NEW ###: Чи є в програмі yield або foreach: лише тоді потрібне опускання генераторів (generators.py)
+        self.uses_generators = False
+        # ### NEW ###: Чи є в програмі масиви чи індексація: лише тоді потрібен аналіз меж (bounds.py)
+        self.uses_arrays = False
 
     def _format_token_type(self, token_type):
         if not token_type: return "<unknown token>"
@@ -35,7 +55,20 @@ class Parser:
         if token.type in (TokenType.KW_INT, TokenType.KW_VOID, TokenType.KW_CHAR, TokenType.IDENTIFIER):
             self.eat(token.type)
             return Type(token, pointer_level)
-        self.reporter.error("PE017", "Expected a base type specifier (e.g., 'int', 'char' or a struct name)", token)
+        if token.type == TokenType.KW_ARRAY:
+            # array<тип елемента, довжина>: довжина - додатний цілий літерал
+            self.uses_arrays = True
+            self.eat(TokenType.KW_ARRAY)
+            self.eat(TokenType.LESS)
+            element = self.type_spec()
+            self.eat(TokenType.COMMA)
+            length_token = self.current_token
+            self.eat(TokenType.INTEGER)
+            if length_token.value <= 0:
+                self.reporter.error("PE021", "Array length must be a positive integer", length_token)
+            self.eat(TokenType.GREATER)
+            return Type(token, pointer_level, element, length_token.value)
+        self.reporter.error("PE017", "Expected a base type specifier (e.g., 'int', 'char', 'array' or a struct name)", token)
 
     def factor(self):
         token = self.current_token
@@ -72,7 +105,15 @@ class Parser:
         else:
             self.reporter.error("PE018", "Invalid factor in expression", token)
 
-        while self.current_token.type == TokenType.DOT:
+        while self.current_token.type in (TokenType.DOT, TokenType.LBRACKET):
+            if self.current_token.type == TokenType.LBRACKET:
+                bracket = self.current_token
+                self.uses_arrays = True
+                self.eat(TokenType.LBRACKET)
+                index_node = self.expr()
+                self.eat(TokenType.RBRACKET)
+                node = IndexExpr(node, index_node, bracket)
+                continue
             self.eat(TokenType.DOT)
             field_node = Var(self.current_token)
             self.eat(TokenType.IDENTIFIER)
@@ -82,17 +123,14 @@ class Parser:
     # ... (методи від unary_expr до expr без змін)
     def unary_expr(self):
         token = self.current_token
-        UNARY_OPS = (TokenType.PLUS, TokenType.MINUS, TokenType.KW_NOT, TokenType.KW_BNOT, TokenType.KW_NNOT,
-                     TokenType.KW_NBNOT, TokenType.KW_ADDR,
-                     TokenType.KW_DEREF)
-        if token.type in UNARY_OPS:
+        if token.type in _UNARY_OPS:
             self.eat(token.type)
             return UnaryOp(op=token, expr=self.unary_expr())
         return self.factor()
 
     def term(self):
         node = self.unary_expr()
-        while self.current_token.type in (TokenType.MULTIPLY, TokenType.DIVIDE):
+        while self.current_token.type in _MULTIPLICATIVE_OPS:
             token = self.current_token
             self.eat(token.type)
             node = BinOp(left=node, op=token, right=self.unary_expr())
@@ -100,7 +138,7 @@ class Parser:
 
     def additive_expr(self):
         node = self.term()
-        while self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
+        while self.current_token.type in _ADDITIVE_OPS:
             token = self.current_token
             self.eat(token.type)
             node = BinOp(left=node, op=token, right=self.term())
@@ -108,9 +146,7 @@ class Parser:
 
     def comparison_expr(self):
         node = self.additive_expr()
-        COMPARISON_OPS = (TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL, TokenType.GREATER,
-                          TokenType.GREATER_EQUAL, TokenType.TYPE_EQUAL)
-        if self.current_token.type in COMPARISON_OPS:
+        if self.current_token.type in _COMPARISON_OPS:
             op = self.current_token
             self.eat(op.type)
             right = self.additive_expr()
@@ -119,8 +155,7 @@ class Parser:
 
     def bitwise_and_expr(self):
         node = self.comparison_expr()
-        BITWISE_AND_OPS = (TokenType.KW_BAND, TokenType.KW_NBAND)
-        while self.current_token.type in BITWISE_AND_OPS:
+        while self.current_token.type in _BITWISE_AND_OPS:
             op = self.current_token
             self.eat(op.type)
             node = BinOp(left=node, op=op, right=self.comparison_expr())
@@ -128,8 +163,7 @@ class Parser:
 
     def bitwise_xor_expr(self):
         node = self.bitwise_and_expr()
-        BITWISE_XOR_OPS = (TokenType.KW_BXOR, TokenType.KW_NBXOR)
-        while self.current_token.type in BITWISE_XOR_OPS:
+        while self.current_token.type in _BITWISE_XOR_OPS:
             op = self.current_token
             self.eat(op.type)
             node = BinOp(left=node, op=op, right=self.bitwise_and_expr())
@@ -137,8 +171,7 @@ class Parser:
 
     def bitwise_or_expr(self):
         node = self.bitwise_xor_expr()
-        BITWISE_OR_OPS = (TokenType.KW_BOR, TokenType.KW_NBOR)
-        while self.current_token.type in BITWISE_OR_OPS:
+        while self.current_token.type in _BITWISE_OR_OPS:
             op = self.current_token
             self.eat(op.type)
             node = BinOp(left=node, op=op, right=self.bitwise_xor_expr())
@@ -146,8 +179,7 @@ class Parser:
 
     def logical_and_expr(self):
         node = self.bitwise_or_expr()
-        LOGICAL_AND_OPS = (TokenType.KW_AND, TokenType.KW_NAND)
-        while self.current_token.type in LOGICAL_AND_OPS:
+        while self.current_token.type in _LOGICAL_AND_OPS:
             op = self.current_token
             self.eat(op.type)
             node = BinOp(left=node, op=op, right=self.bitwise_or_expr())
@@ -155,8 +187,7 @@ class Parser:
 
     def logical_or_expr(self):
         node = self.logical_and_expr()
-        LOGICAL_OR_OPS = (TokenType.KW_OR, TokenType.KW_NOR, TokenType.KW_XOR, TokenType.KW_XNOR)
-        while self.current_token.type in LOGICAL_OR_OPS:
+        while self.current_token.type in _LOGICAL_OR_OPS:
             op = self.current_token
             self.eat(op.type)
             node = BinOp(left=node, op=op, right=self.logical_and_expr())
@@ -208,7 +239,8 @@ class Parser:
         self.eat(TokenType.LPAREN)
         init_node = None
         if self.current_token.type != TokenType.SEMICOLON:
-            if self.current_token.type in (TokenType.KW_INT, TokenType.KW_CHAR, TokenType.KW_MUT, TokenType.KW_PTR) or \
+            if self.current_token.type in (TokenType.KW_INT, TokenType.KW_CHAR, TokenType.KW_MUT, TokenType.KW_PTR,
+                                           TokenType.KW_ARRAY) or \
                     (self.current_token.type == TokenType.IDENTIFIER and self.peek_token.type == TokenType.IDENTIFIER):
                 init_node = self.variable_declaration()
             else:
@@ -226,6 +258,24 @@ class Parser:
         body_node = self.block()
         return ForStmt(init_node, condition_node, increment_node, body_node)
 
+    def foreach_statement(self):
+        self.uses_generators = True
+        self.eat(TokenType.KW_FOREACH)
+        self.eat(TokenType.LPAREN)
+        var_node = Var(self.current_token)
+        self.eat(TokenType.IDENTIFIER)
+        self.eat(TokenType.COMMA)
+        iterable = self.expr()
+        self.eat(TokenType.RPAREN)
+        body = self.block()
+        return ForeachStmt(var_node, iterable, body)
+
+    def yield_statement(self):
+        self.uses_generators = True
+        token = self.current_token
+        self.eat(TokenType.KW_YIELD)
+        return YieldStmt(token, self.expr())
+
     def break_statement(self):
         self.eat(TokenType.KW_BREAK); return BreakStmt()
 
@@ -270,6 +320,7 @@ class Parser:
         if token_type == TokenType.KW_WHILE: return self.while_statement()
         if token_type == TokenType.KW_LOOP: return self.loop_statement()
         if token_type == TokenType.KW_FOR: return self.for_statement()
+        if token_type == TokenType.KW_FOREACH: return self.foreach_statement()
 
         if token_type == TokenType.KW_FREE:
             self.eat(TokenType.KW_FREE)
@@ -279,7 +330,8 @@ class Parser:
             return Free(expr_node)
 
         node = None
-        is_var_decl = (token_type in (TokenType.KW_INT, TokenType.KW_CHAR, TokenType.KW_MUT, TokenType.KW_PTR) or
+        is_var_decl = (token_type in (TokenType.KW_INT, TokenType.KW_CHAR, TokenType.KW_MUT, TokenType.KW_PTR,
+                                      TokenType.KW_ARRAY) or
                        (token_type == TokenType.IDENTIFIER and self.peek_token.type == TokenType.IDENTIFIER))
         if is_var_decl:
             node = self.variable_declaration()
@@ -289,10 +341,12 @@ class Parser:
             node = self.break_statement()
         elif token_type == TokenType.KW_CONTINUE:
             node = self.continue_statement()
+        elif token_type == TokenType.KW_YIELD:
+            node = self.yield_statement()
         else:
             node = self.expr()
             if self.current_token.type == TokenType.ASSIGN:
-                if not isinstance(node, (Var, UnaryOp, MemberAccess)):
+                if not isinstance(node, (Var, UnaryOp, MemberAccess, IndexExpr)):
                     self.reporter.error("PE010", "Invalid assignment target.", self._get_token_from_node(node))
                 node = self.assignment_statement(left_node=node)
         return node
@@ -326,24 +380,28 @@ class Parser:
     def block(self):
         self.eat(TokenType.LBRACE)
         nodes = []
-        while self.current_token.type != TokenType.RBRACE:
-            node = self.statement()
-            nodes.append(node)
-            # Якщо після інструкції йде ';', це звичайна інструкція
-            if self.current_token.type == TokenType.SEMICOLON:
-                self.eat(TokenType.SEMICOLON)
-                # Якщо одразу після ';' йде '}', це може бути порожня інструкція
-                if self.current_token.type == TokenType.RBRACE:
+        while self.current_token.type not in (TokenType.RBRACE, TokenType.EOF):
+            # ### NEW ###: Помилка в інструкції не зупиняє розбір: пропускаємо її до ';' або '}'
+            try:
+                node = self.statement()
+                nodes.append(node)
+                # Якщо після інструкції йде ';', це звичайна інструкція
+                if self.current_token.type == TokenType.SEMICOLON:
+                    self.eat(TokenType.SEMICOLON)
+                    # Якщо одразу після ';' йде '}', це може бути порожня інструкція
+                    if self.current_token.type == TokenType.RBRACE:
+                        break
+                # Якщо після інструкції одразу йде '}', це був вираз, що повертається
+                elif self.current_token.type == TokenType.RBRACE:
                     break
-            # Якщо після інструкції одразу йде '}', це був вираз, що повертається
-            elif self.current_token.type == TokenType.RBRACE:
-                break
-            # Керуючі конструкції не потребують ';' після себе.
-            elif isinstance(node, (ForStmt, LoopStmt, WhileStmt, IfExpr)):
-                pass  # ігноруємо крапку з комою
-            # В іншому випадку, після інструкції має бути ';'
-            else:
-                self.reporter.error("PE001", "Expected ';' after statement", self.current_token)
+                # Керуючі конструкції не потребують ';' після себе.
+                elif isinstance(node, (ForStmt, ForeachStmt, LoopStmt, WhileStmt, IfExpr)):
+                    pass  # ігноруємо крапку з комою
+                # В іншому випадку, після інструкції має бути ';'
+                else:
+                    self.reporter.error("PE001", "Expected ';' after statement", self.current_token)
+            except CompilerError:
+                self.synchronize()
 
         self.eat(TokenType.RBRACE)
         root = Block()
@@ -479,11 +537,40 @@ class Parser:
             self.eat(TokenType.SEMICOLON)
             return var_decl
 
+    def synchronize(self):
+        """
+        Відновлення після помилки: пропускає токени до кінця поточної інструкції чи оголошення -
+        `;` або `}`, що закриває вже відкриту тут дужку (разом з `;` після неї). `}` зовнішнього
+        блоку не поглинається, щоб той блок закрився як зазвичай.
+        """
+        depth = 0
+        while self.current_token.type != TokenType.EOF:
+            token_type = self.current_token.type
+            if token_type == TokenType.SEMICOLON and depth == 0:
+                self.eat(TokenType.SEMICOLON)
+                return
+            if token_type == TokenType.LBRACE:
+                depth += 1
+            elif token_type == TokenType.RBRACE:
+                if depth == 0: return
+                depth -= 1
+                if depth == 0:
+                    self.eat(TokenType.RBRACE)
+                    if self.current_token.type == TokenType.SEMICOLON: self.eat(TokenType.SEMICOLON)
+                    return
+            self.eat(token_type)
+
     def parse(self):
         declarations = []
-        while self.current_token.type != TokenType.EOF: declarations.append(self.declaration())
-        if not declarations: self.reporter.error("PE020", "Source file contains no code (or no 'main' function).",
-                                                 self.current_token)
+        while self.current_token.type != TokenType.EOF:
+            try:
+                declarations.append(self.declaration())
+            except CompilerError:
+                self.synchronize()
+                # `}` без пари на верхньому рівні: synchronize його не поглинає
+                if self.current_token.type == TokenType.RBRACE: self.eat(TokenType.RBRACE)
+        if not declarations and not self.reporter.had_error:
+            self.reporter.error("PE020", "Source file contains no code (or no 'main' function).", self.current_token)
         return Program(declarations)
 
     def function_call(self):
@@ -0,0 +1,158 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+import main as driver
+from build_cache import compiler_hash, tool_version
+
+
+def default_socket_path():
+    if os.environ.get('IGNIS_SOCKET'): return os.environ['IGNIS_SOCKET']
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f'ignis-{os.getuid()}.sock')
+
+
+class ThreadLocalStream(io.TextIOBase):
+    """
+    Замінює sys.stdout/sys.stderr у сервері: запис з потоку, що обробляє запит,
+    потрапляє в буфер цього запиту, а все інше - у справжній потік.
+    Так модулі компілятора можуть і далі просто викликати print().
+    """
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def capture(self, buffer):
+        self.local.buffer = buffer
+
+    def release(self):
+        self.local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer if buffer is not None else self.real).write(text)
+
+    def flush(self):
+        self.real.flush()
+
+
+class CompileRequestHandler(socketserver.StreamRequestHandler):
+    """Один запит - один рядок JSON, одна відповідь - один рядок JSON."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line: return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self._reply({'exit_code': 2, 'output': 'Error: malformed request\n'})
+            return
+        command = request.get('command', 'compile')
+        if command == 'ping':
+            self._reply({'exit_code': 0, 'output': '', 'stats': self.server.stats()})
+        elif command == 'shutdown':
+            self._reply({'exit_code': 0, 'output': 'Server is shutting down\n'})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif command == 'compile':
+            with self.server.slots:
+                self._reply(self.server.compile(request.get('argv', []), request.get('cwd', os.getcwd())))
+        else:
+            self._reply({'exit_code': 2, 'output': f"Error: unknown command '{command}'\n"})
+
+    def _reply(self, response):
+        self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+
+
+def resolve_paths(args, cwd):
+    """Шляхи клієнта відносні до його робочої директорії, а не до директорії сервера."""
+    args.input_file = os.path.join(cwd, args.input_file)
+    if args.output: args.output = os.path.join(cwd, args.output)
+    # '' у --emit-ast - шлях за замовчуванням поруч з результатом, '-' у --dump-ir - stdout
+    if args.emit_ast: args.emit_ast = os.path.join(cwd, args.emit_ast)
+    if args.dump_ir not in (None, '-'): args.dump_ir = os.path.join(cwd, args.dump_ir)
+    if args.time_trace: args.time_trace = os.path.join(cwd, args.time_trace)
+
+
+class CompileServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, workers):
+        self.socket_path = socket_path
+        self.slots = threading.BoundedSemaphore(workers)
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        self.started = time.time()
+        super().__init__(socket_path, CompileRequestHandler)
+
+    def stats(self):
+        with self.lock:
+            served = self.requests_served
+        uptime = time.time() - self.started
+        return {'requests': served, 'uptime': uptime, 'pid': os.getpid()}
+
+    def compile(self, argv, cwd):
+        buffer = io.StringIO()
+        sys.stdout.capture(buffer)
+        sys.stderr.capture(buffer)
+        start = time.perf_counter()
+        exit_code, executable, diagnostics = 1, None, []
+        try:
+            args = driver.make_arg_parser().parse_args(argv)
+            resolve_paths(args, cwd)
+            exit_code = driver.build(args, capture_tools=True, diagnostics=diagnostics)
+            if exit_code == 0 and not (args.S or args.c or args.emit_ast is not None):
+                executable = str(driver.output_path(args))
+        except SystemExit as e:
+            # argparse завершує роботу через SystemExit (напр., на невідомому прапорці або --help)
+            exit_code = e.code if isinstance(e.code, int) else 2
+        except Exception:
+            traceback.print_exc()
+        finally:
+            sys.stdout.release()
+            sys.stderr.release()
+        with self.lock:
+            self.requests_served += 1
+        # diagnostics - ті самі помилки й попередження, що й у виводі, але у структурованому вигляді
+        return {'exit_code': exit_code, 'output': buffer.getvalue(), 'executable': executable,
+                'diagnostics': [diagnostic.to_dict() for diagnostic in diagnostics],
+                'time': time.perf_counter() - start}
+
+
+def warm_up():
+    """Прогріває все, що інакше платить кожен виклик main.py: імпорти, хеш компілятора, версії інструментів."""
+    import codegen, codegen_cpp, codegen_c, ir, ir_opt  # noqa: F401
+    compiler_hash()
+    for target in ('asm', 'cpp', 'c'):
+        tool_version(target)
+
+
+def serve(argv):
+    arg_parser = argparse.ArgumentParser(prog="ignis serve",
+                                         description="Run a persistent Ignis compile server on a Unix socket.")
+    arg_parser.add_argument('--socket', default=default_socket_path(), help='Path of the Unix socket to listen on')
+    arg_parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                            help='Maximum number of concurrent compile requests')
+    args = arg_parser.parse_args(argv)
+
+    if os.path.exists(args.socket): os.unlink(args.socket)
+    warm_up()
+    sys.stdout = ThreadLocalStream(sys.stdout)
+    sys.stderr = ThreadLocalStream(sys.stderr)
+    server = CompileServer(args.socket, args.workers)
+    print(f"--- Ignis compile server listening on {args.socket} (workers: {args.workers}) ---")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket): os.unlink(args.socket)
+        print(f"--- Server stopped after {server.stats()['requests']} requests ---")
+    return 0
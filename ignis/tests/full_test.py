@@ -1,15 +1,48 @@
-import subprocess
-import os
+import argparse
+import difflib
 import glob
+import os
+import re
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- Налаштування ---
 # Директорія з тестовими файлами
 EXAMPLES_DIR = "examples"
-# Директорія для бінарних файлів
+# Директорія для бінарних файлів (окрема піддиректорія для кожної цілі)
 BIN_DIR = os.path.join(EXAMPLES_DIR, "bin")
 # Шлях до компілятора
 COMPILER_PATH = os.path.join("ignis", "main.py")
+# Цілі, які перевіряються за замовчуванням; "run" - виконання без компіляції (`main.py run`),
+# "vm" - байт-код .ignc, який виконує `main.py run`
+TARGETS = ("asm", "cpp", "c", "run", "vm")
+# Ціль, чий еталон підходить, якщо власного немає: C, інтерпретатор і VM повторюють семантику цілі cpp
+GOLDEN_FALLBACK = {"c": "cpp", "run": "cpp", "vm": "cpp"}
+# Приклади, які не мають компілюватися: (приклад, ціль, прапорці). Вивід компілятора (діагностика
+# та підсумок) порівнюється з `<назва>.<мітка>.errors.expected`, напр. `test_syntax_errors.asm.errors.expected`.
+# Помилки бекенду перевіряє лише кодогенератор asm
+ERROR_CASES = [("test_syntax_errors", "asm", ()), ("test_syntax_errors", "asm", ("--max-errors", "3")),
+               ("test_semantic_errors", "asm", ())]
+# Файли, що не є тестами на виконання
+SKIPPED = {name for name, _, _ in ERROR_CASES}
+# Цілі, які приклад не підтримує: глобальні змінні не вміють кодогенератор asm і IR (потрібне VM)
+SKIPPED_TARGETS = {"test_globals": {"asm", "vm"},
+                   # Ціль asm не має рантайму "Вахтера", тож використання після free не зупиняє програму
+                   "test_warden_uaf": {"asm"}}
+# Збирання з додатковими прапорцями: (приклад, ціль, прапорці). Приклад збирається двічі, і друге
+# збирання (з кешу) має дати той самий вивід
+FLAGGED_CASES = [("test_globals", "cpp", ("--incremental", "-k")), ("test_structures", "vm", ("-k",))]
+# Максимальний час виконання однієї програми (секунди)
+RUN_TIMEOUT = 10
+# Множник RUN_TIMEOUT для цілей, які виконує Python, а не процесор: інтерпретатор AST і VM байт-коду
+# у рази повільніші за скомпільований код, а "run" ще й проходить увесь фронтенд
+TIMEOUT_SCALE = {"run": 6, "vm": 4}
+# Коментар у вихідному коді з очікуваним значенням, напр. `print(x); // Expected: 42`
+EXPECTED_COMMENT = re.compile(r"//\s*Expected:\s*(\S+)")
+# Очікувана помилка виконання: програма має завершитися з ненульовим кодом і цим текстом у stderr
+EXPECTED_ERROR_COMMENT = re.compile(r"//\s*Expected error:\s*(.+?)\s*$", re.MULTILINE)
 # Колір для виводу
 GREEN = "\033[92m"
 RED = "\033[91m"
@@ -17,10 +50,219 @@ YELLOW = "\033[93m"
 RESET = "\033[0m"
 
 
+class TestCase:
+    def __init__(self, ign_file, target, flags=(), expect_errors=False):
+        self.ign_file = ign_file
+        self.target = target
+        self.flags = flags
+        # Компіляція має завершитися помилками (ERROR_CASES)
+        self.expect_errors = expect_errors
+        # Напр., "cpp+incremental+k"; окрема директорія, щоб не заважати звичайному збиранню
+        self.label = "+".join([target, *(flag.lstrip("-") for flag in flags)])
+        # Назва файлу без розширення (напр., "test_memmanag")
+        self.base_name = os.path.splitext(os.path.basename(ign_file))[0]
+        self.executable_path = os.path.join(BIN_DIR, self.label,
+                                            self.base_name + (".ignc" if target == "vm" else ""))
+        self.status = "pending"
+        self.stage = ""
+        self.message = ""
+        self.compile_time = 0.0
+        self.run_time = 0.0
+
+
+def golden_path(ign_file, target):
+    """
+    Еталонний вивід лежить поруч з прикладом: `<назва>.<ціль>.expected` має пріоритет
+    над спільним `<назва>.expected` (бекенди, напр., по-різному друкують переведення рядка).
+    """
+    stem = os.path.splitext(ign_file)[0]
+    for candidate in (target, GOLDEN_FALLBACK.get(target)):
+        target_path = f"{stem}.{candidate}.expected"
+        if candidate is not None and os.path.exists(target_path): return target_path
+    return f"{stem}.expected"
+
+
+def extract_expected(ign_file):
+    """Значення з коментарів `// Expected: ...` у порядку появи у файлі."""
+    with open(ign_file, "r", encoding="utf-8") as f:
+        return EXPECTED_COMMENT.findall(f.read())
+
+
+def extract_expected_error(ign_file):
+    """Текст з коментаря `// Expected error: ...` або None, якщо програма має завершитися успішно."""
+    with open(ign_file, "r", encoding="utf-8") as f:
+        match = EXPECTED_ERROR_COMMENT.search(f.read())
+    return match.group(1) if match else None
+
+
+def errors_golden_path(case):
+    return f"{os.path.splitext(case.ign_file)[0]}.{case.label}.errors.expected"
+
+
+def check_output(case, output):
+    """Порівнює вивід з еталонним файлом, а якщо його немає - зі значеннями з коментарів."""
+    golden = errors_golden_path(case) if case.expect_errors else golden_path(case.ign_file, case.target)
+    if os.path.exists(golden):
+        with open(golden, "r", encoding="utf-8") as f:
+            expected = f.read()
+        if output == expected: return True
+        diff = difflib.unified_diff(expected.splitlines(keepends=True), output.splitlines(keepends=True),
+                                    fromfile=golden, tofile="actual")
+        case.message = "".join(diff)
+        return False
+    if case.expect_errors:
+        case.message = f"Golden file {golden} not found (run with --update to create it)"
+        return False
+
+    # Без еталонного файлу: кожне очікуване значення має з'явитися у виводі в тому ж порядку.
+    # Пробіли ігноруються, бо `print` в asm додає переведення рядка, а в C++ - ні.
+    compact = "".join(output.split())
+    position = 0
+    for value in extract_expected(case.ign_file):
+        found = compact.find(value, position)
+        if found < 0:
+            case.message = f"Expected value '{value}' not found in output:\n{output}"
+            return False
+        position = found + len(value)
+    return True
+
+
+def run_case(case, update, no_cache):
+    """Компілює та запускає один приклад для однієї цілі (виконується в пулі потоків)."""
+    if case.target == "run":
+        # Компіляції немає: фронтенд і виконання - один процес, і весь його час іде в "run"
+        run_command = [sys.executable, COMPILER_PATH, "run", case.ign_file]
+        if no_cache: run_command.append("--no-cache")
+    else:
+        os.makedirs(os.path.dirname(case.executable_path), exist_ok=True)
+
+        # --- Етап компіляції ---
+        case.stage = "Компіляція"
+        compile_command = [
+            sys.executable,  # Використовуємо поточний інтерпретатор Python
+            COMPILER_PATH,
+            "-o", case.executable_path,
+            case.ign_file,
+            f"--target={case.target}",
+            *case.flags
+        ]
+        if no_cache or case.expect_errors: compile_command.append("--no-cache")
+        # -S: до асемблера справа не доходить, тож він не потрібен
+        if case.expect_errors: return check_errors(case, compile_command + ["-S"], update)
+        # Випадок з прапорцями збирається вдруге: так перевіряється й шлях влучання в кеш
+        for _ in range(2 if case.flags else 1):
+            start = time.perf_counter()
+            result = subprocess.run(compile_command, capture_output=True, text=True)
+            case.compile_time = time.perf_counter() - start
+            if result.returncode != 0:
+                case.status, case.message = "failed", result.stdout + result.stderr
+                return case
+        # Байт-код виконує сам компілятор
+        run_command = [sys.executable, COMPILER_PATH, "run", case.executable_path] if case.target == "vm" \
+            else [case.executable_path]
+
+    # --- Етап виконання ---
+    case.stage = "Виконання"
+    # Вхідні дані для програми (напр., для getchar) - у файлі `<назва>.stdin` поруч з прикладом
+    stdin_path = os.path.splitext(case.ign_file)[0] + ".stdin"
+    stdin = open(stdin_path, "rb") if os.path.exists(stdin_path) else subprocess.DEVNULL
+    timeout = RUN_TIMEOUT * TIMEOUT_SCALE.get(case.target, 1)
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(run_command, stdin=stdin, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        case.status, case.message = "failed", f"Timed out after {timeout} s"
+        return case
+    finally:
+        if stdin is not subprocess.DEVNULL: stdin.close()
+    case.run_time = time.perf_counter() - start
+    output = result.stdout.decode("utf-8", errors="replace")
+    errors = result.stderr.decode("utf-8", errors="replace")
+    expected_error = extract_expected_error(case.ign_file)
+    if expected_error is not None:
+        if result.returncode == 0 or expected_error not in errors:
+            case.status = "failed"
+            case.message = f"Expected runtime error '{expected_error}', got exit code {result.returncode}\n" \
+                           f"{output}{errors}"
+            return case
+    elif result.returncode != 0:
+        case.status = "failed"
+        case.message = f"Exit code {result.returncode}\n{output}{errors}"
+        return case
+
+    # --- Етап перевірки виводу ---
+    case.stage = "Перевірка виводу"
+    if update:
+        # Вивід бекендів відрізняється, тому оновлюється еталон саме для цієї цілі
+        with open(f"{os.path.splitext(case.ign_file)[0]}.{case.target}.expected", "w", encoding="utf-8") as f:
+            f.write(output)
+        case.status = "updated"
+    elif check_output(case, output):
+        case.status = "ok"
+    else:
+        case.status = "failed"
+    return case
+
+
+def check_errors(case, compile_command, update):
+    """Компіляція має завершитися з ненульовим кодом, а її вивід - збігтися з еталоном."""
+    start = time.perf_counter()
+    result = subprocess.run(compile_command, capture_output=True, text=True)
+    case.compile_time = time.perf_counter() - start
+    if result.returncode == 0:
+        case.status, case.message = "failed", f"Expected compile errors, but compilation succeeded\n{result.stdout}"
+        return case
+
+    case.stage = "Перевірка діагностики"
+    output = result.stdout + result.stderr
+    if update:
+        with open(errors_golden_path(case), "w", encoding="utf-8") as f:
+            f.write(output)
+        case.status = "updated"
+    else:
+        case.status = "ok" if check_output(case, output) else "failed"
+    return case
+
+
+def print_report(cases, wall):
+    failed = [case for case in cases if case.status == "failed"]
+    for case in failed:
+        print(f"\n{RED}!!! Помилка на файлі: {case.ign_file} [{case.label}] !!!{RESET}")
+        print(f"{RED}Етап: {case.stage}{RESET}")
+        print(f"\n--- Повідомлення про помилку ---")
+        print(case.message.rstrip())
+        print("--------------------------------")
+
+    print(f"\n{YELLOW}--- Результати ---{RESET}")
+    name_width = max(len(case.base_name) for case in cases)
+    label_width = max(len(case.label) for case in cases)
+    for case in cases:
+        color = RED if case.status == "failed" else GREEN
+        print(f"  {color}{case.status:<7}{RESET} {case.base_name:<{name_width}}  {case.label:<{label_width}}  "
+              f"compile {case.compile_time * 1000:8.1f} ms  run {case.run_time * 1000:8.1f} ms")
+
+    color = RED if failed else GREEN
+    print(f"\n{color}======================================")
+    print(f"Пройдено {len(cases) - len(failed)}/{len(cases)} тестів за {wall:.2f} s")
+    print(f"======================================{RESET}")
+
+
 def main():
     """
-    Головна функція, що знаходить, компілює та запускає всі .ign тести.
+    Головна функція, що знаходить, компілює та запускає всі .ign тести для кожної цілі
+    паралельно і порівнює вивід з еталонним.
     """
+    arg_parser = argparse.ArgumentParser(description="Run the Ignis example suite.")
+    arg_parser.add_argument("names", nargs="*", help="Run only examples whose name contains one of these strings")
+    arg_parser.add_argument("--target", action="append", choices=TARGETS, dest="targets",
+                            help="Target to test (repeatable, default: all targets)")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                            help="Number of parallel jobs (default: number of CPUs)")
+    arg_parser.add_argument("--update", action="store_true", help="Rewrite .expected files from the actual output")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Compile without the build cache (for honest compile timings)")
+    args = arg_parser.parse_args()
+
     print(f"{YELLOW}--- Запуск повного тестування компілятора Ignis ---{RESET}\n")
 
     # 1. Переконуємось, що компілятор існує
@@ -33,67 +275,36 @@ def main():
     if not test_files:
         print(f"{RED}Помилка: Не знайдено жодного .ign файлу в директорії '{EXAMPLES_DIR}'.{RESET}")
         sys.exit(1)
+    if args.names:
+        test_files = [f for f in test_files if any(name in os.path.basename(f) for name in args.names)]
+    all_files = {os.path.splitext(os.path.basename(f))[0]: f for f in sorted(test_files)}
 
-    # 3. Створюємо директорію для бінарників, якщо її немає
-    os.makedirs(BIN_DIR, exist_ok=True)
-
-    # 4. Проходимо по кожному файлу, компілюємо та запускаємо
-    for ign_file in sorted(test_files):
-        try:
-            # Назва файлу без розширення (напр., "test_memmanag")
-            base_name = os.path.splitext(os.path.basename(ign_file))[0]
-            if base_name == "test_errors":
-                continue
-            # Повний шлях до вихідного бінарного файлу
-            executable_path = os.path.join(BIN_DIR, base_name)
-
-            # --- Етап компіляції ---
-            print(f"[*] Компілюємо: {ign_file}")
-            compile_command = [
-                sys.executable,  # Використовуємо поточний інтерпретатор Python
-                COMPILER_PATH,
-                "-k",  # Зберігати проміжні файли
-                "-o", executable_path,
-                ign_file,
-                "--target=cpp"
-            ]
-
-            # Запускаємо компілятор
-            subprocess.run(compile_command, check=True, capture_output=True, text=True)
-            print(f"{GREEN}[✓] Компіляція успішна!{RESET}\n")
-
-            # --- Етап виконання ---
-            print(f"[*] Запускаємо: {executable_path}")
-
-            # Запускаємо скомпільований файл
-            run_result = subprocess.run([executable_path], check=True, capture_output=True, text=True)
-            print(f"{GREEN}[✓] Виконання успішне!{RESET}")
-
-            # Виводимо результат роботи програми
-            if run_result.stdout:
-                print("--- Вивід програми ---")
-                print(run_result.stdout.strip())
-                print("----------------------\n")
-
-        except subprocess.CalledProcessError as e:
-            # Якщо компіляція або запуск провалились
-            print(f"\n{RED}!!! Помилка на файлі: {ign_file} !!!{RESET}")
-            #if "Компілюємо" in e.args[0]:  # Heuristic to check if it was compile time
-            if 1 == e.args[0]:  # Heuristic to check if it was compile time
-                print(f"{RED}Етап: Компіляція{RESET}")
-            else:
-                print(f"{RED}Етап: Виконання{RESET}")
-
-            # Виводимо stderr, щоб було зрозуміло, що пішло не так
-            print(f"\n--- Повідомлення про помилку ---")
-            print(e.stderr)
-            print("--------------------------------\n")
-            sys.exit(1)  # Зупиняємо весь процес
-
-    print(f"\n{GREEN}======================================")
-    print(f"🎉 Всі {len(test_files)} тестів успішно пройдено! 🎉")
-    print(f"======================================{RESET}")
+    # 3. Кожна пара (файл, ціль) - окреме завдання в пулі
+    targets = args.targets or TARGETS
+    by_name = {name: ign_file for name, ign_file in all_files.items() if name not in SKIPPED}
+    cases = [TestCase(ign_file, target) for name, ign_file in by_name.items() for target in targets
+             if target not in SKIPPED_TARGETS.get(name, ())]
+    cases += [TestCase(by_name[name], target, flags) for name, target, flags in FLAGGED_CASES
+              if name in by_name and target in targets]
+    cases += [TestCase(all_files[name], target, flags, expect_errors=True) for name, target, flags in ERROR_CASES
+              if name in all_files and target in targets]
+    if not cases:
+        print(f"{RED}Помилка: Жоден тест не відповідає фільтру.{RESET}")
+        sys.exit(1)
+    print(f"[*] {len(cases)} тестів, {args.jobs} паралельних завдань")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run_case, case, args.update, args.no_cache) for case in cases]
+        for future in as_completed(futures):
+            case = future.result()
+            color = RED if case.status == "failed" else GREEN
+            print(f"{color}[{'✗' if case.status == 'failed' else '✓'}]{RESET} {case.ign_file} [{case.label}]")
+    wall = time.perf_counter() - start
+
+    print_report(cases, wall)
+    sys.exit(1 if any(case.status == "failed" for case in cases) else 0)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
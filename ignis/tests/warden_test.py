@@ -0,0 +1,158 @@
+"""
+Перевірка "Вахтера" (warden.py): скільки місць розіменування знайдено в кожній функції і скільки
+перевірок прибрано для кожного режиму --warden-checks, а також що звертання після free на кожному
+виді потоку керування, який розбирає аналіз, зберігає перевірку.
+
+    python3 ignis/tests/warden_test.py
+"""
+import os
+import sys
+
+IGNIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, IGNIS_DIR)
+
+from ast_nodes import AST, MemberAccess  # noqa: E402
+from error import ErrorReporter  # noqa: E402
+from main import run_frontend  # noqa: E402
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(IGNIS_DIR), "examples")
+GREEN = "\033[92m"
+RED = "\033[91m"
+RESET = "\033[0m"
+
+# Виклик функції користувача може звільнити будь-що, тож після touch() ключ box перевіряється знову
+CALL_PROGRAM = """
+struct Box { int value; }
+void touch() { }
+int read_twice(ptr Box box) {
+    mut int total = box.value;
+    total = total + box.value;
+    touch();
+    total + box.value
+}
+int main() {
+    mut ptr Box box = new Box;
+    box.value = 3;
+    print(read_twice(box));
+    free(box);
+    return 0;
+}
+"""
+
+# (назва, вихідний код, режим, очікувана статистика {функція: {'sites', 'elided'}})
+CASES = [
+    ("call kills keys", CALL_PROGRAM, "full",
+     {"touch": {"sites": 0, "elided": 0}, "read_twice": {"sites": 3, "elided": 0}, "main": {"sites": 1, "elided": 0}}),
+    ("call kills keys", CALL_PROGRAM, "elided",
+     {"touch": {"sites": 0, "elided": 0}, "read_twice": {"sites": 3, "elided": 1}, "main": {"sites": 1, "elided": 1}}),
+    ("call kills keys", CALL_PROGRAM, "off",
+     {"touch": {"sites": 0, "elided": 0}, "read_twice": {"sites": 3, "elided": 3}, "main": {"sites": 1, "elided": 1}}),
+    # Чотири звертання до щойно створеного box прибираються, звертання після free - ні
+    ("test_warden_uaf.ign", None, "elided", {"main": {"sites": 6, "elided": 4}}),
+]
+
+# Програми, де поле probe читається, коли box уже може бути звільнено: у режимі elided
+# кожне таке звертання мусить зберегти перевірку
+PROBE_PRELUDE = """
+struct Box { int value; int probe; }
+void release(ptr Box box) { free(box); }
+"""
+SOUNDNESS_CASES = [
+    # Ключ перевірено лише в гілці else: після if він дійсний не на всіх шляхах
+    ("if/else meet", """
+int main() {
+    int flag = getchar();
+    mut ptr Box box = new Box;
+    free(box);
+    if (flag > 0) { putchar('a'); } else { box.value = 2; }
+    print(box.probe);
+    return 0;
+}
+"""),
+    # На першому проході ключ дійсний, але free у кінці тіла робить його недійсним на наступній ітерації
+    ("loop fixed point", """
+int main() {
+    mut ptr Box box = new Box;
+    box.value = 1;
+    mut int i = 0;
+    while (i < 3) {
+        print(box.probe);
+        free(box);
+        i = i + 1;
+    }
+    return 0;
+}
+"""),
+    # Права частина `and` може не виконатися, тож її перевірка нічого не доводить
+    ("short-circuit", """
+int main() {
+    int flag = getchar();
+    mut ptr Box box = new Box;
+    free(box);
+    if (flag and box.value > 0) { putchar('a'); }
+    print(box.probe);
+    return 0;
+}
+"""),
+    # Функція користувача може звільнити будь-що, зокрема й переданий їй ключ
+    ("free in callee", """
+int main() {
+    mut ptr Box box = new Box;
+    box.value = 1;
+    release(box);
+    print(box.probe);
+    return 0;
+}
+"""),
+]
+
+
+def analyze(source_code, file_path, mode):
+    """(AST, статистика Вахтера) або (None, None), якщо програма не пройшла фронтенд."""
+    reporter = ErrorReporter(file_path, source_code.split("\n"))
+    ast, stats = run_frontend(source_code, file_path, reporter, mode)
+    if reporter.had_error:
+        reporter.flush()
+        return None, None
+    return ast, stats
+
+
+def probe_sites(node):
+    """Усі звертання `<вказівник>.probe` у дереві."""
+    if isinstance(node, MemberAccess) and node.right.value == "probe": yield node
+    for value in vars(node).values():
+        for item in value if isinstance(value, list) else [value]:
+            if isinstance(item, AST): yield from probe_sites(item)
+
+
+def main():
+    failed = 0
+    for name, source_code, mode, expected in CASES:
+        if source_code is None:
+            file_path = os.path.join(EXAMPLES_DIR, name)
+            with open(file_path, "r", encoding="utf-8") as f:
+                source_code = f.read()
+        else:
+            file_path = f"<{name}>"
+        _, stats = analyze(source_code, file_path, mode)
+        if stats == expected:
+            print(f"{GREEN}[✓]{RESET} {name} [{mode}]")
+        else:
+            failed += 1
+            print(f"{RED}[✗]{RESET} {name} [{mode}]\n    expected {expected}\n    actual   {stats}")
+
+    for name, source_code in SOUNDNESS_CASES:
+        ast, _ = analyze(PROBE_PRELUDE + source_code, f"<{name}>", "elided")
+        sites = list(probe_sites(ast)) if ast is not None else []
+        if sites and all(site.warden_check for site in sites):
+            print(f"{GREEN}[✓]{RESET} {name}: the access after free keeps its check")
+        else:
+            failed += 1
+            print(f"{RED}[✗]{RESET} {name}: the access after free lost its check")
+    total = len(CASES) + len(SOUNDNESS_CASES)
+    print(f"\n{total - failed}/{total} passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
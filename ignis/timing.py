@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from ast_nodes import AST
+from lexer import TokenType
+
+TIME_REPORT_FORMATS = ('table', 'json')
+
+# tracemalloc (разом з pickle, linecache) і json імпортуються лише в увімкненому таймері:
+# вимкнений створюється в кожній збірці й не повинен сповільнювати старт.
+
+
+class TokenList:
+    """
+    Заздалегідь розібраний потік токенів. Парсер тягне токени з лексера по одному,
+    тож щоб виміряти фази окремо, лексер проганяється до кінця, а парсер читає з цього списку.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def get_next_token(self):
+        token = self.tokens[min(self.pos, len(self.tokens) - 1)]
+        self.pos += 1
+        return token
+
+
+def tokenize(lexer):
+    tokens = []
+    while True:
+        token = lexer.get_next_token()
+        tokens.append(token)
+        if token.type == TokenType.EOF: return tokens
+
+
+def count_nodes(node):
+    count = 1
+    for value in node.__dict__.values():
+        if isinstance(value, list):
+            count += sum(count_nodes(item) for item in value if isinstance(item, AST))
+        elif isinstance(value, AST):
+            count += count_nodes(value)
+    return count
+
+
+def _cpu_time():
+    # Власний час процесу плюс час дочірніх процесів (g++, nasm, ld), що вже завершились.
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class PhaseTimer:
+    """
+    Записує для кожної фази компіляції час (реальний та процесорний) і пікове
+    споживання пам'яті за tracemalloc. Фази не вкладаються одна в одну.
+    Вимкнений таймер нічого не вимірює, тож його можна передавати завжди.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = []
+        self.counters = {}
+        self.origin = time.perf_counter()
+        self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        cpu_start = _cpu_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            cpu = _cpu_time() - cpu_start
+            peak = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            self.phases.append({'name': name, 'start': start - self.origin, 'wall': wall, 'cpu': cpu, 'peak': peak})
+
+    def count(self, name, value):
+        if self.enabled: self.counters[name] = value
+
+    def stop(self):
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self, file_path, target):
+        return {
+            'file': str(file_path),
+            'target': target,
+            'phases': [{'name': p['name'], 'wall_ms': round(p['wall'] * 1000, 3), 'cpu_ms': round(p['cpu'] * 1000, 3),
+                        'peak_kb': round(p['peak'] / 1024, 1)} for p in self.phases],
+            'total_wall_ms': round(sum(p['wall'] for p in self.phases) * 1000, 3),
+            'total_cpu_ms': round(sum(p['cpu'] for p in self.phases) * 1000, 3),
+            'counters': dict(self.counters),
+        }
+
+    def print_table(self, file_path):
+        total_wall = sum(p['wall'] for p in self.phases) or 1e-9
+        print(f"--- Time report for {file_path} ---")
+        print(f"  {'Phase':<12} {'Wall (ms)':>10} {'CPU (ms)':>10} {'%':>6} {'Peak mem (KB)':>14}")
+        for p in self.phases:
+            print(f"  {p['name']:<12} {p['wall'] * 1000:10.2f} {p['cpu'] * 1000:10.2f} "
+                  f"{p['wall'] / total_wall * 100:6.1f} {p['peak'] / 1024:14.1f}")
+        print(f"  {'total':<12} {total_wall * 1000:10.2f} {sum(p['cpu'] for p in self.phases) * 1000:10.2f}")
+        for name, value in self.counters.items():
+            print(f"  {name}: {value}")
+
+    def write_chrome_trace(self, path, file_path):
+        """Файл у форматі Trace Event (chrome://tracing, Perfetto): одна подія "X" на фазу."""
+        import json
+
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                   'args': {'name': f'ignis {file_path}'}}]
+        for p in self.phases:
+            events.append({'name': p['name'], 'cat': 'compile', 'ph': 'X', 'pid': pid, 'tid': tid,
+                           'ts': round(p['start'] * 1e6, 3), 'dur': round(p['wall'] * 1e6, 3),
+                           'args': {'cpu_ms': round(p['cpu'] * 1000, 3), 'peak_kb': round(p['peak'] / 1024, 1)}})
+        if self.counters:
+            events.append({'name': 'counters', 'ph': 'C', 'pid': pid, 'tid': tid, 'ts': 0, 'args': self.counters})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
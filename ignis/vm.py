@@ -0,0 +1,441 @@
+"""
+Байт-код Ignis (`--target vm`, файли .ignc) і регістрова віртуальна машина, що його виконує.
+
+Байт-код генерується з оптимізованого SSA IR (codegen_vm.py), тож має ті самі згортання
+констант, CSE, винесення інваріантів, вбудовування та хвостові виклики, що й цілі з --ir.
+Операнди інструкцій - номери регістрів кадру. Константи лежать у своїх регістрах від початку
+виклику (шаблон кадру), тож окремих інструкцій для них немає. Кадр: r0 - адреса ділянки
+пам'яті функції (для alloca), r1..rN - параметри, далі константи, значення IR і тимчасові.
+
+Формат .ignc (усі числа little-endian):
+    MAGIC, u16 FORMAT_VERSION
+    пул констант: u32 кількість; для кожної u8 вид (0 - i64, 1 - рядок: u32 довжина, байти)
+    u32 кількість функцій; для кожної: u16 довжина імені, ім'я (utf-8), u16 параметрів,
+        u32 регістрів, u32 розмір пам'яті кадру, u32 констант і пари (u32 регістр, u32 номер
+        в пулі), u32 кількість слів коду, слова i64
+    u32 номер main
+Код - масив i64: номер операції, за ним її операнди (OPERANDS). У CALL і TAILCALL за номером
+функції йдуть кількість аргументів і регістри аргументів.
+
+Під час завантаження код декодується в список кортежів (op, a, b, c). Цикл диспетчеризації
+розбирає переходи, виклики та найчастіші операції з даними на місці, решту - через таблицю
+обробників HANDLERS.
+Виклики не використовують стек Python: кадри лежать у списку, глибину обмежує CALL_DEPTH_LIMIT.
+Пам'ять, "Вахтер" і повідомлення `Runtime error: ...` - ті самі, що в інтерпретаторі AST.
+
+    python3 ignis/main.py program.ign --target vm        # -> program.ignc
+    python3 ignis/main.py run program.ignc
+"""
+import struct
+import sys
+from array import array
+
+from interpreter import Memory, IgnisRuntimeError, NULL_GUARD, RUNTIME_ERRORS, report_runtime_error
+
+MAGIC = b'IGNC'
+FORMAT_VERSION = 2
+BYTECODE_SUFFIX = '.ignc'
+# Глибша рекурсія - помилка "Stack overflow", як переповнення стека в скомпільованій програмі
+CALL_DEPTH_LIMIT = 1_000_000
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+_INT64, _CHAR = struct.Struct('<q'), struct.Struct('<b')
+_BYTES = [bytes((value,)) for value in range(256)]
+
+# --- Набір інструкцій ---
+
+# Операції з даними йдуть першими, переходи й виклики - від JUMP: цикл відрізняє їх одним порівнянням
+(MOV, ADD, ADDI, SUB, MUL, MULI, DIV, AND, OR, XOR,
+ EQ, NE, LT, LE, GT, GE, NEG, NOT, BNOT, BOOL, TRUNC,
+ LOADQ, LOADB, STOREQ, STOREB, CHECK, BOUNDS, COPY, NEW, ALLOC, FREE, PRINT, PUTCHAR, GETCHAR,
+ JUMP, JT, JF, JEQ, JNE, JLT, JLE, JGT, JGE, CALL, TAILCALL, RET, RETV) = range(47)
+
+OPCODE_NAMES = ('mov', 'add', 'addi', 'sub', 'mul', 'muli', 'div', 'and', 'or', 'xor',
+                'eq', 'ne', 'lt', 'le', 'gt', 'ge', 'neg', 'not', 'bnot', 'bool', 'trunc',
+                'loadq', 'loadb', 'storeq', 'storeb', 'check', 'bounds', 'copy', 'new', 'alloc', 'free',
+                'print', 'putchar', 'getchar',
+                'jump', 'jt', 'jf', 'jeq', 'jne', 'jlt', 'jle', 'jgt', 'jge', 'call', 'tailcall', 'ret', 'retv')
+
+# Операнди кожної операції: r - регістр, i - число, j - номер інструкції, f - номер функції,
+# * - кількість аргументів і їхні регістри
+OPERANDS = {MOV: 'rr', ADDI: 'rri', MULI: 'rri', LOADQ: 'rr', LOADB: 'rr', STOREQ: 'rr', STOREB: 'rr',
+            CHECK: 'rr', BOUNDS: 'rri', COPY: 'rri', NEW: 'ri', ALLOC: 'rr', FREE: 'r', JUMP: 'j', JT: 'rj', JF: 'rj',
+            CALL: 'rf*', TAILCALL: 'f*', RET: 'r', RETV: '', PRINT: 'r', PUTCHAR: 'r', GETCHAR: 'r'}
+OPERANDS.update({op: 'rrr' for op in (ADD, SUB, MUL, DIV, AND, OR, XOR, EQ, NE, LT, LE, GT, GE)})
+OPERANDS.update({op: 'rr' for op in (NEG, NOT, BNOT, BOOL, TRUNC)})
+OPERANDS.update({op: 'rrj' for op in (JEQ, JNE, JLT, JLE, JGT, JGE)})
+
+
+class BytecodeFileError(Exception):
+    """Файл не є байт-кодом Ignis цієї версії або пошкоджений."""
+
+
+class CodeObject:
+    """
+    Функція байт-коду. constants - пари (регістр, номер у пулі); words - код у вигляді слів
+    файлу, code і template заповнює VirtualMachine під час завантаження.
+    """
+    __slots__ = ('name', 'param_count', 'register_count', 'stack_size', 'constants', 'words', 'code', 'template')
+
+    def __init__(self, name, param_count, register_count, stack_size, constants, words):
+        self.name, self.param_count, self.register_count = name, param_count, register_count
+        self.stack_size, self.constants, self.words = stack_size, constants, words
+        self.code, self.template = None, None
+
+
+class Program:
+    """Пул констант (int або bytes рядка з нульовим байтом), функції та номер main."""
+
+    def __init__(self, constants, functions, main):
+        self.constants, self.functions, self.main = constants, functions, main
+
+
+def _wrap(value):
+    return ((value - _INT64_MIN) & 0xFFFFFFFFFFFFFFFF) + _INT64_MIN
+
+
+def _to_char(value):
+    return ((value + 128) & 0xFF) - 128
+
+
+# --- Файл .ignc ---
+
+def dump_program(program):
+    """Program -> вміст файлу .ignc."""
+    out = [MAGIC, struct.pack('<HI', FORMAT_VERSION, len(program.constants))]
+    for value in program.constants:
+        if isinstance(value, bytes):
+            out.append(struct.pack('<BI', 1, len(value)))
+            out.append(value)
+        else:
+            out.append(struct.pack('<Bq', 0, value))
+    out.append(struct.pack('<I', len(program.functions)))
+    for function in program.functions:
+        name = function.name.encode('utf-8')
+        out.append(struct.pack('<H', len(name)))
+        out.append(name)
+        out.append(struct.pack('<HIII', function.param_count, function.register_count, function.stack_size,
+                               len(function.constants)))
+        for register, index in function.constants: out.append(struct.pack('<II', register, index))
+        words = array('q', function.words)
+        if sys.byteorder == 'big': words.byteswap()
+        out.append(struct.pack('<I', len(words)))
+        out.append(words.tobytes())
+    out.append(struct.pack('<I', program.main))
+    return b''.join(out)
+
+
+def is_bytecode(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def load_program(data):
+    """Вміст файлу .ignc -> Program (BytecodeFileError, якщо формат не той)."""
+    if data[:len(MAGIC)] != MAGIC: raise BytecodeFileError("not an Ignis bytecode file")
+    position = len(MAGIC)
+
+    def read(layout):
+        nonlocal position
+        values = struct.unpack_from(layout, data, position)
+        position += struct.calcsize(layout)
+        return values
+
+    def read_bytes(size):
+        nonlocal position
+        if position + size > len(data): raise struct.error("unexpected end of file")
+        position += size
+        return bytes(data[position - size:position])
+
+    try:
+        version, constant_count = read('<HI')
+        if version != FORMAT_VERSION:
+            raise BytecodeFileError(f"bytecode format {version}, this compiler reads format {FORMAT_VERSION}")
+        constants = []
+        for _ in range(constant_count):
+            kind, = read('<B')
+            if kind == 0:
+                constants.append(read('<q')[0])
+            elif kind == 1:
+                constants.append(read_bytes(read('<I')[0]))
+            else:
+                raise BytecodeFileError(f"unknown constant kind {kind}")
+        functions = []
+        for _ in range(read('<I')[0]):
+            name = read_bytes(read('<H')[0]).decode('utf-8')
+            param_count, register_count, stack_size, pair_count = read('<HIII')
+            pairs = [read('<II') for _ in range(pair_count)]
+            words = array('q')
+            words.frombytes(read_bytes(read('<I')[0] * 8))
+            if sys.byteorder == 'big': words.byteswap()
+            functions.append(CodeObject(name, param_count, register_count, stack_size, pairs, words))
+        main, = read('<I')
+    except (struct.error, UnicodeDecodeError) as e:
+        raise BytecodeFileError(f"truncated or corrupted file ({e})")
+    if position != len(data): raise BytecodeFileError("trailing data after the program")
+    if main >= len(functions): raise BytecodeFileError("no 'main' function")
+    return Program(constants, functions, main)
+
+
+def decode(function, function_count):
+    """Слова коду -> список (op, a, b, c); перевіряє номери регістрів, переходів і функцій."""
+    words, code, starts = function.words, [], []
+    position = 0
+    try:
+        while position < len(words):
+            op = words[position]
+            starts.append(len(code))
+            kinds = OPERANDS[op]
+            operands = list(words[position + 1:position + 1 + len(kinds.rstrip('*'))])
+            position += 1 + len(operands)
+            if kinds.endswith('*'):
+                count = words[position]
+                operands.append(tuple(words[position + 1:position + 1 + count]))
+                position += 1 + count
+                if len(operands[-1]) != count: raise IndexError
+            for kind, value in zip(kinds, operands):
+                limit = {'r': function.register_count, 'j': None, 'f': function_count, 'i': None, '*': None}[kind]
+                if kind == '*':
+                    if any(not 0 <= register < function.register_count for register in value): raise IndexError
+                elif limit is not None and not 0 <= value < limit:
+                    raise IndexError
+            code.append((op, *operands, *(0,) * (3 - len(operands))))
+    except (KeyError, IndexError):
+        raise BytecodeFileError(f"malformed code in function '{function.name}'")
+    for instr in code:
+        for kind, value in zip(OPERANDS[instr[0]], instr[1:]):
+            if kind == 'j' and not 0 <= value < len(code):
+                raise BytecodeFileError(f"jump out of function '{function.name}'")
+    return code
+
+
+# --- Обробники рідших операцій: (машина, регістри, a, b, c) ---
+
+def _mul(vm, r, a, b, c):
+    value = r[b] * r[c]
+    r[a] = value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+
+
+def _muli(vm, r, a, b, c):
+    value = r[b] * c
+    r[a] = value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+
+
+def _div(vm, r, a, b, c):
+    dividend, divisor = r[b], r[c]
+    if divisor == 0: raise IgnisRuntimeError("Division by zero")
+    if dividend == _INT64_MIN and divisor == -1: raise IgnisRuntimeError("Integer overflow in division")
+    quotient = abs(dividend) // abs(divisor)
+    r[a] = quotient if (dividend < 0) == (divisor < 0) else -quotient
+
+
+def _sub(vm, r, a, b, c):
+    value = r[b] - r[c]
+    r[a] = value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+
+
+def _storeb(vm, r, a, b, c):
+    address = r[a]
+    if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+    _CHAR.pack_into(vm.memory.data, address, ((r[b] + 128) & 0xFF) - 128)
+
+
+def _neg(vm, r, a, b, c):
+    value = -r[b]
+    r[a] = value if value <= _INT64_MAX else _INT64_MIN
+
+
+def _alloc(vm, r, a, b, c):
+    r[a] = vm.memory.alloc(r[b])
+
+
+def _new(vm, r, a, b, c):
+    r[a] = vm.memory.alloc(b)
+
+
+def _free(vm, r, a, b, c):
+    vm.memory.free(r[a])
+
+
+def _check(vm, r, a, b, c):
+    vm.memory.check(r[b])
+    r[a] = r[b]
+
+
+def _bounds(vm, r, a, b, c):
+    index = r[b]
+    if not 0 <= index < c: raise IgnisRuntimeError(f"Array index out of bounds (index {index}, length {c})")
+    r[a] = index
+
+
+def _copy(vm, r, a, b, c):
+    vm.memory.copy(r[a], r[b], c)
+
+
+def _print(vm, r, a, b, c):
+    vm.stdout.write(b'%d' % r[a])
+
+
+def _putchar(vm, r, a, b, c):
+    vm.stdout.write(_BYTES[r[a] & 0xFF])
+
+
+def _getchar(vm, r, a, b, c):
+    vm.stdout.flush()  # як std::cin, прив'язаний до std::cout
+    data = vm.stdin.read(1)
+    r[a] = _to_char(data[0]) if data else -1
+
+
+def _binary(operation):
+    def handler(vm, r, a, b, c):
+        r[a] = operation(r[b], r[c])
+    return handler
+
+
+def _unary(operation):
+    def handler(vm, r, a, b, c):
+        r[a] = operation(r[b])
+    return handler
+
+
+HANDLERS = [None] * len(OPCODE_NAMES)
+HANDLERS[SUB], HANDLERS[MUL], HANDLERS[MULI], HANDLERS[DIV], HANDLERS[NEG] = _sub, _mul, _muli, _div, _neg
+HANDLERS[STOREB] = _storeb
+HANDLERS[AND] = _binary(lambda x, y: x & y)
+HANDLERS[OR] = _binary(lambda x, y: x | y)
+HANDLERS[XOR] = _binary(lambda x, y: x ^ y)
+HANDLERS[EQ] = _binary(lambda x, y: 1 if x == y else 0)
+HANDLERS[NE] = _binary(lambda x, y: 1 if x != y else 0)
+HANDLERS[LT] = _binary(lambda x, y: 1 if x < y else 0)
+HANDLERS[LE] = _binary(lambda x, y: 1 if x <= y else 0)
+HANDLERS[GT] = _binary(lambda x, y: 1 if x > y else 0)
+HANDLERS[GE] = _binary(lambda x, y: 1 if x >= y else 0)
+HANDLERS[NOT] = _unary(lambda x: 0 if x else 1)
+HANDLERS[BOOL] = _unary(lambda x: 1 if x else 0)
+HANDLERS[BNOT] = _unary(lambda x: ~x)
+HANDLERS[TRUNC] = _unary(_to_char)
+HANDLERS[CHECK], HANDLERS[BOUNDS], HANDLERS[COPY] = _check, _bounds, _copy
+HANDLERS[NEW], HANDLERS[ALLOC], HANDLERS[FREE] = _new, _alloc, _free
+HANDLERS[PRINT], HANDLERS[PUTCHAR], HANDLERS[GETCHAR] = _print, _putchar, _getchar
+
+
+class VirtualMachine:
+    """Завантажена програма: рядки вже в пам'яті, код декодовано, шаблони кадрів готові."""
+
+    def __init__(self, program, stdin=None, stdout=None):
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self.memory = Memory()
+        values = [self.memory.static(value) if isinstance(value, bytes) else value for value in program.constants]
+        self.functions = program.functions
+        for function in self.functions:
+            function.code = decode(function, len(self.functions))
+            if function.param_count >= function.register_count:
+                raise BytecodeFileError(f"function '{function.name}' has fewer registers than parameters")
+            function.template = [0] * function.register_count
+            try:
+                for register, index in function.constants: function.template[register] = values[index]
+            except IndexError:
+                raise BytecodeFileError(f"bad constant in function '{function.name}'")
+        self.main = self.functions[program.main]
+
+    def execute(self):
+        """Викликає main і повертає код завершення процесу."""
+        try:
+            return (self.run(self.main, []) or 0) & 0xFF
+        except RUNTIME_ERRORS as e:
+            return report_runtime_error(e, self.stdout)
+        finally:
+            self.stdout.flush()
+
+    def run(self, function, args):
+        memory = self.memory
+        data, push_frame, pop_frame = memory.data, memory.push_frame, memory.pop_frame
+        unpack_q, unpack_b, pack_q, pack_b = _INT64.unpack_from, _CHAR.unpack_from, _INT64.pack_into, _CHAR.pack_into
+        functions, handlers = self.functions, HANDLERS
+        frames = []  # (функція, код, регістри, pc, регістр результату) тих, хто викликав
+        code, regs, pc = function.code, function.template[:], 0
+        regs[1:1 + len(args)] = args
+        if function.stack_size: regs[0] = push_frame(function.stack_size)
+        while True:
+            op, a, b, c = code[pc]
+            pc += 1
+            # Найчастіші операції розбираються на місці, решта операцій з даними - через таблицю
+            if op < JUMP:
+                if op == MOV:
+                    regs[a] = regs[b]
+                elif op == ADD:
+                    value = regs[b] + regs[c]
+                    regs[a] = value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+                elif op == LOADQ:
+                    address = regs[b]
+                    if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+                    regs[a] = unpack_q(data, address)[0]
+                elif op == ADDI:
+                    value = regs[b] + c
+                    regs[a] = value if _INT64_MIN <= value <= _INT64_MAX else _wrap(value)
+                elif op == STOREQ:
+                    address = regs[a]
+                    if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+                    pack_q(data, address, regs[b])
+                elif op == LOADB:
+                    address = regs[b]
+                    if address < NULL_GUARD: raise IgnisRuntimeError("Invalid memory access", address)
+                    regs[a] = unpack_b(data, address)[0]
+                else:
+                    handlers[op](self, regs, a, b, c)
+            elif op == JUMP:
+                pc = a
+            elif op == JLT:
+                if regs[a] < regs[b]: pc = c
+            elif op == JGE:
+                if regs[a] >= regs[b]: pc = c
+            elif op == JEQ:
+                if regs[a] == regs[b]: pc = c
+            elif op == JNE:
+                if regs[a] != regs[b]: pc = c
+            elif op == JF:
+                if not regs[a]: pc = b
+            elif op == JT:
+                if regs[a]: pc = b
+            elif op == JLE:
+                if regs[a] <= regs[b]: pc = c
+            elif op == JGT:
+                if regs[a] > regs[b]: pc = c
+            elif op == CALL:
+                callee = functions[b]
+                if len(frames) >= CALL_DEPTH_LIMIT: raise RecursionError
+                frames.append((function, code, regs, pc, a))
+                args = [regs[register] for register in c]
+                function, code, regs, pc = callee, callee.code, callee.template[:], 0
+                regs[1:1 + len(args)] = args
+                if callee.stack_size: regs[0] = push_frame(callee.stack_size)
+            elif op == TAILCALL:
+                # Кадр того, хто викликає, звільняється до виклику: аргументи не вказують у нього (ir_opt)
+                callee = functions[a]
+                args = [regs[register] for register in b]
+                if function.stack_size: pop_frame(regs[0], function.stack_size)
+                function, code, regs, pc = callee, callee.code, callee.template[:], 0
+                regs[1:1 + len(args)] = args
+                if callee.stack_size: regs[0] = push_frame(callee.stack_size)
+            else:  # RET, RETV
+                value = regs[a] if op == RET else 0
+                if function.stack_size: pop_frame(regs[0], function.stack_size)
+                if not frames: return value
+                function, code, regs, pc, result = frames.pop()
+                regs[result] = value
+
+
+def run_file(input_path, timer):
+    """`ignis run program.ignc`: завантаження без фронтенду та виконання. Повертає код завершення."""
+    try:
+        with timer.phase('load'):
+            machine = VirtualMachine(load_program(input_path.read_bytes()))
+    except BytecodeFileError as e:
+        print(f"Error: {input_path}: {e}", file=sys.stderr)
+        return 1
+    with timer.phase('run'):
+        return machine.execute()
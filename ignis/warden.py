@@ -0,0 +1,323 @@
+from ast_nodes import *
+from checker import NodeVisitor
+from lexer import TokenType, Token
+from bounds import array_of
+
+
+WARDEN_MODES = ('full', 'elided', 'off')
+
+# Built-ins never touch the heap, so calling them cannot invalidate a key.
+BUILTIN_FUNCTIONS = ('print', 'putchar', 'getchar')
+
+# Operators whose right operand is evaluated only for some values of the left one.
+SHORT_CIRCUIT_OPS = (TokenType.KW_AND, TokenType.KW_OR, TokenType.KW_NAND, TokenType.KW_NOR)
+
+
+class WardenAnalyzer(NodeVisitor):
+    """
+    Static key-safety analysis for the "Warden and Keys" runtime.
+
+    Every dereference through a pointer (`deref p`, `p.field`) is an access site
+    that the Warden checks at runtime. A forward dataflow pass tracks the set of
+    keys that were already validated and cannot have been invalidated since
+    (no `free`, no call into user code, no reassignment of the key). Sites whose
+    key is in that set are marked as elided.
+
+    Results are stored on the AST as `node.warden_check` (True = emit a check).
+    """
+
+    def __init__(self, mode='elided'):
+        self.mode = mode
+        self.struct_fields = {}
+        self.func_types = {}
+        self.symbol_table = {}
+        self.address_taken = set()
+        self.state = set()
+        self.suppress = 0
+        self.loop_stack = []
+        self.current_function = None
+        self.stats = {}
+
+    def analyze(self, tree):
+        self.visit(tree)
+        return self.stats
+
+    # --- Helpers -------------------------------------------------------------
+
+    def _type_of(self, node):
+        if isinstance(node, Var):
+            return self.symbol_table.get(node.value)
+        if isinstance(node, StringLiteral):
+            return Type(Token(TokenType.KW_CHAR, 'char'), 1)
+        if isinstance(node, UnaryOp):
+            base = self._type_of(node.expr)
+            if base is None: return None
+            if node.op.type == TokenType.KW_ADDR: return base.pointer_to()
+            if node.op.type == TokenType.KW_DEREF and base.pointer_level > 0:
+                return base.pointee()
+            return base
+        if isinstance(node, BinOp):
+            left, right = self._type_of(node.left), self._type_of(node.right)
+            if left is not None and left.pointer_level > 0: return left
+            if right is not None and right.pointer_level > 0: return right
+            return left
+        if isinstance(node, MemberAccess):
+            struct_type = self._type_of(node.left)
+            if struct_type is None: return None
+            fields = self.struct_fields.get(struct_type.value, {})
+            return fields.get(node.right.value)
+        if isinstance(node, IndexExpr):
+            array_type = array_of(self._type_of(node.left))
+            return array_type.element if array_type is not None else None
+        if isinstance(node, New):
+            return node.type_node.pointer_to()
+        if isinstance(node, FunctionCall):
+            return self.func_types.get(node.name_node.value)
+        return None
+
+    def _key_of(self, node):
+        """Returns the access path ('p', 'obj.position') that names the key, or None."""
+        if isinstance(node, Var):
+            if node.value in self.address_taken: return None
+            return node.value
+        if isinstance(node, MemberAccess):
+            left_type = self._type_of(node.left)
+            if left_type is None or left_type.pointer_level > 0: return None
+            left_key = self._key_of(node.left)
+            return f"{left_key}.{node.right.value}" if left_key else None
+        if isinstance(node, BinOp) and node.op.type in (TokenType.PLUS, TokenType.MINUS):
+            left_type = self._type_of(node.left)
+            if left_type is not None and left_type.pointer_level > 0: return self._key_of(node.left)
+            right_type = self._type_of(node.right)
+            if right_type is not None and right_type.pointer_level > 0: return self._key_of(node.right)
+        return None
+
+    def _is_pointer_path(self, node):
+        """A dotted key such as `obj.position` whose prefix is reached through a pointer."""
+        while isinstance(node, (MemberAccess, IndexExpr)):
+            left_type = self._type_of(node.left)
+            if left_type is not None and left_type.pointer_level > 0: return True
+            node = node.left
+        return False
+
+    def _kill(self, name):
+        if self.state is None: return
+        self.state = {key for key in self.state if key != name and not key.startswith(name + '.')}
+
+    def _kill_all(self):
+        if self.state is not None: self.state = set()
+
+    def _kill_paths(self):
+        if self.state is not None: self.state = {key for key in self.state if '.' not in key}
+
+    def _validate(self, key):
+        if key is not None and self.state is not None and not self.suppress:
+            self.state.add(key)
+
+    @staticmethod
+    def _meet(a, b):
+        # None stands for "unreachable" and is the identity of the meet.
+        if a is None: return None if b is None else set(b)
+        if b is None: return set(a)
+        return a & b
+
+    def _access(self, site, pointer_expr):
+        key = self._key_of(pointer_expr)
+        stats = self.stats[self.current_function]
+        stats['sites'] += 1
+        if self.mode == 'off':
+            site.warden_check = False
+        elif self.mode == 'full':
+            site.warden_check = True
+        elif key is not None and self.state is not None and key in self.state:
+            site.warden_check = False
+        else:
+            site.warden_check = True
+            self._validate(key)
+        if not site.warden_check:
+            stats['elided'] += 1
+
+    def _has_kill(self, node):
+        if isinstance(node, Free): return True
+        if isinstance(node, FunctionCall) and node.name_node.value not in BUILTIN_FUNCTIONS: return True
+        for value in node.__dict__.values():
+            if isinstance(value, list):
+                if any(isinstance(item, AST) and self._has_kill(item) for item in value): return True
+            elif isinstance(value, AST) and self._has_kill(value):
+                return True
+        return False
+
+    def _collect_address_taken(self, node):
+        if isinstance(node, UnaryOp) and node.op.type == TokenType.KW_ADDR:
+            root = node.expr
+            while isinstance(root, (MemberAccess, IndexExpr)): root = root.left
+            if isinstance(root, Var): self.address_taken.add(root.value)
+        for value in node.__dict__.values():
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, AST): self._collect_address_taken(item)
+            elif isinstance(value, AST):
+                self._collect_address_taken(value)
+
+    def visit_expr(self, node):
+        # C++ leaves the order of operand evaluation unspecified, so inside an
+        # expression that may free memory nothing can be proven; fall back to
+        # checking every site and forget all keys around it.
+        if node is None: return
+        if self._has_kill(node):
+            self._kill_all()
+            self.suppress += 1
+            self.visit(node)
+            self.suppress -= 1
+            self._kill_all()
+        else:
+            self.visit(node)
+
+    # --- Declarations --------------------------------------------------------
+
+    def visit_Program(self, node):
+        for decl in node.declarations:
+            if isinstance(decl, StructDef):
+                self.struct_fields[decl.name] = {f.var_node.value: f.type_node for f in decl.fields}
+            elif isinstance(decl, FunctionDecl):
+                self.func_types[decl.func_name] = decl.type_node
+        for decl in node.declarations:
+            if isinstance(decl, FunctionDecl): self.visit(decl)
+
+    def visit_FunctionDecl(self, node):
+        self.current_function = node.func_name
+        self.stats[node.func_name] = {'sites': 0, 'elided': 0}
+        self.symbol_table = {param.var_node.value: param.type_node for param in node.params}
+        self.address_taken = set()
+        self._collect_address_taken(node.body)
+        self.state = set()
+        self.loop_stack = []
+        self.visit(node.body)
+
+    # --- Statements ----------------------------------------------------------
+
+    def visit_Block(self, node):
+        old_symbol_table = self.symbol_table.copy()
+        for child in node.children:
+            if isinstance(child, (VarDecl, Assign, IfExpr, WhileStmt, LoopStmt, ForStmt, Return, BreakStmt,
+                                  ContinueStmt, Block)):
+                self.visit(child)
+            else:
+                self.visit_expr(child)
+        self.symbol_table = old_symbol_table
+
+    def visit_VarDecl(self, node):
+        self.visit_expr(node.assign_node)
+        name = node.var_node.value
+        self.symbol_table[name] = node.type_node
+        self._kill(name)
+        if isinstance(node.assign_node, (New, Alloc)) and name not in self.address_taken:
+            self._validate(name)
+
+    def visit_Assign(self, node):
+        self.visit_expr(node.right)
+        if isinstance(node.left, Var):
+            self._kill(node.left.value)
+            if isinstance(node.right, (New, Alloc)) and node.left.value not in self.address_taken:
+                self._validate(node.left.value)
+            return
+        self.visit_expr(node.left)
+        # A store through memory may overwrite any pointer held in a struct field.
+        key = self._key_of(node.left)
+        if key is not None: self._kill(key)
+        if self._is_pointer_path(node.left) or isinstance(node.left, UnaryOp): self._kill_paths()
+
+    def visit_Return(self, node):
+        self.visit_expr(node.value)
+        self.state = None
+
+    def visit_BreakStmt(self, node):
+        if self.loop_stack: self.loop_stack[-1]['breaks'].append(self.state)
+        self.state = None
+
+    def visit_ContinueStmt(self, node):
+        if self.loop_stack: self.loop_stack[-1]['continues'].append(self.state)
+        self.state = None
+
+    def visit_IfExpr(self, node):
+        self.visit_expr(node.condition)
+        entry = None if self.state is None else set(self.state)
+        self.visit(node.if_block)
+        then_state = self.state
+        self.state = None if entry is None else set(entry)
+        if node.else_block: self.visit(node.else_block)
+        self.state = self._meet(then_state, self.state)
+
+    def _visit_loop(self, condition, body, increment=None):
+        entry = self.state
+        header = None if entry is None else set(entry)
+        # Sites are re-annotated on every pass; only the final (fixed-point) pass is counted.
+        counters = dict(self.stats[self.current_function])
+        while True:
+            self.stats[self.current_function] = dict(counters)
+            self.state = None if header is None else set(header)
+            self.visit_expr(condition)
+            exit_state = self.state if condition is not None else None
+            self.loop_stack.append({'breaks': [], 'continues': []})
+            self.visit(body)
+            frame = self.loop_stack.pop()
+            for state in frame['continues']: self.state = self._meet(self.state, state)
+            self.visit_expr(increment)
+            new_header = self._meet(entry, self.state)
+            if new_header == header: break
+            header = new_header
+        result = exit_state
+        for state in frame['breaks']: result = self._meet(result, state)
+        self.state = result
+
+    def visit_WhileStmt(self, node):
+        self._visit_loop(node.condition, node.body)
+
+    def visit_LoopStmt(self, node):
+        self._visit_loop(None, node.body)
+
+    def visit_ForStmt(self, node):
+        old_symbol_table = self.symbol_table.copy()
+        if node.init: self.visit(node.init)
+        self._visit_loop(node.condition, node.body, node.increment)
+        self.symbol_table = old_symbol_table
+
+    # --- Expressions ---------------------------------------------------------
+
+    def visit_BinOp(self, node):
+        self.visit(node.left)
+        if node.op.type not in SHORT_CIRCUIT_OPS:
+            self.visit(node.right)
+            return
+        # The right operand may be skipped, so keys it validates hold only on
+        # that path: meet with the state from before it, as for an `if`.
+        skipped = None if self.state is None else set(self.state)
+        self.visit(node.right)
+        self.state = self._meet(skipped, self.state)
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.expr)
+        if node.op.type == TokenType.KW_DEREF:
+            self._access(node, node.expr)
+
+    def visit_MemberAccess(self, node):
+        self.visit(node.left)
+        left_type = self._type_of(node.left)
+        if left_type is not None and left_type.pointer_level > 0:
+            self._access(node, node.left)
+
+    def visit_IndexExpr(self, node):
+        # An element of an array reached through a key (`p[i]`) is an access site like `p.field`.
+        self.visit(node.left)
+        self.visit(node.index)
+        left_type = self._type_of(node.left)
+        if left_type is not None and left_type.pointer_level > 0:
+            self._access(node, node.left)
+
+    def visit_FunctionCall(self, node):
+        for arg in node.args: self.visit(arg)
+        if node.name_node.value not in BUILTIN_FUNCTIONS: self._kill_all()
+
+    def visit_Free(self, node):
+        self.visit(node.expr)
+        self._kill_all()
@@ -0,0 +1,288 @@
+"""
+`ignis watch file.ign` - компілятор лишається в пам'яті й перезбирає файл після кожної зміни.
+
+Зміни виявляються опитуванням mtime (без inotify чи інших залежностей). Між збірками в пам'яті
+зберігаються:
+  - AST (разом з токенами) кожного оголошення верхнього рівня, ключ - його текст: лексер і парсер
+    проходять лише змінені оголошення, а перевірки та аналіз "Вахтера" - усю програму, як завжди;
+  - згенерований код кожної функції (asm) або шлях до її об'єктного файлу в кеші (cpp),
+    з тими ж ключами, що й у --incremental.
+Для кожної зміни друкується час перезбирання; з --run програма після успішної збірки запускається.
+
+    python3 ignis/main.py watch program.ign --target cpp --run
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from ast_nodes import AST, Program
+from lexer import Lexer, Token
+from parser import Parser
+from checker import Checker
+from error import ErrorReporter, CompilerError, TooManyErrors, DEFAULT_MAX_ERRORS
+from warden import WardenAnalyzer, WARDEN_MODES
+from bounds import BoundsAnalyzer
+from build_cache import BuildCache
+from incremental import generate_asm_incremental, build_cpp_incremental
+
+# Інтервал опитування mtime за замовчуванням (секунди)
+DEFAULT_INTERVAL = 0.2
+
+# Те, що важливо для поділу на оголошення: коментарі, рядки та символи (в них можуть бути дужки),
+# самі дужки й `;`; решта - будь-який інший код.
+_SCAN = re.compile(r'''//[^\n]*|/\*|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]|[^\s{};"'/]+|\S''')
+_COMMENT_EDGE = re.compile(r'/\*|\*/')
+# Опускання генераторів (generators.py) переписує тіла функцій на місці, тож закешовані
+# оголошення йому не віддаються: такий код проходить звичайний фронтенд
+_GENERATOR_KEYWORDS = re.compile(r'\b(?:yield|foreach)\b')
+_SEMICOLON_NEXT = re.compile(r'\s*;')
+
+
+def _skip_block_comment(text, pos):
+    """pos - одразу після `/*`. Коментарі вкладаються, як і в лексері."""
+    nesting = 1
+    while nesting > 0:
+        match = _COMMENT_EDGE.search(text, pos)
+        if match is None: return len(text)
+        nesting += 1 if match.group() == '/*' else -1
+        pos = match.end()
+    return pos
+
+
+def split_declarations(source_code):
+    """
+    Ділить вихідний код на шматки по одному оголошенню верхнього рівня: до `;` або до `}`
+    на нульовій глибині дужок. Повертає [(рядок, стовпець, текст)]. Поділ лише текстовий -
+    якщо він помилився, шматок не розбереться, і збірка піде через звичайний фронтенд.
+    """
+    segments = []
+    start, depth, has_code, pos = 0, 0, False, 0
+    line, line_pos = 1, 0  # номер рядка та зсув, для якого він порахований
+    while True:
+        match = _SCAN.search(source_code, pos)
+        if match is None: break
+        token, pos = match.group(), match.end()
+        if token.startswith('//'): continue
+        if token == '/*':
+            pos = _skip_block_comment(source_code, pos)
+            continue
+        has_code = True
+        if token == '{':
+            depth += 1
+            continue
+        if token == '}':
+            depth -= 1
+            # `int g = { ... };` закінчується крапкою з комою, а не дужкою
+            if depth != 0 or _SEMICOLON_NEXT.match(source_code, pos): continue
+        elif token != ';' or depth != 0:
+            continue
+        line += source_code.count('\n', line_pos, start)
+        line_pos = start
+        col = start - (source_code.rfind('\n', 0, start) + 1) + 1
+        segments.append((line, col, source_code[start:pos]))
+        start, has_code = pos, False
+    if has_code:
+        line += source_code.count('\n', line_pos, start)
+        col = start - (source_code.rfind('\n', 0, start) + 1) + 1
+        segments.append((line, col, source_code[start:]))
+    return segments
+
+
+def _shift_lines(value, delta, seen):
+    """Зсуває номери рядків усіх токенів у закешованому AST, якщо оголошення перемістилось."""
+    if isinstance(value, Token):
+        if id(value) not in seen and value.line is not None:
+            seen.add(id(value))
+            value.line += delta
+    elif isinstance(value, AST):
+        for field in vars(value).values(): _shift_lines(field, delta, seen)
+    elif isinstance(value, list):
+        for item in value: _shift_lines(item, delta, seen)
+
+
+class WatchSession:
+    """Стан, що переживає перезбирання: розібрані оголошення та згенерований код."""
+
+    def __init__(self, args):
+        self.args = args
+        self.input_path = Path(args.input_file)
+        self.executable_path = Path(args.output).resolve() if args.output else self.input_path.resolve().with_suffix('')
+        self.build_dir = self.executable_path.parent / '.build' / self.executable_path.stem
+        self.cache = BuildCache(self.executable_path.parent / '.build' / 'cache')
+        self.segments = {}  # (стовпець, текст) -> (рядок, оголошення)
+        self.units = {}  # ключ одиниці --incremental -> код функції / шлях до об'єктного файлу
+        self.last_source = None
+        self.builds = 0
+        self.reporter = None
+
+    def parse(self, source_code, reporter):
+        """Повертає (оголошення, кількість перерозібраних, кількість усіх)."""
+        previous, current = self.segments, {}
+        declarations, reparsed = [], 0
+        segments = split_declarations(source_code)
+        try:
+            for line, col, text in segments:
+                key = (col, text)
+                # pop: два однакові шматки не повинні ділити одні й ті самі вузли AST
+                cached = previous.pop(key, None)
+                if cached is None:
+                    errors = reporter.error_count
+                    lexer = Lexer(text, reporter)
+                    lexer.line, lexer.col = line, col
+                    nodes = Parser(lexer, reporter).parse().declarations
+                    reparsed += 1
+                    if reporter.error_count > errors: continue  # оголошення з помилкою не кешується
+                else:
+                    cached_line, nodes = cached
+                    if cached_line != line: _shift_lines(nodes, line - cached_line, set())
+                current[key] = (line, nodes)
+                declarations.extend(nodes)
+        finally:
+            # Після помилки старі оголошення теж лишаються: коли її виправлять, перерозбирається лише змінене
+            self.segments = {**previous, **current} if reporter.had_error else current
+        return declarations, reparsed, len(segments)
+
+    def frontend(self, source_code):
+        """Повертає (AST або None, опис роботи фронтенду). Діагностика - в self.reporter."""
+        if _GENERATOR_KEYWORDS.search(source_code):
+            from main import run_frontend
+            ast, _ = run_frontend(source_code, self.reporter.file_path, self.reporter, self.args.warden_checks)
+            return ast, 'full (generators)'
+        declarations, reparsed, total = self.parse(source_code, self.reporter)
+        if self.reporter.had_error:
+            # Помилка в оголошенні або неточний поділ: звичайний фронтенд дасть ті самі
+            # повідомлення (з тим самим контекстом), що й `main.py`.
+            from main import run_frontend
+            self.reporter = ErrorReporter(self.reporter.file_path, self.reporter.source_lines, self.args.max_errors)
+            ast, _ = run_frontend(source_code, self.reporter.file_path, self.reporter, self.args.warden_checks)
+            return ast, 'full'
+        ast = Program(declarations)
+        Checker(self.reporter).check(ast)
+        if self.reporter.had_error: return None, 'checker'
+        BoundsAnalyzer(self.reporter).analyze(ast)
+        if self.reporter.had_error: return None, 'bounds'
+        WardenAnalyzer(self.args.warden_checks).analyze(ast)
+        return ast, f"{reparsed}/{total} declarations re-parsed"
+
+    def rebuild(self):
+        """Одне перезбирання. Повертає True, якщо виконуваний файл оновлено."""
+        from main import run_tool, report_failure
+
+        with open(self.input_path, 'r', encoding='utf-8') as f:
+            source_code = f.read()
+        if source_code == self.last_source: return False
+        self.last_source = source_code
+        self.builds += 1
+        print(f"--- {'Building' if self.builds == 1 else 'Change detected, rebuilding'} "
+              f"{self.input_path} (#{self.builds}, Target: {self.args.target.upper()}) ---")
+
+        start = time.perf_counter()
+        self.reporter = ErrorReporter(str(self.input_path), source_code.split('\n'), self.args.max_errors)
+        try:
+            ast, frontend_note = self.frontend(source_code)
+            if ast is None:
+                report_failure(self.reporter)
+                return self._failed(start)
+            self.reporter.flush()
+            frontend_time = time.perf_counter() - start
+            print(f"  [+] Front end: {frontend_note}")
+
+            if self.args.target == 'asm':
+                generated_code, rebuilt, total = generate_asm_incremental(ast, self.reporter, self.cache, self.units)
+            else:
+                rebuilt, total = build_cpp_incremental(ast, self.reporter, self.cache, self.executable_path,
+                                                       self.args.opt_level, self.build_dir / 'units',
+                                                       memory=self.units, warden_checks=self.args.warden_checks)
+            if self.reporter.had_error:
+                report_failure(self.reporter)
+                return self._failed(start)
+            if self.args.target == 'asm':
+                print(f"  [+] Incremental: {rebuilt}/{total} functions regenerated")
+                self.build_dir.mkdir(parents=True, exist_ok=True)
+                asm_path = self.build_dir / (self.executable_path.name + '.asm')
+                obj_path = self.build_dir / (self.executable_path.name + '.o')
+                asm_path.write_text(generated_code)
+                run_tool(['nasm', '-f', 'elf64', '-o', obj_path, asm_path])
+                run_tool(['ld', '-o', self.executable_path, obj_path])
+            else:
+                print(f"  [+] Incremental: {rebuilt}/{total} functions recompiled")
+        except FileNotFoundError:
+            print("\nError: A required build tool was not found (e.g., nasm, ld, g++).")
+            return self._failed(start)
+        except subprocess.CalledProcessError as e:
+            print(f"\nAn error occurred during an external command: {e}")
+            return self._failed(start)
+        except (CompilerError, TooManyErrors) as e:
+            report_failure(self.reporter, e)
+            return self._failed(start)
+        except Exception:
+            print("\n--- An unexpected internal compiler error occurred ---")
+            traceback.print_exc()
+            print("------------------------------------------------------")
+            return self._failed(start)
+
+        total_time = time.perf_counter() - start
+        print(f"  [+] Executable file saved to {self.executable_path}")
+        print(f"  [+] Rebuilt in {total_time * 1000:.1f} ms (front end {frontend_time * 1000:.1f} ms, "
+              f"backend {(total_time - frontend_time) * 1000:.1f} ms)")
+        return True
+
+    def _failed(self, start):
+        print(f"  [!] Build failed after {(time.perf_counter() - start) * 1000:.1f} ms, waiting for changes")
+        # Після виправлення той самий текст має збиратися знову
+        self.last_source = None
+        return False
+
+    def run_program(self):
+        print(f"--- Running {self.executable_path.name} ---")
+        start = time.perf_counter()
+        result = subprocess.run([str(self.executable_path)])
+        print(f"\n--- Exited with code {result.returncode} after {(time.perf_counter() - start) * 1000:.1f} ms ---")
+
+
+def watch(argv):
+    arg_parser = argparse.ArgumentParser(prog="ignis watch",
+                                         description="Rebuild an Ignis program every time its source file changes.")
+    arg_parser.add_argument('input_file', type=str, help='The Ignis source file to watch')
+    arg_parser.add_argument('-o', '--output', type=str, help='Specify the output file name')
+    arg_parser.add_argument('--target', type=str, choices=['asm', 'cpp'], default='asm',
+                            help="Specify the compilation target: 'asm' (default) or 'cpp'")
+    arg_parser.add_argument('-O', dest='opt_level', choices=['0', '1', '2', '3', 's'], default='0',
+                            help="Optimization level passed to g++ (only for 'cpp' target), default 0")
+    arg_parser.add_argument('--warden-checks', choices=WARDEN_MODES, default='elided',
+                            help="Runtime key checks on dereference (only for 'cpp' target), default 'elided'")
+    arg_parser.add_argument('--max-errors', type=int, default=DEFAULT_MAX_ERRORS, metavar='N',
+                            help=f"Stop after N errors (default: {DEFAULT_MAX_ERRORS}, 0 - no limit)")
+    arg_parser.add_argument('--run', action='store_true', help="Run the program after every successful rebuild")
+    arg_parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                            help=f"How often to check the file's mtime, in seconds (default: {DEFAULT_INTERVAL})")
+    args = arg_parser.parse_args(argv)
+
+    session = WatchSession(args)
+    if not session.input_path.exists():
+        print(f"Error: Input file not found at '{session.input_path}'")
+        return 1
+    print(f"--- Watching {session.input_path} (every {args.interval:g} s), press Ctrl+C to stop ---")
+    # Перезбирання інкрементне, а воно працює з AST
+    print("  [!] Rebuilds generate code from the AST: tail calls are not eliminated and the IR optimizations "
+          "are skipped")
+    last_mtime = None
+    try:
+        while True:
+            try:
+                mtime = os.stat(session.input_path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None  # редактор зберігає файл через перейменування - чекаємо, доки він з'явиться
+            if mtime is not None and mtime != last_mtime:
+                last_mtime = mtime
+                if session.rebuild() and args.run: session.run_program()
+                sys.stdout.flush()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n--- Watch stopped ---")
+        return 0